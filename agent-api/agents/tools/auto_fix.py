@@ -28,8 +28,8 @@ Runtime traceback handling:
     If preview tool returns a traceback (e.g., NameError, AttributeError), call
     `fix_code_with_iterations` again with the original code + error message.
 
-NOTE: We intentionally keep execution sandbox-free (no exec) for safety. Only AST parsing
-and regex scanning is done. Downstream Manim runtime does deeper validation.
+NOTE: We intentionally keep execution sandbox-free (no exec) for safety. Only AST parsing,
+static linting (agents.tools.scene_lint) and regex scanning is done. Downstream Manim runtime does deeper validation.
 """
 
 from __future__ import annotations
@@ -39,7 +39,8 @@ import re
 from dataclasses import dataclass
 from typing import Optional, Tuple, List
 
-from agents.tools.code_generation import generate_manim_code, CodeGenerationError
+from agents.tools.code_generation import generate_manim_code, discard_generated_code, CodeGenerationError
+from agents.tools.scene_lint import lint_scene
 
 
 # -------------------------------------------------------------------------------------------------
@@ -83,6 +84,7 @@ def quick_validate(code: str) -> ValidationResult:
       - Contains 'class GenScene(Scene):'
       - AST parses without SyntaxError
       - Basic parentheses/brackets/braces balance check
+      - Static lint (undefined names, unknown Manim kwargs/methods, unknown dataset columns)
 
     Returns:
         ValidationResult(ok=True) if passes, else ok=False with error detail.
@@ -108,6 +110,10 @@ def quick_validate(code: str) -> ValidationResult:
     if not _balanced_delimiters(code):
         return ValidationResult(False, "Unbalanced parentheses/brackets/braces detected.")
 
+    report = lint_scene(code)
+    if not report.ok:
+        return ValidationResult(False, f"Static check failed:\n{report.summary()}")
+
     return ValidationResult(True, "")
 
 
@@ -345,6 +351,7 @@ def fix_code_with_iterations_verbose(
             return FixResult(code=fixed, attempts=attempts + 1, last_error=None, history=history)
         else:
             # Prepare next iteration
+            discard_generated_code(fixed)
             attempts += 1
             current_code = fixed
             current_error = v.error
@@ -28,12 +28,22 @@ import time
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Any
 
+from agents.tools.csv_sniffer import PROFILE_STRICT, detect_header_row
+from agents.tools.inference_cache import dataset_fingerprint, recommendation_cache, schema_cache
+from agents.tools.keyword_matcher import INTENT_PATTERNS, scan
+from agents.tools.stream_profiler import StreamProfile, profile_csv
+
 # We'll use pandas for data analysis
 try:
     import pandas as pd
 except ImportError:
     pd = None  # Handle gracefully if pandas not available
 
+# Rows analyze_schema() reads when no upload-time profile exists yet. Keeps
+# the request path bounded on large files; the background dataset profile
+# still scans every row. 0 disables the bound.
+SCHEMA_SCAN_MAX_ROWS = int(os.getenv("SCHEMA_SCAN_MAX_ROWS", "500000"))
+
 # Setup logging
 _logger = logging.getLogger("chart_inference")
 _logger.setLevel(logging.DEBUG)
@@ -92,22 +102,10 @@ def _resolve_csv_path(csv_path: str) -> str:
 
 def _detect_header_row(filepath: str, max_rows_to_check: int = 10) -> int:
     """
-    Detect the actual header row in a CSV file.
-
-    World Bank and similar data sources often have metadata rows before
-    the actual data table:
+    Detect the actual header row in a CSV file (World Bank style metadata rows).
 
-        "Data Source","World Development Indicators",
-        "Last Updated Date","2025-...",
-        <blank line>
-        "Country Name","Country Code","Indicator Name",...,1960,1961,...
-        "Afghanistan","AFG","Inflation...",...
-
-    This function scans the first few rows to find where the real data starts
-    by looking for:
-    1. A row with significantly more columns than previous rows
-    2. A row containing year-like column headers (1960, 1970, etc.)
-    3. A row containing common data column names (Country, Name, Code, etc.)
+    Delegates to the shared memoized sniffer (agents.tools.csv_sniffer) using
+    the "strict" scoring profile.
 
     Args:
         filepath: Path to the CSV file
@@ -116,75 +114,7 @@ def _detect_header_row(filepath: str, max_rows_to_check: int = 10) -> int:
     Returns:
         0-based index of the header row (0 if no special header detected)
     """
-    import csv
-
-    try:
-        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-            # Read first N rows
-            rows = []
-            reader = csv.reader(f)
-            for i, row in enumerate(reader):
-                if i >= max_rows_to_check:
-                    break
-                rows.append(row)
-
-        if not rows:
-            return 0
-
-        # Patterns indicating a data header row
-        header_patterns = [
-            r'country', r'name', r'code', r'indicator', r'region',
-            r'year', r'date', r'value', r'series', r'id',
-        ]
-        year_pattern = re.compile(r'^(19|20)\d{2}$')  # Years like 1960, 2023
-
-        best_row = 0
-        best_score = 0
-        max_cols = 0
-
-        for i, row in enumerate(rows):
-            col_count = len([c for c in row if c.strip()])  # Non-empty columns
-            score = 0
-
-            # Score: more columns than previous rows (data tables are wider)
-            if col_count > max_cols * 1.5 and col_count >= 4:
-                score += 3
-            max_cols = max(max_cols, col_count)
-
-            # Score: contains year columns
-            year_cols = sum(1 for c in row if year_pattern.match(str(c).strip()))
-            if year_cols >= 3:
-                score += 5
-
-            # Score: contains header-like column names
-            header_matches = sum(
-                1 for c in row
-                if any(re.search(p, str(c).lower()) for p in header_patterns)
-            )
-            if header_matches >= 2:
-                score += 3
-
-            # Score: row has many columns (at least 5)
-            if col_count >= 5:
-                score += 1
-
-            if score > best_score:
-                best_score = score
-                best_row = i
-
-        if best_score >= 3:
-            _log("DEBUG", "Detected header row", {
-                "header_row": best_row,
-                "score": best_score,
-                "filepath": os.path.basename(filepath),
-            })
-            return best_row
-
-        return 0
-
-    except Exception as e:
-        _log("WARNING", f"Header detection failed: {e}", {"filepath": filepath})
-        return 0
+    return detect_header_row(filepath, max_rows_to_check=max_rows_to_check, profile=PROFILE_STRICT)
 
 
 # =============================================================================
@@ -319,85 +249,8 @@ CHART_REQUIREMENTS: Dict[str, Dict[str, Any]] = {
 # INTENT PATTERNS (User's goal/language)
 # =============================================================================
 
-# These patterns detect WHAT the user wants to communicate
-# Not just chart names, but semantic intent
-
-INTENT_PATTERNS: Dict[str, List[str]] = {
-    "bar_race": [
-        # Competition/Ranking intent
-        r"\b(rank(ing)?|peringkat|top\s*\d+|leaderboard)\b",
-        r"\b(compar(e|ing|ison)|banding(kan)?|versus|vs)\b",
-        r"\b(race|racing|compete|competition|lomba)\b",
-        r"\b(rise|fall|overtake|surpass|naik|turun)\b",
-        # Explicit chart name
-        r"\bbar\s*(chart\s*)?race\b",
-        r"\bracing\s*bar\b",
-    ],
-    "line_evolution": [
-        # Trend/Change intent
-        r"\b(trend|tren|trajectory|path)\b",
-        r"\b(evolution|evolusi|perkembangan)\b",
-        r"\b(grow(th)?|decline|change|perubahan)\b",
-        r"\b(over\s*time|time\s*series|dari\s*waktu\s*ke\s*waktu)\b",
-        # Explicit chart name
-        r"\bline\s*(chart|graph|evolution)?\b",
-        r"\bgrafik\s*garis\b",
-    ],
-    "bubble": [
-        # Multi-dimensional intent
-        r"\b(relationship|correlation|korelasi|hubungan)\b",
-        r"\b(x\s*(vs?|versus)\s*y|scatter)\b",
-        r"\b(size|radius|magnitude|ukuran)\b",
-        r"\b(multi.?dimensional|3\s*variables?)\b",
-        # Explicit chart name
-        r"\bbubble\s*(chart)?\b",
-        r"\bgelembung\b",
-    ],
-    "distribution": [
-        # Spread/Shape intent
-        r"\b(distribution|distribusi|spread|sebaran)\b",
-        r"\b(histogram|frequency|frekuensi)\b",
-        r"\b(density|kepadatan|kde)\b",
-        r"\b(normal|skew|outlier)\b",
-        # Explicit chart name
-        r"\bdistribution\s*(chart|plot)?\b",
-    ],
-    "bento_grid": [
-        # Overview/Summary intent
-        r"\b(dashboard|overview|summary|ringkasan)\b",
-        r"\b(kpi|metric(s)?|key\s*indicator)\b",
-        r"\b(at\s*a\s*glance|snapshot|quick\s*view)\b",
-        r"\b(grid|panel|tile)\b",
-        # Explicit chart name
-        r"\bbento\s*(grid|box)?\b",
-    ],
-    "count_bar": [
-        # Counting/Frequency intent
-        r"\b(count(s|ing)?|hitung(an)?|jumlah)\b",
-        r"\b(frequency|frekuensi|occurrences?)\b",
-        r"\b(how\s*many|berapa\s*banyak)\b",
-        r"\b(categor(y|ies|ical)|kategori)\b",
-        r"\b(breakdown|by\s+category)\b",
-        # Explicit chart name
-        r"\bcount\s*(bar|chart)?\b",
-        r"\bbar\s*chart\b(?!\s*race)",  # bar chart but not bar chart race
-        r"\bhorizontal\s*bar\b",
-    ],
-    "single_numeric": [
-        # Value-per-category intent
-        r"\b(value|nilai|amount|jumlah)\s*(by|per|untuk)\b",
-        r"\b(revenue|sales|penjualan)\s*(by|per)\b",
-        r"\b(population|populasi)\s*(by|per)\b",
-        r"\b(score|skor)\s*(by|per)\b",
-        r"\b(total|sum)\s*(by|per)\b",
-        r"\b(show|tampilkan)\s*(the\s*)?(values?|data)\b",
-        # Simple bar chart (not race, not count)
-        r"\bsimple\s*bar\s*(chart)?\b",
-        r"\bbar\s*(chart|graph)\b(?!\s*race)",
-        # Explicit chart name
-        r"\bsingle\s*numeric\b",
-    ],
-}
+# Patterns live in keyword_matcher (INTENT_PATTERNS, re-exported here) so
+# they are matched in the same pass as the intent-detection vocabularies.
 
 
 # =============================================================================
@@ -425,8 +278,8 @@ def _is_year_column(series: "pd.Series") -> bool:
         return False
 
 
-def _is_temporal_column(col_name: str, series: "pd.Series") -> bool:
-    """Check if a column is temporal (time-based)"""
+def _is_temporal_name(col_name: str) -> bool:
+    """Check if a column name marks it as temporal (time-based)"""
     # Check by column name
     temporal_names = ["time", "year", "date", "period", "tahun", "periode", "t", "month", "bulan"]
     if col_name.lower().strip() in temporal_names:
@@ -436,6 +289,14 @@ def _is_temporal_column(col_name: str, series: "pd.Series") -> bool:
     if re.match(r"^(year|yr|date|time|periode?|tahun)$", col_name.lower().strip()):
         return True
 
+    return False
+
+
+def _is_temporal_column(col_name: str, series: "pd.Series") -> bool:
+    """Check if a column is temporal (time-based)"""
+    if _is_temporal_name(col_name):
+        return True
+
     # Check content for year-like values
     if _is_year_column(series):
         return True
@@ -484,20 +345,45 @@ def _detect_wide_format(df: "pd.DataFrame") -> Tuple[bool, List[str]]:
     return is_wide, time_columns
 
 
-def analyze_schema(csv_path: str, sample_rows: int = 500) -> DataSchema:
+def analyze_schema(
+    csv_path: str,
+    sample_rows: int = 500,
+    max_rows: Optional[int] = None,
+) -> DataSchema:
     """
     Analyze CSV structure to understand what charts are possible.
 
     This is the core function that examines the data and extracts
-    key properties needed for chart recommendation.
+    key properties needed for chart recommendation. The file is scanned
+    once in chunks (see stream_profiler), up to SCHEMA_SCAN_MAX_ROWS rows:
+    types, unique counts and value ranges reflect every scanned row, and
+    row_count is extrapolated when the scan stops early.
 
     Args:
         csv_path: Path to the CSV file (can be /static/... URL or filesystem path)
-        sample_rows: Number of rows to sample (for performance)
+        sample_rows: Size of the per-column reservoir sample kept during the scan
+        max_rows: Scan bound (defaults to SCHEMA_SCAN_MAX_ROWS; 0 scans everything)
 
     Returns:
         DataSchema with analyzed properties
     """
+    if max_rows is None:
+        max_rows = SCHEMA_SCAN_MAX_ROWS
+    return schema_from_stream(profile_schema(csv_path, sample_rows, max_rows=max_rows or None))
+
+
+def profile_schema(
+    csv_path: str,
+    sample_rows: int = 500,
+    max_rows: Optional[int] = None,
+) -> "StreamProfile":
+    """
+    Run the streaming profiler over a CSV (after header-row detection).
+
+    Exposed separately so callers that also need per-column stats (dataset
+    profiles, column analysis) share the single pass with analyze_schema().
+    Scans the whole file unless max_rows is given.
+    """
     start_time = time.time()
 
     # Resolve /static/... paths to filesystem paths
@@ -520,20 +406,19 @@ def analyze_schema(csv_path: str, sample_rows: int = 500) -> DataSchema:
     # Detect the actual header row (handles World Bank and similar formats)
     header_row = _detect_header_row(resolved_path)
 
-    # Read sample of the data
-    # IMPORTANT: Use skip_blank_lines=False to match the row indexing from csv.reader
-    # which counts all rows including blank ones. Without this, pandas skips blank lines
-    # and the header_row index becomes incorrect (off by number of blank lines skipped).
+    # IMPORTANT: the profiler reads with skip_blank_lines=False to match the row
+    # indexing from csv.reader (which counts blank rows), and with utf-8-sig to
+    # handle the BOM common in World Bank and Excel-exported CSVs.
     try:
-        # Use utf-8-sig encoding to automatically handle BOM (Byte Order Mark)
-        # which is common in World Bank and Excel-exported CSVs
-        df = pd.read_csv(resolved_path, nrows=sample_rows, header=header_row, skip_blank_lines=False, encoding='utf-8-sig')
-        _log("DEBUG", "CSV file loaded", {
+        stream = profile_csv(resolved_path, header_row=header_row, sample_size=sample_rows, max_rows=max_rows)
+        _log("DEBUG", "CSV file profiled", {
             "csv_path": csv_path,
             "header_row": header_row,
-            "rows_loaded": len(df),
-            "columns": list(df.columns)[:10],  # First 10 to avoid log spam
-            "total_columns": len(df.columns),
+            "rows_scanned": stream.rows_scanned,
+            "complete": stream.complete,
+            "chunks": stream.chunks,
+            "columns": [c.name for c in stream.columns][:10],  # First 10 to avoid log spam
+            "total_columns": len(stream.columns),
         })
     except Exception as e:
         _log("ERROR", f"Failed to read CSV file: {e}", {
@@ -542,7 +427,13 @@ def analyze_schema(csv_path: str, sample_rows: int = 500) -> DataSchema:
         })
         raise
 
-    if df.empty:
+    stream.elapsed_ms = round((time.time() - start_time) * 1000, 2)
+    return stream
+
+
+def schema_from_stream(stream: "StreamProfile") -> DataSchema:
+    """Derive a DataSchema from a streaming profile."""
+    if stream.row_count == 0:
         raise ValueError("CSV file is empty")
 
     # Analyze each column
@@ -551,14 +442,15 @@ def analyze_schema(csv_path: str, sample_rows: int = 500) -> DataSchema:
     categorical_cols: List[str] = []
     time_col: Optional[str] = None
 
-    for col in df.columns:
-        # Check if temporal first (by name and content)
-        if _is_temporal_column(col, df[col]):
+    for sketch in stream.columns:
+        col = sketch.name
+        # Check if temporal first (by name, then >80% year-like values)
+        if _is_temporal_name(col) or sketch.year_ratio > 0.8:
             column_types[col] = "temporal"
             if time_col is None:
                 time_col = col
-        # Then check if numeric
-        elif pd.api.types.is_numeric_dtype(df[col]):
+        # Then check if numeric (every non-null value parses as a number)
+        elif sketch.all_numeric:
             column_types[col] = "numeric"
             numeric_cols.append(col)
         # Otherwise categorical
@@ -566,29 +458,31 @@ def analyze_schema(csv_path: str, sample_rows: int = 500) -> DataSchema:
             column_types[col] = "categorical"
             categorical_cols.append(col)
 
-    # Calculate unique counts for each column
-    unique_counts = {col: int(df[col].nunique()) for col in df.columns}
+    # Unique counts: exact for small cardinalities, HyperLogLog estimate above
+    unique_counts = {sketch.name: sketch.distinct for sketch in stream.columns}
 
     # Entity count = max unique values among categorical columns
     entity_count = 0
     if categorical_cols:
         entity_count = max(unique_counts[c] for c in categorical_cols)
 
-    # Detect wide format
-    is_wide, year_cols = _detect_wide_format(df)
+    # Detect wide format (headers only)
+    columns = [sketch.name for sketch in stream.columns]
+    is_wide, year_cols = _detect_wide_format(pd.DataFrame(columns=columns))
 
     # Calculate value range from numeric columns
     value_range = None
-    if numeric_cols:
-        all_numeric = pd.concat([df[c] for c in numeric_cols])
-        value_range = (float(all_numeric.min()), float(all_numeric.max()))
+    mins = [stream.column(c).numeric_min for c in numeric_cols if stream.column(c).numeric_min is not None]
+    maxs = [stream.column(c).numeric_max for c in numeric_cols if stream.column(c).numeric_max is not None]
+    if mins and maxs:
+        value_range = (float(min(mins)), float(max(maxs)))
 
-    elapsed_ms = (time.time() - start_time) * 1000
     _log("INFO", "Schema analysis completed", {
-        "csv_path": csv_path,
-        "elapsed_ms": round(elapsed_ms, 2),
-        "row_count": len(df),
-        "column_count": len(df.columns),
+        "csv_path": stream.path,
+        "elapsed_ms": stream.elapsed_ms,
+        "row_count": stream.row_count,
+        "row_count_estimated": not stream.complete,
+        "column_count": len(columns),
         "numeric_columns": numeric_cols,
         "categorical_columns": categorical_cols,
         "has_time": time_col is not None,
@@ -598,9 +492,9 @@ def analyze_schema(csv_path: str, sample_rows: int = 500) -> DataSchema:
     })
 
     return DataSchema(
-        columns=list(df.columns),
+        columns=columns,
         column_types=column_types,
-        row_count=len(df),
+        row_count=stream.row_count,
         unique_counts=unique_counts,
         has_time=(time_col is not None),
         time_column=time_col,
@@ -777,12 +671,8 @@ def _match_intent_patterns(text: str, chart_type: str) -> float:
     if not patterns:
         return 0.0
 
-    text_lower = text.lower()
-    matches = 0
-
-    for pattern in patterns:
-        if re.search(pattern, text_lower, re.IGNORECASE):
-            matches += 1
+    # Number of distinct patterns found anywhere in the text
+    matches = scan(text).count_prefix(f"intent:{chart_type}:")
 
     # Normalize: more matches = higher score, but cap at 1.0
     return min(matches * 0.3, 1.0)
@@ -806,6 +696,9 @@ def recommend_chart(
     3. Optionally boosts scores based on user intent keywords
     4. Returns sorted recommendations (best first)
 
+    Results are memoized per (dataset fingerprint, prompt) across runs; a
+    changed file gets a new fingerprint. Callers receive their own copies.
+
     Args:
         csv_path: Path to the CSV file
         user_prompt: Optional user message/prompt for intent detection
@@ -820,6 +713,21 @@ def recommend_chart(
         >>> print(recs[0].score)       # 0.92
         >>> print(recs[0].reasons)     # ["✓ Has time column", ...]
     """
+    fingerprint = dataset_fingerprint(_resolve_csv_path(csv_path))
+    if fingerprint is None:
+        # Missing file: let the uncached path raise/log as before
+        return _recommend_chart_uncached(csv_path, user_prompt, sample_rows)
+    return recommendation_cache.get_or_compute(
+        (fingerprint, user_prompt or "", sample_rows),
+        lambda: _recommend_chart_uncached(csv_path, user_prompt, sample_rows),
+    )
+
+
+def _recommend_chart_uncached(
+    csv_path: str,
+    user_prompt: Optional[str],
+    sample_rows: int,
+) -> List[ChartRecommendation]:
     start_time = time.time()
     _log("INFO", "Starting chart recommendation", {
         "csv_path": csv_path,
@@ -829,8 +737,8 @@ def recommend_chart(
     })
 
     try:
-        # Step 1: Analyze the data
-        schema = analyze_schema(csv_path, sample_rows)
+        # Step 1: Analyze the data (stored upload-time profile when available)
+        schema = load_schema(csv_path, sample_rows)
         _log("DEBUG", "Schema analysis completed for recommendation", {
             "has_time": schema.has_time,
             "numeric_count": len(schema.numeric_columns),
@@ -844,6 +752,31 @@ def recommend_chart(
         })
         raise
 
+    recommendations = recommend_chart_from_schema(schema, user_prompt)
+
+    elapsed_ms = (time.time() - start_time) * 1000
+    _log("INFO", "Chart recommendation completed", {
+        "csv_path": csv_path,
+        "elapsed_ms": round(elapsed_ms, 2),
+        "top_recommendation": recommendations[0].chart_type if recommendations else None,
+        "top_score": recommendations[0].score if recommendations else None,
+        "top_confidence": recommendations[0].confidence if recommendations else None,
+        "all_scores": {r.chart_type: r.score for r in recommendations},
+    })
+
+    return recommendations
+
+
+def recommend_chart_from_schema(
+    schema: DataSchema,
+    user_prompt: Optional[str] = None,
+) -> List[ChartRecommendation]:
+    """
+    Score every chart type against an already-analyzed schema.
+
+    Steps 2-4 of recommend_chart(); cheap enough to run per request once the
+    schema comes from a stored dataset profile.
+    """
     # Step 2: Score each chart type
     recommendations: List[ChartRecommendation] = []
 
@@ -867,18 +800,34 @@ def recommend_chart(
 
     # Step 4: Sort by score (highest first)
     recommendations.sort(key=lambda r: r.score, reverse=True)
+    return recommendations
 
-    elapsed_ms = (time.time() - start_time) * 1000
-    _log("INFO", "Chart recommendation completed", {
-        "csv_path": csv_path,
-        "elapsed_ms": round(elapsed_ms, 2),
-        "top_recommendation": recommendations[0].chart_type if recommendations else None,
-        "top_score": recommendations[0].score if recommendations else None,
-        "top_confidence": recommendations[0].confidence if recommendations else None,
-        "all_scores": {r.chart_type: r.score for r in recommendations},
-    })
 
-    return recommendations
+def load_schema(csv_path: str, sample_rows: int = 500) -> DataSchema:
+    """
+    Return the schema from the dataset's stored profile (computed at upload)
+    if it is still current for the file, otherwise analyze the file now
+    (memoized per dataset fingerprint).
+    """
+    # Lazy import: dataset_profile builds on this module
+    from agents.tools.dataset_profile import get_profile
+
+    resolved_path = _resolve_csv_path(csv_path)
+    profile = get_profile(resolved_path)
+    if profile is not None:
+        _log("DEBUG", "Using stored dataset profile", {
+            "csv_path": csv_path,
+            "profiled_at": profile.profiled_at,
+        })
+        return profile.to_schema()
+
+    fingerprint = dataset_fingerprint(resolved_path)
+    if fingerprint is None:
+        return analyze_schema(csv_path, sample_rows)
+    return schema_cache.get_or_compute(
+        (fingerprint, sample_rows),
+        lambda: analyze_schema(csv_path, sample_rows),
+    )
 
 
 def get_best_chart(
@@ -921,7 +870,7 @@ def get_schema_summary(csv_path: str) -> Dict[str, Any]:
 
     Useful for debugging or showing users what was detected.
     """
-    schema = analyze_schema(csv_path)
+    schema = load_schema(csv_path)
 
     return {
         "columns": schema.columns,
@@ -949,7 +898,11 @@ __all__ = [
     "INTENT_PATTERNS",
     # Functions
     "analyze_schema",
+    "profile_schema",
+    "schema_from_stream",
+    "load_schema",
     "recommend_chart",
+    "recommend_chart_from_schema",
     "get_best_chart",
     "get_schema_summary",
 ]
@@ -13,15 +13,28 @@ Usage:
         temperature=0.2,
         max_tokens=1200,
     )
+
+    # Streamed: progress events while the model writes, then the code
+    for event in stream_manim_code(prompt="..."):
+        if event.kind == "done":
+            code = event.code
+
+    # The scene failed lint / dry run / preview: do not serve it from the cache again
+    discard_generated_code(code)
 """
 
 from __future__ import annotations
 
 import os
 import re
+import threading
 import time
 import logging
-from typing import Optional, List
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, Optional
+
+from agents.tools.llm_gateway import LLMGatewayError, get_gateway
 
 # Import pipeline logger
 try:
@@ -147,6 +160,56 @@ def _clean_output(code: str) -> str:
 
 # OpenAI path removed (OpenAI support deprecated for this project).
 
+# Gateway error kind -> (log error_type, CodeGenerationError message)
+_GATEWAY_ERRORS = {
+    "sdk": ("sdk_import_error", "{e}"),
+    "config": ("missing_api_key", "{e}"),
+    "authentication": (
+        "authentication_error",
+        "Anthropic authentication failed: Invalid API key. Check ANTHROPIC_API_KEY environment variable.",
+    ),
+    "rate_limit": ("rate_limit_error", "Anthropic rate limit exceeded: {e}"),
+    "timeout": ("timeout_error", "Anthropic API request timed out: {e}"),
+    "connection": ("connection_error", "Failed to connect to Anthropic API: {e}"),
+    "status": ("api_status_error", "Anthropic API error: {e}"),
+}
+
+
+# Response-cache entries behind recently generated scenes (code -> (gateway, key)),
+# so a scene rejected downstream is not replayed to the next identical request
+_MAX_TRACKED_COMPLETIONS = 256
+_completion_keys: "OrderedDict[str, tuple]" = OrderedDict()
+_completion_keys_lock = threading.Lock()
+
+
+def _track_completion(code: str, gateway: Any, response: Any) -> None:
+    key = getattr(response, "cache_key", None)
+    if key is None:
+        return
+    with _completion_keys_lock:
+        _completion_keys[code] = (gateway, key)
+        _completion_keys.move_to_end(code)
+        while len(_completion_keys) > _MAX_TRACKED_COMPLETIONS:
+            _completion_keys.popitem(last=False)
+
+
+def discard_generated_code(code: str) -> bool:
+    """
+    Drop the cached completion that produced ``code``.
+
+    Call it when the scene fails a later check (lint, dry run, preview):
+    the same prompt then reaches the model again instead of getting the
+    rejected scene back from the response cache. Returns False for code
+    that did not come from a cached completion (e.g. templates).
+    """
+    with _completion_keys_lock:
+        entry = _completion_keys.pop(code, None)
+    if entry is None:
+        return False
+    gateway, key = entry
+    gateway.invalidate(key)
+    return True
+
 
 def _call_anthropic(
     prompt: str,
@@ -159,7 +222,7 @@ def _call_anthropic(
 ) -> str:
     """Call Anthropic API with comprehensive logging."""
 
-    _log("INFO", f"Starting Anthropic API call", run_id, "llm_api_call_start", {
+    _log("INFO", "Starting Anthropic API call", run_id, "llm_api_call_start", {
         "model": model,
         "temperature": temperature,
         "max_tokens": max_tokens,
@@ -167,15 +230,6 @@ def _call_anthropic(
         "has_api_key": bool(api_key),
     })
 
-    try:
-        import anthropic
-    except Exception as e:
-        _log("ERROR", f"Anthropic SDK not available: {e}", run_id, "llm_api_call_error", {
-            "error_type": "sdk_import_error",
-            "error": str(e),
-        })
-        raise CodeGenerationError(f"Anthropic SDK not available: {e}")
-
     # Check API key
     if not api_key:
         _log("ERROR", "ANTHROPIC_API_KEY not set or empty", run_id, "llm_api_call_error", {
@@ -183,102 +237,53 @@ def _call_anthropic(
         })
         raise CodeGenerationError("ANTHROPIC_API_KEY environment variable not set")
 
-    client = anthropic.Anthropic(api_key=api_key)
-
     start_time = time.time()
     _log("DEBUG", "Sending request to Anthropic API...", run_id, "llm_api_call_start", {
         "model": model,
     })
 
+    gateway = get_gateway(api_key)
     try:
-        resp = client.messages.create(
+        resp = gateway.complete(
+            prompt,
             model=model,
             system=system_prompt,
             max_tokens=max_tokens,
             temperature=temperature,
-            messages=[{"role": "user", "content": prompt}],
+            # Only completions that yield a scene are worth replaying from the cache
+            accept=lambda text: "class GenScene" in _clean_output(_extract_code_from_text(text)),
         )
 
-        elapsed_ms = (time.time() - start_time) * 1000
-        _log("INFO", f"Anthropic API call successful", run_id, "llm_api_call_complete", {
+        _log("INFO", "Anthropic API call successful", run_id, "llm_api_call_complete", {
             "model": model,
-            "elapsed_ms": round(elapsed_ms, 2),
-            "stop_reason": getattr(resp, "stop_reason", None),
-            "usage_input_tokens": getattr(getattr(resp, "usage", None), "input_tokens", None),
-            "usage_output_tokens": getattr(getattr(resp, "usage", None), "output_tokens", None),
-        })
-
-    except anthropic.AuthenticationError as e:
-        elapsed_ms = (time.time() - start_time) * 1000
-        _log("ERROR", f"Anthropic authentication failed - invalid API key", run_id, "llm_api_call_error", {
-            "error_type": "authentication_error",
-            "elapsed_ms": round(elapsed_ms, 2),
-            "error": str(e),
-        })
-        raise CodeGenerationError(f"Anthropic authentication failed: Invalid API key. Check ANTHROPIC_API_KEY environment variable.")
-
-    except anthropic.RateLimitError as e:
-        elapsed_ms = (time.time() - start_time) * 1000
-        _log("ERROR", f"Anthropic rate limit exceeded", run_id, "llm_api_call_error", {
-            "error_type": "rate_limit_error",
-            "elapsed_ms": round(elapsed_ms, 2),
-            "error": str(e),
-        })
-        raise CodeGenerationError(f"Anthropic rate limit exceeded: {e}")
-
-    except anthropic.APIConnectionError as e:
-        elapsed_ms = (time.time() - start_time) * 1000
-        _log("ERROR", f"Anthropic connection error", run_id, "llm_api_call_error", {
-            "error_type": "connection_error",
-            "elapsed_ms": round(elapsed_ms, 2),
-            "error": str(e),
-        })
-        raise CodeGenerationError(f"Failed to connect to Anthropic API: {e}")
-
-    except anthropic.APIStatusError as e:
-        elapsed_ms = (time.time() - start_time) * 1000
-        _log("ERROR", f"Anthropic API status error", run_id, "llm_api_call_error", {
-            "error_type": "api_status_error",
-            "status_code": getattr(e, "status_code", None),
-            "elapsed_ms": round(elapsed_ms, 2),
-            "error": str(e),
+            "elapsed_ms": resp.latency_ms,
+            "attempts": resp.attempts,
+            "cached": resp.cached,
+            "stop_reason": resp.stop_reason,
+            "usage_input_tokens": resp.input_tokens,
+            "usage_output_tokens": resp.output_tokens,
         })
-        raise CodeGenerationError(f"Anthropic API error: {e}")
 
-    except Exception as e:
+    except LLMGatewayError as e:
         elapsed_ms = (time.time() - start_time) * 1000
-        _log("ERROR", f"Anthropic call failed with unexpected error", run_id, "llm_api_call_error", {
-            "error_type": type(e).__name__,
+        error_type, message = _GATEWAY_ERRORS.get(e.kind, (e.kind, "Anthropic call failed: {e}"))
+        _log("ERROR", f"Anthropic call failed ({e.kind})", run_id, "llm_api_call_error", {
+            "error_type": error_type,
+            "status_code": e.status_code,
             "elapsed_ms": round(elapsed_ms, 2),
             "error": str(e),
         })
-        raise CodeGenerationError(f"Anthropic call failed: {e}")
-
-    # Parse response
-    _log("DEBUG", "Parsing Anthropic response...", run_id, "code_generation_parse")
-
-    try:
-        blocks: List = resp.content or []
-        text = "".join(
-            getattr(block, "text", "") for block in blocks if getattr(block, "type", "") == "text"
-        )
-
-        _log("DEBUG", f"Response parsed successfully", run_id, "code_generation_parse", {
-            "response_length": len(text),
-            "num_blocks": len(blocks),
-        })
+        raise CodeGenerationError(message.format(e=e)) from e
 
-    except Exception as e:
-        _log("ERROR", f"Failed to parse Anthropic response", run_id, "code_generation_error", {
-            "error_type": "response_parse_error",
-            "error": str(e),
-        })
-        raise CodeGenerationError(f"Unexpected Anthropic response format: {e}")
+    text = resp.text
+    _log("DEBUG", "Response parsed successfully", run_id, "code_generation_parse", {
+        "response_length": len(text),
+    })
 
     code = _extract_code_from_text(text)
     code = _clean_output(code)
 
-    _log("DEBUG", f"Code extracted and cleaned", run_id, "code_generation_complete", {
+    _log("DEBUG", "Code extracted and cleaned", run_id, "code_generation_complete", {
         "code_length": len(code),
         "has_genscene": "class GenScene" in code,
     })
@@ -290,9 +295,43 @@ def _call_anthropic(
         })
         raise CodeGenerationError("Generated code does not define 'class GenScene'.")
 
+    _track_completion(code, gateway, resp)
     return code
 
 
+def _resolve_engine_model(engine: Optional[str], model: Optional[str], run_id: Optional[str] = None) -> tuple[str, str]:
+    """Normalize the engine and resolve/validate the model ID."""
+    engine = (engine or "anthropic").lower().strip()
+    if engine not in DEFAULT_MODELS:
+        _log("ERROR", "Invalid engine specified", run_id, "code_generation_error", {
+            "engine": engine,
+            "valid_engines": list(DEFAULT_MODELS.keys()),
+        })
+        raise CodeGenerationError(f"Invalid engine '{engine}'. Use one of: {list(DEFAULT_MODELS.keys())}")
+
+    if model is None:
+        model = DEFAULT_MODELS[engine]
+        _log("DEBUG", "Using default model for engine", run_id, "code_generation_config", {
+            "engine": engine,
+            "model": model,
+        })
+    else:
+        model = model.strip()
+        # If we have a validation set for this engine, enforce it (best-effort).
+        valid = VALID_MODELS.get(engine)
+        if valid and model not in valid:
+            _log("ERROR", "Invalid model specified", run_id, "code_generation_error", {
+                "model": model,
+                "engine": engine,
+                "valid_models": sorted(valid),
+            })
+            raise CodeGenerationError(
+                f"Invalid model '{model}' for engine '{engine}'. Valid: {sorted(valid)}"
+            )
+
+    return engine, model
+
+
 def generate_manim_code(
     prompt: str,
     *,
@@ -332,33 +371,7 @@ def generate_manim_code(
         "has_extra_rules": bool(extra_rules),
     })
 
-    engine = (engine or "anthropic").lower().strip()
-    if engine not in DEFAULT_MODELS:
-        _log("ERROR", f"Invalid engine specified", run_id, "code_generation_error", {
-            "engine": engine,
-            "valid_engines": list(DEFAULT_MODELS.keys()),
-        })
-        raise CodeGenerationError(f"Invalid engine '{engine}'. Use one of: {list(DEFAULT_MODELS.keys())}")
-
-    if model is None:
-        model = DEFAULT_MODELS[engine]
-        _log("DEBUG", f"Using default model for engine", run_id, "code_generation_config", {
-            "engine": engine,
-            "model": model,
-        })
-    else:
-        model = model.strip()
-        # If we have a validation set for this engine, enforce it (best-effort).
-        valid = VALID_MODELS.get(engine)
-        if valid and model not in valid:
-            _log("ERROR", f"Invalid model specified", run_id, "code_generation_error", {
-                "model": model,
-                "engine": engine,
-                "valid_models": sorted(valid),
-            })
-            raise CodeGenerationError(
-                f"Invalid model '{model}' for engine '{engine}'. Valid: {sorted(valid)}"
-            )
+    engine, model = _resolve_engine_model(engine, model, run_id)
 
     system_prompt = _build_system_prompt(extra_rules=extra_rules)
     _log("DEBUG", "System prompt built", run_id, "code_generation_config", {
@@ -399,7 +412,7 @@ def generate_manim_code(
 
         except CodeGenerationError as e:
             elapsed_ms = (time.time() - start_time) * 1000
-            _log("ERROR", f"Code generation failed", run_id, "code_generation_error", {
+            _log("ERROR", "Code generation failed", run_id, "code_generation_error", {
                 "engine": engine,
                 "model": model,
                 "elapsed_ms": round(elapsed_ms, 2),
@@ -408,5 +421,234 @@ def generate_manim_code(
             raise
 
     # Should never reach here
-    _log("ERROR", f"Unhandled engine", run_id, "code_generation_error", {"engine": engine})
+    _log("ERROR", "Unhandled engine", run_id, "code_generation_error", {"engine": engine})
     raise CodeGenerationError(f"Unhandled engine '{engine}'")
+
+
+# -------------------------------------------------------------------------------------------------
+# Streaming generation
+# -------------------------------------------------------------------------------------------------
+
+_GENSCENE_HEADER_RE = re.compile(r"^class\s+GenScene\b", re.MULTILINE)
+
+
+class StreamingCodeValidator:
+    """
+    Incremental checks on a completion while it streams.
+
+    feed() returns a rejection reason as soon as the text can no longer
+    become a usable scene, so the call can be aborted instead of waiting
+    for the full completion:
+    - the completed lines of the code do not compile (judged with codeop,
+      so unfinished blocks, brackets and strings are not errors)
+    - no ``class GenScene`` header within ``header_budget`` characters
+    - a reply that opens with prose gets no code fence within
+      ``prose_budget`` characters
+
+    The code is the contents of the first code fence when there is one,
+    otherwise the whole text (the same rule as _extract_code_from_text).
+    """
+
+    def __init__(self, header_budget: int = 6000, prose_budget: int = 1200):
+        self.header_budget = header_budget
+        self.prose_budget = prose_budget
+        self.text = ""
+        self.has_genscene = False
+        self.lines = 0
+
+    def _code(self) -> tuple[str, bool]:
+        """(code so far, whether it is fenced)."""
+        fence = self.text.find("```")
+        if fence < 0:
+            return self.text, False
+        start = self.text.find("\n", fence)
+        if start < 0:
+            return "", True
+        end = self.text.find("```", start)
+        return (self.text[start + 1:] if end < 0 else self.text[start + 1:end] + "\n"), True
+
+    def feed(self, delta: str) -> Optional[str]:
+        self.text += delta
+        code, fenced = self._code()
+        complete = code[: code.rfind("\n") + 1]
+        lines = complete.count("\n")
+        if lines == self.lines:
+            return None
+        self.lines = lines
+        if not self.has_genscene:
+            self.has_genscene = bool(_GENSCENE_HEADER_RE.search(complete))
+
+        error = _compile_error(complete)
+        if error is not None:
+            first_line = next((line for line in complete.splitlines() if line.strip()), "")
+            if not fenced and _compile_error(first_line + "\n") is not None:
+                # Prose so far; it may still introduce a fenced block
+                if len(self.text) > self.prose_budget:
+                    return "response is not Python code"
+                return None
+            return f"syntax error: {error}"
+        if not self.has_genscene and len(complete) > self.header_budget:
+            return "no 'class GenScene' definition"
+        return None
+
+
+def _compile_error(source: str) -> Optional[str]:
+    """Why ``source`` is invalid Python, or None if it is valid or merely incomplete."""
+    import codeop
+
+    try:
+        codeop.compile_command(source, "<generated>", "exec")
+    except (SyntaxError, ValueError, OverflowError) as e:
+        lineno = getattr(e, "lineno", None)
+        return f"{getattr(e, 'msg', e)} (line {lineno})" if lineno else str(e)
+    return None
+
+
+@dataclass
+class CodeGenerationProgress:
+    """
+    One event of stream_manim_code().
+
+    kind: "started" | "scene_detected" | "progress" | "retry" | "done".
+    ``code`` is set on "done".
+    """
+    kind: str
+    attempt: int
+    lines: int = 0
+    chars: int = 0
+    has_genscene: bool = False
+    message: str = ""
+    code: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("code")
+        return data
+
+
+def stream_manim_code(
+    prompt: str,
+    *,
+    engine: str = "anthropic",
+    model: Optional[str] = None,
+    temperature: float = 0.2,
+    max_tokens: int = 1200,
+    extra_rules: Optional[str] = None,
+    run_id: Optional[str] = None,
+    max_attempts: int = 2,
+    progress_every_seconds: float = 2.0,
+) -> Iterator[CodeGenerationProgress]:
+    """
+    Streaming variant of generate_manim_code().
+
+    Yields progress events while the model writes the scene and a final
+    "done" event carrying the code. Completions that StreamingCodeValidator
+    rejects are aborted mid-stream and retried (up to ``max_attempts``
+    calls) with the rejection reason added to the rules; the last attempt is
+    never aborted, so it behaves like generate_manim_code().
+
+    Raises:
+        CodeGenerationError: If the model call fails or the final code is invalid.
+    """
+    start_time = time.time()
+    engine, model = _resolve_engine_model(engine, model, run_id)
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        _log("ERROR", "ANTHROPIC_API_KEY not set or empty", run_id, "llm_api_call_error", {
+            "error_type": "missing_api_key",
+        })
+        raise CodeGenerationError("ANTHROPIC_API_KEY environment variable not set")
+
+    rules = extra_rules
+    for attempt in range(1, max_attempts + 1):
+        last_attempt = attempt == max_attempts
+        system_prompt = _build_system_prompt(extra_rules=rules)
+        validator = StreamingCodeValidator()
+        gateway = get_gateway(api_key)
+        stream = gateway.stream(
+            prompt,
+            model=model,
+            system=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            accept=lambda text: "class GenScene" in _clean_output(_extract_code_from_text(text)),
+        )
+        _log("INFO", "Starting streamed code generation", run_id, "llm_api_call_start", {
+            "model": model,
+            "attempt": attempt,
+            "prompt_length": len(prompt),
+        })
+        yield CodeGenerationProgress("started", attempt)
+
+        rejection = None
+        last_progress = time.monotonic()
+        try:
+            for delta in stream:
+                had_genscene = validator.has_genscene
+                rejection = validator.feed(delta)
+                if rejection and not last_attempt:
+                    break
+                rejection = None
+                now = time.monotonic()
+                if validator.has_genscene and not had_genscene:
+                    last_progress = now
+                    yield CodeGenerationProgress(
+                        "scene_detected", attempt, validator.lines, len(validator.text), True,
+                        "Scene class detected, writing the animation...",
+                    )
+                elif now - last_progress >= progress_every_seconds:
+                    last_progress = now
+                    yield CodeGenerationProgress(
+                        "progress", attempt, validator.lines, len(validator.text), validator.has_genscene,
+                    )
+        except LLMGatewayError as e:
+            error_type, message = _GATEWAY_ERRORS.get(e.kind, (e.kind, "Anthropic call failed: {e}"))
+            _log("ERROR", f"Streamed code generation failed ({e.kind})", run_id, "llm_api_call_error", {
+                "error_type": error_type,
+                "status_code": e.status_code,
+                "attempt": attempt,
+                "error": str(e),
+            })
+            raise CodeGenerationError(message.format(e=e)) from e
+        finally:
+            stream.close()
+
+        if rejection is None:
+            code = _clean_output(_extract_code_from_text(validator.text))
+            if "class GenScene" in code:
+                response = stream.response
+                _log("INFO", "Streamed code generation completed", run_id, "code_generation_complete", {
+                    "model": model,
+                    "attempt": attempt,
+                    "elapsed_ms": round((time.time() - start_time) * 1000, 2),
+                    "first_token_ms": getattr(response, "first_token_ms", None),
+                    "cached": getattr(response, "cached", False),
+                    "code_length": len(code),
+                })
+                _track_completion(code, gateway, response)
+                yield CodeGenerationProgress(
+                    "done", attempt, validator.lines, len(validator.text), True, "Code generated.", code,
+                )
+                return
+            rejection = "no 'class GenScene' definition"
+            if last_attempt:
+                _log("ERROR", "Generated code missing 'class GenScene'", run_id, "code_generation_error", {
+                    "error_type": "invalid_code_structure",
+                    "code_preview": code[:200] if code else "(empty)",
+                })
+                raise CodeGenerationError("Generated code does not define 'class GenScene'.")
+
+        _log("WARNING", f"Rejected streamed code: {rejection}", run_id, "code_generation_retry", {
+            "attempt": attempt,
+            "lines": validator.lines,
+            "chars": len(validator.text),
+        })
+        yield CodeGenerationProgress(
+            "retry", attempt, validator.lines, len(validator.text), validator.has_genscene,
+            f"Generated code was invalid ({rejection}); retrying...",
+        )
+        rules = "\n".join(filter(None, [
+            extra_rules,
+            f"A previous attempt was rejected ({rejection}). Return only complete, valid Python code "
+            f"that defines GenScene(Scene).",
+        ]))
@@ -0,0 +1,412 @@
+"""
+CSV Sniffer
+
+Single shared implementation of CSV header-row detection used by the API
+preprocessing layer (api/services/data_modules.py), smart chart inference
+(agents/tools/chart_inference.py) and the template CSV helpers
+(agents/tools/templates/csv_utils.py).
+
+The sniffer:
+- Reads a bounded byte prefix of the file once (never the whole file).
+- Detects BOM, encoding (utf-8 / utf-8-sig / latin-1) and delimiter.
+- Scores the first rows with a single precompiled alternation regex.
+- Memoizes results per (path, mtime, size) so repeated calls within a
+  request (and across requests) cost one os.stat().
+
+Two scoring profiles are provided because the callers historically used
+slightly different heuristics:
+- "strict":  data_modules / chart_inference (World Bank style metadata rows)
+- "lenient": template CSV helpers (accepts narrower tables, penalizes numeric rows)
+
+Usage:
+    from agents.tools.csv_sniffer import sniff_csv, detect_header_row
+
+    info = sniff_csv("/path/to/data.csv")
+    print(info.encoding, info.delimiter, info.header_row)
+
+    header_row = detect_header_row("/path/to/data.csv", profile="lenient")
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+logger = logging.getLogger("csv_sniffer")
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Initial prefix size; grown (doubling) until enough rows are available
+PREFIX_BYTES = 64 * 1024
+# Hard cap on how much of the file we are willing to read while sniffing
+MAX_PREFIX_BYTES = 4 * 1024 * 1024
+# Number of memoized sniff results kept in-process
+CACHE_SIZE = 256
+
+DELIMITER_CANDIDATES = ",;\t|"
+
+PROFILE_STRICT = "strict"
+PROFILE_LENIENT = "lenient"
+
+# Header tokens used by data_modules / chart_inference
+_STRICT_HEADER_TOKENS = (
+    "country", "name", "code", "indicator", "region",
+    "year", "date", "value", "series", "id",
+)
+# Template helpers recognise a few more domain words
+_LENIENT_HEADER_TOKENS = _STRICT_HEADER_TOKENS + (
+    "film", "director", "time", "category", "label",
+    "entity", "salary", "title", "amount",
+)
+
+# One alternation per profile instead of a re.search() per token per cell
+_STRICT_HEADER_RE = re.compile("|".join(_STRICT_HEADER_TOKENS))
+_LENIENT_HEADER_RE = re.compile("|".join(_LENIENT_HEADER_TOKENS))
+_YEAR_RE = re.compile(r"^(?:19|20)\d{2}$")
+
+
+# =============================================================================
+# DATA STRUCTURES
+# =============================================================================
+
+@dataclass(frozen=True)
+class CsvSniffResult:
+    """
+    Result of sniffing a CSV file prefix.
+
+    Attributes:
+        path: Filesystem path that was sniffed
+        encoding: Encoding suitable for pandas/open() ("utf-8-sig", "utf-8" or "latin-1")
+        has_bom: True if the file starts with a UTF-8 BOM
+        delimiter: Detected field delimiter (defaults to ",")
+        header_row: 0-based header row using the "strict" profile
+        lenient_header_row: 0-based header row using the "lenient" profile
+        rows: First rows of the file (as parsed for scoring)
+        prefix_bytes: Number of bytes read from the file
+        truncated: True if the prefix did not reach end of file
+    """
+    path: str
+    encoding: str
+    has_bom: bool
+    delimiter: str
+    header_row: int
+    lenient_header_row: int
+    rows: Tuple[Tuple[str, ...], ...]
+    prefix_bytes: int
+    truncated: bool
+
+    def header_row_for(self, profile: str = PROFILE_STRICT) -> int:
+        """Return the header row for a scoring profile."""
+        if profile == PROFILE_LENIENT:
+            return self.lenient_header_row
+        return self.header_row
+
+
+# =============================================================================
+# PREFIX READING / DECODING
+# =============================================================================
+
+def _read_prefix(filepath: str, max_rows: int) -> Tuple[bytes, bool]:
+    """
+    Read a bounded prefix that contains at least `max_rows` complete lines
+    (when the file has that many), growing the read size up to MAX_PREFIX_BYTES.
+
+    Returns:
+        (prefix_bytes, truncated) where truncated is False if EOF was reached
+    """
+    size = PREFIX_BYTES
+    with open(filepath, "rb") as f:
+        data = f.read(size)
+        while True:
+            if len(data) < size:
+                return data, False
+            # max() rather than sum so CRLF files aren't double counted; CR-only files still count
+            if max(data.count(b"\n"), data.count(b"\r")) > max_rows or size >= MAX_PREFIX_BYTES:
+                return data, True
+            more = f.read(size)
+            if not more:
+                return data, False
+            data += more
+            size *= 2
+
+
+def _decode_prefix(raw: bytes, truncated: bool) -> Tuple[str, str, bool]:
+    """
+    Decode a byte prefix, returning (text, encoding, has_bom).
+
+    A truncated prefix may end in the middle of a multi-byte sequence, so
+    the incremental decoder is used without a final flush in that case.
+    """
+    has_bom = raw.startswith(codecs.BOM_UTF8)
+    try:
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        text = decoder.decode(raw, final=not truncated)
+        return text, ("utf-8-sig" if has_bom else "utf-8"), has_bom
+    except UnicodeDecodeError:
+        return raw.decode("latin-1"), "latin-1", has_bom
+
+
+def _detect_delimiter(lines: Sequence[str]) -> str:
+    """Detect the delimiter from the first few lines, defaulting to a comma."""
+    sample = "\n".join(line for line in lines if line.strip())
+    if not sample:
+        return ","
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=DELIMITER_CANDIDATES)
+        delimiter = dialect.delimiter
+    except csv.Error:
+        return ","
+    # Only trust the sniffer if the delimiter beats commas on the widest line
+    widest = max(lines, key=lambda ln: ln.count(delimiter))
+    if delimiter != "," and widest.count(delimiter) <= widest.count(","):
+        return ","
+    return delimiter
+
+
+def _parse_rows(text: str, truncated: bool, delimiter: str, max_rows: int) -> List[List[str]]:
+    """Parse up to `max_rows` rows from decoded prefix text."""
+    if truncated:
+        # Drop a trailing partial line so the last row isn't cut in half
+        cut = max(text.rfind("\n"), text.rfind("\r"))
+        if cut != -1:
+            text = text[: cut + 1]
+    rows: List[List[str]] = []
+    reader = csv.reader(io.StringIO(text, newline=""), delimiter=delimiter)
+    try:
+        for row in reader:
+            rows.append(row)
+            if len(rows) >= max_rows:
+                break
+    except csv.Error as e:
+        logger.debug(f"[csv_sniffer] Stopped parsing prefix early: {e}")
+    return rows
+
+
+# =============================================================================
+# SCORING
+# =============================================================================
+
+def _is_number_like(val: str) -> bool:
+    """Detect numeric-like strings (ints, floats, thousands separators, percentages)."""
+    v = val.strip().replace(",", "")
+    if v.endswith("%"):
+        v = v[:-1]
+    try:
+        float(v)
+        return True
+    except ValueError:
+        return False
+
+
+def _score_strict(rows: Sequence[Sequence[str]]) -> int:
+    """
+    World Bank oriented scoring (metadata rows above a wide table).
+
+    Rewards rows that are much wider than previous rows, contain several
+    year-like headers, contain header tokens and have many columns.
+    Returns 0 unless some row scores at least 3.
+    """
+    best_row = 0
+    best_score = 0
+    max_cols = 0
+
+    for i, row in enumerate(rows):
+        stripped = [c.strip() for c in row]
+        col_count = sum(1 for c in stripped if c)
+        score = 0
+
+        if col_count > max_cols * 1.5 and col_count >= 4:
+            score += 3
+        max_cols = max(max_cols, col_count)
+
+        year_cols = sum(1 for c in stripped if _YEAR_RE.match(c))
+        if year_cols >= 3:
+            score += 5
+
+        header_matches = sum(1 for c in row if _STRICT_HEADER_RE.search(c.lower()))
+        if header_matches >= 2:
+            score += 3
+
+        if col_count >= 5:
+            score += 1
+
+        if score > best_score:
+            best_score = score
+            best_row = i
+
+    return best_row if best_score >= 3 else 0
+
+
+def _score_lenient(rows: Sequence[Sequence[str]]) -> int:
+    """
+    Template oriented scoring.
+
+    Accepts narrower tables (3+ columns), gives partial credit for a single
+    year/header token and penalizes rows that look like numeric data.
+    Returns 0 unless some row scores at least 1.
+    """
+    best_row = 0
+    best_score = -1
+    max_cols = 0
+
+    for i, row in enumerate(rows):
+        stripped = [c.strip() for c in row]
+        col_count = sum(1 for c in stripped if c)
+        score = 0
+
+        if col_count > max_cols * 1.5 and col_count >= 3:
+            score += 3
+        max_cols = max(max_cols, col_count)
+
+        years_cols = sum(1 for c in stripped if _YEAR_RE.match(c))
+        if years_cols >= 2:
+            score += 4
+        elif years_cols == 1:
+            score += 1
+
+        header_matches = sum(1 for c in stripped if _LENIENT_HEADER_RE.search(c.lower()))
+        if header_matches >= 2:
+            score += 3
+        elif header_matches == 1:
+            score += 1
+
+        if col_count >= 4:
+            score += 1
+
+        numeric_cells = sum(1 for c in stripped if _is_number_like(c))
+        if numeric_cells >= max(1, col_count * 0.6):
+            score -= 2
+
+        if score > best_score:
+            best_score = score
+            best_row = i
+
+    return best_row if best_score >= 1 else 0
+
+
+# =============================================================================
+# MEMOIZED SNIFFING
+# =============================================================================
+
+_cache: "OrderedDict[Tuple[str, int, int, int], CsvSniffResult]" = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def _sniff_uncached(filepath: str, max_rows: int) -> CsvSniffResult:
+    raw, truncated = _read_prefix(filepath, max_rows)
+    text, encoding, has_bom = _decode_prefix(raw, truncated)
+    head_lines = text.splitlines()[: max_rows]
+    delimiter = _detect_delimiter(head_lines)
+    rows = _parse_rows(text, truncated, delimiter, max_rows)
+
+    return CsvSniffResult(
+        path=filepath,
+        encoding=encoding,
+        has_bom=has_bom,
+        delimiter=delimiter,
+        header_row=_score_strict(rows),
+        lenient_header_row=_score_lenient(rows),
+        rows=tuple(tuple(r) for r in rows),
+        prefix_bytes=len(raw),
+        truncated=truncated,
+    )
+
+
+def sniff_csv(filepath: str, max_rows: int = 10) -> CsvSniffResult:
+    """
+    Sniff a CSV file: encoding, BOM, delimiter and header row.
+
+    Results are memoized per (path, mtime, size, max_rows); a modified file
+    is re-sniffed automatically.
+
+    Args:
+        filepath: Filesystem path to the CSV file
+        max_rows: Number of leading rows to consider for header detection
+
+    Raises:
+        OSError if the file cannot be stat'ed or read
+
+    Returns:
+        CsvSniffResult
+    """
+    st = os.stat(filepath)
+    key = (os.path.abspath(filepath), st.st_mtime_ns, st.st_size, max_rows)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            return cached
+        _cache_stats["misses"] += 1
+
+    result = _sniff_uncached(filepath, max_rows)
+
+    with _cache_lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    logger.debug(
+        f"[csv_sniffer] Sniffed {os.path.basename(filepath)} | encoding={result.encoding} "
+        f"delimiter={result.delimiter!r} header_row={result.header_row} "
+        f"lenient_header_row={result.lenient_header_row} prefix_bytes={result.prefix_bytes}"
+    )
+    return result
+
+
+def detect_header_row(filepath: str, max_rows_to_check: int = 10, profile: str = PROFILE_STRICT) -> int:
+    """
+    Detect the 0-based header row of a CSV file.
+
+    Args:
+        filepath: Path to the CSV file
+        max_rows_to_check: Maximum number of rows to scan
+        profile: "strict" (default) or "lenient" scoring
+
+    Returns:
+        0-based index of the header row (0 if detection fails)
+    """
+    try:
+        return sniff_csv(filepath, max_rows=max_rows_to_check).header_row_for(profile)
+    except Exception as e:
+        logger.warning(f"[csv_sniffer] Header detection failed for {filepath}: {e}")
+        return 0
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Return memoization statistics (hits, misses, size)."""
+    with _cache_lock:
+        return {**_cache_stats, "size": len(_cache)}
+
+
+def clear_cache() -> None:
+    """Drop all memoized sniff results."""
+    with _cache_lock:
+        _cache.clear()
+        _cache_stats["hits"] = 0
+        _cache_stats["misses"] = 0
+
+
+__all__ = [
+    "CsvSniffResult",
+    "PROFILE_STRICT",
+    "PROFILE_LENIENT",
+    "sniff_csv",
+    "detect_header_row",
+    "get_cache_stats",
+    "clear_cache",
+]
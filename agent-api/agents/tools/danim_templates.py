@@ -29,6 +29,8 @@ import os
 from dataclasses import dataclass
 from typing import Dict, List, Tuple, Optional
 
+from agents.tools.templates.scene_data import scene_data_block
+
 try:
     from agents.tools.specs import ChartSpec, DataBinding  # type: ignore
 except Exception:
@@ -333,23 +335,21 @@ def generate_bubble_code(spec: object, csv_path: str, use_modern: bool = True) -
     radius_min = 0.08
     radius_max = 0.60
 
-    # Embed literals
-    lit_times = _format_literal(times)
-    lit_entities = _format_literal(entities)
-    lit_group_of = _format_literal(group_of)
-    lit_data = _format_literal(data)
-    lit_color_map = _format_literal(final_color_map)
+    # Dataset (parsed server-side): binary sidecar, or literals when small
+    data_block = scene_data_block({
+        "TIMES": times,
+        "ENTITIES": entities,
+        "GROUP_OF": group_of,
+        "DATA": data,
+        "GROUP_COLOR_MAP": final_color_map,
+    }, formatter=_format_literal)
 
     code = f'''
 from manim import *
 import math
 
-# Embedded dataset (parsed server-side)
-TIMES = {lit_times}
-ENTITIES = {lit_entities}
-GROUP_OF = {lit_group_of}
-DATA = {lit_data}  # DATA[time][entity] = {{ "x": float, "y": float, "r": float }}
-GROUP_COLOR_MAP = {lit_color_map}
+# Dataset (parsed server-side); DATA[time][entity] = {{ "x": float, "y": float, "r": float }}
+{data_block}
 
 # Axis configuration (auto/manual resolved server-side)
 X_MIN, X_MAX = {x_min}, {x_max}
@@ -23,7 +23,10 @@ Heuristics & Features:
 - Intersects time keys across X/Y/R sets to ensure alignment.
 - If a group file is provided, merges group labels; otherwise assigns "ALL".
 - Attempts multiple common entity column name variants.
-- Pure standard library (csv + typing + dataclasses); no external dependencies.
+- Vectorized pandas/NumPy path (melt + keyed join, streaming CSV write) for large
+  bundles; falls back to a pure standard library implementation when pandas is
+  unavailable or a file has a layout the vectorized reader can't mirror exactly
+  (duplicate/blank headers, ragged rows). Both paths produce byte-identical output.
 
 Main entry:
     unify_danim_files(
@@ -56,10 +59,24 @@ Example:
 from __future__ import annotations
 
 import csv
+import logging
 import os
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Sequence, Any, Tuple, Set
 
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # Vectorized path is optional; the stdlib path is always available
+    np = None  # type: ignore
+    pd = None  # type: ignore
+
+logger = logging.getLogger("data_ingestion")
+
+UNIFIED_COLUMNS = ["entity", "time", "x", "y", "r", "group"]
+# Rows per csv.writer.writerows() batch when streaming the unified CSV
+WRITE_CHUNK_ROWS = 50_000
+
 
 # ---------------------------------------------------------------------------
 # Data structures
@@ -203,6 +220,262 @@ def _write_unified_csv(path: str, rows: List[Dict[str, Any]], headers: List[str]
             writer.writerow({h: r.get(h, "") for h in headers})
 
 
+# ---------------------------------------------------------------------------
+# Vectorized helpers (pandas / NumPy)
+# ---------------------------------------------------------------------------
+
+class _VectorizedUnsupported(Exception):
+    """Raised when a file can't be mirrored exactly by the vectorized reader."""
+
+
+def _read_header_line(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def _read_frame(path: str) -> "pd.DataFrame":
+    """
+    Read a CSV as an all-string DataFrame matching csv.DictReader semantics
+    (no NA inference, blank lines skipped, missing trailing cells -> "").
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"CSV not found: {path}")
+    try:
+        df = pd.read_csv(
+            path,
+            dtype=str,
+            keep_default_na=False,
+            na_filter=False,
+            encoding="utf-8-sig",
+            index_col=False,
+        )
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError, ValueError) as e:
+        raise _VectorizedUnsupported(str(e)) from e
+    # pandas renames duplicate/blank headers ("a.1", "Unnamed: 3") where DictReader keeps them
+    if list(df.columns) != _read_header_line(path):
+        raise _VectorizedUnsupported("header names differ from csv.DictReader view")
+    return df.fillna("")
+
+
+def _parse_float_block(cells: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Parse a 2-D array of stripped strings with Python float() semantics.
+
+    NumPy's str -> float64 cast uses the same parser as float(), so the common
+    case is a single vectorized cast; columns containing non-numeric tokens
+    fall back to per-cell parsing for that column only.
+
+    Returns:
+        (values, present) where present marks cells that were non-empty and parseable
+    """
+    nonempty = cells != ""
+    filled = np.where(nonempty, cells, "nan")
+    try:
+        return filled.astype(np.float64), nonempty
+    except ValueError:
+        pass
+
+    values = np.full(filled.shape, np.nan, dtype=np.float64)
+    ok = np.ones(filled.shape, dtype=bool)
+    for j in range(filled.shape[1]):
+        col = filled[:, j]
+        try:
+            values[:, j] = col.astype(np.float64)
+            continue
+        except ValueError:
+            pass
+        for i, cell in enumerate(col.tolist()):
+            try:
+                values[i, j] = float(cell)
+            except ValueError:
+                ok[i, j] = False
+    return values, nonempty & ok
+
+
+def _wide_to_long(df: "pd.DataFrame", entity_col: str, value_name: str) -> Tuple["pd.DataFrame", Set[str], Set[str]]:
+    """
+    Vectorized equivalent of _parse_wide: melt a wide frame into
+    (entity, time, <value_name>) keeping the last valid value per key.
+
+    Returns (long_df, entities, time_tokens).
+    """
+    entities = df[entity_col].str.strip().to_numpy(dtype=object)
+    keep = entities != ""
+    entity_set: Set[str] = set(entities[keep].tolist())
+    time_cols = [h for h in df.columns if h != entity_col]
+
+    empty = pd.DataFrame({"entity": [], "time": [], value_name: []})
+    if not time_cols or not keep.any():
+        return empty, entity_set, set()
+
+    cells = np.char.strip(df[time_cols].to_numpy(dtype=str)[keep])
+    values, present = _parse_float_block(cells)
+
+    # Row-major order keeps "later rows win" semantics for duplicate entities
+    rows_idx, cols_idx = np.nonzero(present)
+    time_arr = np.asarray(time_cols, dtype=object)
+    long_df = pd.DataFrame({
+        "entity": entities[keep][rows_idx],
+        "time": time_arr[cols_idx],
+        value_name: values[rows_idx, cols_idx],
+    })
+    long_df = long_df.drop_duplicates(["entity", "time"], keep="last")
+    return long_df, entity_set, set(time_arr[np.unique(cols_idx)].tolist())
+
+
+def _long_to_keyed(df: "pd.DataFrame", value_col: str) -> "pd.DataFrame":
+    """
+    Vectorized equivalent of the passthrough _long_map: (entity, time, value)
+    rows with stripped keys, keeping the last valid value per key.
+    """
+    if "entity" not in df.columns or "time" not in df.columns or value_col not in df.columns:
+        return pd.DataFrame({"entity": [], "time": [], value_col: []})
+    ent = df["entity"].str.strip().to_numpy(dtype=object)
+    tim = df["time"].str.strip().to_numpy(dtype=object)
+    cells = np.char.strip(df[[value_col]].to_numpy(dtype=str))
+    values, present = _parse_float_block(cells)
+    mask = (ent != "") & (tim != "") & present[:, 0]
+    out = pd.DataFrame({"entity": ent[mask], "time": tim[mask], value_col: values[mask, 0]})
+    return out.drop_duplicates(["entity", "time"], keep="last")
+
+
+def _write_unified_frame(path: str, frame: "pd.DataFrame") -> None:
+    """Stream a unified frame to CSV in chunks (same formatting as csv.DictWriter)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    n = len(frame)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(UNIFIED_COLUMNS)
+        for start in range(0, n, WRITE_CHUNK_ROWS):
+            chunk = frame.iloc[start:start + WRITE_CHUNK_ROWS]
+            # tolist() yields Python floats so str() formatting matches the stdlib path
+            writer.writerows(zip(*(chunk[c].tolist() for c in UNIFIED_COLUMNS), strict=True))
+
+
+def _load_group_map(g_path: str, candidates: Sequence[str], warnings: List[str]) -> Dict[str, str]:
+    group_map: Dict[str, str] = {}
+    try:
+        g_rows, g_headers = _safe_read_csv(g_path)
+        grp_entity_col = _detect_entity_column(g_headers, candidates)
+        if grp_entity_col:
+            group_map = _merge_group_labels(g_rows, grp_entity_col)
+        else:
+            warnings.append("Could not detect entity column in group file; skipping group merge.")
+    except Exception as e:
+        warnings.append(f"Failed to process group file: {e}")
+    return group_map
+
+
+def _unify_vectorized(
+    x_path: str,
+    y_path: str,
+    r_path: str,
+    g_path: str,
+    output_path: str,
+    entity_col_candidates: Sequence[str],
+) -> IngestionResult:
+    """pandas/NumPy implementation of unify_danim_files (melt + keyed join)."""
+    warnings: List[str] = []
+
+    x_df = _read_frame(x_path)
+    y_df = _read_frame(y_path)
+    r_df = _read_frame(r_path)
+    x_headers, y_headers, r_headers = list(x_df.columns), list(y_df.columns), list(r_df.columns)
+
+    entity_col = _detect_entity_column(x_headers, entity_col_candidates)
+    if not entity_col:
+        raise ValueError(
+            f"Could not detect entity column. Expected one of {entity_col_candidates} in {x_headers}"
+        )
+
+    if all(_is_unified_format(h) for h in (x_headers, y_headers, r_headers)):
+        warnings.append("All input files appear to be unified already; merging by (entity,time).")
+        x_long = _long_to_keyed(x_df, "x")
+        y_long = _long_to_keyed(y_df, "y")
+        r_long = _long_to_keyed(r_df, "r")
+        keys = pd.concat([x_long[["entity", "time"]], y_long[["entity", "time"]], r_long[["entity", "time"]]])
+        entities_count = keys["entity"].nunique()
+        times_count = keys["time"].nunique()
+
+        unified = x_long.merge(y_long, on=["entity", "time"]).merge(r_long, on=["entity", "time"])
+        unified = unified.sort_values(["entity", "time"], kind="mergesort")
+
+        group_map: Dict[str, str] = {}
+        if os.path.exists(g_path):
+            group_map = _load_group_map(g_path, (entity_col, "entity", "Entity", "Country"), warnings)
+        unified["group"] = unified["entity"].map(group_map).fillna("ALL")
+
+        _write_unified_frame(output_path, unified)
+        return IngestionResult(
+            unified_path=output_path,
+            rows_count=len(unified),
+            entities_count=entities_count,
+            times_count=times_count,
+            columns=list(UNIFIED_COLUMNS),
+            warnings=warnings,
+            metadata={"mode": "passthrough-long-form"},
+        )
+
+    # Wide-form path: melt each file to (entity, time, value)
+    x_long, x_entities, x_times = _wide_to_long(x_df, entity_col, "x")
+    y_long, y_entities, y_times = _wide_to_long(y_df, entity_col, "y")
+    r_long, r_entities, r_times = _wide_to_long(r_df, entity_col, "r")
+
+    if not x_times or not y_times or not r_times:
+        raise ValueError("No time columns detected in one or more wide-form files.")
+
+    common_times = _intersect_time_sets(x_times, y_times, r_times)
+    if not common_times:
+        raise ValueError("No overlapping time columns between X/Y/R datasets.")
+
+    entities_all = x_entities & y_entities & r_entities
+    if not entities_all:
+        raise ValueError("No common entities across X/Y/R datasets after parsing.")
+
+    group_map = {}
+    if os.path.exists(g_path):
+        group_map = _load_group_map(g_path, entity_col_candidates, warnings)
+    else:
+        warnings.append("Group file not found; assigning ALL as group for each entity.")
+
+    # Keyed inner join restricted to common entities/times
+    time_pos = {t: i for i, t in enumerate(common_times)}
+    frames = []
+    for long_df in (x_long, y_long, r_long):
+        sel = long_df["entity"].isin(entities_all) & long_df["time"].isin(common_times)
+        frames.append(long_df[sel])
+    unified = frames[0].merge(frames[1], on=["entity", "time"]).merge(frames[2], on=["entity", "time"])
+    unified["_tpos"] = unified["time"].map(time_pos)
+    unified = unified.sort_values(["entity", "_tpos"], kind="mergesort")
+    unified["group"] = unified["entity"].map(group_map).fillna("ALL")
+
+    skipped_missing = len(entities_all) * len(common_times) - len(unified)
+    if skipped_missing > 0:
+        warnings.append(f"Skipped {skipped_missing} (entity,time) rows with missing x/y/r values.")
+
+    _write_unified_frame(output_path, unified)
+
+    return IngestionResult(
+        unified_path=output_path,
+        rows_count=len(unified),
+        entities_count=len(entities_all),
+        times_count=len(common_times),
+        columns=list(UNIFIED_COLUMNS),
+        warnings=warnings,
+        metadata={
+            "mode": "wide-form",
+            "input_files": {
+                "x": x_path,
+                "y": y_path,
+                "r": r_path,
+                "group": g_path if os.path.exists(g_path) else None,
+            },
+            "entity_column": entity_col,
+            "time_intersection_count": len(common_times),
+        },
+    )
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
@@ -221,6 +494,9 @@ def unify_danim_files(
     """
     Ingest Danim-style multiple wide-form CSV files and produce a unified long-form dataset.
 
+    Uses the vectorized pandas/NumPy path when available and falls back to the
+    standard library implementation otherwise; output is identical either way.
+
     Args:
         base_dir: Directory containing X.csv, Y.csv, R.csv, (optionally Group_lable.csv)
         x_file, y_file, r_file, group_file: Filenames inside base_dir
@@ -235,9 +511,6 @@ def unify_danim_files(
         FileNotFoundError if required files are missing.
         ValueError for structural problems (e.g., cannot detect entity column).
     """
-    warnings: List[str] = []
-    meta: Dict[str, Any] = {}
-
     # Resolve paths
     x_path = os.path.join(base_dir, x_file)
     y_path = os.path.join(base_dir, y_file)
@@ -246,6 +519,26 @@ def unify_danim_files(
     if output_path is None:
         output_path = os.path.join(base_dir, "unified_dataset.csv")
 
+    if pd is not None and np is not None:
+        try:
+            return _unify_vectorized(x_path, y_path, r_path, g_path, output_path, entity_col_candidates)
+        except _VectorizedUnsupported as e:
+            logger.info(f"[data_ingestion] Falling back to stdlib unification: {e}")
+
+    return _unify_python(x_path, y_path, r_path, g_path, output_path, entity_col_candidates)
+
+
+def _unify_python(
+    x_path: str,
+    y_path: str,
+    r_path: str,
+    g_path: str,
+    output_path: str,
+    entity_col_candidates: Sequence[str],
+) -> IngestionResult:
+    """Standard library implementation of unify_danim_files."""
+    warnings: List[str] = []
+
     # Read files
     x_rows, x_headers = _safe_read_csv(x_path)
     y_rows, y_headers = _safe_read_csv(y_path)
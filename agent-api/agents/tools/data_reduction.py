@@ -0,0 +1,483 @@
+"""
+data_reduction.py
+
+Render-aware data reduction stage that runs between preprocessing and the
+template generators.
+
+Templates embed every time point and every entity into the generated scene
+(DATA / TIMES / CATEGORIES literals), so render cost grows with raw data size:
+a daily series over 20 years becomes thousands of `self.play` steps in a bar
+race, or a line path with tens of thousands of points. This module enforces a
+frame/step budget before code generation:
+
+- Temporal resampling: when a chart has more time steps than the budget, keep
+  evenly spaced time keys (first and last always kept). Time-series used by
+  bar_race / bubble hold levels, so the value at each bin boundary is kept
+  verbatim rather than re-aggregated.
+- Top-K entity selection:
+    * bar_race: keep the union of the per-step top-K (K = bars on screen), so
+      the template's own first/last-step ranking picks the same categories.
+    * bubble: cap the entity count by peak bubble size.
+    * line_evolution: keep the K largest series and fold the rest into a
+      single "Other" series (per-time sum).
+- Shape-preserving downsampling: Largest-Triangle-Three-Buckets (LTTB) on each
+  line series so peaks and valleys survive.
+
+Rows are read with the same loader the templates use (csv_utils.read_csv_rows)
+and kept rows are written back verbatim, so the template parses identical
+values for everything that survives the reduction.
+
+Pure standard library; no external dependencies.
+
+Main entry:
+    reduce_for_render(csv_path, chart_type, spec=None, output_path=None, budget=None)
+        -> ReductionReport
+"""
+
+from __future__ import annotations
+
+import csv
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from agents.tools.templates.csv_utils import read_csv_rows
+
+logger = logging.getLogger("data_reduction")
+
+OTHER_LABEL = "Other"
+
+# Column candidates mirror each template's _resolve_column() fallbacks
+_TIME_CANDIDATES = ["time", "year", "date", "period", "t"]
+_LINE_TIME_CANDIDATES = ["time", "date", "year", "month", "day", "period", "t", "timestamp"]
+_BAR_VALUE_CANDIDATES = ["value", "count", "score", "gdp", "population", "amount"]
+_LINE_VALUE_CANDIDATES = ["value", "close", "price", "amount", "total", "count", "score", "y"]
+_BAR_ENTITY_CANDIDATES = ["name", "entity", "country", "category", "label", "item"]
+_BUBBLE_ENTITY_CANDIDATES = ["entity", "name", "country", "region", "item", "label"]
+_BUBBLE_R_CANDIDATES = ["r", "size", "population", "pop", "radius", "count"]
+_LINE_GROUP_CANDIDATES = ["group", "entity", "name", "country", "category", "label"]
+
+SUPPORTED_CHART_TYPES = ("bar_race", "bubble", "line_evolution")
+
+
+# ---------------------------------------------------------------------------
+# Data structures
+# ---------------------------------------------------------------------------
+
+@dataclass
+class RenderBudget:
+    """
+    Upper bounds on what a generated scene may contain.
+
+    max_time_steps: animation steps (bar race frames / bubble transitions)
+    bar_top_k: bars visible at once in bar_race (template default is 12)
+    max_bubble_entities: bubbles drawn per frame
+    max_line_series: line series before folding the rest into "Other"
+    max_line_points: points per line series after LTTB
+    """
+    max_time_steps: int = 120
+    bar_top_k: int = 12
+    max_bubble_entities: int = 150
+    max_line_series: int = 8
+    max_line_points: int = 500
+
+    # Shortest on-screen duration worth spending on one animation step
+    MIN_STEP_SECONDS = 0.25
+
+    @classmethod
+    def for_spec(cls, spec: Any = None, **overrides: Any) -> "RenderBudget":
+        """Derive the step budget from the spec's total animation time."""
+        budget = cls(**overrides)
+        timing = getattr(spec, "timing", None) if spec is not None else None
+        total_time = getattr(timing, "total_time", None) if timing is not None else None
+        if "max_time_steps" not in overrides and isinstance(total_time, (int, float)) and total_time > 0:
+            budget.max_time_steps = max(10, min(budget.max_time_steps, int(total_time / cls.MIN_STEP_SECONDS)))
+        return budget
+
+
+@dataclass
+class ReductionReport:
+    applied: bool
+    chart_type: str
+    input_path: str
+    output_path: str
+    rows_before: int = 0
+    rows_after: int = 0
+    time_points_before: int = 0
+    time_points_after: int = 0
+    entities_before: int = 0
+    entities_after: int = 0
+    steps: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        """One-line description suitable for an SSE RunContent message."""
+        if not self.applied:
+            return f"Render budget check ({self.chart_type}): no reduction needed"
+        return f"Reduced dataset for {self.chart_type} render budget: " + "; ".join(self.steps)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "applied": self.applied,
+            "chart_type": self.chart_type,
+            "input_path": self.input_path,
+            "output_path": self.output_path,
+            "rows_before": self.rows_before,
+            "rows_after": self.rows_after,
+            "time_points_before": self.time_points_before,
+            "time_points_after": self.time_points_after,
+            "entities_before": self.entities_before,
+            "entities_after": self.entities_after,
+            "steps": list(self.steps),
+            "warnings": list(self.warnings),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _resolve_column(headers: List[str], target: Optional[str], candidates: Sequence[str]) -> Optional[str]:
+    """Same resolution order as the templates; None when nothing matches."""
+    if target and target in headers:
+        return target
+    lower_map = {h.lower(): h for h in headers}
+    for candidate in candidates:
+        if candidate in headers:
+            return candidate
+        if candidate.lower() in lower_map:
+            return lower_map[candidate.lower()]
+    return None
+
+
+def _binding_attr(spec: Any, *names: str) -> Optional[str]:
+    binding = getattr(spec, "data_binding", None) if spec is not None else None
+    if binding is None:
+        return None
+    for name in names:
+        value = getattr(binding, name, None)
+        if value:
+            return value
+    return None
+
+
+def _parse_time_key(token: str):
+    """Sort key used by the templates (numeric when possible)."""
+    try:
+        return (0, float(token), "")
+    except ValueError:
+        return (1, 0.0, token)
+
+
+def _parse_value(token: str) -> Optional[float]:
+    try:
+        return float((token or "").strip().replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _sorted_times(rows: List[Dict[str, str]], time_col: str) -> List[str]:
+    times = {(r.get(time_col) or "").strip() for r in rows}
+    times.discard("")
+    return sorted(times, key=_parse_time_key)
+
+
+def resample_time_keys(times: Sequence[str], max_steps: int) -> List[str]:
+    """
+    Pick at most max_steps evenly spaced keys from sorted times.
+
+    First and last keys are always kept so the animation spans the same range.
+    """
+    n = len(times)
+    if max_steps <= 0 or n <= max_steps:
+        return list(times)
+    if max_steps == 1:
+        return [times[-1]]
+    step = (n - 1) / (max_steps - 1)
+    picked = sorted({int(round(i * step)) for i in range(max_steps)})
+    return [times[i] for i in picked]
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns indices of the points to keep (always including first and last),
+    chosen so that each bucket keeps the point forming the largest triangle
+    with its neighbours; peaks and valleys are preserved.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    keep = [0]
+    bucket = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+
+        # Average of the next bucket (or the last point)
+        nxt_start = end
+        nxt_end = min(int((i + 2) * bucket) + 1, n)
+        if nxt_start >= nxt_end:
+            avg_x, avg_y = xs[n - 1], ys[n - 1]
+        else:
+            span = nxt_end - nxt_start
+            avg_x = sum(xs[nxt_start:nxt_end]) / span
+            avg_y = sum(ys[nxt_start:nxt_end]) / span
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, min(end, n - 1)):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return keep
+
+
+def _time_axis(times: Sequence[str]) -> List[float]:
+    """Numeric x positions for LTTB: parsed numbers when possible, else ordinal."""
+    try:
+        return [float(t) for t in times]
+    except ValueError:
+        return [float(i) for i in range(len(times))]
+
+
+def _write_rows(path: str, headers: List[str], rows: List[Dict[str, str]]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=headers, extrasaction="ignore")
+        writer.writeheader()
+        for r in rows:
+            writer.writerow({h: r.get(h, "") for h in headers})
+
+
+# ---------------------------------------------------------------------------
+# Per-chart reducers
+# ---------------------------------------------------------------------------
+
+def _reduce_time_and_entities(
+    rows: List[Dict[str, str]],
+    time_col: str,
+    entity_col: str,
+    rank_col: str,
+    budget: RenderBudget,
+    top_k_per_step: Optional[int],
+    max_entities: Optional[int],
+    report: ReductionReport,
+) -> List[Dict[str, str]]:
+    """Shared bar_race / bubble reduction: resample time, then trim entities."""
+    times = _sorted_times(rows, time_col)
+    entities = {(r.get(entity_col) or "").strip() for r in rows} - {""}
+    report.time_points_before = len(times)
+    report.entities_before = len(entities)
+
+    kept_times = resample_time_keys(times, budget.max_time_steps)
+    if len(kept_times) < len(times):
+        keep_set = set(kept_times)
+        rows = [r for r in rows if (r.get(time_col) or "").strip() in keep_set]
+        report.steps.append(
+            f"time points {len(times)} -> {len(kept_times)} (evenly resampled, first/last kept)"
+        )
+
+    # Last value wins per (time, entity), matching the templates' dict assignment
+    latest: Dict[Tuple[str, str], float] = {}
+    for r in rows:
+        t = (r.get(time_col) or "").strip()
+        e = (r.get(entity_col) or "").strip()
+        v = _parse_value(r.get(rank_col) or "0")
+        if t and e and v is not None:
+            latest[(t, e)] = v
+
+    keep_entities: Optional[set] = None
+    if top_k_per_step is not None and len(entities) > top_k_per_step:
+        by_time: Dict[str, List[Tuple[float, str]]] = {}
+        for (t, e), v in latest.items():
+            by_time.setdefault(t, []).append((v, e))
+        keep_entities = set()
+        for ranked in by_time.values():
+            ranked.sort(key=lambda x: x[0], reverse=True)
+            keep_entities.update(e for _, e in ranked[:top_k_per_step])
+        step_desc = f"entities {len(entities)} -> {len(keep_entities)} (union of per-step top {top_k_per_step})"
+    elif max_entities is not None and len(entities) > max_entities:
+        peak: Dict[str, float] = {}
+        for (_t, e), v in latest.items():
+            peak[e] = max(peak.get(e, v), v)
+        keep_entities = set(sorted(peak, key=lambda e: peak[e], reverse=True)[:max_entities])
+        step_desc = f"entities {len(entities)} -> {len(keep_entities)} (largest by peak {rank_col})"
+
+    if keep_entities is not None and len(keep_entities) < len(entities):
+        rows = [r for r in rows if (r.get(entity_col) or "").strip() in keep_entities]
+        report.steps.append(step_desc)
+
+    report.time_points_after = len(kept_times)
+    report.entities_after = len(keep_entities) if keep_entities is not None else len(entities)
+    return rows
+
+
+def _reduce_line(
+    headers: List[str],
+    rows: List[Dict[str, str]],
+    time_col: str,
+    value_col: str,
+    group_col: Optional[str],
+    budget: RenderBudget,
+    report: ReductionReport,
+) -> List[Dict[str, str]]:
+    """Top-K series + "Other" bucket, then LTTB on each series."""
+    series: Dict[str, List[Dict[str, str]]] = {}
+    for r in rows:
+        t = (r.get(time_col) or "").strip()
+        if not t or _parse_value(r.get(value_col) or "") is None:
+            continue
+        key = (r.get(group_col) or "").strip() if group_col else ""
+        series.setdefault(key, []).append(r)
+
+    report.time_points_before = len(_sorted_times(rows, time_col))
+    report.entities_before = len(series)
+
+    # Fold small series into "Other" (per-time sum)
+    if group_col and len(series) > budget.max_line_series:
+        keep_n = max(budget.max_line_series - 1, 1)
+        totals = {
+            k: sum(abs(_parse_value(r.get(value_col) or "") or 0.0) for r in rs)
+            for k, rs in series.items()
+        }
+        ranked = sorted(totals, key=lambda k: totals[k], reverse=True)
+        kept, folded = ranked[:keep_n], ranked[keep_n:]
+        other_sum: Dict[str, float] = {}
+        for k in folded:
+            for r in series[k]:
+                t = (r.get(time_col) or "").strip()
+                other_sum[t] = other_sum.get(t, 0.0) + (_parse_value(r.get(value_col) or "") or 0.0)
+        new_series = {k: series[k] for k in kept}
+        label = OTHER_LABEL if OTHER_LABEL not in new_series else f"{OTHER_LABEL} ({len(folded)})"
+        new_series[label] = [
+            {**{h: "" for h in headers}, group_col: label, time_col: t, value_col: repr(v)}
+            for t, v in other_sum.items()
+        ]
+        series = new_series
+        report.steps.append(
+            f"series {len(ranked)} -> {len(series)} (top {keep_n} kept, {len(folded)} folded into '{label}')"
+        )
+
+    out: List[Dict[str, str]] = []
+    downsampled = 0
+    points_before = 0
+    for _, rs in series.items():
+        rs = sorted(rs, key=lambda r: _parse_time_key((r.get(time_col) or "").strip()))
+        points_before += len(rs)
+        if len(rs) > budget.max_line_points:
+            xs = _time_axis([(r.get(time_col) or "").strip() for r in rs])
+            ys = [_parse_value(r.get(value_col) or "") or 0.0 for r in rs]
+            rs = [rs[i] for i in lttb_indices(xs, ys, budget.max_line_points)]
+            downsampled += 1
+        out.extend(rs)
+
+    if downsampled:
+        report.steps.append(
+            f"points {points_before} -> {len(out)} (LTTB on {downsampled} series, max {budget.max_line_points} each)"
+        )
+
+    report.entities_after = len(series)
+    report.time_points_after = len(_sorted_times(out, time_col))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def reduce_for_render(
+    csv_path: str,
+    chart_type: str,
+    spec: Any = None,
+    output_path: Optional[str] = None,
+    budget: Optional[RenderBudget] = None,
+) -> ReductionReport:
+    """
+    Enforce a render budget on a dataset before template code generation.
+
+    Args:
+        csv_path: Dataset the template would read.
+        chart_type: "bar_race", "bubble" or "line_evolution"; others pass through.
+        spec: ChartSpec (for data_binding column names and timing).
+        output_path: Where to write the reduced CSV. Defaults to
+                     <dir>/<name>-reduced.csv next to the input.
+        budget: RenderBudget; defaults to RenderBudget.for_spec(spec).
+
+    Returns:
+        ReductionReport. When applied is False, output_path == csv_path and
+        the template should read the original file.
+    """
+    budget = budget or RenderBudget.for_spec(spec)
+    report = ReductionReport(applied=False, chart_type=chart_type, input_path=csv_path, output_path=csv_path)
+
+    if chart_type not in SUPPORTED_CHART_TYPES:
+        return report
+
+    headers, rows = read_csv_rows(csv_path)
+    report.rows_before = report.rows_after = len(rows)
+    if not rows:
+        return report
+
+    if chart_type == "bar_race":
+        time_col = _resolve_column(headers, _binding_attr(spec, "time_col") or "time", _TIME_CANDIDATES)
+        value_col = _resolve_column(headers, _binding_attr(spec, "value_col") or "value", _BAR_VALUE_CANDIDATES)
+        entity_col = _resolve_column(headers, _binding_attr(spec, "entity_col") or "category", _BAR_ENTITY_CANDIDATES)
+        if not (time_col and value_col and entity_col):
+            report.warnings.append("Could not resolve time/value/entity columns; skipping reduction.")
+            return report
+        reduced = _reduce_time_and_entities(
+            rows, time_col, entity_col, value_col, budget,
+            top_k_per_step=budget.bar_top_k, max_entities=None, report=report,
+        )
+    elif chart_type == "bubble":
+        time_col = _resolve_column(headers, _binding_attr(spec, "time_col") or "time", _TIME_CANDIDATES)
+        r_col = _resolve_column(headers, _binding_attr(spec, "r", "r_col") or "r", _BUBBLE_R_CANDIDATES)
+        entity_col = _resolve_column(headers, _binding_attr(spec, "entity", "entity_col") or "entity", _BUBBLE_ENTITY_CANDIDATES)
+        if not (time_col and r_col and entity_col):
+            report.warnings.append("Could not resolve time/size/entity columns; skipping reduction.")
+            return report
+        reduced = _reduce_time_and_entities(
+            rows, time_col, entity_col, r_col, budget,
+            top_k_per_step=None, max_entities=budget.max_bubble_entities, report=report,
+        )
+    else:
+        time_col = _resolve_column(headers, _binding_attr(spec, "time_col") or "time", _LINE_TIME_CANDIDATES)
+        value_col = _resolve_column(headers, _binding_attr(spec, "value_col") or "value", _LINE_VALUE_CANDIDATES)
+        group_col = _resolve_column(headers, _binding_attr(spec, "group_col", "entity_col"), _LINE_GROUP_CANDIDATES)
+        if not (time_col and value_col):
+            report.warnings.append("Could not resolve time/value columns; skipping reduction.")
+            return report
+        reduced = _reduce_line(headers, rows, time_col, value_col, group_col, budget, report)
+
+    if not report.steps:
+        return report
+
+    if output_path is None:
+        stem, _ext = os.path.splitext(csv_path)
+        output_path = f"{stem}-reduced.csv"
+    _write_rows(output_path, headers, reduced)
+
+    report.applied = True
+    report.output_path = output_path
+    report.rows_after = len(reduced)
+    logger.info(f"[data_reduction] {report.summary()} | rows {report.rows_before} -> {report.rows_after} | {output_path}")
+    return report
+
+
+__all__ = [
+    "OTHER_LABEL",
+    "SUPPORTED_CHART_TYPES",
+    "RenderBudget",
+    "ReductionReport",
+    "resample_time_keys",
+    "lttb_indices",
+    "reduce_for_render",
+]
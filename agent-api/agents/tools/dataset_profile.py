@@ -0,0 +1,271 @@
+"""
+Dataset Profile Module
+
+Computes a dataset's profile once (at upload time) so later readers do not
+re-open and re-sniff the CSV on every run:
+
+    header row, schema (DataSchema), per-column stats and sample values,
+    wide/long detection and prompt-independent ranked chart recommendations
+
+Profiles are JSON-serializable (persisted alongside the dataset row) and are
+kept in a small in-process store keyed by absolute file path. Each profile
+records the file's size and mtime; a profile whose file has since changed is
+treated as missing.
+
+A loader can be installed with set_profile_loader() so that a memory miss
+falls through to persistent storage (e.g. public.datasets.profile).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agents.tools.chart_inference import (
+    DataSchema,
+    _detect_wide_format,
+    _resolve_csv_path,
+    profile_schema,
+    recommend_chart_from_schema,
+    schema_from_stream,
+)
+from agents.tools.stream_profiler import StreamProfile
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_VERSION = 2
+
+# Distinct sample values reported per column
+SAMPLE_VALUES_PER_COLUMN = 5
+
+_MAX_PROFILES = 256
+
+# Loader misses are remembered briefly so hot paths don't re-query storage,
+# but expire so a profile persisted later (e.g. by another worker) is found.
+_MISS_TTL_SECONDS = 30.0
+_MAX_MISSES = 1024
+
+
+@dataclass
+class DatasetProfile:
+    """
+    Precomputed facts about a single dataset file.
+
+    ``schema`` holds DataSchema fields, ``columns`` holds per-column entries
+    ({name, inferred_type, unique_count, sample_values} plus full-file stats:
+    null_ratio, min/max/mean, type_votes) and
+    ``recommendations`` holds ranked ChartRecommendation fields computed
+    without a user prompt.
+    """
+    path: str
+    size_bytes: int
+    mtime_ns: int
+    header_row: int
+    schema: Dict[str, Any]
+    columns: List[Dict[str, Any]] = field(default_factory=list)
+    is_wide_format: bool = False
+    wide_time_columns: List[str] = field(default_factory=list)
+    recommendations: List[Dict[str, Any]] = field(default_factory=list)
+    profiled_at: float = 0.0
+    elapsed_ms: float = 0.0
+    version: int = PROFILE_VERSION
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional["DatasetProfile"]:
+        """Rebuild a profile from its stored dict; None if stale or malformed."""
+        if not isinstance(data, dict) or data.get("version") != PROFILE_VERSION:
+            return None
+        try:
+            return cls(**{k: data[k] for k in cls.__dataclass_fields__ if k in data})
+        except TypeError:
+            return None
+
+    def to_schema(self) -> DataSchema:
+        data = dict(self.schema)
+        value_range = data.get("value_range")
+        if value_range is not None:
+            data["value_range"] = (float(value_range[0]), float(value_range[1]))
+        return DataSchema(**data)
+
+    def matches_file(self, path: Optional[str] = None) -> bool:
+        """True if the file on disk still has the size/mtime this profile saw."""
+        try:
+            st = os.stat(path or self.path)
+        except OSError:
+            return False
+        return st.st_size == self.size_bytes and st.st_mtime_ns == self.mtime_ns
+
+
+def _column_entries(stream: StreamProfile, schema: DataSchema) -> List[Dict[str, Any]]:
+    entries: List[Dict[str, Any]] = []
+    for sketch in stream.columns:
+        samples: List[str] = []
+        for value in sketch.sample():
+            text = str(value)
+            if text not in samples:
+                samples.append(text)
+                if len(samples) >= SAMPLE_VALUES_PER_COLUMN:
+                    break
+        stats = sketch.to_dict()
+        entries.append({
+            "name": sketch.name,
+            "inferred_type": schema.column_types.get(sketch.name, "categorical"),
+            "unique_count": int(schema.unique_counts.get(sketch.name, 0)),
+            "sample_values": samples,
+            "null_ratio": stats["null_ratio"],
+            "distinct_exact": stats["distinct_exact"],
+            "min": stats["min"],
+            "max": stats["max"],
+            "mean": stats["mean"],
+            "type_votes": stats["type_votes"],
+        })
+    return entries
+
+
+def build_profile(csv_path: str) -> DatasetProfile:
+    """Profile a CSV file. Raises like analyze_schema() on unreadable input."""
+    start = time.time()
+    path = os.path.abspath(_resolve_csv_path(csv_path))
+    st = os.stat(path)
+
+    # One streaming pass over the whole file feeds both schema and column stats
+    stream = profile_schema(path)
+    schema = schema_from_stream(stream)
+    recommendations = recommend_chart_from_schema(schema)
+    wide_time_columns: List[str] = []
+    if schema.is_wide_format and pd is not None:
+        # Wide detection only inspects the headers
+        _, time_cols = _detect_wide_format(pd.DataFrame(columns=schema.columns))
+        wide_time_columns = [str(c) for c in time_cols]
+
+    profile = DatasetProfile(
+        path=path,
+        size_bytes=st.st_size,
+        mtime_ns=st.st_mtime_ns,
+        header_row=stream.header_row,
+        schema=asdict(schema),
+        columns=_column_entries(stream, schema),
+        is_wide_format=schema.is_wide_format,
+        wide_time_columns=wide_time_columns,
+        recommendations=[asdict(r) for r in recommendations],
+        profiled_at=time.time(),
+    )
+    profile.elapsed_ms = round((time.time() - start) * 1000, 2)
+    logger.info(
+        f"Profiled dataset {path}: {schema.row_count} rows, "
+        f"{len(schema.columns)} columns in {profile.elapsed_ms}ms"
+    )
+    return profile
+
+
+# =============================================================================
+# IN-PROCESS STORE
+# =============================================================================
+
+_lock = threading.Lock()
+_profiles: "OrderedDict[str, DatasetProfile]" = OrderedDict()
+_loader: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None
+# path -> ((size, mtime_ns), expires_at) the loader had nothing for
+_misses: "OrderedDict[str, Tuple[Tuple[int, int], float]]" = OrderedDict()
+
+
+def set_profile_loader(loader: Optional[Callable[[str], Optional[Dict[str, Any]]]]) -> None:
+    """
+    Install a fallback used on a memory miss. The loader receives the absolute
+    file path and returns a stored profile dict (or None).
+    """
+    global _loader
+    with _lock:
+        _loader = loader
+        _misses.clear()
+
+
+def register_profile(profile: DatasetProfile) -> None:
+    key = os.path.abspath(profile.path)
+    with _lock:
+        _misses.pop(key, None)
+        _profiles[key] = profile
+        _profiles.move_to_end(key)
+        while len(_profiles) > _MAX_PROFILES:
+            _profiles.popitem(last=False)
+
+
+def get_profile(csv_path: str) -> Optional[DatasetProfile]:
+    """
+    Return the current profile for ``csv_path``, or None when the file has no
+    profile yet or changed since it was profiled.
+    """
+    key = os.path.abspath(csv_path)
+    with _lock:
+        profile = _profiles.get(key)
+        if profile is not None:
+            _profiles.move_to_end(key)
+    if profile is not None:
+        if profile.matches_file(key):
+            return profile
+        with _lock:
+            _profiles.pop(key, None)
+        return None
+
+    loader = _loader
+    if loader is None:
+        return None
+    try:
+        st = os.stat(key)
+    except OSError:
+        return None
+    signature = (st.st_size, st.st_mtime_ns)
+    now = time.monotonic()
+    with _lock:
+        miss = _misses.get(key)
+        if miss is not None:
+            if miss[0] == signature and miss[1] > now:
+                return None
+            del _misses[key]
+    try:
+        data = loader(key)
+    except Exception as e:
+        logger.warning(f"Dataset profile loader failed for {key}: {e}")
+        return None
+    profile = DatasetProfile.from_dict(data) if data else None
+    if profile is None or not profile.matches_file(key):
+        with _lock:
+            _misses[key] = (signature, now + _MISS_TTL_SECONDS)
+            _misses.move_to_end(key)
+            while len(_misses) > _MAX_MISSES:
+                _misses.popitem(last=False)
+        return None
+    # The stored path may differ (e.g. different mount); key by the caller's path
+    profile.path = key
+    register_profile(profile)
+    return profile
+
+
+def clear_profiles() -> None:
+    with _lock:
+        _profiles.clear()
+        _misses.clear()
+
+
+__all__ = [
+    "PROFILE_VERSION",
+    "DatasetProfile",
+    "build_profile",
+    "set_profile_loader",
+    "register_profile",
+    "get_profile",
+    "clear_profiles",
+]
@@ -0,0 +1,439 @@
+"""
+Dry-Run Scene Executor
+
+Runs a scene's construct() without rasterizing or writing frames, so runtime
+errors (NameError, KeyError, wrong Manim API use, ...) surface in about a
+second instead of after a full preview render has been launched. The
+pipeline feeds them into the auto-fix loop before any frames are rendered.
+
+How a scene is executed:
+- Warm workers: a worker process imports manim once and then executes
+  scenes on request (one JSON line in, one JSON line out), so a dry run
+  does not pay the 1-2s manim import.
+- Each scene runs under manim's dry_run config with skip_animations: every
+  play() jumps its animations to their end state (updaters run once),
+  nothing is rasterized and no files are written.
+- Config changes made by the scene are undone afterwards (tempconfig), and
+  the scene module is dropped, so scenes do not leak into each other.
+- A scene that exceeds the timeout gets its worker killed; the next request
+  starts a fresh one. Workers are also recycled after a number of scenes.
+
+The dry run is advisory: when it cannot run (disabled, manim missing,
+timeout, worker crash) the result is ``skipped`` and the caller carries on
+to the preview as before. A worker that fails to start is retried after a
+backoff rather than disabling dry runs for the life of the process.
+
+Usage:
+    from agents.tools.dry_run import dry_run_scene
+
+    result = dry_run_scene(code)
+    if not result.ok and not result.skipped:
+        result.message     # "NameError: name 'Circel' is not defined (line 7)"
+        result.details     # traceback limited to the scene's own frames
+
+Environment:
+    DRY_RUN_ENABLED (1), DRY_RUN_TIMEOUT_SECONDS (10), DRY_RUN_WORKERS (2),
+    DRY_RUN_MAX_SCENES_PER_WORKER (50), DRY_RUN_STARTUP_TIMEOUT_SECONDS (30),
+    DRY_RUN_RETRY_SECONDS (30; doubled per failed worker start, up to 10 min)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from agents.tools.scene_runtime import RUNTIME_ROOT, runtime_env
+from agents.tools.templates.scene_data import stage_scene_data
+
+logger = logging.getLogger("animation_pipeline.dry_run")
+
+# Same module prelude as the preview scene file
+SCENE_PRELUDE = "from manim import *\nfrom math import *\nimport os\n\n"
+_PRELUDE_LINES = SCENE_PRELUDE.count("\n")
+
+
+@dataclass
+class DryRunResult:
+    """Outcome of one dry run."""
+    ok: bool
+    skipped: bool = False
+    error_type: str = ""
+    error: str = ""
+    line: Optional[int] = None  # line in the scene code (without the prelude)
+    details: str = ""
+    plays: int = 0
+    elapsed_ms: float = 0.0
+
+    @property
+    def message(self) -> str:
+        if self.ok or self.skipped:
+            return self.error
+        text = f"{self.error_type}: {self.error}" if self.error_type else self.error
+        return f"{text} (line {self.line})" if self.line else text
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["message"] = self.message
+        return data
+
+
+# =============================================================================
+# WORKER PROCESS
+# =============================================================================
+
+def _execute(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one scene file inside the worker."""
+    import importlib.util
+    import traceback
+
+    from manim import tempconfig
+
+    started = time.perf_counter()
+    scene_file = request["scene_file"]
+    class_name = request.get("class_name", "GenScene")
+    work_dir = os.path.dirname(scene_file)
+    module_name = f"_dry_run_scene_{uuid.uuid4().hex[:8]}"
+    cwd = os.getcwd()
+    plays = 0
+    try:
+        os.chdir(work_dir)
+        with tempconfig({
+            "dry_run": True,
+            "disable_caching": True,
+            "media_dir": work_dir,
+            "verbosity": "ERROR",
+            "progress_bar": "none",
+        }):
+            spec = importlib.util.spec_from_file_location(module_name, scene_file)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+            scene_cls = getattr(module, class_name, None)
+            if scene_cls is None:
+                raise NameError(f"name '{class_name}' is not defined")
+            scene = scene_cls(skip_animations=True)
+            try:
+                scene.render()
+            finally:
+                plays = getattr(getattr(scene, "renderer", None), "num_plays", 0)
+        return {"ok": True, "plays": plays, "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)}
+    except BaseException as e:  # SystemExit from scene code included
+        frames = [f for f in traceback.extract_tb(e.__traceback__) if f.filename == scene_file]
+        line = frames[-1].lineno - _PRELUDE_LINES if frames and frames[-1].lineno else None
+        details = "".join(traceback.format_list(frames)) + "".join(traceback.format_exception_only(type(e), e))
+        return {
+            "ok": False,
+            "error_type": type(e).__name__,
+            "error": str(e)[:500],
+            "line": line if line and line > 0 else None,
+            "details": details.replace(scene_file, "scene.py")[-2000:],
+            "plays": plays,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+    finally:
+        sys.modules.pop(module_name, None)
+        os.chdir(cwd)
+
+
+def _worker_main() -> None:
+    # Protocol lines go to a private copy of stdout; anything the scene
+    # prints goes to stderr (discarded by the parent)
+    protocol = os.fdopen(os.dup(1), "w", buffering=1)
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    def send(message: Dict[str, Any]) -> None:
+        protocol.write(json.dumps(message) + "\n")
+        protocol.flush()
+
+    try:
+        import manim  # noqa: F401  (the point of a warm worker)
+    except Exception as e:
+        send({"ready": False, "error": f"{type(e).__name__}: {e}"})
+        return
+    send({"ready": True})
+
+    for line in sys.stdin:
+        if line.strip():
+            send(_execute(json.loads(line)))
+
+
+# =============================================================================
+# PARENT SIDE
+# =============================================================================
+
+class DryRunUnavailable(Exception):
+    """The worker could not be started or died."""
+
+
+WORKER_COMMAND = [sys.executable, "-m", "agents.tools.dry_run"]
+
+
+class DryRunWorker:
+    """One warm worker process."""
+
+    def __init__(self, startup_timeout: float, command: Optional[List[str]] = None):
+        self.scenes = 0
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self.proc = subprocess.Popen(
+            command or WORKER_COMMAND,
+            cwd=RUNTIME_ROOT,
+            env=runtime_env(),
+            text=True,
+            bufsize=1,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        threading.Thread(target=self._read, name="dry-run-reader", daemon=True).start()
+        try:
+            ready = self._receive(startup_timeout)
+        except BaseException:
+            self.kill()
+            raise
+        if not ready.get("ready"):
+            self.kill()
+            raise DryRunUnavailable(ready.get("error") or "dry-run worker failed to start")
+
+    def _read(self) -> None:
+        for line in self.proc.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _receive(self, timeout: float) -> Dict[str, Any]:
+        try:
+            line = self._lines.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError from None
+        if line is None:
+            raise DryRunUnavailable(f"dry-run worker exited (code {self.proc.poll()})")
+        return json.loads(line)
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def run(self, scene_file: str, class_name: str, timeout: float) -> Dict[str, Any]:
+        self.scenes += 1
+        try:
+            self.proc.stdin.write(json.dumps({"scene_file": scene_file, "class_name": class_name}) + "\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise DryRunUnavailable(f"dry-run worker is gone: {e}") from e
+        return self._receive(timeout)
+
+    def kill(self) -> None:
+        try:
+            self.proc.kill()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+
+
+class DryRunPool:
+    """Warm workers shared by all runs of the process."""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        timeout: float = 10.0,
+        startup_timeout: float = 30.0,
+        max_scenes_per_worker: int = 50,
+        command: Optional[List[str]] = None,
+        retry_seconds: float = 30.0,
+        max_retry_seconds: float = 600.0,
+    ):
+        self.command = command
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.max_scenes_per_worker = max_scenes_per_worker
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self._idle: List[DryRunWorker] = []
+        self._count = 0
+        self._cond = threading.Condition()
+        # Why workers cannot start (e.g. manim not installed, slow startup);
+        # dry runs are skipped until _retry_at, then a worker is tried again
+        self._unavailable: Optional[str] = None
+        self._retry_at = 0.0
+        self._startup_failures = 0
+
+    @classmethod
+    def from_env(cls) -> "DryRunPool":
+        return cls(
+            max_workers=int(os.getenv("DRY_RUN_WORKERS", "2")),
+            timeout=float(os.getenv("DRY_RUN_TIMEOUT_SECONDS", "10")),
+            startup_timeout=float(os.getenv("DRY_RUN_STARTUP_TIMEOUT_SECONDS", "30")),
+            max_scenes_per_worker=int(os.getenv("DRY_RUN_MAX_SCENES_PER_WORKER", "50")),
+            retry_seconds=float(os.getenv("DRY_RUN_RETRY_SECONDS", "30")),
+        )
+
+    @property
+    def unavailable(self) -> Optional[str]:
+        """Why dry runs are being skipped, or None once a worker may be tried again."""
+        if self._unavailable and time.monotonic() < self._retry_at:
+            return self._unavailable
+        return None
+
+    def _startup_failed(self, error: BaseException) -> str:
+        # Exponential backoff: a worker that timed out under load gets
+        # another chance soon, a missing manim is not retried every run
+        with self._cond:
+            self._startup_failures += 1
+            delay = min(self.max_retry_seconds, self.retry_seconds * 2 ** (self._startup_failures - 1))
+            self._unavailable = str(error) or "dry-run worker startup timed out"
+            self._retry_at = time.monotonic() + delay
+        logger.warning("Dry-run worker unavailable (retry in %.0fs): %s", delay, self._unavailable)
+        return self._unavailable
+
+    def _acquire(self) -> DryRunWorker:
+        with self._cond:
+            while not self._idle and self._count >= self.max_workers:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._count += 1
+        try:
+            worker = DryRunWorker(self.startup_timeout, self.command)
+        except BaseException:
+            with self._cond:
+                self._count -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._unavailable = None
+            self._startup_failures = 0
+        return worker
+
+    def _release(self, worker: DryRunWorker, reuse: bool) -> None:
+        if reuse and worker.alive and worker.scenes < self.max_scenes_per_worker:
+            with self._cond:
+                self._idle.append(worker)
+                self._cond.notify()
+            return
+        worker.kill()
+        with self._cond:
+            self._count -= 1
+            self._cond.notify()
+
+    def warm(self) -> None:
+        """Start a worker ahead of the first request."""
+        try:
+            self._release(self._acquire(), reuse=True)
+        except (DryRunUnavailable, TimeoutError, OSError) as e:
+            self._startup_failed(e)
+
+    def run(self, scene_file: str, class_name: str = "GenScene") -> DryRunResult:
+        unavailable = self.unavailable
+        if unavailable:
+            return DryRunResult(ok=True, skipped=True, error=unavailable)
+        started = time.perf_counter()
+        try:
+            worker = self._acquire()
+        except (DryRunUnavailable, TimeoutError, OSError) as e:
+            return DryRunResult(ok=True, skipped=True, error=self._startup_failed(e))
+
+        reuse = False
+        try:
+            reply = worker.run(scene_file, class_name, self.timeout)
+            reuse = True
+        except TimeoutError:
+            return DryRunResult(
+                ok=True, skipped=True, error=f"dry run timed out after {self.timeout}s",
+                elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+            )
+        except DryRunUnavailable as e:
+            # Crashed on this scene (segfault, os._exit, ...); the preview has the final say
+            return DryRunResult(ok=True, skipped=True, error=str(e))
+        finally:
+            self._release(worker, reuse)
+
+        return DryRunResult(
+            ok=bool(reply.get("ok")),
+            error_type=reply.get("error_type", ""),
+            error=reply.get("error", ""),
+            line=reply.get("line"),
+            details=reply.get("details", ""),
+            plays=reply.get("plays", 0),
+            elapsed_ms=reply.get("elapsed_ms", 0.0),
+        )
+
+    def close(self) -> None:
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            self._release(worker, reuse=False)
+
+
+_pool: Optional[DryRunPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_dry_run_pool() -> DryRunPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DryRunPool.from_env()
+    return _pool
+
+
+def dry_run_enabled() -> bool:
+    return os.getenv("DRY_RUN_ENABLED", "1").lower() not in ("0", "false", "no", "off")
+
+
+def dry_run_scene(code: str, class_name: str = "GenScene", pool: Optional[DryRunPool] = None) -> DryRunResult:
+    """
+    Execute ``code`` (a scene module as the preview would run it) without
+    rendering, and report the first runtime error.
+    """
+    if not dry_run_enabled():
+        return DryRunResult(ok=True, skipped=True, error="dry run disabled")
+    pool = pool or get_dry_run_pool()
+    work_dir = tempfile.mkdtemp(prefix="dry_run_")
+    try:
+        scene_file = os.path.join(work_dir, "scene.py")
+        source = SCENE_PRELUDE + code
+        with open(scene_file, "w", encoding="utf-8") as f:
+            f.write(source)
+        stage_scene_data(source, work_dir)
+        result = pool.run(scene_file, class_name)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if result.skipped:
+        logger.info("Dry run skipped: %s", result.error)
+    elif result.ok:
+        logger.info("Dry run passed | plays=%s | elapsed_ms=%s", result.plays, result.elapsed_ms)
+    else:
+        logger.info("Dry run failed | %s | elapsed_ms=%s", result.message, result.elapsed_ms)
+    return result
+
+
+__all__ = [
+    "SCENE_PRELUDE",
+    "DryRunResult",
+    "DryRunUnavailable",
+    "WORKER_COMMAND",
+    "DryRunWorker",
+    "DryRunPool",
+    "get_dry_run_pool",
+    "dry_run_enabled",
+    "dry_run_scene",
+]
+
+
+if __name__ == "__main__":
+    _worker_main()
@@ -0,0 +1,141 @@
+"""
+Inference Cache Module
+
+Memoization for the chart-inference path, keyed by a cheap dataset
+fingerprint (resolved path + size + mtime, no file read):
+
+    - chart recommendations: process-wide LRU per (fingerprint, prompt),
+      shared across runs until the file changes; the analyzed schema is
+      kept per fingerprint so a new prompt does not rescan the file
+    - intent detection: a per-run memo per (message, fingerprint), so the
+      request gate and the animation pipeline do not analyze twice
+
+Both expose hit/miss statistics for the pipeline logger.
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Hashable, Optional
+
+DEFAULT_RECOMMENDATION_CACHE_SIZE = 256
+DEFAULT_SCHEMA_CACHE_SIZE = 64
+
+
+def dataset_fingerprint(csv_path: Optional[str]) -> Optional[str]:
+    """
+    Identify a dataset file by absolute path, size and mtime.
+
+    Returns None when there is no path or the file does not exist (callers
+    then skip caching).
+    """
+    if not csv_path:
+        return None
+    path = os.path.abspath(csv_path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{path}:{st.st_size}:{st.st_mtime_ns}"
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a memo."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return round(self.hits / total, 3) if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_rate"] = self.hit_rate
+        return data
+
+
+class LRUMemo:
+    """
+    Thread-safe LRU memo. Values are deep-copied on the way out so callers
+    may mutate what they get back without corrupting the cache.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_RECOMMENDATION_CACHE_SIZE, copy_values: bool = True):
+        self.maxsize = maxsize
+        self.copy_values = copy_values
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self._stats.hits += 1
+                value = self._data[key]
+                return copy.deepcopy(value) if self.copy_values else value
+            self._stats.misses += 1
+
+        # Compute outside the lock; a concurrent miss on the same key just
+        # computes twice and the last writer wins.
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats.evictions += 1
+        return copy.deepcopy(value) if self.copy_values else value
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                size=len(self._data),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._stats = CacheStats()
+
+
+# Process-wide caches (see chart_inference.recommend_chart / load_schema)
+recommendation_cache = LRUMemo(
+    maxsize=int(os.getenv("CHART_RECOMMENDATION_CACHE_SIZE", str(DEFAULT_RECOMMENDATION_CACHE_SIZE)))
+)
+schema_cache = LRUMemo(maxsize=DEFAULT_SCHEMA_CACHE_SIZE)
+
+
+def inference_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for the process-wide caches, ready for a log context."""
+    return {
+        "recommendations": recommendation_cache.stats().to_dict(),
+        "schemas": schema_cache.stats().to_dict(),
+    }
+
+
+def clear_inference_caches() -> None:
+    recommendation_cache.clear()
+    schema_cache.clear()
+
+
+__all__ = [
+    "dataset_fingerprint",
+    "CacheStats",
+    "LRUMemo",
+    "recommendation_cache",
+    "schema_cache",
+    "inference_cache_stats",
+    "clear_inference_caches",
+]
@@ -20,17 +20,20 @@ Design notes:
 - Pure regex/heuristic for quick checks (no LLM calls).
 - Integrates with chart_inference for data-driven recommendations.
 - Supports all 5 chart types: bubble, distribution, bar_race, line_evolution, bento_grid.
-- Multilingual keywords (ID/EN) for common phrasing.
+- Multilingual keywords (ID/EN) for common phrasing, matched in one pass by
+  agents.tools.keyword_matcher.
 """
 
 from __future__ import annotations
 
-import re
 import logging
 import time
 from dataclasses import dataclass, field
 from typing import List, Optional
 
+from agents.tools.inference_cache import CacheStats, LRUMemo, dataset_fingerprint
+from agents.tools.keyword_matcher import CHART_KEYWORD_PATTERNS, KeywordHits, scan
+
 # Setup logging
 _logger = logging.getLogger("intent_detection")
 _logger.setLevel(logging.DEBUG)
@@ -58,106 +61,6 @@ def _log(level: str, message: str, context: dict = None):
     _logger.log(level_map.get(level.upper(), logging.INFO), log_msg)
 
 
-# =============================================================================
-# ANIMATION INTENT PATTERNS
-# =============================================================================
-
-# Strong animation keywords (ID + EN)
-_STRONG_ANIM_PATTERNS = [
-    r"\banimasi\b",            # ID: animasi
-    r"\banimasikan\b",         # ID: animasikan data
-    r"\banimate\b",
-    r"\banimat[aei]\w*\b",     # Typo tolerance: animte, animtae, animta, animatie, etc.
-    r"\banima[t]+e\b",         # Typo tolerance: animatte, animattte
-    r"\banimation\b",
-    r"\banimating\b",
-    r"\banimated\b",
-    r"\bgerakkan\b",           # ID: gerakkan data
-    r"\bbergerak\b",           # ID: objek bergerak
-    r"\bmanim\b",              # explicit Manim mention
-    r"\bvideo\b",
-    r"\bmp4\b",
-    r"\bgif\b",
-    r"\brender\b",
-    r"\bpreview\b",
-]
-
-# Medium-strength context tokens
-_MEDIUM_ANIM_PATTERNS = [
-    r"\bframe\b",
-    r"\bframes\b",
-    r"\btimeline\b",
-    r"\btime[\s-]?series\b",
-    r"\btime[\s-]?lapse\b",
-    r"\bper\s*tahun\b",        # ID: per tahun (per-year progression)
-    r"\bper\s*waktu\b",        # ID: over time
-    r"\bper\s*year\b",
-    r"\bover\s*time\b",
-]
-
-# Code cue (explicit user-provided Manim code)
-_CODE_CUES = [
-    r"\bclass\s+GenScene\b",
-    r"\bfrom\s+manim\s+import\b",
-    r"\bScene\):",  # class ... (Scene):
-]
-
-
-# =============================================================================
-# CHART TYPE PATTERNS (All 5 chart types)
-# =============================================================================
-
-_BUBBLE_PATTERNS = [
-    r"\bbubble\s*chart\b",
-    r"\bbubblechart\b",
-    r"\bbubble\b",
-    r"\bgelembung\b",          # ID: bubble
-    r"\bsebar\b",              # ID: sebar (scatter-like)
-    r"\bscatter\b",
-]
-
-_DISTRIBUTION_PATTERNS = [
-    r"\bdistribution\b",
-    r"\bdistribusi\b",
-    r"\bhistogram\b",
-    r"\bkde\b",
-    r"\bdensity\b",
-    r"\bstacked\s*distribution\b",
-]
-
-_BAR_RACE_PATTERNS = [
-    r"\bbar\s*(chart\s*)?race\b",
-    r"\bracing\s*bar\b",
-    r"\branking\b",
-    r"\bperingkat\b",
-    r"\btop\s*\d+\b",
-    r"\bleaderboard\b",
-    r"\blomba\s*bar\b",
-]
-
-_LINE_EVOLUTION_PATTERNS = [
-    r"\bline\s*(chart|evolution|graph)?\b",
-    r"\bgrafik\s*garis\b",
-    r"\btrend\b",
-    r"\btren\b",
-    r"\btime\s*series\b",
-    r"\bevolution\b",
-    r"\bevolusi\b",
-    r"\btrajectory\b",
-]
-
-_BENTO_GRID_PATTERNS = [
-    r"\bbento\s*(grid|box)?\b",
-    r"\bdashboard\b",
-    r"\bkpi\b",
-    r"\bmetric(s)?\b",
-    r"\bkey\s*indicator\b",
-    r"\boverview\b",
-    r"\bsummary\b",
-    r"\bringkasan\b",
-]
-
-
 # =============================================================================
 # DATA STRUCTURES
 # =============================================================================
@@ -179,26 +82,9 @@ class IntentResult:
 # HELPER FUNCTIONS
 # =============================================================================
 
-def _compile_any(patterns: List[str]) -> re.Pattern:
-    """Compile a list of patterns into a single regex"""
-    joined = "|".join(f"(?:{p})" for p in patterns)
-    return re.compile(joined, flags=re.IGNORECASE | re.MULTILINE)
-
-
-# Pre-compile all regex patterns
-_RE_STRONG = _compile_any(_STRONG_ANIM_PATTERNS)
-_RE_MEDIUM = _compile_any(_MEDIUM_ANIM_PATTERNS)
-_RE_CODE = _compile_any(_CODE_CUES)
-_RE_BUBBLE = _compile_any(_BUBBLE_PATTERNS)
-_RE_DIST = _compile_any(_DISTRIBUTION_PATTERNS)
-_RE_BAR_RACE = _compile_any(_BAR_RACE_PATTERNS)
-_RE_LINE_EVOLUTION = _compile_any(_LINE_EVOLUTION_PATTERNS)
-_RE_BENTO_GRID = _compile_any(_BENTO_GRID_PATTERNS)
-
-
-def _collect_matches(text: str, pattern: re.Pattern, label: str) -> List[str]:
-    """Collect all matches for a pattern with a label prefix"""
-    return [f"{label}:{m.group(0)}" for m in pattern.finditer(text or "")]
+def _collect_matches(hits: KeywordHits, key: str, label: str) -> List[str]:
+    """Collect all matches for a keyword group with a label prefix"""
+    return [f"{label}:{m}" for m in hits.matches(key)]
 
 
 def _score_animation_intent(
@@ -233,12 +119,10 @@ def _infer_chart_type_from_keywords(text: str) -> str:
     Infer chart type from keywords in text.
     Supports all 5 chart types.
     """
+    hits = scan(text)
     scores = {
-        "bubble": len(_RE_BUBBLE.findall(text)),
-        "distribution": len(_RE_DIST.findall(text)),
-        "bar_race": len(_RE_BAR_RACE.findall(text)),
-        "line_evolution": len(_RE_LINE_EVOLUTION.findall(text)),
-        "bento_grid": len(_RE_BENTO_GRID.findall(text)),
+        chart_type: hits.count(f"chart:{chart_type}")
+        for chart_type in CHART_KEYWORD_PATTERNS
     }
 
     # Find the chart type with the most keyword matches
@@ -271,9 +155,10 @@ def quick_intent_check(message: Optional[str]) -> IntentResult:
     text = message or ""
     reasons: List[str] = []
 
-    code_hits = _collect_matches(text, _RE_CODE, "code")
-    strong_hits = _collect_matches(text, _RE_STRONG, "strong")
-    medium_hits = _collect_matches(text, _RE_MEDIUM, "medium")
+    hits = scan(text)
+    code_hits = _collect_matches(hits, "anim:code", "code")
+    strong_hits = _collect_matches(hits, "anim:strong", "strong")
+    medium_hits = _collect_matches(hits, "anim:medium", "medium")
 
     _log("DEBUG", "Pattern matching results", {
         "code_hits": len(code_hits),
@@ -415,6 +300,33 @@ def detect_animation_intent(
     return result
 
 
+class IntentMemo:
+    """
+    Per-run memo for detect_animation_intent().
+
+    Keyed by (message, dataset fingerprint), so repeated checks within one
+    request (the route gate, then the animation pipeline) analyze the data
+    once. Create one per run; it is not shared across runs.
+    """
+
+    def __init__(self, maxsize: int = 16):
+        self._memo = LRUMemo(maxsize=maxsize)
+
+    def detect(self, message: Optional[str], csv_path: Optional[str] = None) -> IntentResult:
+        fingerprint = None
+        if csv_path:
+            from agents.tools.chart_inference import _resolve_csv_path
+
+            fingerprint = dataset_fingerprint(_resolve_csv_path(csv_path)) or f"missing:{csv_path}"
+        return self._memo.get_or_compute(
+            (message or "", fingerprint),
+            lambda: detect_animation_intent(message, csv_path=csv_path),
+        )
+
+    def stats(self) -> CacheStats:
+        return self._memo.stats()
+
+
 def is_animation_intent(message: Optional[str]) -> bool:
     """Convenience boolean helper"""
     return detect_animation_intent(message).animation_requested
@@ -428,5 +340,6 @@ __all__ = [
     "IntentResult",
     "quick_intent_check",
     "detect_animation_intent",
+    "IntentMemo",
     "is_animation_intent",
 ]
@@ -0,0 +1,385 @@
+"""
+Keyword Matcher Module
+
+Shared keyword vocabularies for the prompt heuristics, matched in one scan:
+
+- animation intent cues and chart-type keywords (intent_detection)
+- chart-type, creation-mode, axis-label and language keywords (specs)
+- per-chart intent patterns (chart_inference.INTENT_PATTERNS)
+
+Every pattern group is compiled once at import time, together with the
+literal stems one of which any of its matches has to start with (derived from
+the parsed pattern, e.g. ``\\b(rank(ing)?|top\\s*\\d+)\\b`` -> rank, top).
+scan() checks the lower-cased text for all stems first and only runs the
+groups whose stems occur, so a typical prompt touches a handful of regexes
+instead of ~70. Results are memoized per text, so the route gate, spec
+inference and chart scoring share one scan per message.
+
+Design notes:
+- Standard-library only.
+- A group's hits are exactly ``pattern.findall``/``finditer`` on the original
+  text (same flags), so ``count()`` and ``has()`` match the per-module regexes
+  this replaces.
+- Multilingual keywords (ID/EN/CN) for common phrasing.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+
+# =============================================================================
+# ANIMATION INTENT PATTERNS (intent_detection)
+# =============================================================================
+
+# Strong animation keywords (ID + EN)
+STRONG_ANIM_PATTERNS = [
+    r"\banimasi\b",            # ID: animasi
+    r"\banimasikan\b",         # ID: animasikan data
+    r"\banimate\b",
+    r"\banimat[aei]\w*\b",     # Typo tolerance: animte, animtae, animta, animatie, etc.
+    r"\banima[t]+e\b",         # Typo tolerance: animatte, animattte
+    r"\banimation\b",
+    r"\banimating\b",
+    r"\banimated\b",
+    r"\bgerakkan\b",           # ID: gerakkan data
+    r"\bbergerak\b",           # ID: objek bergerak
+    r"\bmanim\b",              # explicit Manim mention
+    r"\bvideo\b",
+    r"\bmp4\b",
+    r"\bgif\b",
+    r"\brender\b",
+    r"\bpreview\b",
+]
+
+# Medium-strength context tokens
+MEDIUM_ANIM_PATTERNS = [
+    r"\bframe\b",
+    r"\bframes\b",
+    r"\btimeline\b",
+    r"\btime[\s-]?series\b",
+    r"\btime[\s-]?lapse\b",
+    r"\bper\s*tahun\b",        # ID: per tahun (per-year progression)
+    r"\bper\s*waktu\b",        # ID: over time
+    r"\bper\s*year\b",
+    r"\bover\s*time\b",
+]
+
+# Code cue (explicit user-provided Manim code)
+CODE_CUES = [
+    r"\bclass\s+GenScene\b",
+    r"\bfrom\s+manim\s+import\b",
+    r"\bScene\):",  # class ... (Scene):
+]
+
+# Chart type keywords (all 5 chart types)
+CHART_KEYWORD_PATTERNS: Dict[str, List[str]] = {
+    "bubble": [
+        r"\bbubble\s*chart\b",
+        r"\bbubblechart\b",
+        r"\bbubble\b",
+        r"\bgelembung\b",          # ID: bubble
+        r"\bsebar\b",              # ID: sebar (scatter-like)
+        r"\bscatter\b",
+    ],
+    "distribution": [
+        r"\bdistribution\b",
+        r"\bdistribusi\b",
+        r"\bhistogram\b",
+        r"\bkde\b",
+        r"\bdensity\b",
+        r"\bstacked\s*distribution\b",
+    ],
+    "bar_race": [
+        r"\bbar\s*(chart\s*)?race\b",
+        r"\bracing\s*bar\b",
+        r"\branking\b",
+        r"\bperingkat\b",
+        r"\btop\s*\d+\b",
+        r"\bleaderboard\b",
+        r"\blomba\s*bar\b",
+    ],
+    "line_evolution": [
+        r"\bline\s*(chart|evolution|graph)?\b",
+        r"\bgrafik\s*garis\b",
+        r"\btrend\b",
+        r"\btren\b",
+        r"\btime\s*series\b",
+        r"\bevolution\b",
+        r"\bevolusi\b",
+        r"\btrajectory\b",
+    ],
+    "bento_grid": [
+        r"\bbento\s*(grid|box)?\b",
+        r"\bdashboard\b",
+        r"\bkpi\b",
+        r"\bmetric(s)?\b",
+        r"\bkey\s*indicator\b",
+        r"\boverview\b",
+        r"\bsummary\b",
+        r"\bringkasan\b",
+    ],
+}
+
+
+# =============================================================================
+# SPEC PATTERNS (specs)
+# =============================================================================
+
+SPEC_CHART_PATTERNS: Dict[str, str] = {
+    "bubble": r"(?:\bbubble\s*chart\b|\bbubblechart\b|\bbubble\b|\bgelembung\b|\bscatter\b|\bsebar\b)",
+    "distribution": r"(?:\bdistribution\b|\bdistribusi\b|\bhistogram\b|\bkde\b|\bdensity\b)",
+    "bar_race": r"(?:\bbar\s*race\b|\bracing\s*bar\b|\branking\b|\bperingkat\b|\btop\s*\d+\b|\bleaderboard\b)",
+    "line_evolution": r"(?:\bline\s*chart\b|\bline\s*evolution\b|\bline\s*graph\b|\btrend\b|\btren\b|\btime\s*series\b|\bevolution\b|\bevolusi\b)",
+    "bento_grid": r"(?:\bbento\b|\bdashboard\b|\bkpi\b|\bmetric\b|\boverview\b|\bsummary\b|\bringkasan\b)",
+}
+
+# Creation mode patterns
+CREATION_MODE_PATTERNS: Dict[str, str] = {
+    "1": r"(?:\bmode\s*1\b|\boption\s*1\b|\bdirect(ly)?\b|\blangsung\b)",
+    "3": r"(?:\bmode\s*3\b|\boption\s*3\b|\b(group(ed)?|kelompok)\b|\bby\s*group\b)",
+    "2": r"(?:\bmode\s*2\b|\boption\s*2\b|\brandom\b)",
+    # "group"/"kelompok" anywhere, without an explicit mode number
+    "group": r"(group|kelompok)",
+}
+
+# Common label tokens (ID/EN/CN) to set default axis labels
+LABEL_PATTERNS: Dict[str, str] = {
+    "life_expectancy": r"(life\s*expectancy|umur\s*harapan\s*hidup|人均寿命)",
+    "fertility": r"(fertilit(y|as)|生育率)",
+    "population": r"(population|populasi|人口)",
+    "year": r"(year|tahun|年)",
+    "region": r"(region|wilayah|区域|area|benua)",
+}
+
+# Label language hints (plain substrings, checked in this order)
+LANGUAGE_KEYWORDS: Dict[str, List[str]] = {
+    "id": ["umur", "tahun", "wilayah", "populasi", "fertilitas"],
+    "en": ["life", "year", "region", "population", "fertility"],
+    "cn": ["年", "区域", "人口", "生育率", "人均寿命"],
+}
+
+
+# =============================================================================
+# INTENT PATTERNS (chart_inference)
+# =============================================================================
+
+# These patterns detect WHAT the user wants to communicate
+# Not just chart names, but semantic intent
+
+INTENT_PATTERNS: Dict[str, List[str]] = {
+    "bar_race": [
+        # Competition/Ranking intent
+        r"\b(rank(ing)?|peringkat|top\s*\d+|leaderboard)\b",
+        r"\b(compar(e|ing|ison)|banding(kan)?|versus|vs)\b",
+        r"\b(race|racing|compete|competition|lomba)\b",
+        r"\b(rise|fall|overtake|surpass|naik|turun)\b",
+        # Explicit chart name
+        r"\bbar\s*(chart\s*)?race\b",
+        r"\bracing\s*bar\b",
+    ],
+    "line_evolution": [
+        # Trend/Change intent
+        r"\b(trend|tren|trajectory|path)\b",
+        r"\b(evolution|evolusi|perkembangan)\b",
+        r"\b(grow(th)?|decline|change|perubahan)\b",
+        r"\b(over\s*time|time\s*series|dari\s*waktu\s*ke\s*waktu)\b",
+        # Explicit chart name
+        r"\bline\s*(chart|graph|evolution)?\b",
+        r"\bgrafik\s*garis\b",
+    ],
+    "bubble": [
+        # Multi-dimensional intent
+        r"\b(relationship|correlation|korelasi|hubungan)\b",
+        r"\b(x\s*(vs?|versus)\s*y|scatter)\b",
+        r"\b(size|radius|magnitude|ukuran)\b",
+        r"\b(multi.?dimensional|3\s*variables?)\b",
+        # Explicit chart name
+        r"\bbubble\s*(chart)?\b",
+        r"\bgelembung\b",
+    ],
+    "distribution": [
+        # Spread/Shape intent
+        r"\b(distribution|distribusi|spread|sebaran)\b",
+        r"\b(histogram|frequency|frekuensi)\b",
+        r"\b(density|kepadatan|kde)\b",
+        r"\b(normal|skew|outlier)\b",
+        # Explicit chart name
+        r"\bdistribution\s*(chart|plot)?\b",
+    ],
+    "bento_grid": [
+        # Overview/Summary intent
+        r"\b(dashboard|overview|summary|ringkasan)\b",
+        r"\b(kpi|metric(s)?|key\s*indicator)\b",
+        r"\b(at\s*a\s*glance|snapshot|quick\s*view)\b",
+        r"\b(grid|panel|tile)\b",
+        # Explicit chart name
+        r"\bbento\s*(grid|box)?\b",
+    ],
+    "count_bar": [
+        # Counting/Frequency intent
+        r"\b(count(s|ing)?|hitung(an)?|jumlah)\b",
+        r"\b(frequency|frekuensi|occurrences?)\b",
+        r"\b(how\s*many|berapa\s*banyak)\b",
+        r"\b(categor(y|ies|ical)|kategori)\b",
+        r"\b(breakdown|by\s+category)\b",
+        # Explicit chart name
+        r"\bcount\s*(bar|chart)?\b",
+        r"\bbar\s*chart\b(?!\s*race)",  # bar chart but not bar chart race
+        r"\bhorizontal\s*bar\b",
+    ],
+    "single_numeric": [
+        # Value-per-category intent
+        r"\b(value|nilai|amount|jumlah)\s*(by|per|untuk)\b",
+        r"\b(revenue|sales|penjualan)\s*(by|per)\b",
+        r"\b(population|populasi)\s*(by|per)\b",
+        r"\b(score|skor)\s*(by|per)\b",
+        r"\b(total|sum)\s*(by|per)\b",
+        r"\b(show|tampilkan)\s*(the\s*)?(values?|data)\b",
+        # Simple bar chart (not race, not count)
+        r"\bsimple\s*bar\s*(chart)?\b",
+        r"\bbar\s*(chart|graph)\b(?!\s*race)",
+        # Explicit chart name
+        r"\bsingle\s*numeric\b",
+    ],
+}
+
+
+# =============================================================================
+# MATCHER
+# =============================================================================
+
+try:
+    import re._parser as _sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse as _sre_parse
+
+# Characters IGNORECASE matches to an ASCII letter that str.lower() keeps apart
+_FOLD = str.maketrans({"\u0131": "i", "\u017f": "s"})
+
+
+def _any_of(patterns: List[str]) -> str:
+    return "|".join(f"(?:{p})" for p in patterns)
+
+
+def _stems(items) -> Optional[FrozenSet[str]]:
+    """
+    Literal stems (lowercase) one of which every match must start with, or
+    None when the pattern has no such literal prefix.
+    """
+    acc = [""]
+    for op, av in items:
+        name = str(op)
+        if name == "AT":
+            continue
+        if name == "LITERAL":
+            acc = [a + chr(av).lower() for a in acc]
+            continue
+        if name == "SUBPATTERN":
+            sub = _stems(av[-1])
+        elif name == "BRANCH":
+            subs = [_stems(seq) for seq in av[1]]
+            sub = None if any(x is None for x in subs) else frozenset().union(*subs)
+        else:
+            sub = None
+        if sub is not None:
+            acc = [a + s for a in acc for s in sub]
+        break
+    if not all(acc):
+        return None
+    return frozenset(acc)
+
+
+class _Group:
+    __slots__ = ("key", "regex", "stems")
+
+    def __init__(self, key: str, pattern: str):
+        self.key = key
+        self.regex = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+        try:
+            self.stems = _stems(_sre_parse.parse(pattern, re.IGNORECASE))
+        except Exception:
+            self.stems = None
+
+
+def _build_groups() -> List[_Group]:
+    """One group per vocabulary the matcher reports on."""
+    groups: List[Tuple[str, str]] = [
+        ("anim:strong", _any_of(STRONG_ANIM_PATTERNS)),
+        ("anim:medium", _any_of(MEDIUM_ANIM_PATTERNS)),
+        ("anim:code", _any_of(CODE_CUES)),
+    ]
+    groups += [(f"chart:{name}", _any_of(p)) for name, p in CHART_KEYWORD_PATTERNS.items()]
+    groups += [(f"spec:{name}", p) for name, p in SPEC_CHART_PATTERNS.items()]
+    groups += [(f"mode:{name}", p) for name, p in CREATION_MODE_PATTERNS.items()]
+    groups += [(f"label:{name}", p) for name, p in LABEL_PATTERNS.items()]
+    groups += [
+        (f"lang:{lang}", _any_of([re.escape(w) for w in words]))
+        for lang, words in LANGUAGE_KEYWORDS.items()
+    ]
+    for chart_type, patterns in INTENT_PATTERNS.items():
+        groups += [(f"intent:{chart_type}:{i}", p) for i, p in enumerate(patterns)]
+    return [_Group(key, pattern) for key, pattern in groups]
+
+
+_GROUPS = _build_groups()
+_STEMS = sorted({stem for g in _GROUPS if g.stems for stem in g.stems})
+
+
+class KeywordHits:
+    """All keyword hits for one text, grouped by key (e.g. ``chart:bubble``)."""
+
+    __slots__ = ("_matches",)
+
+    def __init__(self, matches: Dict[str, List[str]]):
+        self._matches = matches
+
+    def has(self, key: str) -> bool:
+        return key in self._matches
+
+    def matches(self, key: str) -> List[str]:
+        """Non-overlapping match texts in order (like ``pattern.findall``)."""
+        return list(self._matches.get(key, ()))
+
+    def count(self, key: str) -> int:
+        return len(self._matches.get(key, ()))
+
+    def count_prefix(self, prefix: str) -> int:
+        """Number of distinct groups under ``prefix`` that matched anywhere."""
+        return sum(1 for key in self._matches if key.startswith(prefix))
+
+    def keys(self) -> List[str]:
+        return list(self._matches)
+
+
+@lru_cache(maxsize=256)
+def scan(text: Optional[str]) -> KeywordHits:
+    """Match every vocabulary against ``text``."""
+    text = text or ""
+    folded = text.lower().translate(_FOLD)
+    present = {stem for stem in _STEMS if stem in folded}
+    matches: Dict[str, List[str]] = {}
+    for group in _GROUPS:
+        if group.stems is not None and present.isdisjoint(group.stems):
+            continue
+        found = [m.group(0) for m in group.regex.finditer(text)]
+        if found:
+            matches[group.key] = found
+    return KeywordHits(matches)
+
+
+__all__ = [
+    "STRONG_ANIM_PATTERNS",
+    "MEDIUM_ANIM_PATTERNS",
+    "CODE_CUES",
+    "CHART_KEYWORD_PATTERNS",
+    "SPEC_CHART_PATTERNS",
+    "CREATION_MODE_PATTERNS",
+    "LABEL_PATTERNS",
+    "LANGUAGE_KEYWORDS",
+    "INTENT_PATTERNS",
+    "KeywordHits",
+    "scan",
+]
@@ -0,0 +1,273 @@
+"""
+LLM Response Cache Module
+
+Persistent, content-addressed cache of LLM completions. Users retrying a
+prompt and the auto-fix loop seeing the same error twice send byte-identical
+requests (same system prompt, user message and sampling parameters); a hit
+returns the stored completion in milliseconds instead of a multi-second
+call.
+
+    - key: SHA-256 of (model, system prompt, messages, max_tokens, temperature)
+    - storage: one SQLite file (WAL mode), shared by every worker process
+    - expiry: entries older than the TTL are ignored and purged
+    - size bound: least recently used entries are evicted past max_entries
+
+Which calls are cached is decided by the LLM gateway: calls at or below
+LLM_CACHE_MAX_TEMPERATURE (0.3, so code generation, auto-fix and
+summaries are cached). A completion the pipeline later rejects (lint, dry
+run, preview) is discarded again, so a retry asks the model afresh.
+
+Environment:
+    LLM_CACHE_ENABLED (1), LLM_CACHE_PATH (artifacts/cache/llm_responses.sqlite3),
+    LLM_CACHE_TTL_SECONDS (604800), LLM_CACHE_MAX_ENTRIES (5000),
+    LLM_CACHE_MAX_TEMPERATURE (0.3)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("animation_pipeline.llm_cache")
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+# Evict down to this fraction of max_entries so eviction does not run on every store
+_EVICT_TO = 0.9
+
+_SCHEMA = """
+create table if not exists llm_responses (
+    key text primary key,
+    model text not null,
+    text text not null,
+    stop_reason text,
+    input_tokens integer,
+    output_tokens integer,
+    created_at real not null,
+    last_used real not null,
+    hits integer not null default 0
+)
+"""
+
+
+def default_cache_path() -> str:
+    return os.getenv("LLM_CACHE_PATH") or os.path.join(os.getcwd(), "artifacts", "cache", "llm_responses.sqlite3")
+
+
+def cache_key(
+    *,
+    model: str,
+    system: Optional[str],
+    messages: List[Dict[str, Any]],
+    max_tokens: int,
+    temperature: float,
+) -> str:
+    """Content address of a request: identical requests share a key."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "system": system or "",
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": round(float(temperature), 4),
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    """A stored completion."""
+    text: str
+    model: str
+    stop_reason: Optional[str] = None
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    created_at: float = 0.0
+
+
+@dataclass
+class LLMCacheStats:
+    """Hit/miss counters for the response cache."""
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    errors: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return round(self.hits / total, 3) if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_rate"] = self.hit_rate
+        return data
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response store. Thread-safe; several processes may share
+    the file. Storage errors are logged and counted, never raised: a broken
+    cache only costs the LLM call it would have saved.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = path or default_cache_path()
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._stats = LLMCacheStats()
+
+    @classmethod
+    def from_env(cls) -> "LLMResponseCache":
+        return cls(
+            path=default_cache_path(),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(DEFAULT_TTL_SECONDS))),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES))),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        # Caller holds the lock
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=normal")
+            conn.execute(_SCHEMA)
+            conn.execute("create index if not exists llm_responses_last_used on llm_responses (last_used)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "select text, model, stop_reason, input_tokens, output_tokens, created_at "
+                    "from llm_responses where key = ? and created_at >= ?",
+                    (key, now - self.ttl_seconds),
+                ).fetchone()
+                if row is None:
+                    self._stats.misses += 1
+                    return None
+                conn.execute(
+                    "update llm_responses set last_used = ?, hits = hits + 1 where key = ?",
+                    (now, key),
+                )
+                self._stats.hits += 1
+                return CachedResponse(*row)
+            except (sqlite3.Error, OSError) as e:
+                self._stats.errors += 1
+                logger.warning("LLM cache read failed: %s", e)
+                return None
+
+    def put(self, key: str, response: CachedResponse) -> None:
+        now = time.time()
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "insert or replace into llm_responses "
+                    "(key, model, text, stop_reason, input_tokens, output_tokens, created_at, last_used, hits) "
+                    "values (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                    (
+                        key, response.model, response.text, response.stop_reason,
+                        response.input_tokens, response.output_tokens, now, now,
+                    ),
+                )
+                self._stats.stores += 1
+                self._evict(conn, now)
+            except (sqlite3.Error, OSError) as e:
+                self._stats.errors += 1
+                logger.warning("LLM cache write failed: %s", e)
+
+    def discard(self, key: str) -> bool:
+        """Drop one entry (a completion found unusable after it was stored)."""
+        with self._lock:
+            try:
+                deleted = self._connect().execute("delete from llm_responses where key = ?", (key,)).rowcount
+            except (sqlite3.Error, OSError) as e:
+                self._stats.errors += 1
+                logger.warning("LLM cache delete failed: %s", e)
+                return False
+            self._stats.evictions += max(0, deleted)
+            return deleted > 0
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        expired = conn.execute(
+            "delete from llm_responses where created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        size = conn.execute("select count(*) from llm_responses").fetchone()[0]
+        evicted = 0
+        if size > self.max_entries:
+            keep = int(self.max_entries * _EVICT_TO)
+            evicted = conn.execute(
+                "delete from llm_responses where key in "
+                "(select key from llm_responses order by last_used asc limit ?)",
+                (size - keep,),
+            ).rowcount
+        self._stats.evictions += max(0, expired) + max(0, evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                self._connect().execute("delete from llm_responses")
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("LLM cache clear failed: %s", e)
+            self._stats = LLMCacheStats()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> LLMCacheStats:
+        with self._lock:
+            size = 0
+            if self._conn is not None:
+                try:
+                    size = self._conn.execute("select count(*) from llm_responses").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return LLMCacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                stores=self._stats.stores,
+                evictions=self._stats.evictions,
+                errors=self._stats.errors,
+                size=size,
+            )
+
+
+__all__ = [
+    "DEFAULT_TTL_SECONDS",
+    "DEFAULT_MAX_ENTRIES",
+    "default_cache_path",
+    "cache_key",
+    "CachedResponse",
+    "LLMCacheStats",
+    "LLMResponseCache",
+]
@@ -0,0 +1,804 @@
+"""
+LLM Gateway Module
+
+Single entry point for Anthropic Messages API calls. Code generation,
+summarization and the auto-fix paths used to construct a new
+anthropic.Anthropic client per call, so every request paid for a fresh
+TCP/TLS connection and nothing bounded how many calls a process made at
+once. The gateway owns:
+
+    - one pooled client per process (sync, and async per event loop; created
+      lazily), with the SDK's own retries disabled so retry policy lives here
+    - a per-process concurrency limit shared by threads and coroutines
+    - a token-rate limit (tokens per minute, estimated up front and settled
+      with the reported usage)
+    - request timeouts and jittered exponential backoff for retryable
+      failures (429, 5xx, timeouts, connection errors), honouring
+      Retry-After
+    - latency / token / error metrics for the pipeline logger
+    - the persistent response cache (see llm_cache): identical deterministic
+      requests are answered from disk without an API call
+
+Usage:
+    from agents.tools.llm_gateway import get_gateway, LLMGatewayError
+
+    response = get_gateway().complete(
+        "Write a haiku", model="claude-sonnet-4-20250514", system="...", max_tokens=256,
+    )
+    response.text, response.input_tokens, response.latency_ms
+
+    stream = get_gateway().stream("Write a haiku", model="claude-sonnet-4-20250514")
+    for delta in stream:
+        ...                   # stream.close() aborts the request
+    stream.response           # LLMResponse once the stream is exhausted
+
+    response = await get_gateway().acomplete("Write a haiku", model="claude-sonnet-4-20250514")
+
+Environment:
+    ANTHROPIC_API_KEY, ANTHROPIC_BASE_URL
+    LLM_MAX_CONCURRENCY (8), LLM_TOKENS_PER_MINUTE (0 = unlimited),
+    LLM_TIMEOUT_SECONDS (120), LLM_MAX_RETRIES (3),
+    LLM_RETRY_BASE_SECONDS (0.5), LLM_RETRY_MAX_SECONDS (20)
+    LLM_CACHE_ENABLED (1), LLM_CACHE_MAX_TEMPERATURE (0.3) and the
+    LLM_CACHE_* settings of llm_cache
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from agents.tools.llm_cache import CachedResponse, LLMResponseCache, cache_key
+
+logger = logging.getLogger("animation_pipeline.llm_gateway")
+
+
+class LLMGatewayError(Exception):
+    """
+    Raised when an LLM call fails after retries.
+
+    ``kind`` is one of: "sdk", "config", "authentication", "rate_limit",
+    "timeout", "connection", "status", "response", "unknown".
+    """
+
+    def __init__(self, message: str, kind: str = "unknown", status_code: Optional[int] = None):
+        super().__init__(message)
+        self.kind = kind
+        self.status_code = status_code
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+@dataclass
+class GatewayConfig:
+    """Limits and retry policy of a gateway."""
+    api_key: Optional[str] = None
+    base_url: Optional[str] = None
+    max_concurrency: int = 8
+    tokens_per_minute: int = 0
+    timeout_seconds: float = 120.0
+    max_retries: int = 3
+    retry_base_seconds: float = 0.5
+    retry_max_seconds: float = 20.0
+    max_connections: int = 20
+    # Response cache: calls at or below this temperature are cached by default
+    cache_enabled: bool = False
+    cache_max_temperature: float = 0.3
+
+    @classmethod
+    def from_env(cls) -> "GatewayConfig":
+        return cls(
+            api_key=os.getenv("ANTHROPIC_API_KEY") or None,
+            base_url=os.getenv("ANTHROPIC_BASE_URL") or None,
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            tokens_per_minute=int(os.getenv("LLM_TOKENS_PER_MINUTE", "0")),
+            timeout_seconds=float(os.getenv("LLM_TIMEOUT_SECONDS", "120")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+            retry_base_seconds=float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5")),
+            retry_max_seconds=float(os.getenv("LLM_RETRY_MAX_SECONDS", "20")),
+            cache_enabled=os.getenv("LLM_CACHE_ENABLED", "1").lower() not in ("0", "false", "no", "off"),
+            cache_max_temperature=float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.3")),
+        )
+
+
+@dataclass
+class LLMResponse:
+    """Text and accounting of one completed call."""
+    text: str
+    model: str
+    stop_reason: Optional[str] = None
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    latency_ms: float = 0.0
+    attempts: int = 1
+    cached: bool = False
+    first_token_ms: Optional[float] = None
+    # Response cache entry the call was answered from or stored under (see invalidate())
+    cache_key: Optional[str] = None
+
+
+# =============================================================================
+# LIMITS
+# =============================================================================
+
+def _wake(waiter: "asyncio.Future") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class ConcurrencyLimiter:
+    """
+    Counting limit shared by the threads and coroutines of a process.
+
+    Threads block on a Condition; coroutines wait on a future that release()
+    resolves through its loop's call_soon_threadsafe, so neither polls.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.in_flight = 0
+        self.peak = 0
+        self._cond = threading.Condition()
+        self._async_waiters: deque = deque()
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            return True
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self.in_flight < self.limit:
+                    self.in_flight += 1
+                    self.peak = max(self.peak, self.in_flight)
+                    return
+                waiter = loop.create_future()
+                entry = (loop, waiter)
+                self._async_waiters.append(entry)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._cond:
+                    if entry in self._async_waiters:
+                        self._async_waiters.remove(entry)
+                    else:
+                        # Woken for a free slot it will not take: pass it on
+                        self._wake_async()
+                raise
+
+    def _wake_async(self) -> None:
+        # Caller holds _cond. The woken coroutine competes for the slot again.
+        while self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+                return
+            except RuntimeError:
+                continue  # its loop is closed
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+            self._wake_async()
+
+
+class TokenBucket:
+    """
+    Tokens-per-minute budget. reserve() takes an estimate (and returns how
+    long to wait before the call may start); settle() corrects it with the
+    actual usage. A rate of 0 disables the limit.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.rate = tokens_per_minute / 60.0
+        self.capacity = float(tokens_per_minute)
+        self.tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: int) -> float:
+        """Take ``tokens`` (possibly into debt); seconds to wait until the debt is repaid."""
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            self._refill()
+            # A single request larger than the whole budget may still run once the bucket is full
+            self.tokens -= min(tokens, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+
+    def settle(self, estimated: int, actual: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + min(estimated, self.capacity) - actual)
+
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+@dataclass
+class GatewayStats:
+    """Counters for the pipeline logger."""
+    calls: int = 0
+    failures: int = 0
+    retries: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    rate_limited_waits: int = 0
+    cache_hits: int = 0
+    streams_aborted: int = 0
+    latency_p50_ms: float = 0.0
+    latency_p95_ms: float = 0.0
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+
+# =============================================================================
+# GATEWAY
+# =============================================================================
+
+def _estimate_tokens(system: Optional[str], messages: List[Dict[str, Any]], max_tokens: int) -> int:
+    chars = len(system or "") + sum(len(str(m.get("content", ""))) for m in messages)
+    return chars // 4 + max_tokens
+
+
+def _response_text(resp: Any) -> str:
+    blocks = getattr(resp, "content", None) or []
+    return "".join(getattr(b, "text", "") for b in blocks if getattr(b, "type", "") == "text")
+
+
+class LLMGateway:
+    """Pooled Anthropic client with limits, retries and metrics."""
+
+    def __init__(self, config: Optional[GatewayConfig] = None, cache: Optional[LLMResponseCache] = None):
+        self.config = config or GatewayConfig.from_env()
+        if cache is None and self.config.cache_enabled:
+            cache = LLMResponseCache.from_env()
+        self.cache = cache
+        self.limiter = ConcurrencyLimiter(self.config.max_concurrency)
+        self.bucket = TokenBucket(self.config.tokens_per_minute)
+        self._client = None
+        # httpx async connections belong to the loop that opened them
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._client_lock = threading.Lock()
+        self._stats = GatewayStats()
+        self._latencies: deque = deque(maxlen=512)
+        self._stats_lock = threading.Lock()
+
+    # -- clients ---------------------------------------------------------------
+
+    def _sdk(self):
+        try:
+            import anthropic
+        except Exception as e:
+            raise LLMGatewayError(f"Anthropic SDK not available: {e}", kind="sdk") from e
+        if not self.config.api_key:
+            raise LLMGatewayError("ANTHROPIC_API_KEY environment variable not set", kind="config")
+        return anthropic
+
+    def _client_kwargs(self, anthropic, async_client: bool = False) -> Dict[str, Any]:
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_connections,
+        )
+        http_cls = anthropic.DefaultAsyncHttpxClient if async_client else anthropic.DefaultHttpxClient
+        kwargs = {
+            "api_key": self.config.api_key,
+            "timeout": self.config.timeout_seconds,
+            "max_retries": 0,
+            "http_client": http_cls(limits=limits),
+        }
+        if self.config.base_url:
+            kwargs["base_url"] = self.config.base_url
+        return kwargs
+
+    @property
+    def client(self):
+        if self._client is None:
+            anthropic = self._sdk()
+            with self._client_lock:
+                if self._client is None:
+                    self._client = anthropic.Anthropic(**self._client_kwargs(anthropic))
+        return self._client
+
+    @property
+    def async_client(self):
+        """The pooled async client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            anthropic = self._sdk()
+            with self._client_lock:
+                client = self._async_clients.get(loop)
+                if client is None:
+                    client = anthropic.AsyncAnthropic(**self._client_kwargs(anthropic, async_client=True))
+                    self._async_clients[loop] = client
+        return client
+
+    def close(self) -> None:
+        """Close the pooled clients (async ones on their own, still running, loops) and the cache."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        with self._client_lock:
+            async_clients = list(self._async_clients.items())
+            self._async_clients.clear()
+        for loop, client in async_clients:
+            if loop.is_running() and not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(client.close(), loop)
+        if self.cache is not None:
+            self.cache.close()
+
+    # -- retry policy -------------------------------------------------------------
+
+    def _classify(self, exc: Exception) -> LLMGatewayError:
+        if isinstance(exc, LLMGatewayError):
+            return exc
+        import anthropic
+
+        status = getattr(exc, "status_code", None)
+        if isinstance(exc, anthropic.AuthenticationError):
+            return LLMGatewayError(str(exc), kind="authentication", status_code=status)
+        if isinstance(exc, anthropic.RateLimitError):
+            return LLMGatewayError(str(exc), kind="rate_limit", status_code=status)
+        if isinstance(exc, anthropic.APITimeoutError):
+            return LLMGatewayError(str(exc), kind="timeout")
+        if isinstance(exc, anthropic.APIConnectionError):
+            return LLMGatewayError(str(exc), kind="connection")
+        if isinstance(exc, anthropic.APIStatusError):
+            return LLMGatewayError(str(exc), kind="status", status_code=status)
+        return LLMGatewayError(str(exc), kind="unknown")
+
+    @staticmethod
+    def _retryable(error: LLMGatewayError) -> bool:
+        if error.kind in ("rate_limit", "timeout", "connection"):
+            return True
+        return error.kind == "status" and (error.status_code or 0) >= 500
+
+    def _backoff(self, attempt: int, exc: Exception) -> float:
+        """Full-jitter exponential backoff, at least the server's Retry-After."""
+        cap = min(self.config.retry_max_seconds, self.config.retry_base_seconds * (2 ** attempt))
+        delay = random.uniform(0, cap)
+        response = getattr(exc, "response", None)
+        retry_after = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+        try:
+            if retry_after is not None:
+                delay = max(delay, min(float(retry_after), self.config.retry_max_seconds))
+        except ValueError:
+            pass
+        return delay
+
+    # -- calls ------------------------------------------------------------------
+
+    def _request(self, model, messages, system, max_tokens, temperature) -> Dict[str, Any]:
+        # temperature goes in the body directly: the (unpinned) SDK does not
+        # accept it as a keyword in every release, the API always does
+        request = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": messages,
+            "extra_body": {"temperature": temperature},
+        }
+        if system:
+            request["system"] = system
+        return request
+
+    def _record(self, resp: Any, model: str, started: float, attempts: int, estimated: int) -> LLMResponse:
+        usage = getattr(resp, "usage", None)
+        response = LLMResponse(
+            text=_response_text(resp),
+            model=getattr(resp, "model", None) or model,
+            stop_reason=getattr(resp, "stop_reason", None),
+            input_tokens=getattr(usage, "input_tokens", None),
+            output_tokens=getattr(usage, "output_tokens", None),
+            latency_ms=round((time.perf_counter() - started) * 1000, 2),
+            attempts=attempts,
+        )
+        actual = (response.input_tokens or 0) + (response.output_tokens or 0)
+        self.bucket.settle(estimated, actual if usage is not None else estimated)
+        with self._stats_lock:
+            self._stats.calls += 1
+            self._stats.input_tokens += response.input_tokens or 0
+            self._stats.output_tokens += response.output_tokens or 0
+            self._latencies.append(response.latency_ms)
+        logger.info(
+            "LLM call ok | model=%s | latency_ms=%s | attempts=%s | input_tokens=%s | output_tokens=%s",
+            response.model, response.latency_ms, attempts, response.input_tokens, response.output_tokens,
+        )
+        return response
+
+    def _record_failure(self, error: LLMGatewayError, estimated: int) -> None:
+        self.bucket.settle(estimated, 0)
+        with self._stats_lock:
+            self._stats.failures += 1
+            self._stats.errors[error.kind] = self._stats.errors.get(error.kind, 0) + 1
+
+    def _record_retry(self, error: LLMGatewayError, attempt: int, delay: float) -> None:
+        with self._stats_lock:
+            self._stats.retries += 1
+        logger.warning(
+            "LLM call failed (%s, status=%s); retry %d/%d in %.2fs",
+            error.kind, error.status_code, attempt + 1, self.config.max_retries, delay,
+        )
+
+    # -- response cache -----------------------------------------------------------
+
+    def _cache_key(self, use_cache, model, system, messages, max_tokens, temperature) -> Optional[str]:
+        if self.cache is None:
+            return None
+        if use_cache is None:
+            use_cache = temperature <= self.config.cache_max_temperature
+        if not use_cache:
+            return None
+        return cache_key(
+            model=model, system=system, messages=messages, max_tokens=max_tokens, temperature=temperature,
+        )
+
+    def _cached(self, key: Optional[str]) -> Optional[LLMResponse]:
+        if key is None:
+            return None
+        started = time.perf_counter()
+        hit = self.cache.get(key)
+        if hit is None:
+            return None
+        with self._stats_lock:
+            self._stats.cache_hits += 1
+        response = LLMResponse(
+            text=hit.text,
+            model=hit.model,
+            stop_reason=hit.stop_reason,
+            input_tokens=hit.input_tokens,
+            output_tokens=hit.output_tokens,
+            latency_ms=round((time.perf_counter() - started) * 1000, 2),
+            attempts=0,
+            cached=True,
+            cache_key=key,
+        )
+        logger.info("LLM cache hit | model=%s | latency_ms=%s", response.model, response.latency_ms)
+        return response
+
+    def _store(self, key: Optional[str], response: LLMResponse, accept: Optional[Callable[[str], bool]]) -> None:
+        # Truncated completions and ones the caller rejects are not worth replaying
+        if key is None or response.stop_reason == "max_tokens":
+            return
+        if accept is not None and not accept(response.text):
+            return
+        response.cache_key = key
+        self.cache.put(key, CachedResponse(
+            text=response.text,
+            model=response.model,
+            stop_reason=response.stop_reason,
+            input_tokens=response.input_tokens,
+            output_tokens=response.output_tokens,
+        ))
+
+    def invalidate(self, key: Optional[str]) -> None:
+        """Drop a cached completion the caller found unusable downstream (LLMResponse.cache_key)."""
+        if key is not None and self.cache is not None:
+            self.cache.discard(key)
+
+    def _reserve(self, estimated: int) -> float:
+        wait = self.bucket.reserve(estimated)
+        if wait > 0:
+            with self._stats_lock:
+                self._stats.rate_limited_waits += 1
+        return wait
+
+    def complete(
+        self,
+        prompt: Optional[str] = None,
+        *,
+        model: str,
+        system: Optional[str] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.2,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        cache: Optional[bool] = None,
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> LLMResponse:
+        """
+        Run one Messages API call (``prompt`` as the single user message, or
+        ``messages``).
+
+        ``cache`` forces the response cache on or off (default: on for
+        temperatures up to the configured maximum); ``accept(text)`` decides
+        whether a fresh completion may be stored. A response that came from
+        or went into the cache carries its ``cache_key`` for invalidate().
+        """
+        messages = messages or [{"role": "user", "content": prompt or ""}]
+        key = self._cache_key(cache, model, system, messages, max_tokens, temperature)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        client = self.client
+        estimated = _estimate_tokens(system, messages, max_tokens)
+        request = self._request(model, messages, system, max_tokens, temperature)
+
+        time.sleep(self._reserve(estimated))
+        self.limiter.acquire()
+        started = time.perf_counter()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    resp = client.messages.create(**request)
+                    response = self._record(resp, model, started, attempt + 1, estimated)
+                    self._store(key, response, accept)
+                    return response
+                except Exception as exc:
+                    error = self._classify(exc)
+                    if attempt >= self.config.max_retries or not self._retryable(error):
+                        self._record_failure(error, estimated)
+                        raise error from exc
+                    delay = self._backoff(attempt, exc)
+                    self._record_retry(error, attempt, delay)
+                    time.sleep(delay)
+                    attempt += 1
+        finally:
+            self.limiter.release()
+
+    async def acomplete(
+        self,
+        prompt: Optional[str] = None,
+        *,
+        model: str,
+        system: Optional[str] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.2,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        cache: Optional[bool] = None,
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> LLMResponse:
+        """Async complete(): same limits, token budget, retries, cache and metrics, without a thread."""
+        messages = messages or [{"role": "user", "content": prompt or ""}]
+        # The cache is a local indexed SQLite lookup; cheap enough for the loop
+        key = self._cache_key(cache, model, system, messages, max_tokens, temperature)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        client = self.async_client
+        estimated = _estimate_tokens(system, messages, max_tokens)
+        request = self._request(model, messages, system, max_tokens, temperature)
+
+        wait = self._reserve(estimated)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await self.limiter.acquire_async()
+        started = time.perf_counter()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    resp = await client.messages.create(**request)
+                    response = self._record(resp, model, started, attempt + 1, estimated)
+                    self._store(key, response, accept)
+                    return response
+                except Exception as exc:
+                    error = self._classify(exc)
+                    if attempt >= self.config.max_retries or not self._retryable(error):
+                        self._record_failure(error, estimated)
+                        raise error from exc
+                    delay = self._backoff(attempt, exc)
+                    self._record_retry(error, attempt, delay)
+                    await asyncio.sleep(delay)
+                    attempt += 1
+        finally:
+            self.limiter.release()
+
+    def stream(
+        self,
+        prompt: Optional[str] = None,
+        *,
+        model: str,
+        system: Optional[str] = None,
+        max_tokens: int = 1024,
+        temperature: float = 0.2,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        cache: Optional[bool] = None,
+        accept: Optional[Callable[[str], bool]] = None,
+    ) -> "CompletionStream":
+        """
+        Like complete(), but yields text deltas as the model produces them.
+
+        Iterating the returned stream starts the call; closing it early
+        aborts the request (nothing is cached). A cache hit is yielded as a
+        single delta.
+        """
+        messages = messages or [{"role": "user", "content": prompt or ""}]
+        key = self._cache_key(cache, model, system, messages, max_tokens, temperature)
+        request = self._request(model, messages, system, max_tokens, temperature)
+        estimated = _estimate_tokens(system, messages, max_tokens)
+        return CompletionStream(self._stream_deltas(request, model, estimated, key, accept))
+
+    def _stream_deltas(self, request, model, estimated, key, accept):
+        cached = self._cached(key)
+        if cached is not None:
+            yield cached.text
+            return cached
+
+        client = self.client
+        time.sleep(self._reserve(estimated))
+        self.limiter.acquire()
+        started = time.perf_counter()
+        finished = False
+        try:
+            attempt = 0
+            while True:
+                first_token_ms = None
+                try:
+                    with client.messages.stream(**request) as stream:
+                        for text in stream.text_stream:
+                            if first_token_ms is None:
+                                first_token_ms = round((time.perf_counter() - started) * 1000, 2)
+                            yield text
+                        final = stream.get_final_message()
+                    response = self._record(final, model, started, attempt + 1, estimated)
+                    response.first_token_ms = first_token_ms
+                    finished = True
+                    self._store(key, response, accept)
+                    return response
+                except Exception as exc:
+                    error = self._classify(exc)
+                    # Text already handed out cannot be taken back, so only
+                    # failures before the first token are retried
+                    retryable = first_token_ms is None and self._retryable(error)
+                    if attempt >= self.config.max_retries or not retryable:
+                        finished = True
+                        self._record_failure(error, estimated)
+                        raise error from exc
+                    delay = self._backoff(attempt, exc)
+                    self._record_retry(error, attempt, delay)
+                    time.sleep(delay)
+                    attempt += 1
+        finally:
+            self.limiter.release()
+            if not finished:
+                # Closed by the consumer; the usage of the aborted call is unknown
+                with self._stats_lock:
+                    self._stats.streams_aborted += 1
+
+    def stats(self) -> GatewayStats:
+        with self._stats_lock:
+            latencies = list(self._latencies)
+            return GatewayStats(
+                calls=self._stats.calls,
+                failures=self._stats.failures,
+                retries=self._stats.retries,
+                input_tokens=self._stats.input_tokens,
+                output_tokens=self._stats.output_tokens,
+                in_flight=self.limiter.in_flight,
+                peak_in_flight=self.limiter.peak,
+                rate_limited_waits=self._stats.rate_limited_waits,
+                cache_hits=self._stats.cache_hits,
+                streams_aborted=self._stats.streams_aborted,
+                latency_p50_ms=_percentile(latencies, 0.5),
+                latency_p95_ms=_percentile(latencies, 0.95),
+                errors=dict(self._stats.errors),
+            )
+
+
+class CompletionStream:
+    """Text deltas of one streamed call; ``response`` is set once they are exhausted."""
+
+    def __init__(self, deltas: Iterator[str]):
+        self._deltas = deltas
+        self.response: Optional[LLMResponse] = None
+
+    def __iter__(self) -> Iterator[str]:
+        self.response = yield from self._deltas
+
+    def close(self) -> None:
+        """Abort the call (closes the HTTP response) if it is still running."""
+        self._deltas.close()
+
+
+# =============================================================================
+# PROCESS-WIDE GATEWAY
+# =============================================================================
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway(api_key: Optional[str] = None) -> LLMGateway:
+    """
+    The process-wide gateway (configured from the environment on first use).
+
+    Callers that resolve the API key themselves pass it along; a key that
+    differs from the current gateway's replaces the gateway. The old one is
+    not closed -- calls started on it may still be running -- and its pool
+    goes with it once they finish.
+    """
+    global _gateway
+    gateway = _gateway
+    if gateway is None or (api_key and api_key != gateway.config.api_key):
+        with _gateway_lock:
+            gateway = _gateway
+            if gateway is None or (api_key and api_key != gateway.config.api_key):
+                config = GatewayConfig.from_env()
+                if api_key:
+                    config.api_key = api_key
+                gateway = _gateway = LLMGateway(config)
+    return gateway
+
+
+def reset_gateway(gateway: Optional[LLMGateway] = None) -> None:
+    """Replace the process-wide gateway (None: rebuild from the environment on next use)."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is not None and _gateway is not gateway:
+            _gateway.close()
+        _gateway = gateway
+
+
+def llm_gateway_stats() -> Dict[str, Any]:
+    """Stats of the process-wide gateway and its response cache, ready for a log context."""
+    gateway = _gateway
+    stats = {"llm_gateway": gateway.stats().to_dict() if gateway is not None else GatewayStats().to_dict()}
+    if gateway is not None and gateway.cache is not None:
+        stats["llm_cache"] = gateway.cache.stats().to_dict()
+    return stats
+
+
+__all__ = [
+    "LLMGatewayError",
+    "GatewayConfig",
+    "LLMResponse",
+    "ConcurrencyLimiter",
+    "TokenBucket",
+    "GatewayStats",
+    "LLMGateway",
+    "CompletionStream",
+    "get_gateway",
+    "reset_gateway",
+    "llm_gateway_stats",
+]
@@ -30,6 +30,9 @@ import logging
 from typing import List, Tuple, Optional, Generator
 from shutil import which
 
+from agents.tools.scene_runtime import runtime_env
+from agents.tools.templates.scene_data import stage_scene_data
+
 # Setup module logger
 logger = logging.getLogger("animation_pipeline.preview_manim")
 try:
@@ -304,6 +307,10 @@ config.frame_rate = {effective_frame_rate}
     logger.debug(f"[PREVIEW] Writing scene file: {scene_file_path}")
     with open(scene_file_path, "w", encoding="utf-8") as f:
         f.write(mod_code)
+    # Dataset sidecars referenced by template scenes go next to the scene file
+    staged = stage_scene_data(mod_code, work_dir)
+    if staged:
+        logger.debug(f"[PREVIEW] Staged scene data: {staged}")
 
     token = f"preview-{user_id}-{project_name}-{iteration}-{uuid.uuid4().hex[:6]}"
     out_dir = os.path.join(previews_dir, token)
@@ -333,6 +340,7 @@ config.frame_rate = {effective_frame_rate}
                 cmd=cmd,
                 role="preview",
                 cwd=work_dir,
+                env=runtime_env(),
                 text=True,
                 bufsize=1,
                 stdout=subprocess.PIPE,
@@ -342,6 +350,7 @@ config.frame_rate = {effective_frame_rate}
             proc = subprocess.Popen(
                 cmd,
                 cwd=work_dir,
+                env=runtime_env(),
                 text=True,
                 bufsize=1,
                 stdout=subprocess.PIPE,
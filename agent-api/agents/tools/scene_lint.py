@@ -0,0 +1,639 @@
+"""
+Static Scene Linter
+
+Checks generated scene code for mistakes that would otherwise only show up
+after a render has been started, without executing it:
+
+- undefined names: every global name must be defined in the module, be a
+  builtin or come from the scene prelude (``from manim import *``,
+  ``from math import *``, ``import os``)
+- unknown keyword arguments to common Manim constructors (Circle(colour=...))
+- unknown methods called on common Manim objects (circle.set_colour(...),
+  self.wiat(...) in a Scene)
+- dataset columns: columns used on a DataFrame read with ``read_csv("<path>")``
+  must exist in that dataset's stored profile
+
+Name and signature checks need the Manim symbol table: the names exported by
+``from manim import *`` and, for the constructors in COMMON_CONSTRUCTORS,
+their accepted keyword arguments and attributes. It is built once per manim
+version by a subprocess (the API process never imports manim) and cached as
+JSON; without manim installed those checks are skipped.
+
+Checks err on the side of silence: anything the linter cannot resolve
+statically (other star imports, names assigned more than once, DataFrames
+whose columns change) is not reported.
+
+Usage:
+    from agents.tools.scene_lint import lint_scene
+
+    report = lint_scene(code)
+    if not report.ok:
+        report.summary()   # "line 7: name 'Squre' is not defined; did you mean 'Square'?"
+
+Environment:
+    SCENE_LINT_ENABLED (1), MANIM_SYMBOLS_PATH (artifacts/cache/manim_symbols.json)
+"""
+
+from __future__ import annotations
+
+import ast
+import builtins
+import difflib
+import json
+import logging
+import math
+import os
+import subprocess
+import symtable
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger("animation_pipeline.scene_lint")
+
+SYMBOLS_FORMAT = 1
+
+# Constructors whose keyword arguments and methods are checked
+COMMON_CONSTRUCTORS = (
+    # scenes (methods called on self)
+    "Scene", "MovingCameraScene", "ThreeDScene", "ZoomedScene",
+    # mobjects
+    "Mobject", "VMobject", "VGroup", "Group", "ValueTracker",
+    "Circle", "Dot", "Square", "Rectangle", "RoundedRectangle", "Triangle",
+    "Polygon", "RegularPolygon", "Ellipse", "Arc", "Annulus", "Sector",
+    "Line", "DashedLine", "Arrow", "DoubleArrow", "Vector", "CurvedArrow",
+    "Text", "MarkupText", "Paragraph", "Tex", "MathTex", "Title", "BulletedList",
+    "DecimalNumber", "Integer",
+    "Axes", "NumberPlane", "NumberLine", "BarChart", "Table",
+    "SurroundingRectangle", "BackgroundRectangle", "Brace", "BraceLabel",
+    "Underline", "Cross", "ImageMobject", "SVGMobject",
+    # animations
+    "Create", "Uncreate", "Write", "Unwrite", "DrawBorderThenFill",
+    "FadeIn", "FadeOut", "GrowFromCenter", "GrowFromEdge",
+    "Transform", "ReplacementTransform", "TransformMatchingTex",
+    "Indicate", "Circumscribe", "Flash", "ShowPassingFlash",
+    "Rotate", "MoveAlongPath", "ChangeDecimalToValue",
+    "AnimationGroup", "LaggedStart", "Succession", "Wait",
+)
+
+# Names the preview/render prelude provides besides the star imports
+_PRELUDE_NAMES = {"os", "config"}
+_MODULE_DUNDERS = {"__name__", "__file__", "__doc__", "__spec__", "__loader__", "__package__", "__builtins__"}
+_STAR_MODULES = {"manim", "math"}
+
+# DataFrame methods taking column names: method -> (positional index, keyword names)
+_COLUMN_METHODS = {
+    "groupby": (0, ("by",)),
+    "sort_values": (0, ("by",)),
+    "set_index": (0, ("keys",)),
+    "pivot": (None, ("index", "columns", "values")),
+    "pivot_table": (None, ("index", "columns", "values")),
+    "drop_duplicates": (0, ("subset",)),
+    "dropna": (None, ("subset",)),
+}
+# read_csv options that change which columns the frame has
+_RESHAPING_READ_OPTIONS = {"names", "usecols", "header", "index_col"}
+
+_MAX_REPORTED = 10
+
+
+# =============================================================================
+# SYMBOL TABLE
+# =============================================================================
+
+@dataclass
+class ManimSymbols:
+    """
+    What ``from manim import *`` provides. ``classes`` maps constructor name
+    to {"params": accepted keyword names, "open": accepts any keyword,
+    "attributes": class attributes, "getattr": has dynamic get_/set_ access}.
+    """
+    version: str
+    names: List[str]
+    classes: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    built_at: float = 0.0
+    format: int = SYMBOLS_FORMAT
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional["ManimSymbols"]:
+        if not isinstance(data, dict) or data.get("format") != SYMBOLS_FORMAT:
+            return None
+        try:
+            return cls(**{k: data[k] for k in cls.__dataclass_fields__ if k in data})
+        except TypeError:
+            return None
+
+
+def _public_names(module: Any) -> List[str]:
+    exported = getattr(module, "__all__", None)
+    if exported is None:
+        exported = [n for n in dir(module) if not n.startswith("_")]
+    return sorted(set(exported))
+
+
+def _constructor_params(cls: type) -> Tuple[List[str], bool]:
+    """
+    Keyword arguments accepted by ``cls(...)``: the parameters of each
+    __init__ along the MRO for as long as they pass **kwargs on. Open when
+    the chain never closes or cannot be inspected.
+    """
+    import inspect
+
+    params: Set[str] = set()
+    for klass in cls.__mro__:
+        if klass is object:
+            return sorted(params), True
+        init = klass.__dict__.get("__init__")
+        if init is None:
+            continue
+        try:
+            signature = inspect.signature(init)
+        except (TypeError, ValueError):
+            return sorted(params), True
+        var_keyword = False
+        for p in signature.parameters.values():
+            if p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY) and p.name != "self":
+                params.add(p.name)
+            elif p.kind == p.VAR_KEYWORD:
+                var_keyword = True
+        if not var_keyword:
+            return sorted(params), False
+    return sorted(params), True
+
+
+def collect_symbols(module: Any, version: str) -> ManimSymbols:
+    """Introspect an imported manim module (runs in the builder subprocess)."""
+    names = _public_names(module)
+    classes: Dict[str, Dict[str, Any]] = {}
+    for name in COMMON_CONSTRUCTORS:
+        cls = getattr(module, name, None)
+        if not isinstance(cls, type):
+            continue
+        params, open_ = _constructor_params(cls)
+        custom_getattr = any("__getattr__" in vars(k) for k in cls.__mro__ if k is not object)
+        classes[name] = {
+            "params": params,
+            "open": open_,
+            "attributes": sorted(n for n in dir(cls) if not n.startswith("__")),
+            "getattr": custom_getattr,
+        }
+    return ManimSymbols(version=version, names=names, classes=classes, built_at=time.time())
+
+
+def manim_version() -> Optional[str]:
+    """Installed manim version, without importing it."""
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:
+        return None
+    try:
+        return version("manim")
+    except PackageNotFoundError:
+        return None
+
+
+def default_symbols_path() -> str:
+    return os.getenv("MANIM_SYMBOLS_PATH") or os.path.join(os.getcwd(), "artifacts", "cache", "manim_symbols.json")
+
+
+def _read_symbols(path: str, version: str) -> Optional[ManimSymbols]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            symbols = ManimSymbols.from_dict(json.load(f))
+    except (OSError, ValueError):
+        return None
+    if symbols is None or symbols.version != version:
+        return None
+    return symbols
+
+
+def _build_symbols(path: str, timeout: float = 60.0) -> None:
+    """Run the builder subprocess, which writes the table to ``path``."""
+    from agents.tools.scene_runtime import RUNTIME_ROOT, runtime_env
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    subprocess.run(
+        [sys.executable, "-m", "agents.tools.scene_lint", "--build-symbols", os.path.abspath(path)],
+        cwd=RUNTIME_ROOT,
+        env=runtime_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        timeout=timeout,
+        check=True,
+    )
+
+
+_symbols: Optional[ManimSymbols] = None
+_symbols_loaded = False
+_symbols_lock = threading.Lock()
+
+
+def load_manim_symbols(path: Optional[str] = None, refresh: bool = False) -> Optional[ManimSymbols]:
+    """
+    The Manim symbol table: from memory, else from the JSON cache (when it
+    matches the installed manim version), else built and cached. None when
+    manim is not installed or the build fails; a failed build is not retried
+    until ``refresh``.
+    """
+    global _symbols, _symbols_loaded
+    if _symbols_loaded and not refresh:
+        return _symbols
+    with _symbols_lock:
+        if _symbols_loaded and not refresh:
+            return _symbols
+        symbols = None
+        version = manim_version()
+        if version:
+            path = path or default_symbols_path()
+            symbols = _read_symbols(path, version)
+            if symbols is None:
+                started = time.perf_counter()
+                try:
+                    _build_symbols(path)
+                    symbols = _read_symbols(path, version)
+                    logger.info(
+                        "Built Manim symbol table | version=%s | names=%s | elapsed_ms=%.0f",
+                        version, len(symbols.names) if symbols else 0, (time.perf_counter() - started) * 1000,
+                    )
+                except (OSError, subprocess.SubprocessError) as e:
+                    logger.warning("Manim symbol table build failed: %s", e)
+        _symbols, _symbols_loaded = symbols, True
+        return symbols
+
+
+# =============================================================================
+# REPORT
+# =============================================================================
+
+@dataclass
+class LintIssue:
+    line: int
+    code: str  # undefined-name | unknown-kwarg | unknown-attribute | unknown-column
+    message: str
+
+    def __str__(self) -> str:
+        return f"line {self.line}: {self.message}"
+
+
+@dataclass
+class LintReport:
+    issues: List[LintIssue] = field(default_factory=list)
+    checks: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+    def summary(self, limit: int = _MAX_REPORTED) -> str:
+        """One issue per line, first issue first."""
+        lines = [str(issue) for issue in self.issues[:limit]]
+        if len(self.issues) > limit:
+            lines.append(f"... and {len(self.issues) - limit} more")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["ok"] = self.ok
+        return data
+
+
+def _did_you_mean(name: str, candidates: Any) -> str:
+    match = difflib.get_close_matches(name, list(candidates), n=1, cutoff=0.75)
+    return f"; did you mean '{match[0]}'?" if match else ""
+
+
+# =============================================================================
+# CHECKS
+# =============================================================================
+
+def _iter_tables(table: symtable.SymbolTable) -> Iterator[symtable.SymbolTable]:
+    yield table
+    for child in table.get_children():
+        yield from _iter_tables(child)
+
+
+def _star_imports(tree: ast.Module) -> Set[str]:
+    return {
+        node.module or ""
+        for node in ast.walk(tree)
+        if isinstance(node, ast.ImportFrom) and any(alias.name == "*" for alias in node.names)
+    }
+
+
+def _module_names(code: str) -> Tuple[Set[str], Set[str]]:
+    """(names the module defines, global names it reads)."""
+    top = symtable.symtable(code, "<scene>", "exec")
+    defined: Set[str] = set()
+    referenced: Set[str] = set()
+    for table in _iter_tables(top):
+        is_module = table is top
+        for sym in table.get_symbols():
+            name = sym.get_name()
+            if sym.is_assigned() or sym.is_imported():
+                if is_module or sym.is_declared_global():
+                    defined.add(name)
+            if sym.is_referenced() and (is_module or sym.is_global()):
+                referenced.add(name)
+    return defined, referenced
+
+
+def _check_names(tree: ast.Module, code: str, symbols: ManimSymbols, issues: List[LintIssue]) -> Set[str]:
+    defined, referenced = _module_names(code)
+    known = defined | set(dir(builtins)) | set(symbols.names) | set(dir(math)) | _PRELUDE_NAMES | _MODULE_DUNDERS
+    missing = referenced - known
+    if missing:
+        reported: Set[str] = set()
+        for node in sorted(
+            (n for n in ast.walk(tree) if isinstance(n, ast.Name) and n.id in missing),
+            key=lambda n: (n.lineno, n.col_offset),
+        ):
+            if node.id not in reported:
+                reported.add(node.id)
+                issues.append(LintIssue(
+                    node.lineno, "undefined-name",
+                    f"name '{node.id}' is not defined{_did_you_mean(node.id, known)}",
+                ))
+    return defined
+
+
+def _single_assignments(tree: ast.AST) -> Dict[str, ast.expr]:
+    """Names bound exactly once, by a plain ``name = value`` assignment."""
+    values: Dict[str, ast.expr] = {}
+    stores: Dict[str, int] = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            stores[node.id] = stores.get(node.id, 0) + 1
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            stores[node.name] = stores.get(node.name, 0) + 1
+        elif isinstance(node, ast.arg):
+            stores[node.arg] = stores.get(node.arg, 0) + 1
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            values[node.targets[0].id] = node.value
+    return {name: value for name, value in values.items() if stores.get(name) == 1}
+
+
+def _stored_attributes(tree: ast.AST) -> Set[str]:
+    return {
+        node.attr for node in ast.walk(tree)
+        if isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Store)
+    }
+
+
+def _check_constructors(tree: ast.Module, symbols: ManimSymbols, defined: Set[str], issues: List[LintIssue]) -> None:
+    classes = {name: info for name, info in symbols.classes.items() if name not in defined}
+    if not classes:
+        return
+    assigned = _single_assignments(tree)
+    stored_attrs = _stored_attributes(tree)
+
+    def constructed(expr: ast.expr) -> Optional[str]:
+        if isinstance(expr, ast.Call) and isinstance(expr.func, ast.Name) and expr.func.id in classes:
+            return expr.func.id
+        return None
+
+    def check_method(node: ast.Call, info: Dict[str, Any], attr: str, label: str) -> None:
+        if attr in stored_attrs or attr in info["attributes"]:
+            return
+        if info.get("getattr") and attr.startswith(("get_", "set_")):
+            return
+        issues.append(LintIssue(
+            node.lineno, "unknown-attribute",
+            f"'{label}' object has no attribute '{attr}'{_did_you_mean(attr, info['attributes'])}",
+        ))
+
+    # Methods called on self inside subclasses (GenScene(Scene))
+    for cls_node in (n for n in ast.walk(tree) if isinstance(n, ast.ClassDef)):
+        bases = [b.id for b in cls_node.bases if isinstance(b, ast.Name)]
+        if len(bases) != 1 or bases[0] not in classes:
+            continue
+        info = classes[bases[0]]
+        own = {
+            n.name for n in cls_node.body
+            if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+        } | {
+            t.id for n in cls_node.body if isinstance(n, ast.Assign) for t in n.targets if isinstance(t, ast.Name)
+        }
+        for method in cls_node.body:
+            if not (isinstance(method, (ast.FunctionDef, ast.AsyncFunctionDef)) and method.args.args):
+                continue
+            self_name = method.args.args[0].arg
+            for node in ast.walk(method):
+                if (
+                    isinstance(node, ast.Call)
+                    and isinstance(node.func, ast.Attribute)
+                    and isinstance(node.func.value, ast.Name)
+                    and node.func.value.id == self_name
+                    and node.func.attr not in own
+                ):
+                    check_method(node, info, node.func.attr, cls_node.name)
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        name = constructed(node)
+        if name is not None:
+            info = classes[name]
+            if not info["open"]:
+                for kw in node.keywords:
+                    if kw.arg is not None and kw.arg not in info["params"]:
+                        issues.append(LintIssue(
+                            node.lineno, "unknown-kwarg",
+                            f"{name}() got an unexpected keyword argument '{kw.arg}'"
+                            f"{_did_you_mean(kw.arg, info['params'])}",
+                        ))
+        if isinstance(node.func, ast.Attribute):
+            owner = node.func.value
+            if isinstance(owner, ast.Name) and owner.id in assigned:
+                owner = assigned[owner.id]
+            name = constructed(owner)
+            if name is not None:
+                check_method(node, classes[name], node.func.attr, name)
+
+
+def _literal_strings(expr: Optional[ast.expr]) -> List[Tuple[str, int]]:
+    if isinstance(expr, ast.Constant) and isinstance(expr.value, str):
+        return [(expr.value, expr.lineno)]
+    if isinstance(expr, (ast.List, ast.Tuple)):
+        return [item for elt in expr.elts for item in _literal_strings(elt)]
+    return []
+
+
+def _dataset_columns(path: str, columns: Optional[Dict[str, List[str]]]) -> Optional[List[str]]:
+    if columns is not None:
+        return columns.get(path)
+    try:
+        from agents.tools.chart_inference import _resolve_csv_path
+        from agents.tools.dataset_profile import get_profile
+    except ImportError:
+        return None
+    profile = get_profile(os.path.abspath(_resolve_csv_path(path)))
+    if profile is None:
+        return None
+    return [c["name"] for c in profile.columns]
+
+
+def _check_columns(tree: ast.Module, columns: Optional[Dict[str, List[str]]], issues: List[LintIssue]) -> bool:
+    """Returns True if any DataFrame could be checked."""
+    assigned = _single_assignments(tree)
+    frames: Dict[str, Tuple[str, List[str]]] = {}
+    for name, value in assigned.items():
+        if not (isinstance(value, ast.Call) and value.args):
+            continue
+        func = value.func
+        func_name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+        if func_name != "read_csv" or any(kw.arg in _RESHAPING_READ_OPTIONS for kw in value.keywords):
+            continue
+        paths = _literal_strings(value.args[0])
+        if len(paths) != 1:
+            continue
+        known = _dataset_columns(paths[0][0], columns)
+        if known:
+            frames[name] = (os.path.basename(paths[0][0]), list(known))
+    if not frames:
+        return False
+
+    # Frames whose columns change in place are not checked; added columns are known
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Store) and isinstance(node.value, ast.Name):
+            frames.pop(node.value.id, None)
+        elif (
+            isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+            and isinstance(node.func.value, ast.Name) and node.func.value.id in frames
+            and any(kw.arg == "inplace" for kw in node.keywords)
+        ):
+            frames.pop(node.func.value.id, None)
+        elif isinstance(node, ast.Subscript) and isinstance(node.ctx, ast.Store) and isinstance(node.value, ast.Name):
+            if node.value.id in frames:
+                frames[node.value.id][1].extend(value for value, _ in _literal_strings(node.slice))
+
+    # Row variables: for _, row in df.iterrows() / for row in df.to_dict("records")
+    rows: Dict[str, str] = {}
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.For) or not isinstance(node.iter, ast.Call):
+            continue
+        func = node.iter.func
+        if not (isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id in frames):
+            continue
+        target = node.target
+        if func.attr == "iterrows" and isinstance(target, ast.Tuple) and len(target.elts) == 2:
+            target = target.elts[1]
+        elif not (func.attr == "to_dict" and [s for s, _ in _literal_strings(node.iter.args[0] if node.iter.args else None)] == ["records"]):
+            continue
+        if isinstance(target, ast.Name) and assigned.get(target.id) is None:
+            rows[target.id] = func.value.id
+
+    def check(frame: str, refs: List[Tuple[str, int]]) -> None:
+        dataset, known = frames[frame]
+        for column, line in refs:
+            if column not in known:
+                shown = ", ".join(known[:20]) + (", ..." if len(known) > 20 else "")
+                issues.append(LintIssue(
+                    line, "unknown-column",
+                    f"column '{column}' is not in {dataset}{_did_you_mean(column, known)} (columns: {shown})",
+                ))
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Subscript) and isinstance(node.ctx, ast.Load) and isinstance(node.value, ast.Name):
+            frame = node.value.id if node.value.id in frames else rows.get(node.value.id)
+            if frame:
+                check(frame, _literal_strings(node.slice))
+        elif (
+            isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+            and isinstance(node.func.value, ast.Name) and node.func.value.id in frames
+            and node.func.attr in _COLUMN_METHODS
+        ):
+            position, keywords = _COLUMN_METHODS[node.func.attr]
+            refs: List[Tuple[str, int]] = []
+            if position is not None and len(node.args) > position:
+                refs.extend(_literal_strings(node.args[position]))
+            for kw in node.keywords:
+                if kw.arg in keywords:
+                    refs.extend(_literal_strings(kw.value))
+            check(node.func.value.id, refs)
+    return True
+
+
+# =============================================================================
+# ENTRY POINT
+# =============================================================================
+
+def scene_lint_enabled() -> bool:
+    return os.getenv("SCENE_LINT_ENABLED", "1").lower() not in ("0", "false", "no", "off")
+
+
+def lint_scene(
+    code: str,
+    *,
+    symbols: Optional[ManimSymbols] = None,
+    columns: Optional[Dict[str, List[str]]] = None,
+) -> LintReport:
+    """
+    Statically check scene code (as written, without the prelude).
+
+    Args:
+        code: Scene module source; code that does not parse yields an empty report.
+        symbols: Manim symbol table (default: load_manim_symbols()).
+        columns: Dataset columns by read_csv path (default: stored dataset profiles).
+    """
+    started = time.perf_counter()
+    report = LintReport()
+    if not scene_lint_enabled():
+        return report
+    try:
+        tree = ast.parse(code or "")
+    except SyntaxError:
+        return report
+
+    symbols = symbols or load_manim_symbols()
+    defined: Set[str] = set()
+    if symbols is not None:
+        # Star imports other than the prelude's make global names unknowable
+        if _star_imports(tree) <= _STAR_MODULES:
+            try:
+                defined = _check_names(tree, code, symbols, report.issues)
+                report.checks.append("names")
+            except SyntaxError:
+                pass
+        _check_constructors(tree, symbols, defined, report.issues)
+        report.checks.append("constructors")
+    if _check_columns(tree, columns, report.issues):
+        report.checks.append("columns")
+
+    report.issues.sort(key=lambda issue: issue.line)
+    report.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    if report.issues:
+        logger.info("Scene lint found %s issue(s) | first: %s", len(report.issues), report.issues[0])
+    return report
+
+
+__all__ = [
+    "COMMON_CONSTRUCTORS",
+    "ManimSymbols",
+    "collect_symbols",
+    "manim_version",
+    "default_symbols_path",
+    "load_manim_symbols",
+    "LintIssue",
+    "LintReport",
+    "scene_lint_enabled",
+    "lint_scene",
+]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--build-symbols":
+        import manim
+
+        table = collect_symbols(manim, manim_version() or getattr(manim, "__version__", "unknown"))
+        tmp_path = f"{sys.argv[2]}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(table.to_dict(), f)
+        os.replace(tmp_path, sys.argv[2])
+    else:
+        sys.exit("usage: python -m agents.tools.scene_lint --build-symbols <path>")
@@ -0,0 +1,54 @@
+"""
+Template Scene Runtime
+
+Importable scene logic for the built-in templates. The template generators
+in agents.tools.templates used to render several hundred lines of helper
+functions and the GenScene class into every scene file; that code now lives
+here, and a generated scene only configures it:
+
+    from manim import *
+    from agents.tools.scene_runtime import bar_race as template
+    from agents.tools.scene_runtime.data import load_scene_data
+
+    template.configure(load_scene_data("sd_<digest>", "<store dir>"))
+
+
+    class GenScene(Scene):
+        def construct(self):
+            template.BarRaceScene(self).construct()
+
+Being regular modules, they are compiled once and cached as .pyc instead of
+recompiled by every render, and scene files (and anything keyed on them) no
+longer change when only the template code does.
+
+Modules (one per template, each with configure() and a TemplateScene):
+- bar_race, bento_grid, bubble_chart, count_bar, distribution,
+  line_evolution, single_numeric
+
+Shared helpers: base (TemplateScene, apply_config), data (sidecar loader),
+labels (cached Text), race_layout (bar race layout tables; numpy only, also
+used by the generator), bubble_layout (bulk bubble positions/radii),
+static_layers (decoration rasterized into the camera background).
+
+This package is imported by the Manim subprocess; renderers put its root on
+PYTHONPATH via runtime_env(). Importing the package itself does not import
+manim.
+"""
+
+import os
+from typing import Dict, Optional
+
+# Directory that must be on sys.path for `agents.tools.scene_runtime` to import
+RUNTIME_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def runtime_env(env: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Environment for a Manim subprocess with the runtime importable."""
+    env = dict(os.environ if env is None else env)
+    paths = [p for p in env.get("PYTHONPATH", "").split(os.pathsep) if p]
+    if RUNTIME_ROOT not in paths:
+        env["PYTHONPATH"] = os.pathsep.join([RUNTIME_ROOT] + paths)
+    return env
+
+
+__all__ = ["RUNTIME_ROOT", "runtime_env"]
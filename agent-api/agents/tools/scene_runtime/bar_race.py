@@ -0,0 +1,522 @@
+"""
+Bar Race Scene Runtime
+
+Scene logic for agents.tools.templates.bar_race.generate_bar_race(), which
+supplies the configuration through configure().
+"""
+
+from manim import *
+
+import numpy as np
+
+from agents.tools.scene_runtime.base import TemplateScene, apply_config
+from agents.tools.scene_runtime.labels import cached_text, glyph_text
+from agents.tools.scene_runtime.race_layout import (
+    BAR_HEIGHT,
+    BAR_TEMPLATE_WIDTH,
+    CORNER_RADIUS,
+    LEFT_MARGIN,
+    TABLE_KEYS,
+    bar_outlines,
+    interpolate_layout,
+)
+
+# Configuration: None until configure() is called with the generator's values
+
+# --- Data ---
+TIMES = None
+CATEGORIES = None
+COLORS = None
+
+# --- Precomputed Layout (T x C tables, see race_layout.race_layout) ---
+VALUES = None
+RANKS = None
+BAR_Y = None
+BAR_WIDTHS = None
+
+# --- Insights (Auto-Detected) ---
+INSIGHTS = None
+
+# --- Story Configuration ---
+STORY_TITLE = None
+STORY_SUBTITLE = None
+INCLUDE_INTRO = None
+INCLUDE_CONCLUSION = None
+
+# --- Timing ---
+INTRO_DURATION = None
+REVEAL_DURATION = None
+RACE_DURATION = None
+OUTRO_DURATION = None
+STEP_TIME = None
+TOTAL_DURATION = None
+
+# --- Style Configuration ---
+BG_COLOR = None
+TEXT_COLOR = None
+TEXT_SECONDARY = None
+SURFACE_COLOR = None
+ACCENT_COLOR = None
+
+CONFIG_KEYS = (
+    "TIMES",
+    "CATEGORIES",
+    "COLORS",
+    "VALUES",
+    "RANKS",
+    "BAR_Y",
+    "BAR_WIDTHS",
+    "INSIGHTS",
+    "STORY_TITLE",
+    "STORY_SUBTITLE",
+    "INCLUDE_INTRO",
+    "INCLUDE_CONCLUSION",
+    "INTRO_DURATION",
+    "REVEAL_DURATION",
+    "RACE_DURATION",
+    "OUTRO_DURATION",
+    "STEP_TIME",
+    "TOTAL_DURATION",
+    "BG_COLOR",
+    "TEXT_COLOR",
+    "TEXT_SECONDARY",
+    "SURFACE_COLOR",
+    "ACCENT_COLOR",
+)
+
+
+def configure(values):
+    """Set the scene configuration (called by the generated scene)."""
+    apply_config(globals(), CONFIG_KEYS, values)
+
+
+# =============================================================================
+# HELPER FUNCTIONS
+# =============================================================================
+
+def format_value(value: float) -> str:
+    """Format large numbers with K/M/B suffixes"""
+    if value >= 1_000_000_000:
+        return f"{value / 1_000_000_000:.1f}B"
+    elif value >= 1_000_000:
+        return f"{value / 1_000_000:.1f}M"
+    elif value >= 1_000:
+        return f"{value / 1_000:.1f}K"
+    else:
+        return f"{value:.0f}"
+
+
+def get_insights_for_time(time_key: str) -> list:
+    """Get any insights that should trigger at this time"""
+    return [i for i in INSIGHTS if i["time"] == time_key]
+
+
+def get_leaders() -> list:
+    """Leading category index at each time step"""
+    return [row.index(0) for row in RANKS]
+
+
+def get_ranking(step: int) -> list:
+    """(category, value) pairs at a time step, best first"""
+    order = sorted(range(len(CATEGORIES)), key=lambda c: RANKS[step][c])
+    return [(CATEGORIES[c], VALUES[step][c]) for c in order]
+
+
+# =============================================================================
+# ANIMATION PRIMITIVES
+# =============================================================================
+
+def place_name_label(label, width: float, y_pos: float):
+    """Name inside the bar when it fits, otherwise left of the axis"""
+    if width > 2.5:
+        label.move_to([LEFT_MARGIN + 0.3, y_pos, 0], aligned_edge=LEFT)
+    else:
+        label.move_to([LEFT_MARGIN - 0.15, y_pos, 0], aligned_edge=RIGHT)
+
+
+def create_bar_with_label(category: str, value: float, width: float, y_pos: float, color: str):
+    """
+    Create a bar element with its associated labels.
+
+    Returns a dict with bar, name_label, and value_label.
+    """
+    # Bar rectangle with rounded corners
+    bar_rect = RoundedRectangle(
+        corner_radius=CORNER_RADIUS,
+        width=BAR_TEMPLATE_WIDTH,
+        height=BAR_HEIGHT,
+        fill_color=color,
+        fill_opacity=0.9,
+        stroke_width=0,
+    )
+    template = bar_rect.points.copy()
+    bar_rect.points = bar_outlines(template, [width], [y_pos])[0]
+
+    # Category name label
+    name_label = cached_text(
+        category,
+        font_size=18,
+        color=WHITE if width > 2.5 else TEXT_COLOR,
+        weight=BOLD,
+    )
+    place_name_label(name_label, width, y_pos)
+
+    # Value label
+    value_label = glyph_text(
+        format_value(value),
+        font_size=16,
+        color=TEXT_COLOR,
+    )
+    value_label.move_to([LEFT_MARGIN + width + 0.25, y_pos, 0], aligned_edge=LEFT)
+
+    return {
+        "rect": bar_rect,
+        "template": template,
+        "name": name_label,
+        "value": value_label,
+        "value_text": format_value(value),
+        "inside": width > 2.5,
+    }
+
+
+def create_emphasis_pulse(mobject, scale_factor=1.15, duration=0.4):
+    """Create a pulse emphasis animation"""
+    return Succession(
+        mobject.animate.scale(scale_factor),
+        mobject.animate.scale(1/scale_factor),
+        run_time=duration,
+    )
+
+
+# =============================================================================
+# SCENE CLASSES
+# =============================================================================
+
+class BarRaceScene(TemplateScene):
+    """
+    Story-driven bar race animation.
+
+    Structure:
+    1. INTRO: Title and subtitle fade in
+    2. REVEAL: Bars appear with staggered animation
+    3. RACE: Main data animation with time progression
+    4. HIGHLIGHTS: Auto-detected insights emphasized
+    5. CONCLUSION: Final state with winner emphasis
+    """
+
+    def construct(self):
+        # Set background
+        self.camera.background_color = BG_COLOR
+
+        # Track active elements
+        self.bars = {}
+        self.time_display = None
+        self.title_group = None
+
+        # Run story scenes
+        if INCLUDE_INTRO:
+            self.scene_intro()
+
+        self.scene_reveal()
+        self.scene_race()
+
+        if INCLUDE_CONCLUSION:
+            self.scene_conclusion()
+
+    # -------------------------------------------------------------------------
+    # SCENE 1: INTRO
+    # -------------------------------------------------------------------------
+    def scene_intro(self):
+        """
+        Opening scene with title and subtitle.
+
+        Sets the stage and hooks the viewer.
+        """
+        # Create title
+        title = cached_text(
+            STORY_TITLE,
+            font_size=56,
+            color=TEXT_COLOR,
+            weight=BOLD,
+        )
+        title.move_to([0, 0.5, 0])
+
+        # Create subtitle
+        subtitle = cached_text(
+            STORY_SUBTITLE,
+            font_size=28,
+            color=TEXT_SECONDARY,
+        )
+        subtitle.move_to([0, -0.3, 0])
+        subtitle.set_opacity(0.8)
+
+        self.title_group = VGroup(title, subtitle)
+
+        # Animate entrance
+        self.play(
+            FadeIn(title, shift=UP * 0.3),
+            run_time=0.8,
+            rate_func=smooth,
+        )
+        self.play(
+            FadeIn(subtitle, shift=UP * 0.2),
+            run_time=0.5,
+            rate_func=smooth,
+        )
+
+        # Hold
+        self.wait(INTRO_DURATION - 1.3)
+
+        # Fade out
+        self.play(
+            FadeOut(self.title_group, shift=UP * 0.5),
+            run_time=0.5,
+        )
+
+    # -------------------------------------------------------------------------
+    # SCENE 2: REVEAL
+    # -------------------------------------------------------------------------
+    def scene_reveal(self):
+        """
+        Data reveal scene where bars first appear.
+
+        Uses staggered animation for visual interest.
+        """
+        t0 = TIMES[0]
+
+        # Create time display
+        self.time_display = glyph_text(
+            str(t0),
+            font_size=72,
+            weight=BOLD,
+            color=TEXT_SECONDARY,
+        )
+        self.time_display.to_corner(DR, buff=0.8)
+        self.time_display.set_opacity(0.8)
+        self.shown_step = 0
+
+        # Get initial ranking
+        initial_ranking = get_ranking(0)
+
+        # Create bars
+        for c, category in enumerate(CATEGORIES):
+            bar_data = create_bar_with_label(
+                category=category,
+                value=VALUES[0][c],
+                width=BAR_WIDTHS[0][c],
+                y_pos=BAR_Y[0][c],
+                color=COLORS.get(category, "#6366F1"),
+            )
+
+            self.bars[category] = bar_data
+
+            # Add to scene (hidden initially)
+            bar_group = VGroup(bar_data["rect"], bar_data["name"], bar_data["value"])
+            bar_group.set_opacity(0)
+            self.add(bar_group)
+
+        # Animate time display
+        self.play(
+            FadeIn(self.time_display),
+            run_time=0.3,
+        )
+
+        # Staggered bar entrance
+        self.play(
+            LaggedStart(
+                *[GrowFromEdge(self.bars[cat]["rect"], LEFT) for cat in [x[0] for x in initial_ranking]],
+                lag_ratio=0.08,
+            ),
+            LaggedStart(
+                *[FadeIn(self.bars[cat]["name"]) for cat in [x[0] for x in initial_ranking]],
+                lag_ratio=0.08,
+            ),
+            LaggedStart(
+                *[FadeIn(self.bars[cat]["value"]) for cat in [x[0] for x in initial_ranking]],
+                lag_ratio=0.08,
+            ),
+            run_time=REVEAL_DURATION,
+            rate_func=smooth,
+        )
+
+        self.wait(0.3)
+
+    # -------------------------------------------------------------------------
+    # SCENE 3: RACE
+    # -------------------------------------------------------------------------
+    def scene_race(self):
+        """
+        Main data animation scene.
+
+        One time tracker drives every bar: each frame interpolates the
+        precomputed layout tables and reshapes all bars at once, so nothing
+        is rebuilt per step. The race runs continuously and only stops for
+        leader-change highlights.
+        """
+        if len(TIMES) < 2:
+            return
+
+        self.race_tables = {key: np.array(globals()[key], dtype=float) for key in TABLE_KEYS}
+        self.bar_template = self.bars[CATEGORIES[0]]["template"]
+        self.race_time = ValueTracker(0)
+
+        leaders = get_leaders()
+        self.leader_steps = {
+            step for step in range(1, len(TIMES)) if leaders[step] != leaders[step - 1]
+        }
+
+        driver = self.add_frame_driver(lambda: self.update_race(self.race_time.get_value()))
+
+        # Run to each leader change, highlight it, then continue
+        stops = sorted(self.leader_steps | {len(TIMES) - 1})
+        prev_stop = 0
+        for stop in stops:
+            self.play(
+                self.race_time.animate.set_value(stop),
+                run_time=(stop - prev_stop) * STEP_TIME,
+                rate_func=linear,
+            )
+
+            if stop in self.leader_steps:
+                current_leader = CATEGORIES[leaders[stop]]
+                self.show_highlight(
+                    category=current_leader,
+                    text=f"{current_leader} takes the lead!",
+                )
+
+            prev_stop = stop
+
+        self.update_race(len(TIMES) - 1)
+        self.remove(driver)
+
+    def update_race(self, t: float):
+        """Lay out every bar and label for fractional time index t"""
+        frame = interpolate_layout(self.race_tables, t, ease=smooth)
+        widths, ys, values = frame["BAR_WIDTHS"], frame["BAR_Y"], frame["VALUES"]
+        outlines = bar_outlines(self.bar_template, widths, ys)
+
+        for c, category in enumerate(CATEGORIES):
+            bar_data = self.bars[category]
+            width, y_pos = widths[c], ys[c]
+            bar_data["rect"].points = outlines[c]
+
+            # Name label flips inside/outside the bar as it grows
+            inside = width > 2.5
+            if inside != bar_data["inside"]:
+                bar_data["name"].set_color(WHITE if inside else TEXT_COLOR)
+                bar_data["inside"] = inside
+            place_name_label(bar_data["name"], width, y_pos)
+
+            # Value label only rebuilt when the shown text changes
+            value_text = format_value(values[c])
+            if value_text != bar_data["value_text"]:
+                bar_data["value"].become(glyph_text(value_text, font_size=16, color=TEXT_COLOR))
+                bar_data["value_text"] = value_text
+            bar_data["value"].move_to([LEFT_MARGIN + width + 0.25, y_pos, 0], aligned_edge=LEFT)
+
+        step = frame["step"]
+        if step != self.shown_step:
+            new_time_display = glyph_text(
+                str(TIMES[step]),
+                font_size=72,
+                weight=BOLD,
+                color=ACCENT_COLOR if step in self.leader_steps else TEXT_SECONDARY,
+            )
+            new_time_display.to_corner(DR, buff=0.8)
+            new_time_display.set_opacity(0.8)
+            self.time_display.become(new_time_display)
+            self.shown_step = step
+
+    def show_highlight(self, category: str, text: str):
+        """Show a highlight annotation for an insight"""
+        bar_data = self.bars.get(category)
+        if not bar_data:
+            return
+
+        # Create annotation
+        annotation = cached_text(
+            text,
+            font_size=24,
+            color=ACCENT_COLOR,
+            weight=BOLD,
+        )
+        annotation.to_edge(UP, buff=0.5)
+
+        # Animate
+        self.play(
+            FadeIn(annotation, shift=DOWN * 0.3),
+            bar_data["rect"].animate.set_stroke(color=ACCENT_COLOR, width=3),
+            run_time=0.3,
+        )
+
+        self.wait(0.5)
+
+        self.play(
+            FadeOut(annotation),
+            bar_data["rect"].animate.set_stroke(width=0),
+            run_time=0.3,
+        )
+
+    # -------------------------------------------------------------------------
+    # SCENE 4: CONCLUSION
+    # -------------------------------------------------------------------------
+    def scene_conclusion(self):
+        """
+        Closing scene with final state emphasis.
+
+        Highlights the winner and provides closure.
+        """
+        # Get final leader
+        final_ranking = get_ranking(len(TIMES) - 1)
+
+        if not final_ranking:
+            self.wait(OUTRO_DURATION)
+            return
+
+        winner = final_ranking[0][0]
+        winner_bar = self.bars.get(winner, {}).get("rect")
+
+        # Dim other bars
+        dim_anims = []
+        for cat, bar_data in self.bars.items():
+            if cat != winner:
+                dim_anims.append(bar_data["rect"].animate.set_opacity(0.3))
+                dim_anims.append(bar_data["name"].animate.set_opacity(0.3))
+                dim_anims.append(bar_data["value"].animate.set_opacity(0.3))
+
+        if dim_anims:
+            self.play(*dim_anims, run_time=0.5)
+
+        # Emphasize winner
+        if winner_bar:
+            self.play(
+                winner_bar.animate.set_stroke(color=ACCENT_COLOR, width=4),
+                run_time=0.3,
+            )
+
+            # Glow effect
+            glow = winner_bar.copy()
+            glow.set_stroke(color=ACCENT_COLOR, width=8, opacity=0.5)
+            glow.scale(1.05)
+
+            self.play(
+                FadeIn(glow),
+                run_time=0.3,
+            )
+
+        # Final title
+        final_title = cached_text(
+            f"Winner: {winner}",
+            font_size=36,
+            color=ACCENT_COLOR,
+            weight=BOLD,
+        )
+        final_title.to_edge(UP, buff=0.8)
+
+        self.play(
+            FadeIn(final_title, shift=DOWN * 0.3),
+            run_time=0.5,
+        )
+
+        # Hold final frame
+        self.wait(OUTRO_DURATION - 1.3)
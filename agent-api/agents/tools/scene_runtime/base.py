@@ -0,0 +1,63 @@
+"""
+Template Scene Base
+
+Template scene logic is written against a manim Scene (self.play, self.wait,
+self.camera, ...). TemplateScene wraps the GenScene instance Manim renders
+and forwards those attributes to it, so the generated file only has to
+declare GenScene(Scene) and hand itself over.
+"""
+
+import abc
+from typing import Any, Callable, Dict, Iterable
+
+
+class TemplateScene(abc.ABC):
+    """Scene logic bound to a manim Scene; unknown attributes resolve on the scene."""
+
+    def __init__(self, scene: Any):
+        self.scene = scene
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not set on the template itself; before
+        # __init__ (copy, pickle) there is no scene to forward to yet
+        try:
+            scene = self.__dict__["scene"]
+        except KeyError:
+            raise AttributeError(name) from None
+        return getattr(scene, name)
+
+    @abc.abstractmethod
+    def construct(self) -> None:
+        """Build and animate the scene."""
+
+    def add_frame_driver(self, update: Callable[[], None]) -> Any:
+        """
+        Call ``update()`` every frame from a driver mobject placed first in
+        the scene; remove the returned driver to stop.
+
+        Cairo only redraws per frame the mobjects from the first animated or
+        updater-bearing one onwards (the rest are snapshotted once per
+        play()), so a driver that reshapes other mobjects has to come before
+        them.
+        """
+        from manim import Mobject
+
+        driver = Mobject()
+        driver.add_updater(lambda m: update())
+        self.bring_to_back(driver)
+        return driver
+
+
+def apply_config(namespace: Dict[str, Any], keys: Iterable[str], values: Dict[str, Any]) -> None:
+    """
+    Set a runtime module's configuration globals.
+
+    A Manim process renders one scene, so module globals hold the
+    configuration the way the generated literals used to.
+    """
+    keys = set(keys)
+    missing = keys - set(values)
+    unknown = set(values) - keys
+    if missing or unknown:
+        raise KeyError(f"Template config mismatch: missing={sorted(missing)} unknown={sorted(unknown)}")
+    namespace.update(values)
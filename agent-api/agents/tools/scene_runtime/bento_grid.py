@@ -0,0 +1,409 @@
+"""
+Bento Grid Scene Runtime
+
+Scene logic for agents.tools.templates.bento_grid.generate_bento_grid(), which
+supplies the configuration through configure().
+"""
+
+from manim import *
+
+from agents.tools.scene_runtime.base import TemplateScene, apply_config
+from agents.tools.scene_runtime.labels import NumberLabel, cached_text
+
+# Configuration: None until configure() is called with the generator's values
+
+# --- Data ---
+KPI_ITEMS = None
+GRID_ROWS = None
+GRID_COLS = None
+
+# --- Insights (Auto-Detected) ---
+INSIGHTS = None
+
+# --- Story Configuration ---
+STORY_TITLE = None
+STORY_SUBTITLE = None
+INCLUDE_INTRO = None
+INCLUDE_CONCLUSION = None
+
+# --- Timing ---
+INTRO_DURATION = None
+REVEAL_DURATION = None
+COUNT_DURATION = None
+HOLD_DURATION = None
+OUTRO_DURATION = None
+TOTAL_DURATION = None
+
+# --- Style Configuration ---
+BG_COLOR = None
+TEXT_COLOR = None
+TEXT_SECONDARY = None
+SURFACE_COLOR = None
+ACCENT_COLOR = None
+SUCCESS_COLOR = None
+ERROR_COLOR = None
+CHART_COLORS = None
+
+# --- Layout Constants ---
+CARD_WIDTH = 3.8
+CARD_HEIGHT = 2.4
+CARD_SPACING = 0.35
+CORNER_RADIUS = 0.2
+
+CONFIG_KEYS = (
+    "KPI_ITEMS",
+    "GRID_ROWS",
+    "GRID_COLS",
+    "INSIGHTS",
+    "STORY_TITLE",
+    "STORY_SUBTITLE",
+    "INCLUDE_INTRO",
+    "INCLUDE_CONCLUSION",
+    "INTRO_DURATION",
+    "REVEAL_DURATION",
+    "COUNT_DURATION",
+    "HOLD_DURATION",
+    "OUTRO_DURATION",
+    "TOTAL_DURATION",
+    "BG_COLOR",
+    "TEXT_COLOR",
+    "TEXT_SECONDARY",
+    "SURFACE_COLOR",
+    "ACCENT_COLOR",
+    "SUCCESS_COLOR",
+    "ERROR_COLOR",
+    "CHART_COLORS",
+)
+
+
+def configure(values):
+    """Set the scene configuration (called by the generated scene)."""
+    apply_config(globals(), CONFIG_KEYS, values)
+
+
+# =============================================================================
+# HELPER FUNCTIONS
+# =============================================================================
+
+def format_display_number(value: float, prefix: str = "", suffix: str = "") -> str:
+    """Format number with K/M/B suffixes and prefix/suffix"""
+    abs_val = abs(value)
+    sign = "-" if value < 0 else ""
+
+    if abs_val >= 1_000_000_000:
+        formatted = f"{abs_val / 1_000_000_000:.1f}B"
+    elif abs_val >= 1_000_000:
+        formatted = f"{abs_val / 1_000_000:.1f}M"
+    elif abs_val >= 1_000:
+        formatted = f"{abs_val / 1_000:.1f}K"
+    elif abs_val >= 100:
+        formatted = f"{abs_val:.0f}"
+    elif abs_val >= 1:
+        formatted = f"{abs_val:.1f}"
+    elif abs_val > 0:
+        formatted = f"{abs_val:.2f}"
+    else:
+        formatted = "0"
+
+    return f"{sign}{prefix}{formatted}{suffix}"
+
+
+def get_decimal_places(value: float) -> int:
+    """Determine appropriate decimal places for value"""
+    abs_val = abs(value)
+    if abs_val >= 1000:
+        return 0
+    elif abs_val >= 10:
+        return 1
+    elif abs_val >= 1:
+        return 1
+    else:
+        return 2
+
+
+def get_top_performer_index() -> int:
+    """Get the index of the top performer from insights"""
+    for insight in INSIGHTS:
+        if insight["type"] == "top_performer":
+            return insight["index"]
+    return 0
+
+
+# =============================================================================
+# SCENE CLASS
+# =============================================================================
+
+class BentoGridScene(TemplateScene):
+    """
+    Story-driven bento grid KPI dashboard animation.
+
+    Structure:
+    1. INTRO: Title and subtitle fade in
+    2. REVEAL: Cards appear with staggered animation
+    3. COUNT: Values count up with animated numbers
+    4. HIGHLIGHTS: Top performer emphasized
+    5. CONCLUSION: Hold and optional shimmer effect
+    """
+
+    def construct(self):
+        # Set background
+        self.camera.background_color = BG_COLOR
+
+        if not KPI_ITEMS:
+            no_data = cached_text("No data available", color=TEXT_COLOR, font_size=36)
+            self.play(Write(no_data))
+            return
+
+        # Track elements
+        self.title_group = None
+        self.cards = None
+        self.value_trackers = []
+
+        # Run story scenes
+        if INCLUDE_INTRO:
+            self.scene_intro()
+
+        self.scene_reveal()
+        self.scene_count()
+
+        if INCLUDE_CONCLUSION:
+            self.scene_conclusion()
+
+    # -------------------------------------------------------------------------
+    # SCENE 1: INTRO
+    # -------------------------------------------------------------------------
+    def scene_intro(self):
+        """Opening scene with title and subtitle."""
+        # Create title
+        title = cached_text(
+            STORY_TITLE,
+            font_size=56,
+            color=TEXT_COLOR,
+            weight=BOLD,
+        )
+        title.move_to([0, 0.5, 0])
+
+        # Create subtitle
+        subtitle_text = None
+        if STORY_SUBTITLE:
+            subtitle_text = cached_text(
+                STORY_SUBTITLE,
+                font_size=28,
+                color=TEXT_SECONDARY,
+            )
+            subtitle_text.move_to([0, -0.3, 0])
+            subtitle_text.set_opacity(0.8)
+
+        title_group = VGroup(title)
+        if subtitle_text:
+            title_group.add(subtitle_text)
+
+        # Animate entrance
+        self.play(
+            FadeIn(title, shift=UP * 0.3),
+            run_time=0.8,
+            rate_func=smooth,
+        )
+
+        if subtitle_text:
+            self.play(
+                FadeIn(subtitle_text, shift=UP * 0.2),
+                run_time=0.5,
+                rate_func=smooth,
+            )
+
+        # Hold
+        self.wait(INTRO_DURATION - 1.8)
+
+        # Fade out
+        self.play(
+            FadeOut(title_group, shift=UP * 0.5),
+            run_time=0.5,
+        )
+
+    # -------------------------------------------------------------------------
+    # SCENE 2: REVEAL
+    # -------------------------------------------------------------------------
+    def scene_reveal(self):
+        """Reveal cards with staggered animation."""
+        self.cards = VGroup()
+        self.value_trackers = []
+
+        for item in KPI_ITEMS:
+            label = item["label"]
+            target_value = item["value"]
+            change = item["change"]
+            card_color = item["color"]
+
+            # Card Background (Glassmorphism)
+            card_bg = RoundedRectangle(
+                corner_radius=CORNER_RADIUS,
+                width=CARD_WIDTH,
+                height=CARD_HEIGHT,
+                fill_color=SURFACE_COLOR,
+                fill_opacity=0.6,
+                stroke_color=card_color,
+                stroke_width=2,
+                stroke_opacity=0.8,
+            )
+
+            # Subtle gradient overlay (top highlight)
+            highlight = RoundedRectangle(
+                corner_radius=CORNER_RADIUS,
+                width=CARD_WIDTH,
+                height=CARD_HEIGHT * 0.3,
+                fill_opacity=0.08,
+                stroke_width=0,
+            )
+            highlight.set_fill(WHITE)
+            highlight.align_to(card_bg, UP)
+            highlight.shift(DOWN * 0.02)
+
+            # Label (Top of card)
+            label_text = cached_text(
+                str(label).upper(),
+                font_size=16,
+                weight=BOLD,
+                color=TEXT_SECONDARY,
+            )
+            label_text.move_to(card_bg.get_top() + DOWN * 0.45)
+
+            # Value (Center, large)
+            decimal_places = get_decimal_places(target_value)
+
+            value_display = NumberLabel(
+                0,
+                num_decimal_places=decimal_places,
+                font_size=48,
+                color=TEXT_COLOR,
+            )
+            value_display.move_to(card_bg.get_center() + UP * 0.1)
+
+            # Change Indicator (Bottom of card)
+            change_group = None
+            if change is not None:
+                is_positive = change >= 0
+                change_color = SUCCESS_COLOR if is_positive else ERROR_COLOR
+                arrow_char = "▲" if is_positive else "▼"
+                change_str = f"{arrow_char} {abs(change):.1f}%"
+
+                change_text = cached_text(
+                    change_str,
+                    font_size=16,
+                    color=change_color,
+                )
+                change_text.move_to(card_bg.get_bottom() + UP * 0.45)
+                change_group = change_text
+
+            # Accent bar at bottom
+            accent_bar = Rectangle(
+                width=CARD_WIDTH * 0.3,
+                height=0.06,
+                fill_color=card_color,
+                fill_opacity=0.9,
+                stroke_width=0,
+            )
+            accent_bar.move_to(card_bg.get_bottom() + UP * 0.12)
+
+            # Assemble Card
+            card_elements = VGroup(card_bg, highlight, label_text, value_display, accent_bar)
+            if change_group:
+                card_elements.add(change_group)
+
+            self.cards.add(card_elements)
+
+            # Setup value tracker for counting animation
+            tracker = ValueTracker(0)
+            self.value_trackers.append((tracker, target_value, value_display))
+
+            # Add updater to animate the number
+            def make_updater(dec_mob, trk, card_center):
+                def updater(m):
+                    m.set_value(trk.get_value())
+                    m.move_to(card_center + UP * 0.1)
+                return updater
+
+            value_display.add_updater(
+                make_updater(value_display, tracker, card_bg.get_center())
+            )
+
+        # Arrange Grid
+        self.cards.arrange_in_grid(
+            rows=GRID_ROWS,
+            cols=GRID_COLS,
+            buff=CARD_SPACING,
+        )
+
+        # Scale to fit screen if needed
+        max_width = config.frame_width - 1.5
+        max_height = config.frame_height - 1.5
+
+        if self.cards.width > max_width:
+            self.cards.scale_to_fit_width(max_width)
+        if self.cards.height > max_height:
+            self.cards.scale_to_fit_height(max_height)
+
+        self.cards.move_to(ORIGIN)
+
+        # Staggered entrance
+        card_anims = []
+        for card in self.cards:
+            card_anims.append(FadeIn(card, shift=UP * 0.3, scale=0.92))
+
+        self.play(
+            LaggedStart(*card_anims, lag_ratio=0.08),
+            run_time=REVEAL_DURATION,
+        )
+
+        self.wait(0.2)
+
+    # -------------------------------------------------------------------------
+    # SCENE 3: COUNT
+    # -------------------------------------------------------------------------
+    def scene_count(self):
+        """Animate values counting up."""
+        count_anims = []
+        for tracker, target, _ in self.value_trackers:
+            count_anims.append(tracker.animate.set_value(target))
+
+        self.play(
+            *count_anims,
+            run_time=COUNT_DURATION,
+            rate_func=rate_functions.ease_out_cubic,
+        )
+
+        self.wait(0.3)
+
+    # -------------------------------------------------------------------------
+    # SCENE 4: CONCLUSION
+    # -------------------------------------------------------------------------
+    def scene_conclusion(self):
+        """Closing scene with highlights and hold."""
+        # Highlight top performer
+        top_idx = get_top_performer_index()
+        if top_idx < len(self.cards):
+            top_card_bg = self.cards[top_idx][0]
+            self.play(
+                top_card_bg.animate.set_stroke(color=ACCENT_COLOR, width=4),
+                run_time=0.4,
+            )
+
+        # Hold
+        self.wait(HOLD_DURATION * 0.5)
+
+        # Shimmer effect across all cards
+        if len(self.cards) > 1:
+            shimmer_anims = []
+            for i, card in enumerate(self.cards):
+                card_bg = card[0]
+                shimmer_anims.append(
+                    Succession(
+                        Wait(i * 0.08),
+                        card_bg.animate(rate_func=there_and_back, run_time=0.3).set_stroke(opacity=1.0),
+                    )
+                )
+
+            self.play(*shimmer_anims)
+
+        # Final hold
+        self.wait(OUTRO_DURATION - 0.5)
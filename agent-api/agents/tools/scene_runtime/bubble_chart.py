@@ -0,0 +1,588 @@
+"""
+Bubble Chart Scene Runtime
+
+Scene logic for agents.tools.templates.bubble_chart.generate_bubble_chart(), which
+supplies the configuration through configure().
+"""
+
+from manim import *
+
+import numpy as np
+
+from agents.tools.scene_runtime.base import TemplateScene, apply_config
+from agents.tools.scene_runtime.bubble_layout import (
+    bubble_tables,
+    circle_outlines,
+    compute_radii,
+    fill_missing,
+    interpolate_tables,
+    visible_labels,
+)
+from agents.tools.scene_runtime.labels import cached_text, glyph_text
+from agents.tools.scene_runtime.static_layers import StaticLayer
+
+# Configuration: None until configure() is called with the generator's values
+
+# --- Data ---
+TIMES = None
+ENTITIES = None
+GROUPS = None
+ENTITY_GROUP = None
+DATA = None
+GROUP_COLORS = None
+
+# --- Insights (Auto-Detected) ---
+INSIGHTS = None
+
+# --- Story Configuration ---
+STORY_TITLE = None
+STORY_SUBTITLE = None
+INCLUDE_INTRO = None
+INCLUDE_CONCLUSION = None
+
+# --- Timing ---
+INTRO_DURATION = None
+REVEAL_DURATION = None
+EVOLUTION_DURATION = None
+OUTRO_DURATION = None
+PER_STEP_TIME = None
+TOTAL_DURATION = None
+
+# --- Axis Configuration ---
+X_MIN = X_MAX = None
+Y_MIN = Y_MAX = None
+X_STEP = None
+Y_STEP = None
+X_LABEL = None
+Y_LABEL = None
+X_DECIMALS = None
+Y_DECIMALS = None
+
+# --- Radius Configuration ---
+R_MIN = R_MAX = None
+RADIUS_MIN = 0.08
+RADIUS_MAX = 0.65
+
+# --- Style Configuration ---
+BG_COLOR = None
+TEXT_COLOR = None
+TEXT_SECONDARY = None
+ACCENT_COLOR = None
+SURFACE_COLOR = None
+FILL_OPACITY = None
+SHOW_LABELS = None
+SHOW_LEGEND = None
+
+# --- Layout Constants ---
+CHART_WIDTH = 10.0
+CHART_HEIGHT = 6.0
+
+CONFIG_KEYS = (
+    "TIMES",
+    "ENTITIES",
+    "GROUPS",
+    "ENTITY_GROUP",
+    "DATA",
+    "GROUP_COLORS",
+    "INSIGHTS",
+    "STORY_TITLE",
+    "STORY_SUBTITLE",
+    "INCLUDE_INTRO",
+    "INCLUDE_CONCLUSION",
+    "INTRO_DURATION",
+    "REVEAL_DURATION",
+    "EVOLUTION_DURATION",
+    "OUTRO_DURATION",
+    "PER_STEP_TIME",
+    "TOTAL_DURATION",
+    "X_MIN",
+    "X_MAX",
+    "Y_MIN",
+    "Y_MAX",
+    "X_STEP",
+    "Y_STEP",
+    "X_LABEL",
+    "Y_LABEL",
+    "X_DECIMALS",
+    "Y_DECIMALS",
+    "R_MIN",
+    "R_MAX",
+    "BG_COLOR",
+    "TEXT_COLOR",
+    "TEXT_SECONDARY",
+    "ACCENT_COLOR",
+    "SURFACE_COLOR",
+    "FILL_OPACITY",
+    "SHOW_LABELS",
+    "SHOW_LEGEND",
+)
+
+
+def configure(values):
+    """Set the scene configuration (called by the generated scene)."""
+    apply_config(globals(), CONFIG_KEYS, values)
+
+
+# =============================================================================
+# HELPER FUNCTIONS
+# =============================================================================
+
+def format_axis_number(value: float, decimals: int = 0) -> str:
+    """Format large numbers with K/M/B suffixes"""
+    abs_val = abs(value)
+    sign = "-" if value < 0 else ""
+
+    if abs_val >= 1_000_000_000:
+        return f"{sign}{abs_val / 1_000_000_000:.{decimals}f}B"
+    elif abs_val >= 1_000_000:
+        return f"{sign}{abs_val / 1_000_000:.{decimals}f}M"
+    elif abs_val >= 1_000:
+        return f"{sign}{abs_val / 1_000:.{decimals}f}K"
+    else:
+        if decimals == 0 and abs_val == int(abs_val):
+            return f"{sign}{int(abs_val)}"
+        return f"{sign}{abs_val:.{decimals}f}"
+
+
+def get_entity_color(entity: str) -> str:
+    """Get color for entity based on its group"""
+    group = ENTITY_GROUP.get(entity, "ALL")
+    return GROUP_COLORS.get(group, "#6366F1")
+
+
+def get_insight_at_time(time_key: str):
+    """Get insight at a specific time, if any"""
+    for insight in INSIGHTS:
+        if insight["time"] == time_key:
+            return insight
+    return None
+
+
+def get_label_text(entity: str) -> str:
+    """Bubble label, shortened for long names"""
+    return entity[:12] + "..." if len(entity) > 15 else entity
+
+
+# =============================================================================
+# SCENE CLASS
+# =============================================================================
+
+class BubbleChartScene(TemplateScene):
+    """
+    Story-driven bubble chart animation.
+
+    Structure:
+    1. INTRO: Title and subtitle fade in
+    2. REVEAL: Axes and bubbles appear
+    3. EVOLUTION: Bubbles animate through time
+    4. HIGHLIGHTS: Insights emphasized during evolution
+    5. CONCLUSION: Final state with leader emphasis
+    """
+
+    def construct(self):
+        # Set background
+        self.camera.background_color = BG_COLOR
+
+        if not TIMES or not ENTITIES:
+            no_data = cached_text("No data available", color=TEXT_COLOR, font_size=36)
+            self.play(Write(no_data))
+            return
+
+        # Track elements
+        self.axes = None
+        self.layers = {}
+        self.labels = {}
+        self.shown_labels = set()
+        self.shown_step = 0
+        self.static_layer = StaticLayer(self)
+        self.time_display = None
+        self.legend = None
+
+        # Run story scenes
+        if INCLUDE_INTRO:
+            self.scene_intro()
+
+        self.scene_reveal()
+        self.scene_evolution()
+
+        if INCLUDE_CONCLUSION:
+            self.scene_conclusion()
+
+    # -------------------------------------------------------------------------
+    # SCENE 1: INTRO
+    # -------------------------------------------------------------------------
+    def scene_intro(self):
+        """Opening scene with title and subtitle."""
+        title = cached_text(
+            STORY_TITLE,
+            font_size=56,
+            color=TEXT_COLOR,
+            weight=BOLD,
+        )
+        title.move_to([0, 0.5, 0])
+
+        subtitle = cached_text(
+            STORY_SUBTITLE,
+            font_size=28,
+            color=TEXT_SECONDARY,
+        )
+        subtitle.move_to([0, -0.3, 0])
+        subtitle.set_opacity(0.8)
+
+        title_group = VGroup(title, subtitle)
+
+        self.play(
+            FadeIn(title, shift=UP * 0.3),
+            run_time=0.8,
+            rate_func=smooth,
+        )
+        self.play(
+            FadeIn(subtitle, shift=UP * 0.2),
+            run_time=0.5,
+            rate_func=smooth,
+        )
+
+        self.wait(INTRO_DURATION - 1.8)
+
+        self.play(
+            FadeOut(title_group, shift=UP * 0.5),
+            run_time=0.5,
+        )
+
+    # -------------------------------------------------------------------------
+    # SCENE 2: REVEAL
+    # -------------------------------------------------------------------------
+    def scene_reveal(self):
+        """Reveal axes, legend, and initial bubbles."""
+        # Create Axes
+        self.axes = Axes(
+            x_range=[X_MIN, X_MAX, X_STEP],
+            y_range=[Y_MIN, Y_MAX, Y_STEP],
+            x_length=CHART_WIDTH,
+            y_length=CHART_HEIGHT,
+            axis_config={
+                "color": TEXT_SECONDARY,
+                "stroke_width": 2,
+                "include_ticks": True,
+                "tick_size": 0.1,
+            },
+            x_axis_config={"include_numbers": False},
+            y_axis_config={"include_numbers": False},
+            tips=False,
+        )
+        self.axes.to_edge(DOWN, buff=1.2)
+        self.axes.shift(LEFT * 0.8)
+
+        # Custom X-axis labels
+        x_labels = VGroup()
+        x_tick_vals = [X_MIN + i * X_STEP for i in range(int((X_MAX - X_MIN) / X_STEP) + 1)]
+        for val in x_tick_vals:
+            if val > X_MAX:
+                break
+            label = cached_text(
+                format_axis_number(val, X_DECIMALS),
+                font_size=14,
+                color=TEXT_SECONDARY,
+            )
+            x_pos = self.axes.c2p(val, Y_MIN)[0]
+            label.move_to([x_pos, self.axes.c2p(X_MIN, Y_MIN)[1] - 0.35, 0])
+            x_labels.add(label)
+
+        # Custom Y-axis labels
+        y_labels = VGroup()
+        y_tick_vals = [Y_MIN + i * Y_STEP for i in range(int((Y_MAX - Y_MIN) / Y_STEP) + 1)]
+        for val in y_tick_vals:
+            if val > Y_MAX:
+                break
+            label = cached_text(
+                format_axis_number(val, Y_DECIMALS),
+                font_size=14,
+                color=TEXT_SECONDARY,
+            )
+            y_pos = self.axes.c2p(X_MIN, val)[1]
+            label.move_to([self.axes.c2p(X_MIN, Y_MIN)[0] - 0.5, y_pos, 0])
+            y_labels.add(label)
+
+        # Axis labels
+        x_axis_label = cached_text(X_LABEL, font_size=22, color=TEXT_SECONDARY)
+        x_axis_label.next_to(self.axes.x_axis, DOWN, buff=0.8)
+
+        y_axis_label = cached_text(Y_LABEL, font_size=22, color=TEXT_SECONDARY)
+        y_axis_label.rotate(90 * DEGREES)
+        y_axis_label.next_to(self.axes.y_axis, LEFT, buff=0.9)
+
+        # Time Display
+        self.time_display = glyph_text(
+            str(TIMES[0]),
+            font_size=72,
+            weight=BOLD,
+            color=ACCENT_COLOR,
+        )
+        self.time_display.to_corner(UR, buff=0.8)
+        self.time_display.set_opacity(0.85)
+
+        # Legend
+        if SHOW_LEGEND and len(GROUPS) > 1:
+            legend_items = VGroup()
+            for group in GROUPS:
+                color = GROUP_COLORS.get(group, "#6366F1")
+                swatch = Circle(radius=0.12, fill_color=color, fill_opacity=0.9, stroke_width=0)
+                group_label = cached_text(str(group), font_size=16, color=TEXT_COLOR)
+                group_label.next_to(swatch, RIGHT, buff=0.15)
+                item = VGroup(swatch, group_label)
+                legend_items.add(item)
+
+            legend_items.arrange(DOWN, aligned_edge=LEFT, buff=0.2)
+
+            legend_bg = RoundedRectangle(
+                corner_radius=0.15,
+                width=legend_items.get_width() + 0.5,
+                height=legend_items.get_height() + 0.4,
+                fill_color=SURFACE_COLOR,
+                fill_opacity=0.8,
+                stroke_width=1,
+                stroke_color=TEXT_SECONDARY,
+                stroke_opacity=0.3,
+            )
+
+            self.legend = VGroup(legend_bg, legend_items)
+            legend_items.move_to(legend_bg.get_center())
+            self.legend.to_corner(UL, buff=0.5)
+
+        # Bubble layout: data tables -> scene coordinates, one row per step
+        self.build_bubble_tables()
+
+        # One mobject per color holds all of its bubbles as separate paths
+        self.bubble_template = Circle(radius=1).points
+        for color, columns in self.color_columns.items():
+            self.layers[color] = VMobject(
+                fill_color=color,
+                fill_opacity=FILL_OPACITY,
+                stroke_color=color,
+                stroke_width=2,
+                stroke_opacity=0.9,
+            )
+        self.bubble_scale = ValueTracker(0)
+        self.bubble_time = ValueTracker(0)
+        self.update_bubbles(0, 0)
+        self.add(*self.layers.values())
+
+        self.bubble_driver = self.add_frame_driver(
+            lambda: self.update_bubbles(self.bubble_time.get_value(), self.bubble_scale.get_value())
+        )
+
+        # Animate reveal
+        self.play(
+            Create(self.axes),
+            FadeIn(x_labels),
+            FadeIn(y_labels),
+            FadeIn(x_axis_label),
+            FadeIn(y_axis_label),
+            run_time=REVEAL_DURATION * 0.4,
+        )
+
+        if self.legend:
+            self.play(FadeIn(self.legend), run_time=0.3)
+
+        self.play(FadeIn(self.time_display), run_time=0.3)
+
+        # Axes and legend stay fixed from here on
+        self.static_layer.freeze(self.axes, x_labels, y_labels, x_axis_label, y_axis_label, self.legend)
+
+        # Bubbles grow in together
+        self.play(
+            self.bubble_scale.animate.set_value(1),
+            run_time=REVEAL_DURATION * 0.6,
+            rate_func=smooth,
+        )
+
+        self.wait(0.3)
+
+    def build_bubble_tables(self):
+        """Scene-space position and radius tables (T x E) for every entity."""
+        tables = bubble_tables(TIMES, ENTITIES, DATA)
+
+        # Linear axes: map data to scene coordinates with one scale/offset per axis
+        origin = self.axes.c2p(X_MIN, Y_MIN)
+        x_scale = (self.axes.c2p(X_MAX, Y_MIN)[0] - origin[0]) / ((X_MAX - X_MIN) or 1)
+        y_scale = (self.axes.c2p(X_MIN, Y_MAX)[1] - origin[1]) / ((Y_MAX - Y_MIN) or 1)
+
+        x_values = fill_missing(tables["X"], (X_MIN + X_MAX) / 2)
+        y_values = fill_missing(tables["Y"], (Y_MIN + Y_MAX) / 2)
+        r_values = fill_missing(tables["R"], R_MIN)
+
+        self.bubble_tables = {
+            "X": origin[0] + (x_values - X_MIN) * x_scale,
+            "Y": origin[1] + (y_values - Y_MIN) * y_scale,
+            "RADIUS": compute_radii(r_values, R_MIN, R_MAX, RADIUS_MIN, RADIUS_MAX),
+        }
+        self.entity_index = {entity: c for c, entity in enumerate(ENTITIES)}
+
+        self.color_columns = {}
+        for c, entity in enumerate(ENTITIES):
+            self.color_columns.setdefault(get_entity_color(entity), []).append(c)
+        self.color_columns = {color: np.array(cols) for color, cols in self.color_columns.items()}
+
+    def bubble_at(self, entity: str):
+        """Current center and radius of an entity's bubble"""
+        c = self.entity_index[entity]
+        return np.array([self.bubble_frame["X"][c], self.bubble_frame["Y"][c], 0.0]), self.bubble_frame["RADIUS"][c]
+
+    def update_bubbles(self, t: float, scale: float):
+        """Lay out every bubble and visible label for fractional time index t"""
+        frame = interpolate_tables(self.bubble_tables, t, ease=smooth)
+        self.bubble_frame = frame
+        centers = np.column_stack([frame["X"], frame["Y"]])
+        radii = frame["RADIUS"] * scale
+
+        for color, columns in self.color_columns.items():
+            outlines = circle_outlines(self.bubble_template, centers[columns], radii[columns])
+            self.layers[color].points = outlines.reshape(-1, 3)
+
+        if SHOW_LABELS:
+            self.update_labels(centers, radii)
+
+        step = frame["step"]
+        if step != self.shown_step:
+            new_time_display = glyph_text(
+                str(TIMES[step]),
+                font_size=72,
+                weight=BOLD,
+                color=ACCENT_COLOR,
+            )
+            new_time_display.to_corner(UR, buff=0.8)
+            new_time_display.set_opacity(0.85)
+            self.time_display.become(new_time_display)
+            self.shown_step = step
+
+    def update_labels(self, centers, radii):
+        """Show labels only on the largest bubbles; create them on first use"""
+        visible = set(np.flatnonzero(visible_labels(radii)).tolist())
+
+        hidden = self.shown_labels - visible
+        if hidden:
+            self.remove(*[self.labels[c] for c in hidden])
+        for c in visible - self.shown_labels:
+            if c not in self.labels:
+                self.labels[c] = cached_text(get_label_text(ENTITIES[c]), font_size=11, color=WHITE, weight=BOLD)
+            self.add(self.labels[c])
+        for c in visible:
+            self.labels[c].move_to([centers[c, 0], centers[c, 1], 0])
+        self.shown_labels = visible
+
+    # -------------------------------------------------------------------------
+    # SCENE 3: EVOLUTION
+    # -------------------------------------------------------------------------
+    def scene_evolution(self):
+        """
+        Main animation: evolve through time.
+
+        The time tracker moves step by step; the bubble driver applies all
+        positions and radii per frame. Pauses only for insights.
+        """
+        insight_steps = {}
+        for step_idx in range(1, len(TIMES)):
+            insight = get_insight_at_time(TIMES[step_idx])
+            if insight:
+                insight_steps[step_idx] = insight
+
+        prev_stop = 0
+        for stop in sorted(set(insight_steps) | {len(TIMES) - 1}):
+            if stop > prev_stop:
+                self.play(
+                    self.bubble_time.animate.set_value(stop),
+                    run_time=(stop - prev_stop) * PER_STEP_TIME,
+                    rate_func=linear,
+                )
+
+            # Show insight if any
+            if stop in insight_steps:
+                self.show_insight(insight_steps[stop])
+
+            prev_stop = stop
+
+        self.remove(self.bubble_driver)
+
+    def show_insight(self, insight):
+        """Show a highlight annotation for an insight."""
+        entity = insight["entity"]
+        if entity not in self.entity_index:
+            return
+
+        # Highlight the bubble with a ring over it
+        center, radius = self.bubble_at(entity)
+        ring = Circle(radius=radius, stroke_color=ACCENT_COLOR, stroke_width=4, fill_opacity=0)
+        ring.move_to(center)
+
+        self.play(FadeIn(ring), run_time=0.3)
+
+        self.wait(0.2)
+
+        self.play(FadeOut(ring), run_time=0.3)
+
+    # -------------------------------------------------------------------------
+    # SCENE 4: CONCLUSION
+    # -------------------------------------------------------------------------
+    def scene_conclusion(self):
+        """Closing scene with leader emphasis."""
+        # Find the leader (largest bubble)
+        final_time = TIMES[-1]
+        final_data = DATA.get(final_time, {})
+
+        leader = None
+        max_r = -1
+        for entity, vals in final_data.items():
+            if vals["r"] > max_r:
+                max_r = vals["r"]
+                leader = entity
+
+        if leader and leader in self.entity_index:
+            # Leader drawn on its own above the dimmed layers
+            center, radius = self.bubble_at(leader)
+            color = get_entity_color(leader)
+            leader_circle = Circle(
+                radius=radius,
+                fill_color=color,
+                fill_opacity=FILL_OPACITY,
+                stroke_color=color,
+                stroke_width=2,
+                stroke_opacity=0.9,
+            )
+            leader_circle.move_to(center)
+            leader_index = self.entity_index[leader]
+            if leader_index in self.shown_labels:
+                self.remove(self.labels[leader_index])
+                self.add(leader_circle, self.labels[leader_index])
+            else:
+                self.add(leader_circle)
+
+            # Dim other bubbles
+            dim_anims = [layer.animate.set_opacity(0.3) for layer in self.layers.values()]
+            for c in self.shown_labels:
+                if c != leader_index:
+                    dim_anims.append(self.labels[c].animate.set_opacity(0.1))
+
+            self.play(*dim_anims, run_time=0.5)
+
+            # Emphasize leader
+            self.play(
+                leader_circle.animate.set_stroke(color=ACCENT_COLOR, width=5),
+                run_time=0.4,
+            )
+
+            # Show leader annotation
+            leader_label = cached_text(
+                f"Leader: {leader}",
+                font_size=28,
+                color=ACCENT_COLOR,
+                weight=BOLD,
+            )
+            leader_label.to_edge(UP, buff=0.5)
+
+            self.play(
+                FadeIn(leader_label, shift=DOWN * 0.3),
+                run_time=0.4,
+            )
+
+        # Final hold
+        self.wait(OUTRO_DURATION - 1.0)
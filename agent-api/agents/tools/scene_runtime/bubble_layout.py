@@ -0,0 +1,139 @@
+"""
+Bubble Chart Layout
+
+Array form of the bubble chart data for agents.tools.scene_runtime.bubble_chart.
+Instead of one Circle per entity (and one Transform per entity per step),
+the scene keeps every entity's position and radius in T x E tables (time
+steps x entities, in ENTITIES order), interpolates them per frame and
+writes all circles of a color into one multi-path mobject, so the cost per
+frame is a few array operations regardless of the entity count. Labels are
+culled to the largest bubbles.
+
+Only depends on numpy.
+"""
+
+import math
+from typing import Any, Callable, Dict, Mapping, Sequence
+
+import numpy as np
+
+# --- Label Culling ---
+# Bubbles smaller than this never get a label
+LABEL_MIN_RADIUS = 0.2
+# At most this many labels (the largest bubbles) are shown at once
+LABEL_LIMIT = 40
+
+
+def bubble_tables(
+    times: Sequence[Any],
+    entities: Sequence[str],
+    data: Mapping[Any, Mapping[str, Mapping[str, float]]],
+) -> Dict[str, np.ndarray]:
+    """
+    X, Y and R tables from DATA[time][entity] = {"x", "y", "r"}; NaN where
+    an entity has no data at a time step.
+    """
+    shape = (len(times), len(entities))
+    tables = {key: np.full(shape, np.nan) for key in ("X", "Y", "R")}
+    column = {entity: c for c, entity in enumerate(entities)}
+    for t, time_key in enumerate(times):
+        for entity, values in (data.get(time_key) or {}).items():
+            c = column.get(entity)
+            if c is None or not values:
+                continue
+            tables["X"][t, c] = values["x"]
+            tables["Y"][t, c] = values["y"]
+            tables["R"][t, c] = values["r"]
+    return tables
+
+
+def fill_missing(table: np.ndarray, initial: float) -> np.ndarray:
+    """
+    Carry each entity's last known value forward over missing (NaN) steps;
+    ``initial`` until its first value.
+    """
+    steps, count = table.shape
+    padded = np.vstack([np.full((1, count), float(initial)), table])
+    present = ~np.isnan(padded)
+    source = np.where(present, np.arange(steps + 1)[:, None], 0)
+    np.maximum.accumulate(source, axis=0, out=source)
+    return padded[source, np.arange(count)][1:]
+
+
+def compute_radii(
+    r_values: np.ndarray,
+    r_min: float,
+    r_max: float,
+    radius_min: float,
+    radius_max: float,
+) -> np.ndarray:
+    """Visual radii with sqrt scaling (area-proportional), elementwise."""
+    r_min_safe = max(r_min, 1e-9)
+    r_max_safe = max(r_max, r_min_safe + 1e-9)
+    sqrt_min = math.sqrt(r_min_safe)
+    sqrt_max = math.sqrt(r_max_safe)
+
+    r_values = np.asarray(r_values, dtype=float)
+    if sqrt_max <= sqrt_min:
+        return np.full_like(r_values, 0.5 * (radius_min + radius_max))
+
+    t = (np.sqrt(np.maximum(r_values, 0)) - sqrt_min) / (sqrt_max - sqrt_min)
+    return radius_min + np.clip(t, 0.0, 1.0) * (radius_max - radius_min)
+
+
+def interpolate_tables(
+    tables: Mapping[str, np.ndarray],
+    t: float,
+    ease: Callable[[float], float] = lambda x: x,
+) -> Dict[str, Any]:
+    """
+    Rows of every table at fractional time index ``t``, blended with
+    ``ease`` applied to the fraction between steps. "step" is the nearest
+    time index.
+    """
+    last = len(next(iter(tables.values()))) - 1
+    t = min(max(t, 0.0), float(last))
+    i = min(int(math.floor(t)), max(last - 1, 0))
+    frac = ease(t - i) if last > 0 else 0.0
+    j = min(i + 1, last)
+
+    out = {"step": int(round(t))}
+    for key, table in tables.items():
+        out[key] = table[i] + (table[j] - table[i]) * frac
+    return out
+
+
+def visible_labels(radii: np.ndarray, min_radius: float = LABEL_MIN_RADIUS, limit: int = LABEL_LIMIT) -> np.ndarray:
+    """Bool mask of bubbles that get a label: large enough and among the ``limit`` largest."""
+    radii = np.asarray(radii, dtype=float)
+    mask = radii >= min_radius
+    if limit <= 0:
+        return np.zeros_like(mask)
+    if mask.sum() > limit:
+        largest = np.argpartition(-radii, limit - 1)[:limit]
+        capped = np.zeros_like(mask)
+        capped[largest] = True
+        mask &= capped
+    return mask
+
+
+def circle_outlines(template_points: np.ndarray, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+    """
+    Points of many circles at once from a unit circle centered at the
+    origin; returns (count, len(template_points), 3).
+    """
+    points = template_points[None, :, :] * np.asarray(radii, dtype=float)[:, None, None]
+    points[:, :, :2] += np.asarray(centers, dtype=float)[:, None, :2]
+    return points
+
+
+__all__ = [
+    "LABEL_MIN_RADIUS",
+    "LABEL_LIMIT",
+    "bubble_tables",
+    "fill_missing",
+    "compute_radii",
+    "interpolate_tables",
+    "visible_labels",
+    "circle_outlines",
+]
@@ -0,0 +1,65 @@
+"""
+Scene Data Loader
+
+Decodes the sidecars written by agents.tools.templates.scene_data. Runs
+inside the Manim process, so it only depends on the standard library and
+numpy.
+"""
+
+import json
+import os
+import sys
+
+
+def _sd_nested(values, axes, masks):
+    keys, here, deeper = axes[0], masks[0], masks[1:]
+    leaf = len(axes) == 1
+    if keys is None:
+        if leaf:
+            return values
+        return [
+            _sd_nested(v, axes[1:], [m[i] if m is not None else None for m in deeper])
+            for i, v in enumerate(values)
+        ]
+    out = {}
+    for i, k in enumerate(keys):
+        if here is not None and not here[i]:
+            continue
+        v = values[i]
+        out[k] = v if leaf else _sd_nested(v, axes[1:], [m[i] if m is not None else None for m in deeper])
+    return out
+
+
+def decode_value(spec, arrays):
+    """Rebuild one index entry from the sidecar arrays."""
+    kind = spec["kind"]
+    if kind == "json":
+        return spec["value"]
+    values = arrays[spec["array"]].tolist()
+    if kind == "list":
+        return values
+    masks = [arrays[m].tolist() if m is not None else None for m in spec["masks"]]
+    return _sd_nested(values, spec["axes"], masks)
+
+
+def load_scene_data(name, store_dir, scene_file=None):
+    """
+    Load sidecar ``name`` as a dict of values.
+
+    Looks next to the scene file first (renderers stage sidecars there) and
+    then in ``store_dir``. ``scene_file`` defaults to the caller's __file__.
+    """
+    import numpy
+
+    if scene_file is None:
+        scene_file = sys._getframe(1).f_globals.get("__file__")
+    here = os.path.dirname(os.path.abspath(scene_file)) if scene_file else None
+    for base in (here, store_dir):
+        if base and os.path.exists(os.path.join(base, name + ".json")):
+            break
+    else:
+        raise FileNotFoundError(f"Scene data sidecar not found: {name}")
+    with open(os.path.join(base, name + ".json"), encoding="utf-8") as f:
+        index = json.load(f)
+    with numpy.load(os.path.join(base, name + ".npz")) as arrays:
+        return {key: decode_value(spec, arrays) for key, spec in index["values"].items()}
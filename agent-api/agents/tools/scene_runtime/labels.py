@@ -0,0 +1,167 @@
+"""
+Cached Labels
+
+Text mobjects go through Pango layout and SVG parsing on every
+construction, which dominated render time in scenes that rebuild labels on
+each step or frame (bar race names/values, time displays, line value
+labels). Templates build text through these helpers instead:
+
+- cached_text(): a Text rendered once per (string, font, size, weight) and
+  handed out as recolored copies.
+- glyph_text(): strings that change every step (years, formatted values)
+  laid out from a per-style atlas of glyphs, so a new string costs a few
+  copies instead of a Pango render. Strings with characters outside the
+  atlas fall back to cached_text().
+- NumberLabel: a DecimalNumber-style counter (set_value/get_value) built
+  from the same glyphs, without DecimalNumber's LaTeX dependency.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from manim import *
+
+TEXT_CACHE_SIZE = 1024
+# Characters the glyph atlas covers; everything needed by format_value()-style
+# numbers and years
+GLYPH_CHARSET = "0123456789.,:-+%$/KMBT"
+
+_text_cache: "OrderedDict[Tuple[Any, ...], Text]" = OrderedDict()
+_atlases: Dict[Tuple[Any, ...], Optional[Dict[str, Tuple[VMobject, float]]]] = {}
+
+
+def _text_key(text: str, font_size: float, weight: str, font: str, options: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (text, font, font_size, weight, tuple(sorted(options.items())))
+
+
+def cached_text(
+    text: Any,
+    font_size: float = DEFAULT_FONT_SIZE,
+    color: Any = WHITE,
+    weight: str = NORMAL,
+    font: str = "",
+    **options: Any,
+) -> Text:
+    """Text(text, ...) rendered once per string and style; returns a copy."""
+    text = str(text)
+    try:
+        key = _text_key(text, font_size, weight, font, options)
+        hash(key)
+    except TypeError:
+        # Unhashable options (e.g. t2c dicts) are rare; render directly
+        return Text(text, font_size=font_size, color=color, weight=weight, font=font, **options)
+
+    base = _text_cache.get(key)
+    if base is None:
+        base = Text(text, font_size=font_size, weight=weight, font=font, **options)
+        _text_cache[key] = base
+        if len(_text_cache) > TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)
+    else:
+        _text_cache.move_to_end(key)
+    label = base.copy()
+    label.set_color(color)
+    return label
+
+
+def _glyph_atlas(font_size: float, weight: str, font: str) -> Optional[Dict[str, Tuple[VMobject, float]]]:
+    """
+    Glyphs of GLYPH_CHARSET with their advance widths, cut from one rendered
+    Text so they share its baseline. None if the glyphs cannot be matched to
+    characters (the caller then renders whole strings).
+    """
+    key = (font, font_size, weight)
+    if key in _atlases:
+        return _atlases[key]
+
+    reference = Text(GLYPH_CHARSET, font_size=font_size, weight=weight, font=font)
+    glyphs = list(reference.submobjects)
+    atlas = None
+    if len(glyphs) == len(GLYPH_CHARSET):
+        lefts = [g.get_left()[0] for g in glyphs]
+        gaps = [b - a - g.width for a, b, g in zip(lefts, lefts[1:], glyphs)]
+        spacing = sorted(gaps)[len(gaps) // 2] if gaps else 0.0
+        atlas = {}
+        for i, (char, glyph) in enumerate(zip(GLYPH_CHARSET, glyphs)):
+            advance = lefts[i + 1] - lefts[i] if i + 1 < len(glyphs) else glyph.width + spacing
+            atlas[char] = (glyph.copy().shift(LEFT * lefts[i]), advance)
+    _atlases[key] = atlas
+    return atlas
+
+
+def glyph_text(
+    text: Any,
+    font_size: float = DEFAULT_FONT_SIZE,
+    color: Any = WHITE,
+    weight: str = NORMAL,
+    font: str = "",
+) -> VMobject:
+    """
+    A label for frequently changing strings, centered like Text. Composed
+    from cached glyphs when every character is in GLYPH_CHARSET.
+    """
+    text = str(text)
+    atlas = _glyph_atlas(font_size, weight, font) if text else None
+    if atlas is None or any(char not in atlas for char in text):
+        return cached_text(text, font_size=font_size, color=color, weight=weight, font=font)
+
+    label = VGroup()
+    x = 0.0
+    for char in text:
+        glyph, advance = atlas[char]
+        label.add(glyph.copy().shift(RIGHT * x))
+        x += advance
+    label.move_to(ORIGIN)
+    label.set_color(color)
+    return label
+
+
+class NumberLabel(VGroup):
+    """
+    DecimalNumber-style numeric label (set_value/get_value, comma grouping)
+    laid out with glyph_text(); keeps its center when the value changes.
+    """
+
+    def __init__(
+        self,
+        number: float = 0,
+        num_decimal_places: int = 2,
+        font_size: float = DEFAULT_FONT_SIZE,
+        color: Any = WHITE,
+        weight: str = NORMAL,
+        font: str = "",
+        group_with_commas: bool = True,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.num_decimal_places = num_decimal_places
+        self.group_with_commas = group_with_commas
+        self.label_style = {"font_size": font_size, "color": color, "weight": weight, "font": font}
+        self.number = None
+        self._text = None
+        self.set_value(number)
+
+    def format_number(self, number: float) -> str:
+        grouping = "," if self.group_with_commas else ""
+        return f"{number:{grouping}.{self.num_decimal_places}f}"
+
+    def get_value(self) -> float:
+        return self.number
+
+    def set_value(self, number: float) -> "NumberLabel":
+        self.number = number
+        text = self.format_number(number)
+        if text == self._text:
+            return self
+        center = self.get_center() if self.submobjects else None
+        opacity = self.get_fill_opacity() if self.submobjects else None
+        self.remove(*self.submobjects)
+        self.add(glyph_text(text, **self.label_style))
+        if center is not None:
+            self.move_to(center)
+            self.set_fill(opacity=opacity)
+        self._text = text
+        return self
+
+    def increment_value(self, delta: float) -> "NumberLabel":
+        return self.set_value(self.number + delta)
@@ -0,0 +1,477 @@
+"""
+Line Evolution Scene Runtime
+
+Scene logic for agents.tools.templates.line_evolution.generate_line_evolution(), which
+supplies the configuration through configure().
+"""
+
+from manim import *
+
+from agents.tools.scene_runtime.base import TemplateScene, apply_config
+from agents.tools.scene_runtime.labels import cached_text, glyph_text
+from agents.tools.scene_runtime.static_layers import StaticLayer
+
+# Configuration: None until configure() is called with the generator's values
+
+# --- Data ---
+TIMES = None
+VALUES = None
+Y_MIN = None
+Y_MAX = None
+VALUE_MIN = None
+VALUE_MAX = None
+NUM_POINTS = None
+LABEL_INDICES = None
+
+# --- Insights (Auto-Detected) ---
+INSIGHTS = None
+
+# --- Story Configuration ---
+STORY_TITLE = None
+STORY_SUBTITLE = None
+INCLUDE_INTRO = None
+INCLUDE_CONCLUSION = None
+
+# --- Timing ---
+INTRO_DURATION = None
+REVEAL_DURATION = None
+DRAW_DURATION = None
+OUTRO_DURATION = None
+TOTAL_DURATION = None
+
+# --- Style Configuration ---
+BG_COLOR = None
+TEXT_COLOR = None
+TEXT_SECONDARY = None
+LINE_COLOR = None
+ACCENT_COLOR = None
+AREA_COLOR = None
+SURFACE_COLOR = None
+
+# --- Layout Constants ---
+AXES_WIDTH = 10.0
+AXES_HEIGHT = 5.5
+DOT_RADIUS = 0.12
+GLOW_RADIUS = 0.25
+GLOW_OPACITY = 0.4
+
+# --- Axis Labels ---
+X_LABEL = None
+Y_LABEL = None
+
+CONFIG_KEYS = (
+    "TIMES",
+    "VALUES",
+    "Y_MIN",
+    "Y_MAX",
+    "VALUE_MIN",
+    "VALUE_MAX",
+    "NUM_POINTS",
+    "LABEL_INDICES",
+    "INSIGHTS",
+    "STORY_TITLE",
+    "STORY_SUBTITLE",
+    "INCLUDE_INTRO",
+    "INCLUDE_CONCLUSION",
+    "INTRO_DURATION",
+    "REVEAL_DURATION",
+    "DRAW_DURATION",
+    "OUTRO_DURATION",
+    "TOTAL_DURATION",
+    "BG_COLOR",
+    "TEXT_COLOR",
+    "TEXT_SECONDARY",
+    "LINE_COLOR",
+    "ACCENT_COLOR",
+    "AREA_COLOR",
+    "SURFACE_COLOR",
+    "X_LABEL",
+    "Y_LABEL",
+)
+
+
+def configure(values):
+    """Set the scene configuration (called by the generated scene)."""
+    apply_config(globals(), CONFIG_KEYS, values)
+
+
+# =============================================================================
+# HELPER FUNCTIONS
+# =============================================================================
+
+def format_value(value: float) -> str:
+    """Format numbers with appropriate precision"""
+    if abs(value) >= 1_000_000_000:
+        return f"{value / 1_000_000_000:.1f}B"
+    elif abs(value) >= 1_000_000:
+        return f"{value / 1_000_000:.1f}M"
+    elif abs(value) >= 1_000:
+        return f"{value / 1_000:.1f}K"
+    elif abs(value) >= 100:
+        return f"{value:.0f}"
+    elif abs(value) >= 1:
+        return f"{value:.1f}"
+    else:
+        return f"{value:.2f}"
+
+
+def get_insight_at_index(index: int):
+    """Get insight at a specific data index, if any"""
+    for insight in INSIGHTS:
+        if insight["index"] == index:
+            return insight
+    return None
+
+
+# =============================================================================
+# SCENE CLASS
+# =============================================================================
+
+class LineEvolutionScene(TemplateScene):
+    """
+    Story-driven line evolution animation.
+
+    Structure:
+    1. INTRO: Title and subtitle fade in
+    2. REVEAL: Axes and labels appear
+    3. DRAW: Line draws with tracking dot
+    4. HIGHLIGHTS: Insights emphasized during draw
+    5. CONCLUSION: Final value emphasis and summary
+    """
+
+    def construct(self):
+        # Set background
+        self.camera.background_color = BG_COLOR
+
+        # Track elements
+        self.axes = None
+        self.line_path = None
+        self.dot = None
+        self.glow = None
+        self.value_label = None
+        self.tracker = None
+        self.static_layer = StaticLayer(self)
+
+        # Run story scenes
+        if INCLUDE_INTRO:
+            self.scene_intro()
+
+        self.scene_reveal()
+        self.scene_draw()
+
+        if INCLUDE_CONCLUSION:
+            self.scene_conclusion()
+
+    # -------------------------------------------------------------------------
+    # SCENE 1: INTRO
+    # -------------------------------------------------------------------------
+    def scene_intro(self):
+        """Opening scene with title and subtitle."""
+        # Create title
+        title = cached_text(
+            STORY_TITLE,
+            font_size=56,
+            color=TEXT_COLOR,
+            weight=BOLD,
+        )
+        title.move_to([0, 0.5, 0])
+
+        # Create subtitle
+        subtitle = cached_text(
+            STORY_SUBTITLE,
+            font_size=28,
+            color=TEXT_SECONDARY,
+        )
+        subtitle.move_to([0, -0.3, 0])
+        subtitle.set_opacity(0.8)
+
+        title_group = VGroup(title, subtitle)
+
+        # Animate entrance
+        self.play(
+            FadeIn(title, shift=UP * 0.3),
+            run_time=0.8,
+            rate_func=smooth,
+        )
+        self.play(
+            FadeIn(subtitle, shift=UP * 0.2),
+            run_time=0.5,
+            rate_func=smooth,
+        )
+
+        # Hold
+        self.wait(INTRO_DURATION - 1.8)
+
+        # Fade out
+        self.play(
+            FadeOut(title_group, shift=UP * 0.5),
+            run_time=0.5,
+        )
+
+    # -------------------------------------------------------------------------
+    # SCENE 2: REVEAL
+    # -------------------------------------------------------------------------
+    def scene_reveal(self):
+        """Reveal axes and prepare for drawing."""
+        # Create Axes
+        x_range_max = NUM_POINTS - 1
+        x_step = max(1, x_range_max // 5)
+        y_step = (Y_MAX - Y_MIN) / 5
+
+        self.axes = Axes(
+            x_range=[0, x_range_max, x_step],
+            y_range=[Y_MIN, Y_MAX, y_step],
+            x_length=AXES_WIDTH,
+            y_length=AXES_HEIGHT,
+            axis_config={
+                "color": TEXT_SECONDARY,
+                "stroke_width": 2,
+                "include_ticks": True,
+                "tick_size": 0.1,
+            },
+            x_axis_config={
+                "include_numbers": False,
+            },
+            y_axis_config={
+                "include_numbers": True,
+                "font_size": 18,
+                "decimal_number_config": {"num_decimal_places": 0},
+            },
+            tips=False,
+        )
+        self.axes.to_edge(LEFT, buff=1.2)
+        self.axes.shift(DOWN * 0.3)
+
+        # Custom X-Axis Labels
+        x_labels = VGroup()
+        for i in LABEL_INDICES:
+            if i < NUM_POINTS:
+                label = cached_text(
+                    str(TIMES[i]),
+                    font_size=16,
+                    color=TEXT_SECONDARY,
+                )
+                label.next_to(self.axes.c2p(i, Y_MIN), DOWN, buff=0.3)
+                x_labels.add(label)
+
+        # Axis Labels
+        y_axis_label = cached_text(
+            Y_LABEL,
+            font_size=20,
+            color=TEXT_SECONDARY,
+        )
+        y_axis_label.rotate(90 * DEGREES)
+        y_axis_label.next_to(self.axes.y_axis, LEFT, buff=0.6)
+
+        x_axis_label = cached_text(
+            X_LABEL,
+            font_size=20,
+            color=TEXT_SECONDARY,
+        )
+        x_axis_label.next_to(self.axes.x_axis, DOWN, buff=0.8)
+
+        # Animate reveal
+        self.play(
+            Create(self.axes, lag_ratio=0.1),
+            run_time=REVEAL_DURATION * 0.6,
+        )
+        self.play(
+            FadeIn(x_labels),
+            FadeIn(y_axis_label),
+            FadeIn(x_axis_label),
+            run_time=REVEAL_DURATION * 0.4,
+        )
+
+        # Axes and labels stay fixed from here on
+        self.static_layer.freeze(self.axes, x_labels, y_axis_label, x_axis_label)
+
+        self.wait(0.2)
+
+    # -------------------------------------------------------------------------
+    # SCENE 3: DRAW
+    # -------------------------------------------------------------------------
+    def scene_draw(self):
+        """Main animation: draw line with tracking dot."""
+        # Create the Line Path
+        line_points = [self.axes.c2p(i, val) for i, val in enumerate(VALUES)]
+
+        self.line_path = VMobject()
+        self.line_path.set_points_smoothly(line_points)
+        self.line_path.set_color(LINE_COLOR)
+        self.line_path.set_stroke(width=4)
+
+        # Area Under Curve
+        area_points = line_points.copy()
+        area_points.append(self.axes.c2p(NUM_POINTS - 1, Y_MIN))
+        area_points.append(self.axes.c2p(0, Y_MIN))
+
+        area = Polygon(*area_points)
+        area.set_stroke(width=0)
+        area.set_fill(AREA_COLOR, opacity=0.15)
+
+        # Glowing Tracking Dot
+        initial_point = self.axes.c2p(0, VALUES[0])
+
+        self.glow = Dot(
+            point=initial_point,
+            radius=GLOW_RADIUS,
+            color=LINE_COLOR,
+        )
+        self.glow.set_opacity(GLOW_OPACITY)
+
+        self.dot = Dot(
+            point=initial_point,
+            radius=DOT_RADIUS,
+            color=WHITE,
+        )
+
+        # Value Label
+        self.value_label = glyph_text(
+            format_value(VALUES[0]),
+            font_size=24,
+            color=TEXT_COLOR,
+            weight=BOLD,
+        )
+        self.value_label.add_background_rectangle(
+            color=SURFACE_COLOR,
+            opacity=0.9,
+            buff=0.15,
+        )
+        self.value_label.next_to(self.dot, UP, buff=0.3)
+
+        # Progress Tracker
+        self.tracker = ValueTracker(0)
+
+        # Updaters
+        def update_dot(mob):
+            t = self.tracker.get_value()
+            if NUM_POINTS <= 1:
+                return
+            proportion = t / (NUM_POINTS - 1)
+            proportion = min(max(proportion, 0), 1)
+            point = self.line_path.point_from_proportion(proportion)
+            mob.move_to(point)
+
+        def update_glow(mob):
+            mob.move_to(self.dot.get_center())
+
+        shown_idx = [0]
+
+        def update_value_label(mob):
+            t = self.tracker.get_value()
+            idx = int(round(t))
+            idx = min(max(idx, 0), NUM_POINTS - 1)
+
+            # Only rebuild when the shown value changes; follow the dot every frame
+            if idx != shown_idx[0]:
+                new_text = glyph_text(
+                    format_value(VALUES[idx]),
+                    font_size=24,
+                    color=TEXT_COLOR,
+                    weight=BOLD,
+                )
+                new_text.add_background_rectangle(
+                    color=SURFACE_COLOR,
+                    opacity=0.9,
+                    buff=0.15,
+                )
+                mob.become(new_text)
+                shown_idx[0] = idx
+
+            mob.next_to(self.dot, UP, buff=0.3)
+
+            # Keep label on screen
+            if mob.get_right()[0] > 6:
+                mob.next_to(self.dot, LEFT, buff=0.3)
+            elif mob.get_left()[0] < -6:
+                mob.next_to(self.dot, RIGHT, buff=0.3)
+
+        self.dot.add_updater(update_dot)
+        self.glow.add_updater(update_glow)
+        self.value_label.add_updater(update_value_label)
+
+        # Fade in tracking elements
+        self.play(
+            FadeIn(self.dot),
+            FadeIn(self.glow),
+            FadeIn(self.value_label),
+            run_time=0.5,
+        )
+
+        # Main Animation: Draw Line + Move Tracker
+        self.play(
+            Create(self.line_path, rate_func=linear),
+            FadeIn(area, rate_func=linear),
+            self.tracker.animate.set_value(NUM_POINTS - 1),
+            run_time=DRAW_DURATION,
+            rate_func=linear,
+        )
+
+        # Remove updaters
+        self.dot.clear_updaters()
+        self.glow.clear_updaters()
+        self.value_label.clear_updaters()
+
+        # The finished line no longer changes
+        self.static_layer.freeze(self.line_path, area)
+
+        self.wait(0.3)
+
+    # -------------------------------------------------------------------------
+    # SCENE 4: CONCLUSION
+    # -------------------------------------------------------------------------
+    def scene_conclusion(self):
+        """Closing scene with final value emphasis."""
+        # Pulse effect on final dot
+        self.play(
+            self.glow.animate.scale(1.8).set_opacity(0.7),
+            run_time=0.4,
+            rate_func=smooth,
+        )
+        self.play(
+            self.glow.animate.scale(1/1.8).set_opacity(GLOW_OPACITY),
+            run_time=0.4,
+            rate_func=smooth,
+        )
+
+        # Show final summary
+        final_value = VALUES[-1]
+        start_value = VALUES[0]
+        change = final_value - start_value
+        change_pct = (change / start_value * 100) if start_value != 0 else 0
+
+        if change >= 0:
+            change_text = f"+{change_pct:.1f}%"
+            change_color = "#10B981"  # Green
+        else:
+            change_text = f"{change_pct:.1f}%"
+            change_color = "#EF4444"  # Red
+
+        # Summary card
+        summary = VGroup()
+
+        final_label = cached_text(
+            f"Final: {format_value(final_value)}",
+            font_size=32,
+            color=TEXT_COLOR,
+            weight=BOLD,
+        )
+
+        change_label = cached_text(
+            change_text,
+            font_size=28,
+            color=change_color,
+            weight=BOLD,
+        )
+        change_label.next_to(final_label, DOWN, buff=0.2)
+
+        summary.add(final_label, change_label)
+        summary.to_edge(UP, buff=0.8)
+
+        self.play(
+            FadeIn(summary, shift=DOWN * 0.3),
+            run_time=0.5,
+        )
+
+        # Hold
+        self.wait(OUTRO_DURATION - 0.5)
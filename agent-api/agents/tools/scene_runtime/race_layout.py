@@ -0,0 +1,136 @@
+"""
+Bar Race Layout
+
+Rank, position and width tables for the bar race, shared by the generator
+(agents.tools.templates.bar_race), which precomputes them once per dataset,
+and the scene (agents.tools.scene_runtime.bar_race), which interpolates them
+every frame. Tables are T x C (time steps x categories, in CATEGORIES order).
+
+Only depends on numpy, so the generator can import it without manim.
+"""
+
+import math
+from typing import Any, Callable, Dict, List, Mapping, Sequence
+
+import numpy as np
+
+# --- Layout Constants ---
+BAR_HEIGHT = 0.55
+BAR_SPACING = 0.7
+BAR_MAX_WIDTH = 9.0
+BAR_MIN_WIDTH = 0.1
+LEFT_MARGIN = -5.5
+TOP_Y = 3.0
+CORNER_RADIUS = 0.12
+# Width of the template bar that per-frame bar outlines are derived from
+BAR_TEMPLATE_WIDTH = 1.0
+
+# Config keys of the precomputed tables
+TABLE_KEYS = ("VALUES", "RANKS", "BAR_Y", "BAR_WIDTHS")
+
+
+def get_y_position(rank):
+    """Y position for a rank (0 = top); works elementwise on arrays."""
+    return TOP_Y - (rank * BAR_SPACING)
+
+
+def get_bar_width(value, max_value: float):
+    """Bar width proportional to value; works elementwise on arrays."""
+    if max_value <= 0:
+        return np.full_like(np.asarray(value, dtype=float), BAR_MIN_WIDTH)
+    return np.maximum(BAR_MIN_WIDTH, np.asarray(value, dtype=float) / max_value * BAR_MAX_WIDTH)
+
+
+def race_layout(
+    times: Sequence[Any],
+    categories: Sequence[str],
+    data: Mapping[Any, Mapping[str, float]],
+    max_value: float,
+) -> Dict[str, List[List[float]]]:
+    """
+    Precompute the race tables from DATA[time][category].
+
+    Ranks sort by value descending; ties keep CATEGORIES order (the order
+    the scene used to get from a stable sort).
+
+    Returns:
+        {"VALUES", "RANKS", "BAR_Y", "BAR_WIDTHS"} as nested lists
+    """
+    values = np.array(
+        [[float(data[t].get(cat, 0.0)) for cat in categories] for t in times],
+        dtype=float,
+    ).reshape(len(times), len(categories))
+    order = np.argsort(-values, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(len(categories))[None, :].repeat(len(times), axis=0), axis=1)
+
+    return {
+        "VALUES": values.tolist(),
+        "RANKS": ranks.tolist(),
+        "BAR_Y": get_y_position(ranks.astype(float)).tolist(),
+        "BAR_WIDTHS": get_bar_width(values, max_value).tolist(),
+    }
+
+
+def interpolate_layout(
+    tables: Mapping[str, np.ndarray],
+    t: float,
+    ease: Callable[[float], float] = lambda x: x,
+) -> Dict[str, Any]:
+    """
+    Rows of every table at fractional time index ``t``.
+
+    Between steps i and i+1 values and widths blend linearly, so bars grow
+    continuously across steps, while y positions blend with ``ease``
+    applied to the fraction so rank swaps settle into their slots. "step"
+    is the nearest time index.
+    """
+    last = len(tables["VALUES"]) - 1
+    t = min(max(t, 0.0), float(last))
+    i = min(int(math.floor(t)), max(last - 1, 0))
+    frac = t - i if last > 0 else 0.0
+    j = min(i + 1, last)
+
+    out = {"step": int(round(t))}
+    for key, f in (("VALUES", frac), ("BAR_WIDTHS", frac), ("BAR_Y", ease(frac))):
+        table = tables[key]
+        out[key] = table[i] + (table[j] - table[i]) * f
+    return out
+
+
+def bar_outlines(template_points, widths, ys):
+    """
+    Points of every bar at once: the template bar (BAR_TEMPLATE_WIDTH wide,
+    centered at the origin) resized to each width and moved into place.
+
+    Straight edges stretch and the corner arcs only shift, so corners stay
+    round; bars narrower than the two corners squeeze horizontally.
+    """
+    widths = np.asarray(widths, dtype=float)[:, None]
+    fitted = np.maximum(widths, 2 * CORNER_RADIUS)
+    x = template_points[None, :, 0]
+    x = (x + np.sign(x) * (fitted - BAR_TEMPLATE_WIDTH) / 2) * (widths / fitted)
+
+    points = np.empty((len(widths),) + template_points.shape)
+    points[:, :, 0] = x + LEFT_MARGIN + widths / 2
+    points[:, :, 1] = template_points[None, :, 1] + np.asarray(ys, dtype=float)[:, None]
+    points[:, :, 2] = template_points[None, :, 2]
+    return points
+
+
+__all__ = [
+    "BAR_HEIGHT",
+    "BAR_SPACING",
+    "BAR_MAX_WIDTH",
+    "BAR_MIN_WIDTH",
+    "LEFT_MARGIN",
+    "TOP_Y",
+    "CORNER_RADIUS",
+    "BAR_TEMPLATE_WIDTH",
+    "TABLE_KEYS",
+    "get_y_position",
+    "get_bar_width",
+    "race_layout",
+    "interpolate_layout",
+    "bar_outlines",
+]
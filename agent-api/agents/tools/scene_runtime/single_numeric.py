@@ -0,0 +1,302 @@
+"""
+Single Numeric Scene Runtime
+
+Scene logic for agents.tools.templates.single_numeric.generate_single_numeric(), which
+supplies the configuration through configure().
+"""
+
+from manim import *
+
+from agents.tools.scene_runtime.base import TemplateScene, apply_config
+from agents.tools.scene_runtime.labels import cached_text
+
+# Configuration: None until configure() is called with the generator's values
+
+# --- Data ---
+CATEGORIES = None
+VALUES = None
+MAX_VALUE = None
+MIN_VALUE = None
+TOTAL_VALUE = None
+CATEGORY_COLUMN = None
+VALUE_COLUMN = None
+
+# --- Colors ---
+BAR_COLORS = None
+BG_COLOR = None
+TEXT_COLOR = None
+TEXT_SECONDARY = None
+
+# --- Insights ---
+INSIGHTS = None
+
+# --- Story Configuration ---
+STORY_TITLE = None
+STORY_SUBTITLE = None
+INCLUDE_INTRO = None
+INCLUDE_CONCLUSION = None
+
+# --- Timing ---
+INTRO_DURATION = None
+REVEAL_DURATION = None
+HOLD_DURATION = None
+OUTRO_DURATION = None
+BAR_GROW_TIME = None
+STAGGER_DELAY = None
+
+# --- Layout ---
+BAR_HEIGHT = None
+BAR_SPACING = None
+MAX_BAR_WIDTH = None
+CHART_TOP = None
+VALUE_MARGIN = None
+
+CONFIG_KEYS = (
+    "CATEGORIES",
+    "VALUES",
+    "MAX_VALUE",
+    "MIN_VALUE",
+    "TOTAL_VALUE",
+    "CATEGORY_COLUMN",
+    "VALUE_COLUMN",
+    "BAR_COLORS",
+    "BG_COLOR",
+    "TEXT_COLOR",
+    "TEXT_SECONDARY",
+    "INSIGHTS",
+    "STORY_TITLE",
+    "STORY_SUBTITLE",
+    "INCLUDE_INTRO",
+    "INCLUDE_CONCLUSION",
+    "INTRO_DURATION",
+    "REVEAL_DURATION",
+    "HOLD_DURATION",
+    "OUTRO_DURATION",
+    "BAR_GROW_TIME",
+    "STAGGER_DELAY",
+    "BAR_HEIGHT",
+    "BAR_SPACING",
+    "MAX_BAR_WIDTH",
+    "CHART_TOP",
+    "VALUE_MARGIN",
+)
+
+
+def configure(values):
+    """Set the scene configuration (called by the generated scene)."""
+    apply_config(globals(), CONFIG_KEYS, values)
+
+
+def format_value(value: float) -> str:
+    """Format value with K/M/B suffix"""
+    abs_value = abs(value)
+    sign = "-" if value < 0 else ""
+
+    if abs_value >= 1_000_000_000:
+        return f"{sign}{abs_value / 1_000_000_000:.1f}B"
+    elif abs_value >= 1_000_000:
+        return f"{sign}{abs_value / 1_000_000:.1f}M"
+    elif abs_value >= 1_000:
+        return f"{sign}{abs_value / 1_000:.1f}K"
+    elif abs_value >= 100:
+        return f"{sign}{abs_value:.0f}"
+    elif abs_value >= 1:
+        return f"{sign}{abs_value:.1f}"
+    elif abs_value > 0:
+        return f"{sign}{abs_value:.2f}"
+    else:
+        return "0"
+
+
+class SingleNumericScene(TemplateScene):
+    def construct(self):
+        # Set background
+        self.camera.background_color = BG_COLOR
+
+        # --- Intro Scene ---
+        if INCLUDE_INTRO:
+            self.play_intro()
+
+        # --- Main Chart ---
+        self.play_chart()
+
+        # --- Conclusion Scene ---
+        if INCLUDE_CONCLUSION:
+            self.play_conclusion()
+
+    def play_intro(self):
+        """Animated title sequence"""
+        title = cached_text(
+            STORY_TITLE,
+            font_size=48,
+            color=TEXT_COLOR,
+            weight=BOLD,
+        ).move_to(UP * 0.5)
+
+        subtitle = cached_text(
+            STORY_SUBTITLE,
+            font_size=24,
+            color=TEXT_SECONDARY,
+        ).next_to(title, DOWN, buff=0.3)
+
+        # Animate in
+        self.play(
+            FadeIn(title, shift=UP * 0.3),
+            run_time=0.8,
+        )
+        self.play(
+            FadeIn(subtitle, shift=UP * 0.2),
+            run_time=0.5,
+        )
+
+        self.wait(INTRO_DURATION - 1.3)
+
+        # Animate out
+        self.play(
+            FadeOut(title, shift=UP * 0.3),
+            FadeOut(subtitle, shift=UP * 0.3),
+            run_time=0.5,
+        )
+
+    def play_chart(self):
+        """Main chart animation with staggered bar growth"""
+
+        # Create all bar components
+        bars = []
+        labels = []
+        value_texts = []
+
+        # Calculate vertical positions
+        start_y = CHART_TOP - BAR_HEIGHT / 2
+
+        for i, (category, value) in enumerate(zip(CATEGORIES, VALUES)):
+            y_pos = start_y - i * (BAR_HEIGHT + BAR_SPACING)
+
+            # Calculate bar width (scaled to max value)
+            # Handle negative values by using absolute value for width
+            abs_value = abs(value)
+            width_ratio = abs_value / MAX_VALUE if MAX_VALUE > 0 else 0
+            bar_width = width_ratio * MAX_BAR_WIDTH
+
+            # Category label (left side)
+            label = cached_text(
+                category[:20] + "..." if len(category) > 20 else category,
+                font_size=18,
+                color=TEXT_COLOR,
+            ).move_to(LEFT * 6 + UP * y_pos)
+            label.align_to(LEFT * 5.5, RIGHT)
+            labels.append(label)
+
+            # Bar (starts at width 0)
+            bar = Rectangle(
+                width=0.001,  # Start nearly invisible
+                height=BAR_HEIGHT,
+                fill_color=BAR_COLORS[i % len(BAR_COLORS)],
+                fill_opacity=0.9,
+                stroke_width=0,
+            )
+            bar.move_to(LEFT * 5 + UP * y_pos)
+            bar.align_to(LEFT * 5, LEFT)
+            bar.target_width = bar_width  # Store target width
+            bars.append(bar)
+
+            # Value label (will appear at end of bar)
+            value_text = cached_text(
+                format_value(value),
+                font_size=16,
+                color=TEXT_COLOR,
+                weight=BOLD,
+            )
+            value_text.move_to(LEFT * 5 + RIGHT * bar_width + RIGHT * VALUE_MARGIN + UP * y_pos)
+            value_text.set_opacity(0)
+            value_texts.append(value_text)
+
+        # Add small title at top
+        chart_title = cached_text(
+            STORY_TITLE,
+            font_size=28,
+            color=TEXT_COLOR,
+            weight=BOLD,
+        ).move_to(UP * 3.2)
+
+        # Animate: First show labels and title
+        self.play(
+            FadeIn(chart_title, shift=DOWN * 0.2),
+            *[FadeIn(label, shift=RIGHT * 0.2) for label in labels],
+            run_time=0.6,
+        )
+
+        # Animate: Staggered bar growth
+        bar_animations = []
+        for i, (bar, value_text) in enumerate(zip(bars, value_texts)):
+            # Create custom animation for bar growth
+            target_width = bar.target_width
+
+            def grow_bar(mob, alpha, tw=target_width):
+                new_width = max(0.001, tw * alpha)
+                mob.stretch_to_fit_width(new_width)
+                mob.align_to(LEFT * 5, LEFT)
+                return mob
+
+            bar_anim = UpdateFromAlphaFunc(
+                bar,
+                grow_bar,
+                run_time=BAR_GROW_TIME,
+                rate_func=rate_functions.ease_out_cubic,
+            )
+
+            # Value appears as bar finishes
+            value_anim = Succession(
+                Wait(BAR_GROW_TIME * 0.7),
+                AnimationGroup(
+                    value_text.animate.set_opacity(1),
+                    run_time=BAR_GROW_TIME * 0.3,
+                ),
+            )
+
+            bar_animations.append(
+                Succession(
+                    Wait(i * STAGGER_DELAY),
+                    AnimationGroup(bar_anim, value_anim),
+                )
+            )
+
+        # Add bars to scene first
+        for bar in bars:
+            self.add(bar)
+        for vt in value_texts:
+            self.add(vt)
+
+        # Play staggered animations
+        self.play(*bar_animations)
+
+        # Hold on final result
+        self.wait(HOLD_DURATION)
+
+        # Store for cleanup
+        self.chart_elements = [chart_title] + labels + bars + value_texts
+
+    def play_conclusion(self):
+        """Conclusion with optional insight callout"""
+        # Fade out chart elements
+        if hasattr(self, 'chart_elements'):
+            self.play(
+                *[FadeOut(elem) for elem in self.chart_elements],
+                run_time=0.5,
+            )
+
+        # Show insight if available
+        if INSIGHTS:
+            insight = INSIGHTS[0]
+            insight_text = cached_text(
+                insight["desc"],
+                font_size=32,
+                color=TEXT_COLOR,
+            ).move_to(ORIGIN)
+
+            self.play(FadeIn(insight_text, shift=UP * 0.3), run_time=0.5)
+            self.wait(OUTRO_DURATION - 1.0)
+            self.play(FadeOut(insight_text, shift=UP * 0.3), run_time=0.5)
+        else:
+            # Simple fade to end
+            self.wait(OUTRO_DURATION)
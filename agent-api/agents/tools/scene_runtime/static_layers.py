@@ -0,0 +1,76 @@
+"""
+Static Layers
+
+Axes, tick labels, axis titles and legends stay put for the whole main
+animation but were still vector mobjects: Cairo draws them again whenever it
+re-snapshots the non-moving part of the scene (at every play() call) and on
+every frame once they sit behind an animated or updated mobject in the
+scene order.
+
+StaticLayer rasterizes such mobjects once into the camera background -- the
+frame every render starts from -- and removes them from the scene, so only
+the dynamic mobjects are composited per frame:
+
+    self.static_layer = StaticLayer(self)
+    ...
+    self.static_layer.freeze(self.axes, x_labels, y_labels)
+
+Frozen mobjects always end up beneath the remaining mobjects and must not
+change afterwards; thaw() puts them back as mobjects (e.g. before animating
+them). freeze() must come after the scene's background color is set, which
+resets the camera background.
+
+Renderers without a pixel background (OpenGL) leave the mobjects in place.
+"""
+
+from typing import Any, List, Optional
+
+
+class StaticLayer:
+    """Mobjects drawn once into the camera background instead of every frame."""
+
+    def __init__(self, scene: Any):
+        self.scene = scene
+        self.mobjects: List[Any] = []
+        self._background: Optional[Any] = None
+
+    @property
+    def supported(self) -> bool:
+        camera = getattr(self.scene, "camera", None)
+        return all(
+            hasattr(camera, name)
+            for name in ("background", "pixel_array", "capture_mobjects", "set_background")
+        )
+
+    def freeze(self, *mobjects: Any) -> bool:
+        """
+        Rasterize ``mobjects`` over the current background and remove them
+        from the scene. Returns False (and changes nothing) when the
+        renderer has no pixel background.
+        """
+        mobjects = [mob for mob in mobjects if mob is not None]
+        if not mobjects or not self.supported:
+            return False
+
+        camera = self.scene.camera
+        if self._background is None:
+            self._background = camera.background
+        camera.reset()
+        camera.capture_mobjects(mobjects)
+        camera.set_background(camera.pixel_array.copy())
+
+        self.scene.remove(*mobjects)
+        self.mobjects.extend(mobjects)
+        return True
+
+    def thaw(self) -> None:
+        """Restore the original background and put the frozen mobjects back (at the bottom)."""
+        if self._background is None:
+            return
+        self.scene.camera.set_background(self._background)
+        self.scene.bring_to_back(*self.mobjects)
+        self.mobjects = []
+        self._background = None
+
+
+__all__ = ["StaticLayer"]
@@ -30,6 +30,8 @@ from dataclasses import dataclass, field, asdict
 from typing import Dict, Optional, Literal, Tuple
 import re
 
+from agents.tools.keyword_matcher import LANGUAGE_KEYWORDS, scan
+
 
 # =============================================================================
 # CONSTANTS
@@ -164,51 +166,6 @@ class ChartSpec:
         return asdict(self)
 
 
-# =============================================================================
-# REGEX PATTERNS FOR CHART TYPE DETECTION
-# =============================================================================
-
-_RE_BUBBLE = re.compile(
-    r"(?:\bbubble\s*chart\b|\bbubblechart\b|\bbubble\b|\bgelembung\b|\bscatter\b|\bsebar\b)",
-    re.IGNORECASE,
-)
-
-_RE_DISTRIBUTION = re.compile(
-    r"(?:\bdistribution\b|\bdistribusi\b|\bhistogram\b|\bkde\b|\bdensity\b)",
-    re.IGNORECASE,
-)
-
-_RE_BAR_RACE = re.compile(
-    r"(?:\bbar\s*race\b|\bracing\s*bar\b|\branking\b|\bperingkat\b|\btop\s*\d+\b|\bleaderboard\b)",
-    re.IGNORECASE,
-)
-
-_RE_LINE_EVOLUTION = re.compile(
-    r"(?:\bline\s*chart\b|\bline\s*evolution\b|\bline\s*graph\b|\btrend\b|\btren\b|\btime\s*series\b|\bevolution\b|\bevolusi\b)",
-    re.IGNORECASE,
-)
-
-_RE_BENTO_GRID = re.compile(
-    r"(?:\bbento\b|\bdashboard\b|\bkpi\b|\bmetric\b|\boverview\b|\bsummary\b|\bringkasan\b)",
-    re.IGNORECASE,
-)
-
-# Creation mode patterns
-_RE_MODE1 = re.compile(r"(?:\bmode\s*1\b|\boption\s*1\b|\bdirect(ly)?\b|\blangsung\b)", re.IGNORECASE)
-_RE_MODE3 = re.compile(
-    r"(?:\bmode\s*3\b|\boption\s*3\b|\b(group(ed)?|kelompok)\b|\bby\s*group\b)",
-    re.IGNORECASE,
-)
-_RE_MODE2 = re.compile(r"(?:\bmode\s*2\b|\boption\s*2\b|\brandom\b)", re.IGNORECASE)
-
-# Common label tokens (ID/EN) to set default axis labels
-_RE_LIFE_EXPECTANCY = re.compile(r"(life\s*expectancy|umur\s*harapan\s*hidup|人均寿命)", re.IGNORECASE)
-_RE_FERTILITY = re.compile(r"(fertilit(y|as)|生育率)", re.IGNORECASE)
-_RE_POPULATION = re.compile(r"(population|populasi|人口)", re.IGNORECASE)
-_RE_YEAR = re.compile(r"(year|tahun|年)", re.IGNORECASE)
-_RE_REGION = re.compile(r"(region|wilayah|区域|area|benua)", re.IGNORECASE)
-
-
 # =============================================================================
 # INFERENCE FUNCTIONS
 # =============================================================================
@@ -218,14 +175,11 @@ def normalize_chart_type(text: Optional[str]) -> ChartType:
     Infer chart type from prompt text.
     Now supports all 5 chart types.
     """
-    t = text or ""
+    hits = scan(text or "")
 
     matches = {
-        "bubble": bool(_RE_BUBBLE.search(t)),
-        "distribution": bool(_RE_DISTRIBUTION.search(t)),
-        "bar_race": bool(_RE_BAR_RACE.search(t)),
-        "line_evolution": bool(_RE_LINE_EVOLUTION.search(t)),
-        "bento_grid": bool(_RE_BENTO_GRID.search(t)),
+        chart_type: hits.has(f"spec:{chart_type}")
+        for chart_type in ("bubble", "distribution", "bar_race", "line_evolution", "bento_grid")
     }
 
     # Count how many chart types matched
@@ -287,15 +241,15 @@ def infer_creation_mode(text: Optional[str]) -> int:
     """
     Guess creation mode for bubble charts. Defaults to 2.
     """
-    t = text or ""
-    if _RE_MODE1.search(t):
+    hits = scan(text or "")
+    if hits.has("mode:1"):
         return 1
-    if _RE_MODE3.search(t):
+    if hits.has("mode:3"):
         return 3
-    if _RE_MODE2.search(t):
+    if hits.has("mode:2"):
         return 2
     # Heuristic: if "group" or "kelompok" mentioned without explicit number, prefer 3
-    if re.search(r"(group|kelompok)", t, re.IGNORECASE):
+    if hits.has("mode:group"):
         return 3
     return 2
 
@@ -306,14 +260,14 @@ def infer_axis_labels(text: Optional[str]) -> Tuple[Optional[str], Optional[str]
     If the prompt references known domains (life expectancy, fertility), use them.
     Otherwise, leave as None for templates to handle.
     """
-    t = text or ""
+    hits = scan(text or "")
     x_label = None
     y_label = None
 
     # Common pair: X=Life Expectancy, Y=Fertility
-    if _RE_LIFE_EXPECTANCY.search(t):
+    if hits.has("label:life_expectancy"):
         x_label = "Life Expectancy"
-    if _RE_FERTILITY.search(t):
+    if hits.has("label:fertility"):
         y_label = "Fertility"
 
     return x_label, y_label
@@ -378,13 +332,10 @@ def infer_style_language(text: Optional[str]) -> Optional[str]:
     """
     Attempt to infer preferred label language from prompt (very rough).
     """
-    t = (text or "").lower()
-    if any(k in t for k in ["umur", "tahun", "wilayah", "populasi", "fertilitas"]):
-        return "id"
-    if any(k in t for k in ["life", "year", "region", "population", "fertility"]):
-        return "en"
-    if any(k in t for k in ["年", "区域", "人口", "生育率", "人均寿命"]):
-        return "cn"
+    hits = scan(text or "")
+    for lang in LANGUAGE_KEYWORDS:
+        if hits.has(f"lang:{lang}"):
+            return lang
     return None
 
 
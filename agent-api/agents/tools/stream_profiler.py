@@ -0,0 +1,667 @@
+"""
+Streaming CSV Profiler
+
+Scans an entire CSV once, in fixed-size chunks, and keeps a bounded-memory
+sketch per column:
+
+    - distinct count: exact while small, HyperLogLog beyond that
+    - numeric min / max / mean over values that parse as numbers
+    - null ratio
+    - reservoir sample (uniform over the whole file, kept in file order)
+    - type votes: numeric vs text values, and how many look like years
+
+Memory is O(chunk_rows + columns * (HLL registers + sample size)), so the
+profile of a multi-GB file costs about as much memory as one chunk. The
+result feeds chart_inference.analyze_schema() and the upload-time dataset
+profile, replacing their head-of-file samples.
+
+Distinct values are hashed in one normalized form whatever dtype pandas
+infers for a chunk: anything that parses as a number by its float value,
+everything else by its text. A column that is numeric in one chunk and
+object in the next therefore counts "5" and 5.0 once.
+
+profile_csv(max_rows=...) bounds the scan for latency-sensitive callers; the
+profile then covers the leading rows and row_count is extrapolated from the
+bytes those rows take up.
+
+The C parser is most of the cost of a full scan (about 60% on one core), so
+large files are split into byte ranges at row boundaries (never inside a
+quoted field) and profiled by worker processes, one range each; their
+sketches merge into the same result. One core profiles roughly 20-40 MB/s
+depending on the columns, so a 1 GB file takes a few seconds only with
+about ten or more cores; on fewer it takes proportionally longer.
+"""
+
+from __future__ import annotations
+
+import codecs
+import io
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_ROWS = 200_000
+DEFAULT_SAMPLE_SIZE = 500
+
+# Distinct values are counted exactly up to this many, then by HyperLogLog
+EXACT_DISTINCT_LIMIT = 4096
+
+# 2^14 registers: ~0.8% standard error, 16 KiB per column
+HLL_PRECISION = 14
+
+# Full scans of files at least twice this size are split across worker
+# processes (STREAM_PROFILE_WORKERS, default: one per CPU), each range at least
+# this big; smaller files are not worth the worker start-up.
+PARALLEL_MIN_BYTES = 64 << 20
+
+# Same range chart_inference._is_year_column() treats as year-like
+YEAR_MIN = 1900
+YEAR_MAX = 2100
+
+
+# =============================================================================
+# SKETCHES
+# =============================================================================
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter over 64-bit hashes.
+
+    ``add_hashes`` is vectorized; registers from two sketches with the same
+    precision can be combined with ``merge``.
+    """
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be in [4, 18]")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add_hashes(self, hashes: "np.ndarray") -> None:
+        if len(hashes) == 0:
+            return
+        h = np.asarray(hashes, dtype=np.uint64)
+        p = np.uint64(self.precision)
+        idx = (h >> (np.uint64(64) - p)).astype(np.intp)
+        rest = h << p
+        # The top 53 bits convert to float64 exactly, so log2 gives the
+        # highest set bit without rounding; all-zero means max rank.
+        top = (rest >> np.uint64(11)).astype(np.float64)
+        max_rank = 64 - self.precision + 1
+        with np.errstate(divide="ignore"):
+            clz = 52 - np.floor(np.log2(top))
+        rank = np.where(top > 0, np.minimum(clz + 1, max_rank), max_rank).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        m = float(self.m)
+        alpha = 0.7213 / (1.0 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int32))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return m * math.log(m / zeros)
+        return raw
+
+
+# Anything pd.to_numeric() turns into a number starts (after whitespace) with
+# one of these; checking the first character skips the slow parse for text.
+_NUMERIC_LEADS = tuple("0123456789+-.iI")
+_NUMERIC_PREFIX = r"\s*[-+]?(?:[\d.]|inf)"
+
+
+def _numeric_candidates(values: "np.ndarray") -> "np.ndarray":
+    if hasattr(np, "strings") and hasattr(np.strings, "slice"):
+        try:
+            text = values.astype(np.dtypes.StringDType())
+        except (TypeError, ValueError):
+            text = None
+        if text is not None:
+            first = np.strings.slice(np.strings.lstrip(text), 0, 1)
+            mask = np.zeros(len(values), dtype=bool)
+            for lead in _NUMERIC_LEADS:
+                mask |= first == lead
+            return mask
+    series = pd.Series(values, dtype=object)
+    try:
+        return series.str.match(_NUMERIC_PREFIX, case=False, na=False).to_numpy(dtype=bool)
+    except (AttributeError, TypeError):
+        # Mixed non-string objects: parse everything
+        return np.ones(len(values), dtype=bool)
+
+
+def _hash_numbers(values: "np.ndarray") -> "np.ndarray":
+    """Hashes of float values (-0.0 folded into 0.0)."""
+    return pd.util.hash_array(np.asarray(values, dtype=np.float64) + 0.0)
+
+
+def _parse_numeric(values: "np.ndarray") -> "np.ndarray":
+    """Float value of each entry, NaN where it does not parse as a number."""
+    out = np.full(len(values), np.nan)
+    candidates = _numeric_candidates(values)
+    if candidates.any():
+        out[candidates] = pd.to_numeric(
+            pd.Series(values[candidates], dtype=object), errors="coerce"
+        ).to_numpy(dtype=np.float64)
+    return out
+
+
+@dataclass
+class ColumnSketch:
+    """Running statistics for one column."""
+    name: str
+    sample_size: int = DEFAULT_SAMPLE_SIZE
+    rows: int = 0
+    nulls: int = 0
+    numeric_votes: int = 0
+    text_votes: int = 0
+    year_like: int = 0
+    numeric_sum: float = 0.0
+    numeric_min: Optional[float] = None
+    numeric_max: Optional[float] = None
+    hll: Any = None
+    _exact: Optional[set] = field(default_factory=set, repr=False)
+    _sample_keys: Any = field(default=None, repr=False)
+    _sample_pos: Any = field(default=None, repr=False)
+    _sample_values: Any = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if self.hll is None:
+            self.hll = HyperLogLog()
+        self._sample_keys = np.empty(0, dtype=np.float64)
+        self._sample_pos = np.empty(0, dtype=np.int64)
+        self._sample_values = np.empty(0, dtype=object)
+
+    # -- updates ------------------------------------------------------------
+
+    def update(self, series: "pd.Series", row_offset: int, rng: "np.random.Generator") -> None:
+        n = len(series)
+        self.rows += n
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            arr = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            positions = np.flatnonzero(~np.isnan(arr))
+            values = arr[positions]
+            self.nulls += n - len(values)
+            self._add_numeric(values)
+            self._add_distinct(_hash_numbers(values))
+            self._add_sample(positions, row_offset, rng, lambda idx: values[idx].astype(object))
+            return
+
+        # Text-like chunk: work on the distinct values and weight them by
+        # their counts, so parsing and hashing cost O(uniques), not O(rows).
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        positions = np.flatnonzero(codes >= 0)
+        self.nulls += n - len(positions)
+        if len(uniques) == 0:
+            return
+        uniques = np.asarray(uniques, dtype=object)
+        present = codes[positions]
+        counts = np.bincount(present, minlength=len(uniques))
+        parsed = _parse_numeric(uniques)
+        numeric = ~np.isnan(parsed)
+        self._add_numeric(parsed[numeric], counts[numeric])
+        self.text_votes += int(counts[~numeric].sum())
+        # Numbers hash by value so they match chunks pandas parsed as numeric
+        hashes = np.empty(len(uniques), dtype=np.uint64)
+        hashes[numeric] = _hash_numbers(parsed[numeric])
+        hashes[~numeric] = pd.util.hash_array(uniques[~numeric])
+        self._add_distinct(hashes)
+        self._add_sample(positions, row_offset, rng, lambda idx: uniques[present[idx]])
+
+    def _add_numeric(self, values: "np.ndarray", weights: Optional["np.ndarray"] = None) -> None:
+        if len(values) == 0:
+            return
+        year = (values >= YEAR_MIN) & (values <= YEAR_MAX)
+        if weights is None:
+            self.numeric_votes += len(values)
+            self.numeric_sum += float(values.sum())
+            self.year_like += int(np.count_nonzero(year))
+        else:
+            self.numeric_votes += int(weights.sum())
+            self.numeric_sum += float(np.dot(values, weights))
+            self.year_like += int(weights[year].sum())
+        lo, hi = float(values.min()), float(values.max())
+        self.numeric_min = lo if self.numeric_min is None else min(self.numeric_min, lo)
+        self.numeric_max = hi if self.numeric_max is None else max(self.numeric_max, hi)
+
+    def _add_distinct(self, hashes: "np.ndarray") -> None:
+        if len(hashes) == 0:
+            return
+        self.hll.add_hashes(hashes)
+        if self._exact is not None:
+            self._exact.update(np.unique(hashes).tolist())
+            if len(self._exact) > EXACT_DISTINCT_LIMIT:
+                self._exact = None
+
+    def _add_sample(self, positions: "np.ndarray", row_offset: int, rng: "np.random.Generator", values_at) -> None:
+        # Bottom-k sampling: each value gets a uniform random key and the k
+        # smallest keys seen so far form a uniform sample without replacement.
+        # Values are only materialized for the candidates that survive.
+        if len(positions) == 0 or self.sample_size <= 0:
+            return
+        keys = rng.random(len(positions))
+        local = np.arange(len(positions))
+        if len(self._sample_keys) >= self.sample_size:
+            keep = keys < self._sample_keys.max()
+            keys, local = keys[keep], local[keep]
+            if len(keys) == 0:
+                return
+        if len(keys) > self.sample_size:
+            best = np.argpartition(keys, self.sample_size - 1)[: self.sample_size]
+            keys, local = keys[best], local[best]
+        all_keys = np.concatenate([self._sample_keys, keys])
+        all_pos = np.concatenate([self._sample_pos, positions[local] + row_offset])
+        all_values = np.concatenate([self._sample_values, np.asarray(values_at(local), dtype=object)])
+        if len(all_keys) > self.sample_size:
+            chosen = np.argpartition(all_keys, self.sample_size - 1)[: self.sample_size]
+            all_keys, all_pos, all_values = all_keys[chosen], all_pos[chosen], all_values[chosen]
+        self._sample_keys, self._sample_pos, self._sample_values = all_keys, all_pos, all_values
+
+    def merge(self, other: "ColumnSketch", row_offset: int = 0) -> None:
+        """Fold in the sketch of a later part of the same column, which starts ``row_offset`` rows in."""
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.numeric_votes += other.numeric_votes
+        self.text_votes += other.text_votes
+        self.year_like += other.year_like
+        self.numeric_sum += other.numeric_sum
+        for attr, pick in (("numeric_min", min), ("numeric_max", max)):
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            if theirs is not None:
+                setattr(self, attr, theirs if mine is None else pick(mine, theirs))
+        self.hll.merge(other.hll)
+        if self._exact is not None and other._exact is not None:
+            self._exact |= other._exact
+            if len(self._exact) > EXACT_DISTINCT_LIMIT:
+                self._exact = None
+        else:
+            self._exact = None
+        # Both samples are bottom-k by independent uniform keys: their
+        # bottom-k is a uniform sample of the union
+        keys = np.concatenate([self._sample_keys, other._sample_keys])
+        pos = np.concatenate([self._sample_pos, other._sample_pos + row_offset])
+        values = np.concatenate([self._sample_values, other._sample_values])
+        if len(keys) > self.sample_size:
+            chosen = np.argpartition(keys, self.sample_size - 1)[: self.sample_size]
+            keys, pos, values = keys[chosen], pos[chosen], values[chosen]
+        self._sample_keys, self._sample_pos, self._sample_values = keys, pos, values
+
+    # -- results ------------------------------------------------------------
+
+    @property
+    def non_null(self) -> int:
+        return self.rows - self.nulls
+
+    @property
+    def distinct(self) -> int:
+        if self._exact is not None:
+            return len(self._exact)
+        return int(round(self.hll.estimate()))
+
+    @property
+    def distinct_exact(self) -> bool:
+        return self._exact is not None
+
+    @property
+    def null_ratio(self) -> float:
+        return self.nulls / self.rows if self.rows else 0.0
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.numeric_sum / self.numeric_votes if self.numeric_votes else None
+
+    @property
+    def all_numeric(self) -> bool:
+        """True when no non-null value failed to parse as a number."""
+        return self.text_votes == 0
+
+    @property
+    def year_ratio(self) -> float:
+        return self.year_like / self.numeric_votes if self.numeric_votes else 0.0
+
+    def sample(self) -> List[Any]:
+        """Reservoir sample in file order."""
+        order = np.argsort(self._sample_pos, kind="stable")
+        return self._sample_values[order].tolist()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "rows": self.rows,
+            "null_ratio": round(self.null_ratio, 6),
+            "distinct": self.distinct,
+            "distinct_exact": self.distinct_exact,
+            "min": self.numeric_min,
+            "max": self.numeric_max,
+            "mean": self.mean,
+            "type_votes": {
+                "numeric": self.numeric_votes,
+                "text": self.text_votes,
+                "year_like": self.year_like,
+            },
+        }
+
+
+@dataclass
+class StreamProfile:
+    """
+    Result of profile_csv(). When the scan stopped at max_rows, ``complete``
+    is False and ``row_count`` is an estimate (``rows_scanned`` were read).
+    """
+    path: str
+    header_row: int
+    row_count: int
+    columns: List[ColumnSketch]
+    chunks: int
+    elapsed_ms: float
+    complete: bool = True
+    rows_scanned: int = 0
+
+    def column(self, name: str) -> Optional[ColumnSketch]:
+        for sketch in self.columns:
+            if sketch.name == name:
+                return sketch
+        return None
+
+
+# =============================================================================
+# PROFILING
+# =============================================================================
+
+def _offset_after_lines(handle, lines: int) -> int:
+    """Byte offset just past the first ``lines`` newlines of a binary file (or its size)."""
+    handle.seek(0)
+    seen = 0
+    offset = 0
+    while True:
+        block = handle.read(1 << 20)
+        if not block:
+            return offset
+        count = block.count(b"\n")
+        if seen + count >= lines:
+            idx = -1
+            for _ in range(lines - seen):
+                idx = block.index(b"\n", idx + 1)
+            return offset + idx + 1
+        seen += count
+        offset += len(block)
+
+
+class _RangeReader(io.RawIOBase):
+    """Bytes ``[start, end)`` of a file, as a readable binary stream."""
+
+    def __init__(self, path: str, start: int, end: int):
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._left = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer)[: self._left]
+        read = self._file.readinto(view) if len(view) else 0
+        self._left -= read
+        return read
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def _split_offsets(handle, start: int, size: int, parts: int) -> List[int]:
+    """
+    Up to ``parts - 1`` offsets in (start, size) that split the bytes from
+    ``start`` into roughly equal ranges, each just past a newline that is
+    outside any quoted field (an even number of quote characters since
+    ``start``; doubled quotes inside a field count twice).
+    """
+    targets = [start + (size - start) * i // parts for i in range(1, parts)]
+    offsets: List[int] = []
+    handle.seek(start)
+    pos = start
+    quotes = 0
+    while targets:
+        block = handle.read(1 << 20)
+        if not block:
+            break
+        end = pos + len(block)
+        while targets and targets[0] < end:
+            idx = block.find(b"\n", max(0, targets[0] - pos))
+            while idx != -1 and (quotes + block.count(b'"', 0, idx)) % 2:
+                idx = block.find(b"\n", idx + 1)
+            if idx == -1:
+                # No row boundary left in this block: look from the next one
+                targets[0] = end
+                break
+            offset = pos + idx + 1
+            if offset < size and (not offsets or offset > offsets[-1]):
+                offsets.append(offset)
+            targets.pop(0)
+        quotes += block.count(b'"')
+        pos = end
+    return offsets
+
+
+def _parallel_ranges(
+    handle, header_row: int, encoding: str, workers: Optional[int]
+) -> Optional[List[Tuple[int, int]]]:
+    """Byte ranges of the data rows to profile in parallel, or None to scan in one pass."""
+    if codecs.lookup(encoding).name not in ("utf-8", "utf-8-sig", "ascii", "latin-1", "iso8859-1", "cp1252"):
+        # Splitting at b"\n" is only safe where a newline is a single byte
+        return None
+    size = os.fstat(handle.fileno()).st_size
+    if workers is None:
+        workers = int(os.getenv("STREAM_PROFILE_WORKERS", "0")) or os.cpu_count() or 1
+        workers = min(workers, size // PARALLEL_MIN_BYTES)
+    if workers < 2:
+        return None
+    start = _offset_after_lines(handle, header_row + 1)
+    bounds = [start] + _split_offsets(handle, start, size, workers) + [size]
+    ranges = [(a, b) for a, b in zip(bounds[:-1], bounds[1:], strict=True) if b > a]
+    return ranges if len(ranges) > 1 else None
+
+
+def _profile_range(
+    csv_path: str,
+    start: int,
+    end: int,
+    names: List[str],
+    chunk_rows: int,
+    sample_size: int,
+    encoding: str,
+    seed: Tuple[int, int],
+) -> Tuple[int, int, List[ColumnSketch]]:
+    """Worker: (rows, chunks, sketches) of the rows in bytes [start, end), positions from 0."""
+    rng = np.random.default_rng(seed)
+    sketches = [ColumnSketch(name, sample_size=sample_size) for name in names]
+    rows = chunks = 0
+    with io.BufferedReader(_RangeReader(csv_path, start, end), 1 << 20) as stream:
+        reader = pd.read_csv(
+            stream,
+            header=None,
+            names=names,
+            skip_blank_lines=False,
+            encoding=encoding,
+            chunksize=chunk_rows,
+        )
+        with reader:
+            for chunk in reader:
+                chunks += 1
+                for col, sketch in zip(chunk.columns, sketches, strict=True):
+                    sketch.update(chunk[col], rows, rng)
+                rows += len(chunk)
+    return rows, chunks, sketches
+
+
+def _header_columns(csv_path: str, header_row: int, encoding: str) -> List[str]:
+    return [str(c) for c in pd.read_csv(
+        csv_path, header=header_row, nrows=0, skip_blank_lines=False, encoding=encoding
+    ).columns]
+
+
+def _profile_parallel(
+    csv_path: str,
+    ranges: List[Tuple[int, int]],
+    names: List[str],
+    chunk_rows: int,
+    sample_size: int,
+    encoding: str,
+    seed: int,
+) -> Tuple[int, int, Dict[str, ColumnSketch]]:
+    """(rows, chunks, sketches) of all ranges, profiled by one worker process each."""
+    # spawn: forking a threaded server process is not safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(ranges), mp_context=context) as pool:
+        futures = [
+            pool.submit(_profile_range, csv_path, a, b, names, chunk_rows, sample_size, encoding, (seed, i))
+            for i, (a, b) in enumerate(ranges)
+        ]
+        parts = [future.result() for future in futures]
+    sketches = {name: ColumnSketch(name, sample_size=sample_size) for name in names}
+    rows = chunks = 0
+    for part_rows, part_chunks, part_sketches in parts:
+        for sketch in part_sketches:
+            sketches[sketch.name].merge(sketch, row_offset=rows)
+        rows += part_rows
+        chunks += part_chunks
+    return rows, chunks, sketches
+
+
+def profile_csv(
+    csv_path: str,
+    header_row: int = 0,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    encoding: str = "utf-8-sig",
+    seed: int = 0,
+    max_rows: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> StreamProfile:
+    """
+    Profile every row of ``csv_path`` (or the first ``max_rows``) in one
+    chunked pass.
+
+    Reads with the same options analyze_schema() always used (header row,
+    skip_blank_lines=False, BOM-tolerant encoding), so column names and row
+    indexing match the rest of the pipeline. Raises pandas parser errors
+    unchanged.
+
+    Full scans of large files run in ``workers`` processes (default: one
+    per CPU, each with at least PARALLEL_MIN_BYTES); ``workers=1`` forces a
+    single pass. Bounded scans (max_rows) always run in one pass.
+    """
+    if pd is None:
+        raise RuntimeError("pandas is required for data analysis")
+
+    start = time.time()
+    rng = np.random.default_rng(seed)
+    sketches: Dict[str, ColumnSketch] = {}
+    order: List[str] = []
+    rows = 0
+    chunks = 0
+    complete = True
+    row_count = 0
+    chunk_rows = max(1, int(chunk_rows))
+    if max_rows:
+        chunk_rows = min(chunk_rows, int(max_rows))
+
+    with open(csv_path, "rb") as handle:
+        ranges = None if max_rows else _parallel_ranges(handle, header_row, encoding, workers)
+        if ranges:
+            order = _header_columns(csv_path, header_row, encoding)
+            try:
+                rows, chunks, sketches = _profile_parallel(
+                    csv_path, ranges, order, chunk_rows, sample_size, encoding, seed
+                )
+            except (BrokenProcessPool, OSError) as e:
+                logger.warning(f"Parallel profile of {csv_path} failed ({e}); scanning in one pass")
+                ranges = None
+                order = []
+        if not ranges:
+            handle.seek(0)
+            reader = pd.read_csv(
+                handle,
+                header=header_row,
+                skip_blank_lines=False,
+                encoding=encoding,
+                chunksize=chunk_rows,
+            )
+            with reader:
+                for chunk in reader:
+                    chunks += 1
+                    if not order:
+                        order = [str(c) for c in chunk.columns]
+                        sketches = {name: ColumnSketch(name, sample_size=sample_size) for name in order}
+                    for col, name in zip(chunk.columns, order, strict=True):
+                        sketches[name].update(chunk[col], rows, rng)
+                    rows += len(chunk)
+                    if max_rows and rows >= max_rows:
+                        complete = False
+                        break
+            if not complete:
+                # Extrapolate from the bytes the scanned rows took up
+                size = os.fstat(handle.fileno()).st_size
+                data_start = _offset_after_lines(handle, header_row + 1)
+                scanned_end = _offset_after_lines(handle, header_row + 1 + rows)
+                if scanned_end >= size:
+                    complete = True
+                else:
+                    row_bytes = max(1.0, (scanned_end - data_start) / max(1, rows))
+                    row_count = rows + int(round((size - scanned_end) / row_bytes))
+    if complete:
+        row_count = rows
+
+    if not order:
+        # Header only: keep the columns so callers can still report them
+        order = _header_columns(csv_path, header_row, encoding)
+        sketches = {name: ColumnSketch(name, sample_size=sample_size) for name in order}
+
+    elapsed_ms = round((time.time() - start) * 1000, 2)
+    logger.debug(
+        f"Profiled {csv_path}: {rows} rows{'' if complete else f' (of ~{row_count})'}, "
+        f"{len(order)} columns, {chunks} chunks in {elapsed_ms}ms"
+    )
+    return StreamProfile(
+        path=csv_path,
+        header_row=header_row,
+        row_count=row_count,
+        columns=[sketches[name] for name in order],
+        chunks=chunks,
+        elapsed_ms=elapsed_ms,
+        complete=complete,
+        rows_scanned=rows,
+    )
+
+
+__all__ = [
+    "DEFAULT_CHUNK_ROWS",
+    "DEFAULT_SAMPLE_SIZE",
+    "EXACT_DISTINCT_LIMIT",
+    "PARALLEL_MIN_BYTES",
+    "HyperLogLog",
+    "ColumnSketch",
+    "StreamProfile",
+    "profile_csv",
+]
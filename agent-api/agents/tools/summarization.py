@@ -20,12 +20,16 @@ Environment:
 Notes:
 - The function returns plain text (Markdown-friendly).
 - If the SDK call fails, a SummarizationError is raised.
+- Calls go through the shared LLM gateway (pooled client, limits, retries,
+  persistent response cache).
 """
 
 from __future__ import annotations
 
 import os
-from typing import Optional, List
+from typing import Optional
+
+from agents.tools.llm_gateway import LLMGatewayError, get_gateway
 
 
 class SummarizationError(Exception):
@@ -85,31 +89,20 @@ def _call_anthropic(
     api_key: Optional[str],
 ) -> str:
     try:
-        import anthropic
-    except Exception as e:
-        raise SummarizationError(f"Anthropic SDK not available: {e}")
-
-    client = anthropic.Anthropic(api_key=api_key)
-
-    try:
-        resp = client.messages.create(
+        resp = get_gateway(api_key).complete(
+            f"Summarize the following text:\n\n{text}",
             model=model,
             system=system_prompt,
             max_tokens=max_tokens,
             temperature=temperature,
-            messages=[{"role": "user", "content": f"Summarize the following text:\n\n{text}"}],
-        )
-    except Exception as e:
-        raise SummarizationError(f"Anthropic summarization failed: {e}")
-
-    try:
-        blocks: List = resp.content or []
-        out = "".join(
-            getattr(b, "text", "") for b in blocks if getattr(b, "type", "") == "text"
+            accept=lambda summary: bool(summary.strip()),
         )
-    except Exception as e:
-        raise SummarizationError(f"Unexpected Anthropic response format: {e}")
+    except LLMGatewayError as e:
+        if e.kind in ("sdk", "config"):
+            raise SummarizationError(str(e)) from e
+        raise SummarizationError(f"Anthropic summarization failed: {e}") from e
 
+    out = resp.text
     return _postprocess_summary(out)
 
 
@@ -19,6 +19,9 @@ Available Templates:
 - bubble_chart: Bubble chart animations (multi-dimensional data over time)
 - bento_grid: KPI dashboard grid animations
 
+Generators parse the dataset and compute the configuration; the scene logic
+itself lives in agents.tools.scene_runtime, which the generated scene imports.
+
 Usage:
     from agents.tools.templates import generate_bar_race, generate_line_evolution, generate_distribution, generate_bubble_chart, generate_bento_grid
 
@@ -35,6 +35,10 @@ import os
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any, Tuple
 
+from agents.tools.scene_runtime.race_layout import race_layout
+from agents.tools.templates.csv_utils import read_csv_rows
+from agents.tools.templates.scene_data import template_scene_code
+
 # Setup module logger
 logger = logging.getLogger("animation_pipeline.templates.bar_race")
 
@@ -435,20 +439,6 @@ def create_time_display_element(
 # CODE GENERATION
 # =============================================================================
 
-def _format_literal(obj: Any) -> str:
-    """Format Python object as code literal"""
-    if isinstance(obj, str):
-        return repr(obj)
-    elif isinstance(obj, dict):
-        items = ", ".join(f"{_format_literal(k)}: {_format_literal(v)}" for k, v in obj.items())
-        return "{" + items + "}"
-    elif isinstance(obj, (list, tuple)):
-        items = ", ".join(_format_literal(x) for x in obj)
-        return "[" + items + "]"
-    else:
-        return repr(obj)
-
-
 def generate_bar_race(
     spec: object,
     csv_path: str,
@@ -532,17 +522,12 @@ def generate_bar_race(
         NARRATIVE_STYLE_PRESETS[NarrativeStyle.EXPLAINER]
     )
 
-    # Format data literals
-    lit_times = _format_literal(data.times)
-    lit_categories = _format_literal(data.categories)
-    lit_data = _format_literal(data.data)
-    lit_colors = _format_literal(data.category_colors)
 
     # Format insights for highlights
-    lit_insights = _format_literal([
+    insight_items = [
         {"time": i.time, "type": i.insight_type, "desc": i.description, "elements": i.element_ids}
         for i in insights
-    ])
+    ]
 
     # Calculate timing
     intro_duration = pacing["intro_duration"] if include_intro else 0
@@ -559,521 +544,40 @@ def generate_bar_race(
     title = getattr(spec, "title", None) or "Data Race"
     subtitle = getattr(spec, "subtitle", None) or f"{data.times[0]} - {data.times[-1]}"
 
-    # Generate the Manim code
-    code = f'''
-from manim import *
-import math
-
-# =============================================================================
-# BAR RACE ANIMATION - Story-Driven Architecture
-# =============================================================================
-# Generated using the primitives system for modular, narrative animations
-# Theme: {theme}
-# Narrative Style: {narrative_style.value}
-# =============================================================================
-
-# --- Data ---
-TIMES = {lit_times}
-CATEGORIES = {lit_categories}
-DATA = {lit_data}
-COLORS = {lit_colors}
-MAX_VALUE = {data.max_value}
-
-# --- Insights (Auto-Detected) ---
-INSIGHTS = {lit_insights}
-
-# --- Story Configuration ---
-STORY_TITLE = "{title}"
-STORY_SUBTITLE = "{subtitle}"
-INCLUDE_INTRO = {include_intro}
-INCLUDE_CONCLUSION = {include_conclusion}
-
-# --- Timing (Narrative Style: {narrative_style.value}) ---
-INTRO_DURATION = {intro_duration}
-REVEAL_DURATION = {reveal_duration}
-RACE_DURATION = {race_duration}
-OUTRO_DURATION = {outro_duration}
-STEP_TIME = {step_time}
-TOTAL_DURATION = {total_time}
-
-# --- Style Configuration ---
-BG_COLOR = "{bg_color}"
-TEXT_COLOR = "{text_color}"
-TEXT_SECONDARY = "{text_secondary}"
-SURFACE_COLOR = "{surface_color}"
-ACCENT_COLOR = "{accent_color}"
-
-# --- Layout Constants ---
-BAR_HEIGHT = 0.55
-BAR_SPACING = 0.7
-BAR_MAX_WIDTH = 9.0
-LEFT_MARGIN = -5.5
-TOP_Y = 3.0
-CORNER_RADIUS = 0.12
-
-
-# =============================================================================
-# HELPER FUNCTIONS
-# =============================================================================
-
-def get_y_position(rank: int) -> float:
-    """Calculate Y position for a given rank (0 = top)"""
-    return TOP_Y - (rank * BAR_SPACING)
-
-
-def get_bar_width(value: float) -> float:
-    """Calculate bar width proportional to value"""
-    if MAX_VALUE <= 0:
-        return 0.1
-    return max(0.1, (value / MAX_VALUE) * BAR_MAX_WIDTH)
-
-
-def format_value(value: float) -> str:
-    """Format large numbers with K/M/B suffixes"""
-    if value >= 1_000_000_000:
-        return f"{{value / 1_000_000_000:.1f}}B"
-    elif value >= 1_000_000:
-        return f"{{value / 1_000_000:.1f}}M"
-    elif value >= 1_000:
-        return f"{{value / 1_000:.1f}}K"
-    else:
-        return f"{{value:.0f}}"
-
+    # Rank, position and width of every bar at every step, so the scene only
+    # interpolates instead of re-sorting and rebuilding bars per step
+    layout = race_layout(data.times, data.categories, data.data, data.max_value)
 
-def get_insights_for_time(time_key: str) -> list:
-    """Get any insights that should trigger at this time"""
-    return [i for i in INSIGHTS if i["time"] == time_key]
-
-
-# =============================================================================
-# ANIMATION PRIMITIVES
-# =============================================================================
-
-def create_bar_with_label(category: str, value: float, rank: int, color: str):
-    """
-    Create a bar element with its associated labels.
-
-    Returns a dict with bar, name_label, and value_label.
-    """
-    bar_width = get_bar_width(value)
-    y_pos = get_y_position(rank)
-
-    # Bar rectangle with rounded corners
-    bar_rect = RoundedRectangle(
-        corner_radius=CORNER_RADIUS,
-        width=bar_width,
-        height=BAR_HEIGHT,
-        fill_color=color,
-        fill_opacity=0.9,
-        stroke_width=0,
-    )
-    bar_rect.move_to([LEFT_MARGIN + bar_width / 2, y_pos, 0])
-
-    # Category name label
-    name_label = Text(
-        category,
-        font_size=18,
-        color=WHITE if bar_width > 2.5 else TEXT_COLOR,
-        weight=BOLD,
-    )
-    if bar_width > 2.5:
-        name_label.move_to([LEFT_MARGIN + 0.3, y_pos, 0], aligned_edge=LEFT)
-    else:
-        name_label.move_to([LEFT_MARGIN - 0.15, y_pos, 0], aligned_edge=RIGHT)
-
-    # Value label
-    value_label = Text(
-        format_value(value),
-        font_size=16,
-        color=TEXT_COLOR,
-    )
-    value_label.move_to([LEFT_MARGIN + bar_width + 0.25, y_pos, 0], aligned_edge=LEFT)
-
-    return {{
-        "rect": bar_rect,
-        "name": name_label,
-        "value": value_label,
-        "current_rank": rank,
-        "current_value": value,
-    }}
-
-
-def create_emphasis_pulse(mobject, scale_factor=1.15, duration=0.4):
-    """Create a pulse emphasis animation"""
-    return Succession(
-        mobject.animate.scale(scale_factor),
-        mobject.animate.scale(1/scale_factor),
-        run_time=duration,
+    # Generate the Manim code
+    values = {
+        "TIMES": data.times,
+        "CATEGORIES": data.categories,
+        "COLORS": data.category_colors,
+        **layout,
+        "INSIGHTS": insight_items,
+        "STORY_TITLE": title,
+        "STORY_SUBTITLE": subtitle,
+        "INCLUDE_INTRO": include_intro,
+        "INCLUDE_CONCLUSION": include_conclusion,
+        "INTRO_DURATION": intro_duration,
+        "REVEAL_DURATION": reveal_duration,
+        "RACE_DURATION": race_duration,
+        "OUTRO_DURATION": outro_duration,
+        "STEP_TIME": step_time,
+        "TOTAL_DURATION": total_time,
+        "BG_COLOR": bg_color,
+        "TEXT_COLOR": text_color,
+        "TEXT_SECONDARY": text_secondary,
+        "SURFACE_COLOR": surface_color,
+        "ACCENT_COLOR": accent_color,
+    }
+    code = template_scene_code(
+        "bar_race",
+        "BarRaceScene",
+        values,
+        comment=f"Theme: {theme}\nNarrative Style: {narrative_style.value}",
     )
 
-
-# =============================================================================
-# SCENE CLASSES
-# =============================================================================
-
-class GenScene(Scene):
-    """
-    Story-driven bar race animation.
-
-    Structure:
-    1. INTRO: Title and subtitle fade in
-    2. REVEAL: Bars appear with staggered animation
-    3. RACE: Main data animation with time progression
-    4. HIGHLIGHTS: Auto-detected insights emphasized
-    5. CONCLUSION: Final state with winner emphasis
-    """
-
-    def construct(self):
-        # Set background
-        self.camera.background_color = BG_COLOR
-
-        # Track active elements
-        self.bars = {{}}
-        self.time_display = None
-        self.title_group = None
-
-        # Run story scenes
-        if INCLUDE_INTRO:
-            self.scene_intro()
-
-        self.scene_reveal()
-        self.scene_race()
-
-        if INCLUDE_CONCLUSION:
-            self.scene_conclusion()
-
-    # -------------------------------------------------------------------------
-    # SCENE 1: INTRO
-    # -------------------------------------------------------------------------
-    def scene_intro(self):
-        """
-        Opening scene with title and subtitle.
-
-        Sets the stage and hooks the viewer.
-        """
-        # Create title
-        title = Text(
-            STORY_TITLE,
-            font_size=56,
-            color=TEXT_COLOR,
-            weight=BOLD,
-        )
-        title.move_to([0, 0.5, 0])
-
-        # Create subtitle
-        subtitle = Text(
-            STORY_SUBTITLE,
-            font_size=28,
-            color=TEXT_SECONDARY,
-        )
-        subtitle.move_to([0, -0.3, 0])
-        subtitle.set_opacity(0.8)
-
-        self.title_group = VGroup(title, subtitle)
-
-        # Animate entrance
-        self.play(
-            FadeIn(title, shift=UP * 0.3),
-            run_time=0.8,
-            rate_func=smooth,
-        )
-        self.play(
-            FadeIn(subtitle, shift=UP * 0.2),
-            run_time=0.5,
-            rate_func=smooth,
-        )
-
-        # Hold
-        self.wait(INTRO_DURATION - 1.3)
-
-        # Fade out
-        self.play(
-            FadeOut(self.title_group, shift=UP * 0.5),
-            run_time=0.5,
-        )
-
-    # -------------------------------------------------------------------------
-    # SCENE 2: REVEAL
-    # -------------------------------------------------------------------------
-    def scene_reveal(self):
-        """
-        Data reveal scene where bars first appear.
-
-        Uses staggered animation for visual interest.
-        """
-        t0 = TIMES[0]
-
-        # Create time display
-        self.time_display = Text(
-            str(t0),
-            font_size=72,
-            weight=BOLD,
-            color=TEXT_SECONDARY,
-        )
-        self.time_display.to_corner(DR, buff=0.8)
-        self.time_display.set_opacity(0.8)
-
-        # Get initial ranking
-        initial_ranking = sorted(
-            [(cat, DATA[t0].get(cat, 0)) for cat in CATEGORIES],
-            key=lambda x: x[1],
-            reverse=True
-        )
-
-        # Create bars
-        bar_anims = []
-        for rank, (category, value) in enumerate(initial_ranking):
-            bar_data = create_bar_with_label(
-                category=category,
-                value=value,
-                rank=rank,
-                color=COLORS.get(category, "#6366F1"),
-            )
-
-            self.bars[category] = bar_data
-
-            # Add to scene (hidden initially)
-            bar_group = VGroup(bar_data["rect"], bar_data["name"], bar_data["value"])
-            bar_group.set_opacity(0)
-            self.add(bar_group)
-
-            # Create entrance animation with stagger
-            bar_anims.append(
-                bar_group.animate.set_opacity(1)
-            )
-
-        # Animate time display
-        self.play(
-            FadeIn(self.time_display),
-            run_time=0.3,
-        )
-
-        # Staggered bar entrance
-        self.play(
-            LaggedStart(
-                *[GrowFromEdge(self.bars[cat]["rect"], LEFT) for cat in [x[0] for x in initial_ranking]],
-                lag_ratio=0.08,
-            ),
-            LaggedStart(
-                *[FadeIn(self.bars[cat]["name"]) for cat in [x[0] for x in initial_ranking]],
-                lag_ratio=0.08,
-            ),
-            LaggedStart(
-                *[FadeIn(self.bars[cat]["value"]) for cat in [x[0] for x in initial_ranking]],
-                lag_ratio=0.08,
-            ),
-            run_time=REVEAL_DURATION,
-            rate_func=smooth,
-        )
-
-        self.wait(0.3)
-
-    # -------------------------------------------------------------------------
-    # SCENE 3: RACE
-    # -------------------------------------------------------------------------
-    def scene_race(self):
-        """
-        Main data animation scene.
-
-        Bars animate through time with smooth transitions.
-        Highlights are shown when insights are detected.
-        """
-        prev_leader = None
-
-        for step_idx in range(1, len(TIMES)):
-            t_current = TIMES[step_idx]
-
-            # Check for insights at this time
-            current_insights = get_insights_for_time(t_current)
-
-            # Calculate new rankings
-            new_ranking = sorted(
-                [(cat, DATA[t_current].get(cat, 0)) for cat in CATEGORIES],
-                key=lambda x: x[1],
-                reverse=True
-            )
-
-            current_leader = new_ranking[0][0] if new_ranking else None
-            leader_changed = prev_leader and current_leader != prev_leader
-
-            animations = []
-
-            # Update time display
-            new_time_display = Text(
-                str(t_current),
-                font_size=72,
-                weight=BOLD,
-                color=ACCENT_COLOR if leader_changed else TEXT_SECONDARY,
-            )
-            new_time_display.to_corner(DR, buff=0.8)
-            new_time_display.set_opacity(0.8)
-            animations.append(Transform(self.time_display, new_time_display))
-
-            # Update each bar
-            for new_rank, (category, new_value) in enumerate(new_ranking):
-                bar_data = self.bars[category]
-                bar_rect = bar_data["rect"]
-                name_label = bar_data["name"]
-                value_label = bar_data["value"]
-
-                new_width = get_bar_width(new_value)
-                new_y = get_y_position(new_rank)
-
-                # Create new bar state
-                new_bar = RoundedRectangle(
-                    corner_radius=CORNER_RADIUS,
-                    width=new_width,
-                    height=BAR_HEIGHT,
-                    fill_color=COLORS.get(category, "#6366F1"),
-                    fill_opacity=0.9,
-                    stroke_width=0,
-                )
-                new_bar.move_to([LEFT_MARGIN + new_width / 2, new_y, 0])
-                animations.append(Transform(bar_rect, new_bar))
-
-                # Update name label
-                new_name = Text(
-                    category,
-                    font_size=18,
-                    color=WHITE if new_width > 2.5 else TEXT_COLOR,
-                    weight=BOLD,
-                )
-                if new_width > 2.5:
-                    new_name.move_to([LEFT_MARGIN + 0.3, new_y, 0], aligned_edge=LEFT)
-                else:
-                    new_name.move_to([LEFT_MARGIN - 0.15, new_y, 0], aligned_edge=RIGHT)
-                animations.append(Transform(name_label, new_name))
-
-                # Update value label
-                new_value_label = Text(
-                    format_value(new_value),
-                    font_size=16,
-                    color=TEXT_COLOR,
-                )
-                new_value_label.move_to([LEFT_MARGIN + new_width + 0.25, new_y, 0], aligned_edge=LEFT)
-                animations.append(Transform(value_label, new_value_label))
-
-                # Update tracking
-                bar_data["current_rank"] = new_rank
-                bar_data["current_value"] = new_value
-
-            # Play animations
-            self.play(
-                *animations,
-                run_time=STEP_TIME,
-                rate_func=smooth,
-            )
-
-            # Show highlight for leader change
-            if leader_changed and current_leader:
-                self.show_highlight(
-                    category=current_leader,
-                    text=f"{{current_leader}} takes the lead!",
-                )
-
-            prev_leader = current_leader
-
-    def show_highlight(self, category: str, text: str):
-        """Show a highlight annotation for an insight"""
-        bar_data = self.bars.get(category)
-        if not bar_data:
-            return
-
-        # Create annotation
-        annotation = Text(
-            text,
-            font_size=24,
-            color=ACCENT_COLOR,
-            weight=BOLD,
-        )
-        annotation.to_edge(UP, buff=0.5)
-
-        # Animate
-        self.play(
-            FadeIn(annotation, shift=DOWN * 0.3),
-            bar_data["rect"].animate.set_stroke(color=ACCENT_COLOR, width=3),
-            run_time=0.3,
-        )
-
-        self.wait(0.5)
-
-        self.play(
-            FadeOut(annotation),
-            bar_data["rect"].animate.set_stroke(width=0),
-            run_time=0.3,
-        )
-
-    # -------------------------------------------------------------------------
-    # SCENE 4: CONCLUSION
-    # -------------------------------------------------------------------------
-    def scene_conclusion(self):
-        """
-        Closing scene with final state emphasis.
-
-        Highlights the winner and provides closure.
-        """
-        # Get final leader
-        final_t = TIMES[-1]
-        final_ranking = sorted(
-            [(cat, DATA[final_t].get(cat, 0)) for cat in CATEGORIES],
-            key=lambda x: x[1],
-            reverse=True
-        )
-
-        if not final_ranking:
-            self.wait(OUTRO_DURATION)
-            return
-
-        winner = final_ranking[0][0]
-        winner_value = final_ranking[0][1]
-        winner_bar = self.bars.get(winner, {{}}).get("rect")
-
-        # Dim other bars
-        dim_anims = []
-        for cat, bar_data in self.bars.items():
-            if cat != winner:
-                dim_anims.append(bar_data["rect"].animate.set_opacity(0.3))
-                dim_anims.append(bar_data["name"].animate.set_opacity(0.3))
-                dim_anims.append(bar_data["value"].animate.set_opacity(0.3))
-
-        if dim_anims:
-            self.play(*dim_anims, run_time=0.5)
-
-        # Emphasize winner
-        if winner_bar:
-            self.play(
-                winner_bar.animate.set_stroke(color=ACCENT_COLOR, width=4),
-                run_time=0.3,
-            )
-
-            # Glow effect
-            glow = winner_bar.copy()
-            glow.set_stroke(color=ACCENT_COLOR, width=8, opacity=0.5)
-            glow.scale(1.05)
-
-            self.play(
-                FadeIn(glow),
-                run_time=0.3,
-            )
-
-        # Final title
-        final_title = Text(
-            f"Winner: {{winner}}",
-            font_size=36,
-            color=ACCENT_COLOR,
-            weight=BOLD,
-        )
-        final_title.to_edge(UP, buff=0.8)
-
-        self.play(
-            FadeIn(final_title, shift=DOWN * 0.3),
-            run_time=0.5,
-        )
-
-        # Hold final frame
-        self.wait(OUTRO_DURATION - 1.3)
-'''
-
     return code.strip()
 
 
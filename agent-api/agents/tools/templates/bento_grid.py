@@ -38,7 +38,7 @@ import csv
 import math
 import os
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 # Import primitives
 from agents.tools.primitives.elements import (
@@ -64,6 +64,8 @@ from agents.tools.primitives.composer import (
     NarrativeStyle,
     NARRATIVE_STYLE_PRESETS,
 )
+from agents.tools.templates.csv_utils import read_csv_rows
+from agents.tools.templates.scene_data import template_scene_code
 
 # Import styles
 try:
@@ -362,22 +364,6 @@ def detect_insights(data: BentoGridData) -> List[BentoInsight]:
 # CODE GENERATION
 # =============================================================================
 
-def _format_literal(obj: Any) -> str:
-    """Format Python object as code literal"""
-    if isinstance(obj, str):
-        return repr(obj)
-    elif isinstance(obj, dict):
-        items = ", ".join(f"{_format_literal(k)}: {_format_literal(v)}" for k, v in obj.items())
-        return "{" + items + "}"
-    elif isinstance(obj, (list, tuple)):
-        items = ", ".join(_format_literal(x) for x in obj)
-        return "[" + items + "]"
-    elif obj is None:
-        return "None"
-    else:
-        return repr(obj)
-
-
 def _calculate_grid_layout(n: int) -> Tuple[int, int]:
     """Calculate optimal grid rows and columns for n items"""
     if n == 1:
@@ -505,18 +491,16 @@ def generate_bento_grid(
         })
 
     # Format insights
-    lit_insights = _format_literal([
+    insight_items = [
         {"index": i.index, "label": i.label, "type": i.insight_type, "desc": i.description}
         for i in insights
-    ])
+    ]
 
     # Calculate grid layout
     n_items = len(items_data)
     rows, cols = _calculate_grid_layout(n_items)
 
     # Format literals
-    lit_items = _format_literal(items_data)
-    lit_chart_colors = _format_literal(chart_colors)
 
     # Calculate timing
     intro_duration = pacing["intro_duration"] if include_intro else 0
@@ -528,386 +512,36 @@ def generate_bento_grid(
     hold_time = max(1.0, hold_time)
 
     # Generate the Manim code
-    code = f'''
-from manim import *
-import math
-
-# =============================================================================
-# BENTO GRID KPI DASHBOARD - Story-Driven Architecture
-# =============================================================================
-# Generated using the primitives system for modular, narrative animations
-# Theme: {theme}
-# Narrative Style: {narrative_style.value}
-# =============================================================================
-
-# --- Data ---
-KPI_ITEMS = {lit_items}
-GRID_ROWS = {rows}
-GRID_COLS = {cols}
-
-# --- Insights (Auto-Detected) ---
-INSIGHTS = {lit_insights}
-
-# --- Story Configuration ---
-STORY_TITLE = "{title}"
-STORY_SUBTITLE = {repr(subtitle) if subtitle else 'None'}
-INCLUDE_INTRO = {include_intro}
-INCLUDE_CONCLUSION = {include_conclusion}
-
-# --- Timing (Narrative Style: {narrative_style.value}) ---
-INTRO_DURATION = {intro_duration}
-REVEAL_DURATION = {reveal_duration}
-COUNT_DURATION = {count_time}
-HOLD_DURATION = {hold_time}
-OUTRO_DURATION = {outro_duration}
-TOTAL_DURATION = {total_time}
-
-# --- Style Configuration ---
-BG_COLOR = "{bg_color}"
-TEXT_COLOR = "{text_color}"
-TEXT_SECONDARY = "{text_secondary}"
-SURFACE_COLOR = "{surface_color}"
-ACCENT_COLOR = "{accent_color}"
-SUCCESS_COLOR = "{success_color}"
-ERROR_COLOR = "{error_color}"
-CHART_COLORS = {lit_chart_colors}
-
-# --- Layout Constants ---
-CARD_WIDTH = 3.8
-CARD_HEIGHT = 2.4
-CARD_SPACING = 0.35
-CORNER_RADIUS = 0.2
-
-
-# =============================================================================
-# HELPER FUNCTIONS
-# =============================================================================
-
-def format_display_number(value: float, prefix: str = "", suffix: str = "") -> str:
-    """Format number with K/M/B suffixes and prefix/suffix"""
-    abs_val = abs(value)
-    sign = "-" if value < 0 else ""
-
-    if abs_val >= 1_000_000_000:
-        formatted = f"{{abs_val / 1_000_000_000:.1f}}B"
-    elif abs_val >= 1_000_000:
-        formatted = f"{{abs_val / 1_000_000:.1f}}M"
-    elif abs_val >= 1_000:
-        formatted = f"{{abs_val / 1_000:.1f}}K"
-    elif abs_val >= 100:
-        formatted = f"{{abs_val:.0f}}"
-    elif abs_val >= 1:
-        formatted = f"{{abs_val:.1f}}"
-    elif abs_val > 0:
-        formatted = f"{{abs_val:.2f}}"
-    else:
-        formatted = "0"
-
-    return f"{{sign}}{{prefix}}{{formatted}}{{suffix}}"
-
-
-def get_decimal_places(value: float) -> int:
-    """Determine appropriate decimal places for value"""
-    abs_val = abs(value)
-    if abs_val >= 1000:
-        return 0
-    elif abs_val >= 10:
-        return 1
-    elif abs_val >= 1:
-        return 1
-    else:
-        return 2
-
-
-def get_top_performer_index() -> int:
-    """Get the index of the top performer from insights"""
-    for insight in INSIGHTS:
-        if insight["type"] == "top_performer":
-            return insight["index"]
-    return 0
-
-
-# =============================================================================
-# SCENE CLASS
-# =============================================================================
-
-class GenScene(Scene):
-    """
-    Story-driven bento grid KPI dashboard animation.
-
-    Structure:
-    1. INTRO: Title and subtitle fade in
-    2. REVEAL: Cards appear with staggered animation
-    3. COUNT: Values count up with animated numbers
-    4. HIGHLIGHTS: Top performer emphasized
-    5. CONCLUSION: Hold and optional shimmer effect
-    """
-
-    def construct(self):
-        # Set background
-        self.camera.background_color = BG_COLOR
-
-        if not KPI_ITEMS:
-            no_data = Text("No data available", color=TEXT_COLOR, font_size=36)
-            self.play(Write(no_data))
-            return
-
-        # Track elements
-        self.title_group = None
-        self.cards = None
-        self.value_trackers = []
-
-        # Run story scenes
-        if INCLUDE_INTRO:
-            self.scene_intro()
-
-        self.scene_reveal()
-        self.scene_count()
-
-        if INCLUDE_CONCLUSION:
-            self.scene_conclusion()
-
-    # -------------------------------------------------------------------------
-    # SCENE 1: INTRO
-    # -------------------------------------------------------------------------
-    def scene_intro(self):
-        """Opening scene with title and subtitle."""
-        # Create title
-        title = Text(
-            STORY_TITLE,
-            font_size=56,
-            color=TEXT_COLOR,
-            weight=BOLD,
-        )
-        title.move_to([0, 0.5, 0])
-
-        # Create subtitle
-        subtitle_text = None
-        if STORY_SUBTITLE:
-            subtitle_text = Text(
-                STORY_SUBTITLE,
-                font_size=28,
-                color=TEXT_SECONDARY,
-            )
-            subtitle_text.move_to([0, -0.3, 0])
-            subtitle_text.set_opacity(0.8)
-
-        title_group = VGroup(title)
-        if subtitle_text:
-            title_group.add(subtitle_text)
-
-        # Animate entrance
-        self.play(
-            FadeIn(title, shift=UP * 0.3),
-            run_time=0.8,
-            rate_func=smooth,
-        )
-
-        if subtitle_text:
-            self.play(
-                FadeIn(subtitle_text, shift=UP * 0.2),
-                run_time=0.5,
-                rate_func=smooth,
-            )
-
-        # Hold
-        self.wait(INTRO_DURATION - 1.8)
-
-        # Fade out
-        self.play(
-            FadeOut(title_group, shift=UP * 0.5),
-            run_time=0.5,
-        )
-
-    # -------------------------------------------------------------------------
-    # SCENE 2: REVEAL
-    # -------------------------------------------------------------------------
-    def scene_reveal(self):
-        """Reveal cards with staggered animation."""
-        self.cards = VGroup()
-        self.value_trackers = []
-
-        for i, item in enumerate(KPI_ITEMS):
-            label = item["label"]
-            target_value = item["value"]
-            change = item["change"]
-            prefix = item["prefix"]
-            suffix = item["suffix"]
-            card_color = item["color"]
-
-            # Card Background (Glassmorphism)
-            card_bg = RoundedRectangle(
-                corner_radius=CORNER_RADIUS,
-                width=CARD_WIDTH,
-                height=CARD_HEIGHT,
-                fill_color=SURFACE_COLOR,
-                fill_opacity=0.6,
-                stroke_color=card_color,
-                stroke_width=2,
-                stroke_opacity=0.8,
-            )
-
-            # Subtle gradient overlay (top highlight)
-            highlight = RoundedRectangle(
-                corner_radius=CORNER_RADIUS,
-                width=CARD_WIDTH,
-                height=CARD_HEIGHT * 0.3,
-                fill_opacity=0.08,
-                stroke_width=0,
-            )
-            highlight.set_fill(WHITE)
-            highlight.align_to(card_bg, UP)
-            highlight.shift(DOWN * 0.02)
-
-            # Label (Top of card)
-            label_text = Text(
-                str(label).upper(),
-                font_size=16,
-                weight=BOLD,
-                color=TEXT_SECONDARY,
-            )
-            label_text.move_to(card_bg.get_top() + DOWN * 0.45)
-
-            # Value (Center, large)
-            decimal_places = get_decimal_places(target_value)
-
-            value_display = DecimalNumber(
-                0,
-                num_decimal_places=decimal_places,
-                font_size=48,
-                color=TEXT_COLOR,
-            )
-            value_display.move_to(card_bg.get_center() + UP * 0.1)
-
-            # Change Indicator (Bottom of card)
-            change_group = None
-            if change is not None:
-                is_positive = change >= 0
-                change_color = SUCCESS_COLOR if is_positive else ERROR_COLOR
-                arrow_char = "▲" if is_positive else "▼"
-                change_str = f"{{arrow_char}} {{abs(change):.1f}}%"
-
-                change_text = Text(
-                    change_str,
-                    font_size=16,
-                    color=change_color,
-                )
-                change_text.move_to(card_bg.get_bottom() + UP * 0.45)
-                change_group = change_text
-
-            # Accent bar at bottom
-            accent_bar = Rectangle(
-                width=CARD_WIDTH * 0.3,
-                height=0.06,
-                fill_color=card_color,
-                fill_opacity=0.9,
-                stroke_width=0,
-            )
-            accent_bar.move_to(card_bg.get_bottom() + UP * 0.12)
-
-            # Assemble Card
-            card_elements = VGroup(card_bg, highlight, label_text, value_display, accent_bar)
-            if change_group:
-                card_elements.add(change_group)
-
-            self.cards.add(card_elements)
-
-            # Setup value tracker for counting animation
-            tracker = ValueTracker(0)
-            self.value_trackers.append((tracker, target_value, value_display))
-
-            # Add updater to animate the number
-            def make_updater(dec_mob, trk, card_center):
-                def updater(m):
-                    m.set_value(trk.get_value())
-                    m.move_to(card_center + UP * 0.1)
-                return updater
-
-            value_display.add_updater(
-                make_updater(value_display, tracker, card_bg.get_center())
-            )
-
-        # Arrange Grid
-        self.cards.arrange_in_grid(
-            rows=GRID_ROWS,
-            cols=GRID_COLS,
-            buff=CARD_SPACING,
-        )
-
-        # Scale to fit screen if needed
-        max_width = config.frame_width - 1.5
-        max_height = config.frame_height - 1.5
-
-        if self.cards.width > max_width:
-            self.cards.scale_to_fit_width(max_width)
-        if self.cards.height > max_height:
-            self.cards.scale_to_fit_height(max_height)
-
-        self.cards.move_to(ORIGIN)
-
-        # Staggered entrance
-        card_anims = []
-        for card in self.cards:
-            card_anims.append(FadeIn(card, shift=UP * 0.3, scale=0.92))
-
-        self.play(
-            LaggedStart(*card_anims, lag_ratio=0.08),
-            run_time=REVEAL_DURATION,
-        )
-
-        self.wait(0.2)
-
-    # -------------------------------------------------------------------------
-    # SCENE 3: COUNT
-    # -------------------------------------------------------------------------
-    def scene_count(self):
-        """Animate values counting up."""
-        count_anims = []
-        for tracker, target, _ in self.value_trackers:
-            count_anims.append(tracker.animate.set_value(target))
-
-        self.play(
-            *count_anims,
-            run_time=COUNT_DURATION,
-            rate_func=rate_functions.ease_out_cubic,
-        )
-
-        self.wait(0.3)
-
-    # -------------------------------------------------------------------------
-    # SCENE 4: CONCLUSION
-    # -------------------------------------------------------------------------
-    def scene_conclusion(self):
-        """Closing scene with highlights and hold."""
-        # Highlight top performer
-        top_idx = get_top_performer_index()
-        if top_idx < len(self.cards):
-            top_card_bg = self.cards[top_idx][0]
-            self.play(
-                top_card_bg.animate.set_stroke(color=ACCENT_COLOR, width=4),
-                run_time=0.4,
-            )
-
-        # Hold
-        self.wait(HOLD_DURATION * 0.5)
-
-        # Shimmer effect across all cards
-        if len(self.cards) > 1:
-            shimmer_anims = []
-            for i, card in enumerate(self.cards):
-                card_bg = card[0]
-                shimmer_anims.append(
-                    Succession(
-                        Wait(i * 0.08),
-                        card_bg.animate(rate_func=there_and_back, run_time=0.3).set_stroke(opacity=1.0),
-                    )
-                )
-
-            self.play(*shimmer_anims)
-
-        # Final hold
-        self.wait(OUTRO_DURATION - 0.5)
-'''
+    values = {
+        "KPI_ITEMS": items_data,
+        "GRID_ROWS": rows,
+        "GRID_COLS": cols,
+        "INSIGHTS": insight_items,
+        "STORY_TITLE": title,
+        "STORY_SUBTITLE": subtitle or None,
+        "INCLUDE_INTRO": include_intro,
+        "INCLUDE_CONCLUSION": include_conclusion,
+        "INTRO_DURATION": intro_duration,
+        "REVEAL_DURATION": reveal_duration,
+        "COUNT_DURATION": count_time,
+        "HOLD_DURATION": hold_time,
+        "OUTRO_DURATION": outro_duration,
+        "TOTAL_DURATION": total_time,
+        "BG_COLOR": bg_color,
+        "TEXT_COLOR": text_color,
+        "TEXT_SECONDARY": text_secondary,
+        "SURFACE_COLOR": surface_color,
+        "ACCENT_COLOR": accent_color,
+        "SUCCESS_COLOR": success_color,
+        "ERROR_COLOR": error_color,
+        "CHART_COLORS": chart_colors,
+    }
+    code = template_scene_code(
+        "bento_grid",
+        "BentoGridScene",
+        values,
+        comment=f"Theme: {theme}\nNarrative Style: {narrative_style.value}",
+    )
 
     return code.strip()
 
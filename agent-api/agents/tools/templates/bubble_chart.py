@@ -39,7 +39,10 @@ import logging
 import math
 import os
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from agents.tools.templates.csv_utils import read_csv_rows
+from agents.tools.templates.scene_data import template_scene_code
 
 # Setup module logger
 logger = logging.getLogger("animation_pipeline.templates.bubble_chart")
@@ -398,20 +401,6 @@ def detect_insights(data: BubbleChartData) -> List[BubbleInsight]:
 # CODE GENERATION
 # =============================================================================
 
-def _format_literal(obj: Any) -> str:
-    """Format Python object as code literal"""
-    if isinstance(obj, str):
-        return repr(obj)
-    elif isinstance(obj, dict):
-        items = ", ".join(f"{_format_literal(k)}: {_format_literal(v)}" for k, v in obj.items())
-        return "{" + items + "}"
-    elif isinstance(obj, (list, tuple)):
-        items = ", ".join(_format_literal(x) for x in obj)
-        return "[" + items + "]"
-    else:
-        return repr(obj)
-
-
 def generate_bubble_chart(
     spec: object,
     csv_path: str,
@@ -520,19 +509,12 @@ def generate_bubble_chart(
         NARRATIVE_STYLE_PRESETS[NarrativeStyle.EXPLAINER]
     )
 
-    # Format data literals
-    lit_times = _format_literal(data.times)
-    lit_entities = _format_literal(data.entities)
-    lit_groups = _format_literal(data.groups)
-    lit_entity_group = _format_literal(data.entity_group)
-    lit_data = _format_literal(data.data)
-    lit_group_colors = _format_literal(data.group_colors)
 
     # Format insights
-    lit_insights = _format_literal([
+    insight_items = [
         {"time": i.time, "entity": i.entity, "type": i.insight_type, "desc": i.description}
         for i in insights
-    ])
+    ]
 
     # Calculate timing
     intro_duration = pacing["intro_duration"] if include_intro else 0
@@ -569,532 +551,51 @@ def generate_bubble_chart(
     subtitle = getattr(spec, "subtitle", None) or f"{data.times[0]} - {data.times[-1]}" if len(data.times) > 1 else ""
 
     # Generate the Manim code
-    code = f'''
-from manim import *
-import math
-
-# =============================================================================
-# BUBBLE CHART ANIMATION - Story-Driven Architecture
-# =============================================================================
-# Generated using the primitives system for modular, narrative animations
-# Theme: {theme}
-# Narrative Style: {narrative_style.value}
-# =============================================================================
-
-# --- Data ---
-TIMES = {lit_times}
-ENTITIES = {lit_entities}
-GROUPS = {lit_groups}
-ENTITY_GROUP = {lit_entity_group}
-DATA = {lit_data}
-GROUP_COLORS = {lit_group_colors}
-
-# --- Insights (Auto-Detected) ---
-INSIGHTS = {lit_insights}
-
-# --- Story Configuration ---
-STORY_TITLE = "{title}"
-STORY_SUBTITLE = "{subtitle}"
-INCLUDE_INTRO = {include_intro}
-INCLUDE_CONCLUSION = {include_conclusion}
-
-# --- Timing (Narrative Style: {narrative_style.value}) ---
-INTRO_DURATION = {intro_duration}
-REVEAL_DURATION = {reveal_duration}
-EVOLUTION_DURATION = {evolution_duration}
-OUTRO_DURATION = {outro_duration}
-PER_STEP_TIME = {per_step_time}
-TOTAL_DURATION = {total_time}
-
-# --- Axis Configuration ---
-X_MIN, X_MAX = {x_min}, {x_max}
-Y_MIN, Y_MAX = {y_min}, {y_max}
-X_STEP = {x_step}
-Y_STEP = {y_step}
-X_LABEL = "{x_label or 'X Axis'}"
-Y_LABEL = "{y_label or 'Y Axis'}"
-X_DECIMALS = {x_decimals}
-Y_DECIMALS = {y_decimals}
-
-# --- Radius Configuration ---
-R_MIN, R_MAX = {r_min}, {r_max}
-RADIUS_MIN = 0.08
-RADIUS_MAX = 0.65
-
-# --- Style Configuration ---
-BG_COLOR = "{bg_color}"
-TEXT_COLOR = "{text_color}"
-TEXT_SECONDARY = "{text_secondary}"
-ACCENT_COLOR = "{accent_color}"
-SURFACE_COLOR = "{surface_color}"
-FILL_OPACITY = {fill_opacity}
-SHOW_LABELS = {show_labels}
-SHOW_LEGEND = {show_legend}
-
-# --- Layout Constants ---
-CHART_WIDTH = 10.0
-CHART_HEIGHT = 6.0
-
-
-# =============================================================================
-# HELPER FUNCTIONS
-# =============================================================================
-
-def compute_radius(r_value: float) -> float:
-    """Convert data value to visual radius using sqrt scaling (area-proportional)."""
-    r_min_safe = max(R_MIN, 1e-9)
-    r_max_safe = max(R_MAX, r_min_safe + 1e-9)
-
-    sqrt_val = math.sqrt(max(r_value, 0))
-    sqrt_min = math.sqrt(r_min_safe)
-    sqrt_max = math.sqrt(r_max_safe)
-
-    if sqrt_max <= sqrt_min:
-        return 0.5 * (RADIUS_MIN + RADIUS_MAX)
-
-    t = (sqrt_val - sqrt_min) / (sqrt_max - sqrt_min)
-    t = max(0.0, min(1.0, t))
-
-    return RADIUS_MIN + t * (RADIUS_MAX - RADIUS_MIN)
-
-
-def format_axis_number(value: float, decimals: int = 0) -> str:
-    """Format large numbers with K/M/B suffixes"""
-    abs_val = abs(value)
-    sign = "-" if value < 0 else ""
-
-    if abs_val >= 1_000_000_000:
-        return f"{{sign}}{{abs_val / 1_000_000_000:.{{decimals}}f}}B"
-    elif abs_val >= 1_000_000:
-        return f"{{sign}}{{abs_val / 1_000_000:.{{decimals}}f}}M"
-    elif abs_val >= 1_000:
-        return f"{{sign}}{{abs_val / 1_000:.{{decimals}}f}}K"
-    else:
-        if decimals == 0 and abs_val == int(abs_val):
-            return f"{{sign}}{{int(abs_val)}}"
-        return f"{{sign}}{{abs_val:.{{decimals}}f}}"
-
-
-def get_entity_color(entity: str) -> str:
-    """Get color for entity based on its group"""
-    group = ENTITY_GROUP.get(entity, "ALL")
-    return GROUP_COLORS.get(group, "#6366F1")
-
-
-def get_insight_at_time(time_key: str):
-    """Get insight at a specific time, if any"""
-    for insight in INSIGHTS:
-        if insight["time"] == time_key:
-            return insight
-    return None
-
-
-# =============================================================================
-# SCENE CLASS
-# =============================================================================
-
-class GenScene(Scene):
-    """
-    Story-driven bubble chart animation.
-
-    Structure:
-    1. INTRO: Title and subtitle fade in
-    2. REVEAL: Axes and bubbles appear
-    3. EVOLUTION: Bubbles animate through time
-    4. HIGHLIGHTS: Insights emphasized during evolution
-    5. CONCLUSION: Final state with leader emphasis
-    """
-
-    def construct(self):
-        # Set background
-        self.camera.background_color = BG_COLOR
-
-        if not TIMES or not ENTITIES:
-            no_data = Text("No data available", color=TEXT_COLOR, font_size=36)
-            self.play(Write(no_data))
-            return
-
-        # Track elements
-        self.axes = None
-        self.bubbles = {{}}
-        self.time_display = None
-        self.legend = None
-
-        # Run story scenes
-        if INCLUDE_INTRO:
-            self.scene_intro()
-
-        self.scene_reveal()
-        self.scene_evolution()
-
-        if INCLUDE_CONCLUSION:
-            self.scene_conclusion()
-
-    # -------------------------------------------------------------------------
-    # SCENE 1: INTRO
-    # -------------------------------------------------------------------------
-    def scene_intro(self):
-        """Opening scene with title and subtitle."""
-        title = Text(
-            STORY_TITLE,
-            font_size=56,
-            color=TEXT_COLOR,
-            weight=BOLD,
-        )
-        title.move_to([0, 0.5, 0])
-
-        subtitle = Text(
-            STORY_SUBTITLE,
-            font_size=28,
-            color=TEXT_SECONDARY,
-        )
-        subtitle.move_to([0, -0.3, 0])
-        subtitle.set_opacity(0.8)
-
-        title_group = VGroup(title, subtitle)
-
-        self.play(
-            FadeIn(title, shift=UP * 0.3),
-            run_time=0.8,
-            rate_func=smooth,
-        )
-        self.play(
-            FadeIn(subtitle, shift=UP * 0.2),
-            run_time=0.5,
-            rate_func=smooth,
-        )
-
-        self.wait(INTRO_DURATION - 1.8)
-
-        self.play(
-            FadeOut(title_group, shift=UP * 0.5),
-            run_time=0.5,
-        )
-
-    # -------------------------------------------------------------------------
-    # SCENE 2: REVEAL
-    # -------------------------------------------------------------------------
-    def scene_reveal(self):
-        """Reveal axes, legend, and initial bubbles."""
-        # Create Axes
-        self.axes = Axes(
-            x_range=[X_MIN, X_MAX, X_STEP],
-            y_range=[Y_MIN, Y_MAX, Y_STEP],
-            x_length=CHART_WIDTH,
-            y_length=CHART_HEIGHT,
-            axis_config={{
-                "color": TEXT_SECONDARY,
-                "stroke_width": 2,
-                "include_ticks": True,
-                "tick_size": 0.1,
-            }},
-            x_axis_config={{"include_numbers": False}},
-            y_axis_config={{"include_numbers": False}},
-            tips=False,
-        )
-        self.axes.to_edge(DOWN, buff=1.2)
-        self.axes.shift(LEFT * 0.8)
-
-        # Custom X-axis labels
-        x_labels = VGroup()
-        x_tick_vals = [X_MIN + i * X_STEP for i in range(int((X_MAX - X_MIN) / X_STEP) + 1)]
-        for val in x_tick_vals:
-            if val > X_MAX:
-                break
-            label = Text(
-                format_axis_number(val, X_DECIMALS),
-                font_size=14,
-                color=TEXT_SECONDARY,
-            )
-            x_pos = self.axes.c2p(val, Y_MIN)[0]
-            label.move_to([x_pos, self.axes.c2p(X_MIN, Y_MIN)[1] - 0.35, 0])
-            x_labels.add(label)
-
-        # Custom Y-axis labels
-        y_labels = VGroup()
-        y_tick_vals = [Y_MIN + i * Y_STEP for i in range(int((Y_MAX - Y_MIN) / Y_STEP) + 1)]
-        for val in y_tick_vals:
-            if val > Y_MAX:
-                break
-            label = Text(
-                format_axis_number(val, Y_DECIMALS),
-                font_size=14,
-                color=TEXT_SECONDARY,
-            )
-            y_pos = self.axes.c2p(X_MIN, val)[1]
-            label.move_to([self.axes.c2p(X_MIN, Y_MIN)[0] - 0.5, y_pos, 0])
-            y_labels.add(label)
-
-        # Axis labels
-        x_axis_label = Text(X_LABEL, font_size=22, color=TEXT_SECONDARY)
-        x_axis_label.next_to(self.axes.x_axis, DOWN, buff=0.8)
-
-        y_axis_label = Text(Y_LABEL, font_size=22, color=TEXT_SECONDARY)
-        y_axis_label.rotate(90 * DEGREES)
-        y_axis_label.next_to(self.axes.y_axis, LEFT, buff=0.9)
-
-        # Time Display
-        self.time_display = Text(
-            str(TIMES[0]),
-            font_size=72,
-            weight=BOLD,
-            color=ACCENT_COLOR,
-        )
-        self.time_display.to_corner(UR, buff=0.8)
-        self.time_display.set_opacity(0.85)
-
-        # Legend
-        if SHOW_LEGEND and len(GROUPS) > 1:
-            legend_items = VGroup()
-            for group in GROUPS:
-                color = GROUP_COLORS.get(group, "#6366F1")
-                swatch = Circle(radius=0.12, fill_color=color, fill_opacity=0.9, stroke_width=0)
-                group_label = Text(str(group), font_size=16, color=TEXT_COLOR)
-                group_label.next_to(swatch, RIGHT, buff=0.15)
-                item = VGroup(swatch, group_label)
-                legend_items.add(item)
-
-            legend_items.arrange(DOWN, aligned_edge=LEFT, buff=0.2)
-
-            legend_bg = RoundedRectangle(
-                corner_radius=0.15,
-                width=legend_items.get_width() + 0.5,
-                height=legend_items.get_height() + 0.4,
-                fill_color=SURFACE_COLOR,
-                fill_opacity=0.8,
-                stroke_width=1,
-                stroke_color=TEXT_SECONDARY,
-                stroke_opacity=0.3,
-            )
-
-            self.legend = VGroup(legend_bg, legend_items)
-            legend_items.move_to(legend_bg.get_center())
-            self.legend.to_corner(UL, buff=0.5)
-
-        # Create Bubbles
-        t0 = TIMES[0]
-        for entity in ENTITIES:
-            entity_data = DATA.get(t0, {{}}).get(entity)
-
-            if entity_data:
-                x_val = entity_data["x"]
-                y_val = entity_data["y"]
-                r_val = entity_data["r"]
-            else:
-                x_val = (X_MIN + X_MAX) / 2
-                y_val = (Y_MIN + Y_MAX) / 2
-                r_val = R_MIN
-
-            pos = self.axes.c2p(x_val, y_val)
-            radius = compute_radius(r_val)
-            color = get_entity_color(entity)
-
-            bubble = Circle(
-                radius=radius,
-                fill_color=color,
-                fill_opacity=FILL_OPACITY,
-                stroke_color=color,
-                stroke_width=2,
-                stroke_opacity=0.9,
-            )
-            bubble.move_to(pos)
-
-            entity_label = None
-            if SHOW_LABELS:
-                display_name = entity[:12] + "..." if len(entity) > 15 else entity
-                entity_label = Text(display_name, font_size=11, color=WHITE, weight=BOLD)
-                entity_label.move_to(bubble.get_center())
-                if radius < 0.2:
-                    entity_label.set_opacity(0)
-
-            self.bubbles[entity] = {{
-                "circle": bubble,
-                "label": entity_label,
-                "current_pos": pos,
-                "current_radius": radius,
-            }}
-
-        # Animate reveal
-        self.play(
-            Create(self.axes),
-            FadeIn(x_labels),
-            FadeIn(y_labels),
-            FadeIn(x_axis_label),
-            FadeIn(y_axis_label),
-            run_time=REVEAL_DURATION * 0.4,
-        )
-
-        if self.legend:
-            self.play(FadeIn(self.legend), run_time=0.3)
-
-        self.play(FadeIn(self.time_display), run_time=0.3)
-
-        # Bubbles appear
-        bubble_circles = [self.bubbles[e]["circle"] for e in ENTITIES]
-        bubble_labels = [self.bubbles[e]["label"] for e in ENTITIES if self.bubbles[e]["label"]]
-
-        self.play(
-            LaggedStart(
-                *[GrowFromCenter(b) for b in bubble_circles],
-                lag_ratio=0.02,
-            ),
-            run_time=REVEAL_DURATION * 0.6,
-        )
-
-        if bubble_labels:
-            self.add(*bubble_labels)
-
-        self.wait(0.3)
-
-    # -------------------------------------------------------------------------
-    # SCENE 3: EVOLUTION
-    # -------------------------------------------------------------------------
-    def scene_evolution(self):
-        """Main animation: evolve through time."""
-        for step_idx in range(1, len(TIMES)):
-            t_current = TIMES[step_idx]
-            insight = get_insight_at_time(t_current)
-
-            animations = []
-
-            # Update time display
-            new_time_display = Text(
-                str(t_current),
-                font_size=72,
-                weight=BOLD,
-                color=ACCENT_COLOR,
-            )
-            new_time_display.to_corner(UR, buff=0.8)
-            new_time_display.set_opacity(0.85)
-            animations.append(Transform(self.time_display, new_time_display))
-
-            # Update each bubble
-            for entity in ENTITIES:
-                entity_data = DATA.get(t_current, {{}}).get(entity)
-
-                if not entity_data:
-                    continue
-
-                x_val = entity_data["x"]
-                y_val = entity_data["y"]
-                r_val = entity_data["r"]
-
-                new_pos = self.axes.c2p(x_val, y_val)
-                new_radius = compute_radius(r_val)
-                color = get_entity_color(entity)
-
-                bubble_data = self.bubbles[entity]
-                circle = bubble_data["circle"]
-                label = bubble_data["label"]
-
-                new_circle = Circle(
-                    radius=new_radius,
-                    fill_color=color,
-                    fill_opacity=FILL_OPACITY,
-                    stroke_color=color,
-                    stroke_width=2,
-                    stroke_opacity=0.9,
-                )
-                new_circle.move_to(new_pos)
-                animations.append(Transform(circle, new_circle))
-
-                if label:
-                    new_label = label.copy()
-                    new_label.move_to(new_pos)
-                    if new_radius < 0.2:
-                        new_label.set_opacity(0)
-                    else:
-                        new_label.set_opacity(1)
-                    animations.append(Transform(label, new_label))
-
-                bubble_data["current_pos"] = new_pos
-                bubble_data["current_radius"] = new_radius
-
-            self.play(
-                *animations,
-                run_time=PER_STEP_TIME,
-                rate_func=smooth,
-            )
-
-            # Show insight if any
-            if insight:
-                self.show_insight(insight)
-
-    def show_insight(self, insight):
-        """Show a highlight annotation for an insight."""
-        entity = insight["entity"]
-        if entity not in self.bubbles:
-            return
-
-        bubble_data = self.bubbles[entity]
-        circle = bubble_data["circle"]
-
-        # Highlight the bubble
-        self.play(
-            circle.animate.set_stroke(color=ACCENT_COLOR, width=4),
-            run_time=0.3,
-        )
-
-        self.wait(0.2)
-
-        self.play(
-            circle.animate.set_stroke(color=get_entity_color(entity), width=2),
-            run_time=0.3,
-        )
-
-    # -------------------------------------------------------------------------
-    # SCENE 4: CONCLUSION
-    # -------------------------------------------------------------------------
-    def scene_conclusion(self):
-        """Closing scene with leader emphasis."""
-        # Find the leader (largest bubble)
-        final_time = TIMES[-1]
-        final_data = DATA.get(final_time, {{}})
-
-        leader = None
-        max_r = -1
-        for entity, vals in final_data.items():
-            if vals["r"] > max_r:
-                max_r = vals["r"]
-                leader = entity
-
-        if leader and leader in self.bubbles:
-            leader_circle = self.bubbles[leader]["circle"]
-
-            # Dim other bubbles
-            dim_anims = []
-            for entity, bubble_data in self.bubbles.items():
-                if entity != leader:
-                    dim_anims.append(bubble_data["circle"].animate.set_opacity(0.3))
-                    if bubble_data["label"]:
-                        dim_anims.append(bubble_data["label"].animate.set_opacity(0.1))
-
-            if dim_anims:
-                self.play(*dim_anims, run_time=0.5)
-
-            # Emphasize leader
-            self.play(
-                leader_circle.animate.set_stroke(color=ACCENT_COLOR, width=5),
-                run_time=0.4,
-            )
-
-            # Show leader annotation
-            leader_label = Text(
-                f"Leader: {{leader}}",
-                font_size=28,
-                color=ACCENT_COLOR,
-                weight=BOLD,
-            )
-            leader_label.to_edge(UP, buff=0.5)
-
-            self.play(
-                FadeIn(leader_label, shift=DOWN * 0.3),
-                run_time=0.4,
-            )
-
-        # Final hold
-        self.wait(OUTRO_DURATION - 1.0)
-'''
+    values = {
+        "TIMES": data.times,
+        "ENTITIES": data.entities,
+        "GROUPS": data.groups,
+        "ENTITY_GROUP": data.entity_group,
+        "DATA": data.data,
+        "GROUP_COLORS": data.group_colors,
+        "INSIGHTS": insight_items,
+        "STORY_TITLE": title,
+        "STORY_SUBTITLE": subtitle,
+        "INCLUDE_INTRO": include_intro,
+        "INCLUDE_CONCLUSION": include_conclusion,
+        "INTRO_DURATION": intro_duration,
+        "REVEAL_DURATION": reveal_duration,
+        "EVOLUTION_DURATION": evolution_duration,
+        "OUTRO_DURATION": outro_duration,
+        "PER_STEP_TIME": per_step_time,
+        "TOTAL_DURATION": total_time,
+        "X_MIN": x_min,
+        "X_MAX": x_max,
+        "Y_MIN": y_min,
+        "Y_MAX": y_max,
+        "X_STEP": x_step,
+        "Y_STEP": y_step,
+        "X_LABEL": x_label or 'X Axis',
+        "Y_LABEL": y_label or 'Y Axis',
+        "X_DECIMALS": x_decimals,
+        "Y_DECIMALS": y_decimals,
+        "R_MIN": r_min,
+        "R_MAX": r_max,
+        "BG_COLOR": bg_color,
+        "TEXT_COLOR": text_color,
+        "TEXT_SECONDARY": text_secondary,
+        "ACCENT_COLOR": accent_color,
+        "SURFACE_COLOR": surface_color,
+        "FILL_OPACITY": fill_opacity,
+        "SHOW_LABELS": show_labels,
+        "SHOW_LEGEND": show_legend,
+    }
+    code = template_scene_code(
+        "bubble_chart",
+        "BubbleChartScene",
+        values,
+        comment=f"Theme: {theme}\nNarrative Style: {narrative_style.value}",
+    )
 
     return code.strip()
 
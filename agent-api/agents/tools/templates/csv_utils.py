@@ -1,9 +1,11 @@
 import csv
-import re
 import os
 import logging
 from typing import List, Dict, Tuple, Optional
 
+from agents.tools.csv_sniffer import PROFILE_LENIENT
+from agents.tools.csv_sniffer import detect_header_row as _sniff_header_row
+
 logger = logging.getLogger("animation_pipeline.template.csv_utils")
 
 
@@ -15,6 +17,9 @@ def detect_header_row(filepath: str, max_row_to_check: int = 10) -> int:
       - number of non-empty columns
       - presence of year-like values in columns
 
+    Delegates to the shared memoized sniffer (agents.tools.csv_sniffer) using
+    the "lenient" scoring profile.
+
     Returns:
       - integer index of the detected header row (0-based)
       - returns 0 when detection fails or file is empty
@@ -23,113 +28,7 @@ def detect_header_row(filepath: str, max_row_to_check: int = 10) -> int:
         logger.warning(f"[CSV_UTILS] File not found for header detection: {filepath}")
         return 0
 
-    try:
-        rows = []
-        with open(filepath, "r", encoding="utf-8", errors="replace") as f:
-            reader = csv.reader(f)
-            for i, row in enumerate(reader):
-                if i >= max_row_to_check:
-                    break
-                rows.append(row)
-
-        if not rows:
-            return 0
-
-        # common header tokens
-        header_patterns = [
-            r"country",
-            r"name",
-            r"code",
-            r"indicator",
-            r"region",
-            r"year",
-            r"date",
-            r"value",
-            r"series",
-            r"id",
-            r"film",
-            r"director",
-            r"time",
-            r"category",
-            r"label",
-            r"entity",
-            r"salary",
-            r"title",
-            r"amount",
-        ]
-
-        year_pattern = re.compile(r"^(?:19|20)\d{2}$")  # simple year matcher
-
-        best_row = 0
-        best_score = -1
-        max_cols = 0
-
-        for i, row in enumerate(rows):
-            # normalize cells
-            stripped = [str(c).strip() for c in row]
-            non_empty_cols = [c for c in stripped if c != ""]
-            col_count = len(non_empty_cols)
-
-            score = 0
-
-            # reward rows that open up many columns compared to earlier rows
-            if col_count > max_cols * 1.5 and col_count >= 3:
-                score += 3
-            max_cols = max(max_cols, col_count)
-
-            # reward presence of year-like columns
-            years_cols = sum(1 for c in stripped if year_pattern.match(c))
-            if years_cols >= 2:
-                score += 4
-            elif years_cols == 1:
-                score += 1
-
-            # reward header-like tokens
-            header_matches = sum(
-                1 for c in stripped if any(re.search(p, c.lower()) for p in header_patterns)
-            )
-            if header_matches >= 2:
-                score += 3
-            elif header_matches == 1:
-                score += 1
-
-            # small bonus for reasonable number of columns
-            if col_count >= 4:
-                score += 1
-
-            # penalize rows that look like numeric-only data rows
-            numeric_cells = sum(1 for c in stripped if _is_number_like(c))
-            if numeric_cells >= max(1, col_count * 0.6):
-                score -= 2
-
-            if score > best_score:
-                best_score = score
-                best_row = i
-
-        if best_score >= 1:
-            logger.debug(
-                f"[CSV_UTILS] detected header row {best_row} with score {best_score} for {os.path.basename(filepath)}"
-            )
-            return best_row
-
-    except Exception as e:
-        logger.warning(f"[CSV_UTILS] Header detection failed for {filepath}: {e}")
-
-    return 0
-
-
-def _is_number_like(val: str) -> bool:
-    """Small helper to detect numeric-like strings (ints, floats, percentages)."""
-    if val is None:
-        return False
-    v = val.strip().replace(",", "")
-    if v.endswith("%"):
-        v = v[:-1]
-    try:
-        float(v)
-        return True
-    except Exception:
-        return False
+    return _sniff_header_row(filepath, max_rows_to_check=max_row_to_check, profile=PROFILE_LENIENT)
 
 
 def read_csv_rows(
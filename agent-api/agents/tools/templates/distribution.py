@@ -38,7 +38,10 @@ import logging
 import math
 import os
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from agents.tools.templates.csv_utils import read_csv_rows
+from agents.tools.templates.scene_data import template_scene_code
 
 # Setup module logger
 logger = logging.getLogger("animation_pipeline.templates.distribution")
@@ -365,20 +368,6 @@ def detect_insights(data: DistributionData) -> List[DistributionInsight]:
 # CODE GENERATION
 # =============================================================================
 
-def _format_literal(obj: Any) -> str:
-    """Format Python object as code literal"""
-    if isinstance(obj, str):
-        return repr(obj)
-    elif isinstance(obj, dict):
-        items = ", ".join(f"{_format_literal(k)}: {_format_literal(v)}" for k, v in obj.items())
-        return "{" + items + "}"
-    elif isinstance(obj, (list, tuple)):
-        items = ", ".join(_format_literal(x) for x in obj)
-        return "[" + items + "]"
-    else:
-        return repr(obj)
-
-
 def generate_distribution(
     spec: object,
     csv_path: str,
@@ -461,16 +450,12 @@ def generate_distribution(
         NARRATIVE_STYLE_PRESETS[NarrativeStyle.EXPLAINER]
     )
 
-    # Format data literals
-    lit_times = _format_literal(data.times)
-    lit_bin_labels = _format_literal(data.bin_labels)
-    lit_histograms = _format_literal(data.histograms)
 
     # Format insights for highlights
-    lit_insights = _format_literal([
+    insight_items = [
         {"time": i.time, "type": i.insight_type, "desc": i.description}
         for i in insights
-    ])
+    ]
 
     # Calculate timing
     intro_duration = pacing["intro_duration"] if include_intro else 0
@@ -492,412 +477,38 @@ def generate_distribution(
     subtitle = getattr(spec, "subtitle", None) or f"{data.times[0]} - {data.times[-1]}" if len(data.times) > 1 else ""
 
     # Generate the Manim code
-    code = f'''
-from manim import *
-import math
-
-# =============================================================================
-# DISTRIBUTION ANIMATION - Story-Driven Architecture
-# =============================================================================
-# Generated using the primitives system for modular, narrative animations
-# Theme: {theme}
-# Narrative Style: {narrative_style.value}
-# =============================================================================
-
-# --- Data ---
-TIMES = {lit_times}
-BIN_LABELS = {lit_bin_labels}
-HISTOGRAMS = {lit_histograms}
-Y_MAX = {y_max}
-Y_STEP = {y_step}
-NUM_BINS = {num_bins}
-
-# --- Insights (Auto-Detected) ---
-INSIGHTS = {lit_insights}
-
-# --- Story Configuration ---
-STORY_TITLE = "{title}"
-STORY_SUBTITLE = "{subtitle}"
-INCLUDE_INTRO = {include_intro}
-INCLUDE_CONCLUSION = {include_conclusion}
-
-# --- Timing (Narrative Style: {narrative_style.value}) ---
-INTRO_DURATION = {intro_duration}
-REVEAL_DURATION = {reveal_duration}
-EVOLUTION_DURATION = {evolution_duration}
-OUTRO_DURATION = {outro_duration}
-PER_STEP_TIME = {per_step_time}
-TOTAL_DURATION = {total_time}
-
-# --- Style Configuration ---
-BG_COLOR = "{bg_color}"
-TEXT_COLOR = "{text_color}"
-TEXT_SECONDARY = "{text_secondary}"
-PRIMARY_COLOR = "{primary_color}"
-ACCENT_COLOR = "{accent_color}"
-
-# --- Axis Labels ---
-X_LABEL = "{x_label or 'Value'}"
-Y_LABEL = "{y_label or 'Count'}"
-
-# --- Layout Constants ---
-CHART_WIDTH = 10.0
-CHART_HEIGHT = 5.0
-BAR_WIDTH_RATIO = 0.7
-
-
-# =============================================================================
-# HELPER FUNCTIONS
-# =============================================================================
-
-def format_number(value: float) -> str:
-    """Format large numbers with K/M/B suffixes"""
-    if abs(value) >= 1_000_000_000:
-        return f"{{value / 1_000_000_000:.1f}}B"
-    elif abs(value) >= 1_000_000:
-        return f"{{value / 1_000_000:.1f}}M"
-    elif abs(value) >= 1_000:
-        return f"{{value / 1_000:.1f}}K"
-    else:
-        return f"{{value:.0f}}"
-
-
-def get_insight_at_time(time_key: str):
-    """Get insight at a specific time, if any"""
-    for insight in INSIGHTS:
-        if insight["time"] == time_key:
-            return insight
-    return None
-
-
-# =============================================================================
-# SCENE CLASS
-# =============================================================================
-
-class GenScene(Scene):
-    """
-    Story-driven distribution animation.
-
-    Structure:
-    1. INTRO: Title and subtitle fade in
-    2. REVEAL: Axes and initial bars appear
-    3. EVOLUTION: Bars animate through time
-    4. HIGHLIGHTS: Insights emphasized during evolution
-    5. CONCLUSION: Final state with summary
-    """
-
-    def construct(self):
-        # Set background
-        self.camera.background_color = BG_COLOR
-
-        if not TIMES:
-            no_data = Text("No data available", color=TEXT_COLOR)
-            self.play(Write(no_data))
-            return
-
-        # Track elements
-        self.axes = None
-        self.bars = None
-        self.time_display = None
-
-        # Run story scenes
-        if INCLUDE_INTRO:
-            self.scene_intro()
-
-        self.scene_reveal()
-        self.scene_evolution()
-
-        if INCLUDE_CONCLUSION:
-            self.scene_conclusion()
-
-    # -------------------------------------------------------------------------
-    # SCENE 1: INTRO
-    # -------------------------------------------------------------------------
-    def scene_intro(self):
-        """Opening scene with title and subtitle."""
-        # Create title
-        title = Text(
-            STORY_TITLE,
-            font_size=56,
-            color=TEXT_COLOR,
-            weight=BOLD,
-        )
-        title.move_to([0, 0.5, 0])
-
-        # Create subtitle
-        subtitle = Text(
-            STORY_SUBTITLE,
-            font_size=28,
-            color=TEXT_SECONDARY,
-        )
-        subtitle.move_to([0, -0.3, 0])
-        subtitle.set_opacity(0.8)
-
-        title_group = VGroup(title, subtitle)
-
-        # Animate entrance
-        self.play(
-            FadeIn(title, shift=UP * 0.3),
-            run_time=0.8,
-            rate_func=smooth,
-        )
-        self.play(
-            FadeIn(subtitle, shift=UP * 0.2),
-            run_time=0.5,
-            rate_func=smooth,
-        )
-
-        # Hold
-        self.wait(INTRO_DURATION - 1.8)
-
-        # Fade out
-        self.play(
-            FadeOut(title_group, shift=UP * 0.5),
-            run_time=0.5,
-        )
-
-    # -------------------------------------------------------------------------
-    # SCENE 2: REVEAL
-    # -------------------------------------------------------------------------
-    def scene_reveal(self):
-        """Reveal axes and initial bars."""
-        # Create Axes
-        self.axes = Axes(
-            x_range=[0, NUM_BINS, 1],
-            y_range=[0, Y_MAX, Y_STEP],
-            x_length=CHART_WIDTH,
-            y_length=CHART_HEIGHT,
-            axis_config={{
-                "color": TEXT_SECONDARY,
-                "stroke_width": 2,
-                "include_ticks": True,
-            }},
-            x_axis_config={{
-                "include_numbers": False,
-            }},
-            y_axis_config={{
-                "include_numbers": True,
-                "font_size": 18,
-            }},
-            tips=False,
-        )
-        self.axes.to_edge(DOWN, buff=1.0)
-        self.axes.shift(LEFT * 0.5)
-
-        # Custom X-Axis Labels (Bin Ranges)
-        x_labels = VGroup()
-
-        if NUM_BINS <= 5:
-            label_step = 1
-        elif NUM_BINS <= 10:
-            label_step = 2
-        else:
-            label_step = max(1, NUM_BINS // 5)
-
-        for i in range(0, NUM_BINS, label_step):
-            label = Text(
-                BIN_LABELS[i],
-                font_size=14,
-                color=TEXT_SECONDARY,
-            )
-            x_pos = self.axes.c2p(i + 0.5, 0)[0]
-            label.move_to([x_pos, self.axes.c2p(0, 0)[1] - 0.4, 0])
-            label.rotate(-45 * DEGREES)
-            x_labels.add(label)
-
-        # Axis Labels
-        x_axis_label = Text(
-            X_LABEL,
-            font_size=22,
-            color=TEXT_SECONDARY,
-        )
-        x_axis_label.next_to(self.axes.x_axis, DOWN, buff=1.2)
-
-        y_axis_label = Text(
-            Y_LABEL,
-            font_size=22,
-            color=TEXT_SECONDARY,
-        )
-        y_axis_label.rotate(90 * DEGREES)
-        y_axis_label.next_to(self.axes.y_axis, LEFT, buff=0.6)
-
-        # Time Display
-        self.time_display = Text(
-            str(TIMES[0]),
-            font_size=72,
-            weight=BOLD,
-            color=ACCENT_COLOR,
-        )
-        self.time_display.to_corner(UL, buff=0.8)
-        self.time_display.set_opacity(0.9)
-
-        # Create Initial Bars
-        t0 = TIMES[0]
-        initial_counts = HISTOGRAMS.get(t0, [0] * NUM_BINS)
-        self.bars = self.create_bars(initial_counts)
-
-        # Animate reveal
-        self.play(
-            Create(self.axes, lag_ratio=0.1),
-            run_time=REVEAL_DURATION * 0.4,
-        )
-        self.play(
-            FadeIn(x_labels),
-            FadeIn(x_axis_label),
-            FadeIn(y_axis_label),
-            FadeIn(self.time_display),
-            run_time=REVEAL_DURATION * 0.3,
-        )
-        self.play(
-            LaggedStart(
-                *[GrowFromEdge(bar, DOWN) for bar in self.bars],
-                lag_ratio=0.05,
-            ),
-            run_time=REVEAL_DURATION * 0.3,
-        )
-
-        self.wait(0.3)
-
-    def create_bars(self, counts):
-        """Create histogram bars for given counts."""
-        bars = VGroup()
-        bar_width = (CHART_WIDTH / NUM_BINS) * BAR_WIDTH_RATIO
-
-        for i, count in enumerate(counts):
-            if Y_MAX > 0:
-                height = (count / Y_MAX) * CHART_HEIGHT
-            else:
-                height = 0
-            height = max(0.01, height)
-
-            bar = RoundedRectangle(
-                corner_radius=0.08,
-                width=bar_width,
-                height=height,
-                fill_color=PRIMARY_COLOR,
-                fill_opacity=0.85,
-                stroke_width=0,
-            )
-
-            x_pos = self.axes.c2p(i + 0.5, 0)[0]
-            y_pos = self.axes.c2p(0, 0)[1] + height / 2
-            bar.move_to([x_pos, y_pos, 0])
-
-            bars.add(bar)
-
-        return bars
-
-    # -------------------------------------------------------------------------
-    # SCENE 3: EVOLUTION
-    # -------------------------------------------------------------------------
-    def scene_evolution(self):
-        """Main animation: evolve through time."""
-        for step_idx in range(1, len(TIMES)):
-            t_current = TIMES[step_idx]
-            new_counts = HISTOGRAMS.get(t_current, [0] * NUM_BINS)
-
-            # Check for insights
-            insight = get_insight_at_time(t_current)
-
-            # Create new bars
-            new_bars = self.create_bars(new_counts)
-
-            # Update time display
-            new_time_display = Text(
-                str(t_current),
-                font_size=72,
-                weight=BOLD,
-                color=ACCENT_COLOR if insight else ACCENT_COLOR,
-            )
-            new_time_display.to_corner(UL, buff=0.8)
-            new_time_display.set_opacity(0.9)
-
-            # Animate transition
-            animations = [Transform(self.time_display, new_time_display)]
-
-            for old_bar, new_bar in zip(self.bars, new_bars):
-                animations.append(Transform(old_bar, new_bar))
-
-            self.play(
-                *animations,
-                run_time=PER_STEP_TIME,
-                rate_func=smooth,
-            )
-
-            # Show insight if any
-            if insight:
-                self.show_insight(insight)
-
-    def show_insight(self, insight):
-        """Show a highlight annotation for an insight."""
-        annotation = Text(
-            insight["desc"],
-            font_size=24,
-            color=ACCENT_COLOR,
-            weight=BOLD,
-        )
-        annotation.to_edge(UP, buff=0.5)
-
-        self.play(
-            FadeIn(annotation, shift=DOWN * 0.3),
-            run_time=0.3,
-        )
-
-        self.wait(0.4)
-
-        self.play(
-            FadeOut(annotation),
-            run_time=0.3,
-        )
-
-    # -------------------------------------------------------------------------
-    # SCENE 4: CONCLUSION
-    # -------------------------------------------------------------------------
-    def scene_conclusion(self):
-        """Closing scene with summary."""
-        # Calculate summary statistics
-        final_counts = HISTOGRAMS.get(TIMES[-1], [0] * NUM_BINS)
-        total = sum(final_counts)
-        peak_bin = final_counts.index(max(final_counts)) if final_counts else 0
-        peak_range = BIN_LABELS[peak_bin] if peak_bin < len(BIN_LABELS) else ""
-
-        # Summary card
-        summary = VGroup()
-
-        total_label = Text(
-            f"Total: {{format_number(total)}}",
-            font_size=32,
-            color=TEXT_COLOR,
-            weight=BOLD,
-        )
-
-        peak_label = Text(
-            f"Peak: {{peak_range}}",
-            font_size=28,
-            color=TEXT_SECONDARY,
-        )
-        peak_label.next_to(total_label, DOWN, buff=0.2)
-
-        summary.add(total_label, peak_label)
-        summary.to_corner(UR, buff=0.8)
-
-        # Highlight peak bar
-        if peak_bin < len(self.bars):
-            peak_bar = self.bars[peak_bin]
-            self.play(
-                FadeIn(summary, shift=LEFT * 0.3),
-                peak_bar.animate.set_fill(ACCENT_COLOR, opacity=0.95),
-                run_time=0.5,
-            )
-        else:
-            self.play(
-                FadeIn(summary, shift=LEFT * 0.3),
-                run_time=0.5,
-            )
-
-        # Hold
-        self.wait(OUTRO_DURATION - 0.5)
-'''
+    values = {
+        "TIMES": data.times,
+        "BIN_LABELS": data.bin_labels,
+        "HISTOGRAMS": data.histograms,
+        "Y_MAX": y_max,
+        "Y_STEP": y_step,
+        "NUM_BINS": num_bins,
+        "INSIGHTS": insight_items,
+        "STORY_TITLE": title,
+        "STORY_SUBTITLE": subtitle,
+        "INCLUDE_INTRO": include_intro,
+        "INCLUDE_CONCLUSION": include_conclusion,
+        "INTRO_DURATION": intro_duration,
+        "REVEAL_DURATION": reveal_duration,
+        "EVOLUTION_DURATION": evolution_duration,
+        "OUTRO_DURATION": outro_duration,
+        "PER_STEP_TIME": per_step_time,
+        "TOTAL_DURATION": total_time,
+        "BG_COLOR": bg_color,
+        "TEXT_COLOR": text_color,
+        "TEXT_SECONDARY": text_secondary,
+        "PRIMARY_COLOR": primary_color,
+        "ACCENT_COLOR": accent_color,
+        "X_LABEL": x_label or 'Value',
+        "Y_LABEL": y_label or 'Count',
+    }
+    code = template_scene_code(
+        "distribution",
+        "DistributionScene",
+        values,
+        comment=f"Theme: {theme}\nNarrative Style: {narrative_style.value}",
+    )
 
     return code.strip()
 
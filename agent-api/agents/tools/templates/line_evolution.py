@@ -37,9 +37,11 @@ import csv
 import os
 import logging
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Tuple
 from agents.tools.templates.csv_utils import read_csv_rows,  detect_header_row
 
+from agents.tools.templates.scene_data import template_scene_code
+
 # Setup module logger
 logger = logging.getLogger("animation_pipeline.templates.line_evolution")
 
@@ -197,6 +199,31 @@ def parse_csv_data(
 
     logger.info(f"[LINE_EVOLUTION] Data collection complete | valid_rows={len(raw_data)} | skipped_rows={skipped_rows}")
 
+    if not raw_data:
+        logger.error(f"[LINE_EVOLUTION] No valid data found | time_col={time_col} | value_col={value_col} | headers={headers}")
+        raise ValueError(f"No valid data found for line evolution. Check that columns '{time_col}' and '{value_col}' exist and contain valid data. Available columns: {headers}")
+
+    # One point per time period (rows sharing a period are summed), in time order
+    totals: Dict[str, float] = {}
+    for t, v in raw_data:
+        totals[t] = totals.get(t, 0.0) + v
+    times = sorted(totals.keys(), key=_parse_time_key)
+    values = [totals[t] for t in times]
+
+    min_value = min(values)
+    max_value = max(values)
+    span = max_value - min_value
+    padding = span * 0.1 if span > 0 else max(abs(max_value) * 0.1, 1.0)
+
+    return LineEvolutionData(
+        times=times,
+        values=values,
+        min_value=min_value,
+        max_value=max_value,
+        y_min=min_value - padding,
+        y_max=max_value + padding,
+    )
+
 
 def detect_insights(data: LineEvolutionData) -> List[LineInsight]:
     """
@@ -277,20 +304,6 @@ def detect_insights(data: LineEvolutionData) -> List[LineInsight]:
 # CODE GENERATION
 # =============================================================================
 
-def _format_literal(obj: Any) -> str:
-    """Format Python object as code literal"""
-    if isinstance(obj, str):
-        return repr(obj)
-    elif isinstance(obj, dict):
-        items = ", ".join(f"{_format_literal(k)}: {_format_literal(v)}" for k, v in obj.items())
-        return "{" + items + "}"
-    elif isinstance(obj, (list, tuple)):
-        items = ", ".join(_format_literal(x) for x in obj)
-        return "[" + items + "]"
-    else:
-        return repr(obj)
-
-
 def generate_line_evolution(
     spec: object,
     csv_path: str,
@@ -389,15 +402,12 @@ def generate_line_evolution(
         NARRATIVE_STYLE_PRESETS[NarrativeStyle.EXPLAINER]
     )
 
-    # Format data literals
-    lit_times = _format_literal(data.times)
-    lit_values = _format_literal(data.values)
 
     # Format insights for highlights
-    lit_insights = _format_literal([
+    insight_items = [
         {"index": i.index, "time": i.time, "value": i.value, "type": i.insight_type, "desc": i.description}
         for i in insights
-    ])
+    ]
 
     # Calculate number of x-axis labels to show
     num_points = len(data.times)
@@ -409,7 +419,6 @@ def generate_line_evolution(
         step = (num_points - 1) // 4
         label_indices = [0, step, step * 2, step * 3, num_points - 1]
 
-    lit_label_indices = _format_literal(label_indices)
 
     # Calculate timing
     intro_duration = pacing["intro_duration"] if include_intro else 0
@@ -424,430 +433,41 @@ def generate_line_evolution(
     subtitle = getattr(spec, "subtitle", None) or f"{data.times[0]} - {data.times[-1]}"
 
     # Generate the Manim code
-    code = f'''
-from manim import *
-import math
-
-# =============================================================================
-# LINE EVOLUTION ANIMATION - Story-Driven Architecture
-# =============================================================================
-# Generated using the primitives system for modular, narrative animations
-# Theme: {theme}
-# Narrative Style: {narrative_style.value}
-# =============================================================================
-
-# --- Data ---
-TIMES = {lit_times}
-VALUES = {lit_values}
-Y_MIN = {data.y_min}
-Y_MAX = {data.y_max}
-VALUE_MIN = {data.min_value}
-VALUE_MAX = {data.max_value}
-NUM_POINTS = {num_points}
-LABEL_INDICES = {lit_label_indices}
-
-# --- Insights (Auto-Detected) ---
-INSIGHTS = {lit_insights}
-
-# --- Story Configuration ---
-STORY_TITLE = "{title}"
-STORY_SUBTITLE = "{subtitle}"
-INCLUDE_INTRO = {include_intro}
-INCLUDE_CONCLUSION = {include_conclusion}
-
-# --- Timing (Narrative Style: {narrative_style.value}) ---
-INTRO_DURATION = {intro_duration}
-REVEAL_DURATION = {reveal_duration}
-DRAW_DURATION = {draw_duration}
-OUTRO_DURATION = {outro_duration}
-TOTAL_DURATION = {total_time}
-
-# --- Style Configuration ---
-BG_COLOR = "{bg_color}"
-TEXT_COLOR = "{text_color}"
-TEXT_SECONDARY = "{text_secondary}"
-LINE_COLOR = "{primary_color}"
-ACCENT_COLOR = "{accent_color}"
-AREA_COLOR = "{primary_color}"
-SURFACE_COLOR = "{surface_color}"
-
-# --- Layout Constants ---
-AXES_WIDTH = 10.0
-AXES_HEIGHT = 5.5
-DOT_RADIUS = 0.12
-GLOW_RADIUS = 0.25
-GLOW_OPACITY = 0.4
-
-
-# =============================================================================
-# HELPER FUNCTIONS
-# =============================================================================
-
-def format_value(value: float) -> str:
-    """Format numbers with appropriate precision"""
-    if abs(value) >= 1_000_000_000:
-        return f"{{value / 1_000_000_000:.1f}}B"
-    elif abs(value) >= 1_000_000:
-        return f"{{value / 1_000_000:.1f}}M"
-    elif abs(value) >= 1_000:
-        return f"{{value / 1_000:.1f}}K"
-    elif abs(value) >= 100:
-        return f"{{value:.0f}}"
-    elif abs(value) >= 1:
-        return f"{{value:.1f}}"
-    else:
-        return f"{{value:.2f}}"
-
-
-def get_insight_at_index(index: int):
-    """Get insight at a specific data index, if any"""
-    for insight in INSIGHTS:
-        if insight["index"] == index:
-            return insight
-    return None
-
-
-# =============================================================================
-# SCENE CLASS
-# =============================================================================
-
-class GenScene(Scene):
-    """
-    Story-driven line evolution animation.
-
-    Structure:
-    1. INTRO: Title and subtitle fade in
-    2. REVEAL: Axes and labels appear
-    3. DRAW: Line draws with tracking dot
-    4. HIGHLIGHTS: Insights emphasized during draw
-    5. CONCLUSION: Final value emphasis and summary
-    """
-
-    def construct(self):
-        # Set background
-        self.camera.background_color = BG_COLOR
-
-        # Track elements
-        self.axes = None
-        self.line_path = None
-        self.dot = None
-        self.glow = None
-        self.value_label = None
-        self.tracker = None
-
-        # Run story scenes
-        if INCLUDE_INTRO:
-            self.scene_intro()
-
-        self.scene_reveal()
-        self.scene_draw()
-
-        if INCLUDE_CONCLUSION:
-            self.scene_conclusion()
-
-    # -------------------------------------------------------------------------
-    # SCENE 1: INTRO
-    # -------------------------------------------------------------------------
-    def scene_intro(self):
-        """Opening scene with title and subtitle."""
-        # Create title
-        title = Text(
-            STORY_TITLE,
-            font_size=56,
-            color=TEXT_COLOR,
-            weight=BOLD,
-        )
-        title.move_to([0, 0.5, 0])
-
-        # Create subtitle
-        subtitle = Text(
-            STORY_SUBTITLE,
-            font_size=28,
-            color=TEXT_SECONDARY,
-        )
-        subtitle.move_to([0, -0.3, 0])
-        subtitle.set_opacity(0.8)
-
-        title_group = VGroup(title, subtitle)
-
-        # Animate entrance
-        self.play(
-            FadeIn(title, shift=UP * 0.3),
-            run_time=0.8,
-            rate_func=smooth,
-        )
-        self.play(
-            FadeIn(subtitle, shift=UP * 0.2),
-            run_time=0.5,
-            rate_func=smooth,
-        )
-
-        # Hold
-        self.wait(INTRO_DURATION - 1.8)
-
-        # Fade out
-        self.play(
-            FadeOut(title_group, shift=UP * 0.5),
-            run_time=0.5,
-        )
-
-    # -------------------------------------------------------------------------
-    # SCENE 2: REVEAL
-    # -------------------------------------------------------------------------
-    def scene_reveal(self):
-        """Reveal axes and prepare for drawing."""
-        # Create Axes
-        x_range_max = NUM_POINTS - 1
-        x_step = max(1, x_range_max // 5)
-        y_step = (Y_MAX - Y_MIN) / 5
-
-        self.axes = Axes(
-            x_range=[0, x_range_max, x_step],
-            y_range=[Y_MIN, Y_MAX, y_step],
-            x_length=AXES_WIDTH,
-            y_length=AXES_HEIGHT,
-            axis_config={{
-                "color": TEXT_SECONDARY,
-                "stroke_width": 2,
-                "include_ticks": True,
-                "tick_size": 0.1,
-            }},
-            x_axis_config={{
-                "include_numbers": False,
-            }},
-            y_axis_config={{
-                "include_numbers": True,
-                "font_size": 18,
-                "decimal_number_config": {{"num_decimal_places": 0}},
-            }},
-            tips=False,
-        )
-        self.axes.to_edge(LEFT, buff=1.2)
-        self.axes.shift(DOWN * 0.3)
-
-        # Custom X-Axis Labels
-        x_labels = VGroup()
-        for i in LABEL_INDICES:
-            if i < NUM_POINTS:
-                label = Text(
-                    str(TIMES[i]),
-                    font_size=16,
-                    color=TEXT_SECONDARY,
-                )
-                label.next_to(self.axes.c2p(i, Y_MIN), DOWN, buff=0.3)
-                x_labels.add(label)
-
-        # Axis Labels
-        y_axis_label = Text(
-            "{y_label or 'Value'}",
-            font_size=20,
-            color=TEXT_SECONDARY,
-        )
-        y_axis_label.rotate(90 * DEGREES)
-        y_axis_label.next_to(self.axes.y_axis, LEFT, buff=0.6)
-
-        x_axis_label = Text(
-            "{x_label or 'Time'}",
-            font_size=20,
-            color=TEXT_SECONDARY,
-        )
-        x_axis_label.next_to(self.axes.x_axis, DOWN, buff=0.8)
-
-        # Animate reveal
-        self.play(
-            Create(self.axes, lag_ratio=0.1),
-            run_time=REVEAL_DURATION * 0.6,
-        )
-        self.play(
-            FadeIn(x_labels),
-            FadeIn(y_axis_label),
-            FadeIn(x_axis_label),
-            run_time=REVEAL_DURATION * 0.4,
-        )
-
-        self.wait(0.2)
-
-    # -------------------------------------------------------------------------
-    # SCENE 3: DRAW
-    # -------------------------------------------------------------------------
-    def scene_draw(self):
-        """Main animation: draw line with tracking dot."""
-        # Create the Line Path
-        line_points = [self.axes.c2p(i, val) for i, val in enumerate(VALUES)]
-
-        self.line_path = VMobject()
-        self.line_path.set_points_smoothly(line_points)
-        self.line_path.set_color(LINE_COLOR)
-        self.line_path.set_stroke(width=4)
-
-        # Area Under Curve
-        area_points = line_points.copy()
-        area_points.append(self.axes.c2p(NUM_POINTS - 1, Y_MIN))
-        area_points.append(self.axes.c2p(0, Y_MIN))
-
-        area = Polygon(*area_points)
-        area.set_stroke(width=0)
-        area.set_fill(AREA_COLOR, opacity=0.15)
-
-        # Glowing Tracking Dot
-        initial_point = self.axes.c2p(0, VALUES[0])
-
-        self.glow = Dot(
-            point=initial_point,
-            radius=GLOW_RADIUS,
-            color=LINE_COLOR,
-        )
-        self.glow.set_opacity(GLOW_OPACITY)
-
-        self.dot = Dot(
-            point=initial_point,
-            radius=DOT_RADIUS,
-            color=WHITE,
-        )
-
-        # Value Label
-        self.value_label = Text(
-            format_value(VALUES[0]),
-            font_size=24,
-            color=TEXT_COLOR,
-            weight=BOLD,
-        )
-        self.value_label.add_background_rectangle(
-            color=SURFACE_COLOR,
-            opacity=0.9,
-            buff=0.15,
-        )
-        self.value_label.next_to(self.dot, UP, buff=0.3)
-
-        # Progress Tracker
-        self.tracker = ValueTracker(0)
-
-        # Updaters
-        def update_dot(mob):
-            t = self.tracker.get_value()
-            if NUM_POINTS <= 1:
-                return
-            proportion = t / (NUM_POINTS - 1)
-            proportion = min(max(proportion, 0), 1)
-            point = self.line_path.point_from_proportion(proportion)
-            mob.move_to(point)
-
-        def update_glow(mob):
-            mob.move_to(self.dot.get_center())
-
-        def update_value_label(mob):
-            t = self.tracker.get_value()
-            idx = int(round(t))
-            idx = min(max(idx, 0), NUM_POINTS - 1)
-
-            new_text = Text(
-                format_value(VALUES[idx]),
-                font_size=24,
-                color=TEXT_COLOR,
-                weight=BOLD,
-            )
-            new_text.add_background_rectangle(
-                color=SURFACE_COLOR,
-                opacity=0.9,
-                buff=0.15,
-            )
-            new_text.next_to(self.dot, UP, buff=0.3)
-
-            # Keep label on screen
-            if new_text.get_right()[0] > 6:
-                new_text.next_to(self.dot, LEFT, buff=0.3)
-            elif new_text.get_left()[0] < -6:
-                new_text.next_to(self.dot, RIGHT, buff=0.3)
-
-            mob.become(new_text)
-
-        self.dot.add_updater(update_dot)
-        self.glow.add_updater(update_glow)
-        self.value_label.add_updater(update_value_label)
-
-        # Fade in tracking elements
-        self.play(
-            FadeIn(self.dot),
-            FadeIn(self.glow),
-            FadeIn(self.value_label),
-            run_time=0.5,
-        )
-
-        # Main Animation: Draw Line + Move Tracker
-        self.play(
-            Create(self.line_path, rate_func=linear),
-            FadeIn(area, rate_func=linear),
-            self.tracker.animate.set_value(NUM_POINTS - 1),
-            run_time=DRAW_DURATION,
-            rate_func=linear,
-        )
-
-        # Remove updaters
-        self.dot.clear_updaters()
-        self.glow.clear_updaters()
-        self.value_label.clear_updaters()
-
-        self.wait(0.3)
-
-    # -------------------------------------------------------------------------
-    # SCENE 4: CONCLUSION
-    # -------------------------------------------------------------------------
-    def scene_conclusion(self):
-        """Closing scene with final value emphasis."""
-        # Pulse effect on final dot
-        self.play(
-            self.glow.animate.scale(1.8).set_opacity(0.7),
-            run_time=0.4,
-            rate_func=smooth,
-        )
-        self.play(
-            self.glow.animate.scale(1/1.8).set_opacity(GLOW_OPACITY),
-            run_time=0.4,
-            rate_func=smooth,
-        )
-
-        # Show final summary
-        final_value = VALUES[-1]
-        start_value = VALUES[0]
-        change = final_value - start_value
-        change_pct = (change / start_value * 100) if start_value != 0 else 0
-
-        if change >= 0:
-            change_text = f"+{{change_pct:.1f}}%"
-            change_color = "#10B981"  # Green
-        else:
-            change_text = f"{{change_pct:.1f}}%"
-            change_color = "#EF4444"  # Red
-
-        # Summary card
-        summary = VGroup()
-
-        final_label = Text(
-            f"Final: {{format_value(final_value)}}",
-            font_size=32,
-            color=TEXT_COLOR,
-            weight=BOLD,
-        )
-
-        change_label = Text(
-            change_text,
-            font_size=28,
-            color=change_color,
-            weight=BOLD,
-        )
-        change_label.next_to(final_label, DOWN, buff=0.2)
-
-        summary.add(final_label, change_label)
-        summary.to_edge(UP, buff=0.8)
-
-        self.play(
-            FadeIn(summary, shift=DOWN * 0.3),
-            run_time=0.5,
-        )
-
-        # Hold
-        self.wait(OUTRO_DURATION - 0.5)
-'''
+    values = {
+        "TIMES": data.times,
+        "VALUES": data.values,
+        "Y_MIN": data.y_min,
+        "Y_MAX": data.y_max,
+        "VALUE_MIN": data.min_value,
+        "VALUE_MAX": data.max_value,
+        "NUM_POINTS": num_points,
+        "LABEL_INDICES": label_indices,
+        "INSIGHTS": insight_items,
+        "STORY_TITLE": title,
+        "STORY_SUBTITLE": subtitle,
+        "INCLUDE_INTRO": include_intro,
+        "INCLUDE_CONCLUSION": include_conclusion,
+        "INTRO_DURATION": intro_duration,
+        "REVEAL_DURATION": reveal_duration,
+        "DRAW_DURATION": draw_duration,
+        "OUTRO_DURATION": outro_duration,
+        "TOTAL_DURATION": total_time,
+        "BG_COLOR": bg_color,
+        "TEXT_COLOR": text_color,
+        "TEXT_SECONDARY": text_secondary,
+        "LINE_COLOR": primary_color,
+        "ACCENT_COLOR": accent_color,
+        "AREA_COLOR": primary_color,
+        "SURFACE_COLOR": surface_color,
+        "X_LABEL": x_label or 'Time',
+        "Y_LABEL": y_label or 'Value',
+    }
+    code = template_scene_code(
+        "line_evolution",
+        "LineEvolutionScene",
+        values,
+        comment=f"Theme: {theme}\nNarrative Style: {narrative_style.value}",
+    )
 
     return code.strip()
 
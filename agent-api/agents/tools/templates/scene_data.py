@@ -0,0 +1,535 @@
+"""
+Scene Data Sidecar
+
+Templates used to embed the parsed dataset into the generated scene as nested
+Python literals (TIMES = [...], DATA = {...}), so scene files grew with the
+data and every consumer (file write, ast.parse in quick_validate, LLM fix
+prompts, the Manim subprocess compile) paid for it.
+
+Values are instead written into a sidecar -- an uncompressed NumPy .npz with
+the numeric arrays plus a small JSON index -- that the scene loads with
+agents.tools.scene_runtime.data.load_scene_data when it is imported:
+
+- template_scene_code() stores a template's whole configuration (data and
+  settings) and returns a fixed few-line scene that configures the matching
+  agents.tools.scene_runtime module.
+- scene_data_block() returns constants for hand-assembled scenes:
+
+    from agents.tools.scene_runtime.data import load_scene_data
+    _SCENE_DATA = load_scene_data("sd_<digest>", "<store dir>")
+    TIMES = _SCENE_DATA["TIMES"]
+
+Sidecars are content-addressed in SCENE_DATA_DIR (artifacts/scene_data by
+default). Renderers call stage_scene_data() to link the sidecars a scene
+references next to the scene file; the loader looks there first and falls
+back to the store.
+
+Index entries ("values"):
+    {"kind": "json", "value": ...}        strings and irregular values
+    {"kind": "list", "array": "a0"}       flat numeric list
+    {"kind": "nested", "array": "a1", "axes": [...], "masks": [...]}
+        regular nesting of dicts/lists with numeric leaves, such as
+        DATA[time][category] or DATA[time][entity]["x"]. ``axes`` holds the
+        keys of each dict level (None for list levels); ``masks`` names, per
+        dict level, a bool array of which keys each dict has (None when
+        every dict has all keys).
+
+Encoded values must round-trip exactly (types, key order, NaN): nested
+values whose dict keys disagree in order or do not survive JSON are stored as
+JSON instead, and JSON values that come back different are inlined as
+literals. scene_data_block() keeps small payloads inline; both inline
+everything when numpy is unavailable or the sidecar cannot be written.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import io
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger("animation_pipeline.templates.scene_data")
+
+SCENE_DATA_DIR = os.path.abspath(os.getenv("SCENE_DATA_DIR", os.path.join("artifacts", "scene_data")))
+SCENE_DATA_ENABLED = os.getenv("SCENE_DATA_SIDECAR", "1").lower() not in ("0", "false", "no")
+# Payloads with at most this many scalar leaves are kept inline
+SCENE_DATA_INLINE_MAX_ITEMS = int(os.getenv("SCENE_DATA_INLINE_MAX_ITEMS", "256"))
+# Sidecars unused for this long are pruned from the store
+SCENE_DATA_TTL_SECONDS = float(os.getenv("SCENE_DATA_TTL_HOURS", "168")) * 3600
+
+_PRUNE_INTERVAL_SECONDS = 3600.0
+_last_prune = 0.0
+
+_SIDECAR_REF_RE = re.compile(r'load_scene_data\(\s*"(sd_[0-9a-f]+)"')
+
+
+# =============================================================================
+# LITERAL FORMATTING (inline fallback)
+# =============================================================================
+
+def format_literal(obj: Any) -> str:
+    """Format Python object as code literal"""
+    if isinstance(obj, str):
+        return repr(obj)
+    elif isinstance(obj, dict):
+        items = ", ".join(f"{format_literal(k)}: {format_literal(v)}" for k, v in obj.items())
+        return "{" + items + "}"
+    elif isinstance(obj, (list, tuple)):
+        items = ", ".join(format_literal(x) for x in obj)
+        return "[" + items + "]"
+    else:
+        return repr(obj)
+
+
+# =============================================================================
+# ENCODING
+# =============================================================================
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _same(a: Any, b: Any) -> bool:
+    """Structural equality that also checks key order, int/float and NaN."""
+    if isinstance(a, dict):
+        return (
+            isinstance(b, dict)
+            and list(a.keys()) == list(b.keys())
+            and all(_same(v, b[k]) for k, v in a.items())
+        )
+    if isinstance(a, (list, tuple)):
+        # Literals rendered tuples as lists, so a list is the expected result
+        return isinstance(b, list) and len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b, strict=True))
+    if isinstance(a, float):
+        return isinstance(b, float) and (a == b or (math.isnan(a) and math.isnan(b)))
+    return type(a) is type(b) and a == b
+
+
+def _more_leaves_than(value: Any, limit: int) -> bool:
+    """True once ``value`` holds more than ``limit`` scalar leaves."""
+    stack = [value]
+    count = 0
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        else:
+            count += 1
+            if count > limit:
+                return True
+    return False
+
+
+class _KeyOrder:
+    """
+    Key order for one dict level: the order every dict at that level agrees
+    on, preferring first appearance, so entities that are missing from early
+    frames still land in their natural position.
+    """
+
+    __slots__ = ("first", "after")
+
+    def __init__(self) -> None:
+        self.first: Dict[Any, int] = {}
+        self.after: Dict[Any, set] = {}
+
+    def add(self, key: Any, prev: Any, has_prev: bool) -> None:
+        if key not in self.first:
+            self.first[key] = len(self.first)
+            self.after[key] = set()
+        if has_prev:
+            self.after[prev].add(key)
+
+    def order(self) -> Optional[List[Any]]:
+        """Keys in a consistent order, or None if the dicts disagree."""
+        pending = {k: 0 for k in self.first}
+        for successors in self.after.values():
+            for k in successors:
+                pending[k] += 1
+        ready = [(i, k) for k, i in self.first.items() if not pending[k]]
+        heapq.heapify(ready)
+        keys = []
+        while ready:
+            _, key = heapq.heappop(ready)
+            keys.append(key)
+            for k in self.after[key]:
+                pending[k] -= 1
+                if not pending[k]:
+                    heapq.heappush(ready, (self.first[k], k))
+        return keys if len(keys) == len(self.first) else None
+
+
+def _collect_layout(value: Any, depth: int, axes: List[Any], leaf: Dict[str, Any]) -> bool:
+    """Gather per-level keys/lengths; False if the nesting is irregular."""
+    if isinstance(value, dict):
+        if not value:
+            return False
+        if len(axes) == depth:
+            axes.append(_KeyOrder())
+        level = axes[depth]
+        if not isinstance(level, _KeyOrder):
+            return False
+        prev, has_prev = None, False
+        for k, v in value.items():
+            level.add(k, prev, has_prev)
+            prev, has_prev = k, True
+            if not _collect_layout(v, depth + 1, axes, leaf):
+                return False
+        return True
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return False
+        if len(axes) == depth:
+            axes.append(len(value))
+        if axes[depth] != len(value):
+            return False
+        return all(_collect_layout(v, depth + 1, axes, leaf) for v in value)
+    if not _is_number(value):
+        return False
+    if leaf.setdefault("depth", depth) != depth:
+        return False
+    leaf.setdefault("types", set()).add(float if isinstance(value, float) else int)
+    return True
+
+
+def _collect_leaves(value, idx, positions, coords, leaves) -> bool:
+    """Leaf coordinates and values; False if a dict's key order disagrees with its axis."""
+    if isinstance(value, dict):
+        level = positions[len(idx)]
+        last = -1
+        for k, v in value.items():
+            i = level[k]
+            if i < last:
+                return False
+            last = i
+            if not _collect_leaves(v, idx + (i,), positions, coords, leaves):
+                return False
+        return True
+    if isinstance(value, (list, tuple)):
+        for i, v in enumerate(value):
+            if not _collect_leaves(v, idx + (i,), positions, coords, leaves):
+                return False
+        return True
+    coords.append(idx)
+    leaves.append(value)
+    return True
+
+
+def _encode_value(value: Any, arrays: Dict[str, Any]) -> Dict[str, Any]:
+    """Index entry for ``value``; numeric arrays are added to ``arrays``."""
+    axes: List[Any] = []
+    leaf: Dict[str, Any] = {}
+    if isinstance(value, (dict, list, tuple)) and _collect_layout(value, 0, axes, leaf):
+        if leaf.get("depth") == len(axes) and len(leaf["types"]) == 1:
+            dtype = np.float64 if float in leaf["types"] else np.int64
+            if len(axes) == 1 and not isinstance(axes[0], _KeyOrder):
+                try:
+                    array = np.asarray(value, dtype=dtype)
+                except (OverflowError, TypeError, ValueError):
+                    return {"kind": "json", "value": value}
+                name = f"a{len(arrays)}"
+                arrays[name] = array
+                return {"kind": "list", "array": name}
+
+            keys = [a.order() if isinstance(a, _KeyOrder) else None for a in axes]
+            if any(ks is None and isinstance(a, _KeyOrder) for ks, a in zip(keys, axes, strict=True)):
+                return {"kind": "json", "value": value}
+            positions = [{k: i for i, k in enumerate(ks)} if ks is not None else None for ks in keys]
+            coords: List[Tuple[int, ...]] = []
+            leaves: List[Any] = []
+            if _collect_leaves(value, (), positions, coords, leaves):
+                shape = tuple(len(ks) if ks is not None else a for ks, a in zip(keys, axes, strict=True))
+                try:
+                    flat = np.asarray(leaves, dtype=dtype)
+                except (OverflowError, TypeError, ValueError):
+                    return {"kind": "json", "value": value}
+                index = np.asarray(coords, dtype=np.intp).T
+                data = np.zeros(shape, dtype=dtype)
+                data[tuple(index)] = flat
+
+                name = f"a{len(arrays)}"
+                arrays[name] = data
+                mask_names: List[Optional[str]] = []
+                for d, ks in enumerate(keys):
+                    mask = None
+                    if ks is not None:
+                        # Containers are never empty, so a key is present iff a leaf sits below it
+                        mask = np.zeros(shape[: d + 1], dtype=bool)
+                        mask[tuple(index[: d + 1])] = True
+                    if mask is None or mask.all():
+                        mask_names.append(None)
+                    else:
+                        mask_names.append(f"a{len(arrays)}")
+                        arrays[mask_names[-1]] = mask
+                return {"kind": "nested", "array": name, "axes": keys, "masks": mask_names}
+    return {"kind": "json", "value": value}
+
+
+def _encode(values: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], List[str]]:
+    """
+    Encode values into (index, arrays, inline_names). Names whose encoding
+    does not round-trip exactly are returned in ``inline_names``.
+    """
+    arrays: Dict[str, Any] = {}
+    entries: Dict[str, Any] = {}
+    inline: List[str] = []
+    for key, value in values.items():
+        before = dict(arrays)
+        spec = _encode_value(value, arrays)
+        if spec["kind"] != "json" and not _roundtrips(spec):
+            arrays = before
+            spec = {"kind": "json", "value": value}
+        if spec["kind"] == "json":
+            try:
+                spec = json.loads(json.dumps(spec))
+            except (TypeError, ValueError):
+                inline.append(key)
+                continue
+            if not _same(value, spec["value"]):
+                inline.append(key)
+                continue
+        entries[key] = spec
+    index = {"version": 1, "values": entries}
+    return index, arrays, inline
+
+
+def _roundtrips(spec: Dict[str, Any]) -> bool:
+    """
+    Whether the index entry survives JSON. Leaves are uniformly int or float
+    and dict key order was checked against the axes while encoding, so the
+    dict keys are the only part that JSON can still change (tuple or
+    non-string keys that are not int/float/bool).
+    """
+    if spec["kind"] != "nested":
+        return True
+    try:
+        stored = json.loads(json.dumps(spec["axes"]))
+    except (TypeError, ValueError):
+        return False
+    for keys, loaded in zip(spec["axes"], stored, strict=True):
+        if keys is None:
+            continue
+        if len(keys) != len(loaded) or any(type(k) is not type(j) or k != j for k, j in zip(keys, loaded, strict=True)):
+            return False
+    return True
+
+
+# =============================================================================
+# STORE
+# =============================================================================
+
+def _write_atomic(path: str, payload: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def _prune_store(store_dir: str) -> None:
+    global _last_prune
+    now = time.time()
+    if now - _last_prune < _PRUNE_INTERVAL_SECONDS:
+        return
+    _last_prune = now
+    try:
+        entries = list(os.scandir(store_dir))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.name.startswith("sd_") and now - entry.stat().st_mtime > SCENE_DATA_TTL_SECONDS:
+                os.remove(entry.path)
+        except OSError:
+            continue
+
+
+def write_scene_data(
+    index: Dict[str, Any],
+    arrays: Dict[str, Any],
+    store_dir: Optional[str] = None,
+) -> str:
+    """Write a sidecar to the store and return its name (content-addressed)."""
+    store_dir = store_dir or SCENE_DATA_DIR
+    index_bytes = json.dumps(index, ensure_ascii=False).encode("utf-8")
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    npz_bytes = buf.getvalue()
+
+    digest = hashlib.sha1(index_bytes)
+    digest.update(npz_bytes)
+    name = f"sd_{digest.hexdigest()[:24]}"
+
+    os.makedirs(store_dir, exist_ok=True)
+    index_path = os.path.join(store_dir, name + ".json")
+    npz_path = os.path.join(store_dir, name + ".npz")
+    if os.path.exists(index_path) and os.path.exists(npz_path):
+        # Same content already stored; keep it from being pruned
+        os.utime(index_path)
+        os.utime(npz_path)
+    else:
+        # Arrays first: the index is what the loader looks for
+        _write_atomic(npz_path, npz_bytes)
+        _write_atomic(index_path, index_bytes)
+        _prune_store(store_dir)
+    return name
+
+
+def scene_data_refs(code: str) -> List[str]:
+    """Sidecar names referenced by generated scene code."""
+    return sorted(set(_SIDECAR_REF_RE.findall(code or "")))
+
+
+def stage_scene_data(code: str, work_dir: str, store_dir: Optional[str] = None) -> List[str]:
+    """
+    Link (or copy) the sidecars referenced by ``code`` into ``work_dir`` so
+    they sit next to the scene file. Missing sidecars are skipped; the loader
+    then reports them when the scene starts.
+    """
+    store_dir = store_dir or SCENE_DATA_DIR
+    staged: List[str] = []
+    for name in scene_data_refs(code):
+        for suffix in (".npz", ".json"):
+            src = os.path.join(store_dir, name + suffix)
+            dst = os.path.join(work_dir, name + suffix)
+            if os.path.exists(dst):
+                continue
+            try:
+                os.link(src, dst)
+            except OSError:
+                try:
+                    shutil.copy2(src, dst)
+                except OSError as e:
+                    logger.warning(f"[SCENE_DATA] Could not stage {name}{suffix}: {e}")
+                    continue
+        staged.append(name)
+    return staged
+
+
+# =============================================================================
+# CODE GENERATION
+# =============================================================================
+
+def _store_values(values: Dict[str, Any], store_dir: Optional[str]) -> Tuple[Optional[str], List[str]]:
+    """
+    Write ``values`` to a sidecar. Returns the sidecar name (None when nothing
+    could be stored) and the names that must be emitted as literals.
+    """
+    names = list(values)
+    if not SCENE_DATA_ENABLED or np is None:
+        return None, names
+
+    start = time.time()
+    try:
+        index, arrays, inline = _encode(values)
+        if len(inline) == len(names):
+            return None, names
+        sidecar = write_scene_data(index, arrays, store_dir)
+    except Exception as e:
+        logger.warning(f"[SCENE_DATA] Sidecar unavailable, embedding literals: {e}")
+        return None, names
+
+    logger.debug(
+        f"[SCENE_DATA] Wrote {sidecar}: {len(names) - len(inline)} values, {len(arrays)} arrays "
+        f"in {round((time.time() - start) * 1000, 2)}ms"
+    )
+    return sidecar, inline
+
+
+def _load_call(sidecar: str, store_dir: Optional[str]) -> str:
+    return f"load_scene_data({json.dumps(sidecar)}, {json.dumps(store_dir or SCENE_DATA_DIR)})"
+
+
+def scene_data_block(
+    values: Dict[str, Any],
+    store_dir: Optional[str] = None,
+    formatter: Callable[[Any], str] = format_literal,
+) -> str:
+    """
+    Code that defines each ``values`` entry as a module-level constant.
+
+    Dataset-sized values are loaded from a sidecar; small payloads, values
+    that cannot be stored exactly, and everything when the sidecar cannot be
+    written are emitted as literals via ``formatter`` (the previous behaviour).
+    """
+    names = list(values)
+    sidecar, inline = None, names
+    if _more_leaves_than(list(values.values()), SCENE_DATA_INLINE_MAX_ITEMS):
+        sidecar, inline = _store_values(values, store_dir)
+    if sidecar is None:
+        return "\n".join(f"{name} = {formatter(values[name])}" for name in names)
+
+    lines = [
+        "from agents.tools.scene_runtime.data import load_scene_data",
+        f"_SCENE_DATA = {_load_call(sidecar, store_dir)}",
+    ]
+    for name in names:
+        if name in inline:
+            lines.append(f"{name} = {formatter(values[name])}")
+        else:
+            lines.append(f"{name} = _SCENE_DATA[{json.dumps(name)}]")
+    return "\n".join(lines)
+
+
+def template_scene_code(
+    template: str,
+    scene_class: str,
+    values: Dict[str, Any],
+    comment: str = "",
+    store_dir: Optional[str] = None,
+    formatter: Callable[[Any], str] = format_literal,
+) -> str:
+    """
+    Scene file for a template in agents.tools.scene_runtime.
+
+    ``values`` (data and settings alike) go into one sidecar, so the file is
+    the same few lines for every dataset; values that cannot be stored are
+    passed to configure() as literals.
+    """
+    sidecar, inline = _store_values(values, store_dir)
+    items = [f"    {json.dumps(name)}: {formatter(values[name])}," for name in values if name in inline]
+    if sidecar is not None and not items:
+        config = _load_call(sidecar, store_dir)
+    else:
+        if sidecar is not None:
+            items.insert(0, f"    **{_load_call(sidecar, store_dir)},")
+        config = "{\n" + "\n".join(items) + "\n}"
+
+    lines = ["from manim import *", f"from agents.tools.scene_runtime import {template} as template"]
+    if sidecar is not None:
+        lines.append("from agents.tools.scene_runtime.data import load_scene_data")
+    lines.append("")
+    lines.extend(f"# {line}".rstrip() for line in comment.splitlines())
+    lines.extend([
+        f"template.configure({config})",
+        "",
+        "",
+        "class GenScene(Scene):",
+        "    def construct(self):",
+        f"        template.{scene_class}(self).construct()",
+    ])
+    return "\n".join(lines)
+
+
+__all__ = [
+    "SCENE_DATA_DIR",
+    "format_literal",
+    "scene_data_block",
+    "scene_data_refs",
+    "stage_scene_data",
+    "template_scene_code",
+    "write_scene_data",
+]
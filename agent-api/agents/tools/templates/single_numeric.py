@@ -40,7 +40,9 @@ import csv
 import logging
 import os
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from agents.tools.templates.scene_data import template_scene_code
 
 # Setup module logger
 logger = logging.getLogger("animation_pipeline.templates.single_numeric")
@@ -440,20 +442,6 @@ def detect_insights(data: SingleNumericData) -> List[SingleNumericInsight]:
 # CODE GENERATION
 # =============================================================================
 
-def _format_literal(obj: Any) -> str:
-    """Format Python object as code literal"""
-    if isinstance(obj, str):
-        return repr(obj)
-    elif isinstance(obj, dict):
-        items = ", ".join(f"{_format_literal(k)}: {_format_literal(v)}" for k, v in obj.items())
-        return "{" + items + "}"
-    elif isinstance(obj, (list, tuple)):
-        items = ", ".join(_format_literal(x) for x in obj)
-        return "[" + items + "]"
-    else:
-        return repr(obj)
-
-
 def generate_single_numeric(
     spec: object,
     csv_path: str,
@@ -568,16 +556,13 @@ def generate_single_numeric(
         NARRATIVE_STYLE_PRESETS[NarrativeStyle.EXPLAINER]
     )
 
-    # Format data literals
-    lit_categories = _format_literal(data.categories)
-    lit_values = _format_literal(data.values)
-    lit_colors = _format_literal(chart_colors[:len(data.categories)])
+    bar_colors = chart_colors[:len(data.categories)]
 
     # Format insights
-    lit_insights = _format_literal([
+    insight_items = [
         {"type": i.insight_type, "desc": i.description}
         for i in insights
-    ])
+    ]
 
     # Calculate timing
     intro_duration = pacing["intro_duration"] if include_intro else 0
@@ -603,274 +588,41 @@ def generate_single_numeric(
     value_margin = 0.5
 
     # Generate the Manim code
-    code = f'''
-from manim import *
-import math
-
-# =============================================================================
-# SINGLE NUMERIC BAR CHART ANIMATION
-# =============================================================================
-# A clean horizontal bar chart showing values by category
-# Theme: {theme}
-# Category Column: {data.category_column}
-# Value Column: {data.value_column}
-# =============================================================================
-
-# --- Data ---
-CATEGORIES = {lit_categories}
-VALUES = {lit_values}
-MAX_VALUE = {data.max_value}
-MIN_VALUE = {data.min_value}
-TOTAL_VALUE = {data.total_value}
-CATEGORY_COLUMN = "{data.category_column}"
-VALUE_COLUMN = "{data.value_column}"
-
-# --- Colors ---
-BAR_COLORS = {lit_colors}
-BG_COLOR = "{bg_color}"
-TEXT_COLOR = "{text_color}"
-TEXT_SECONDARY = "{text_secondary}"
-
-# --- Insights ---
-INSIGHTS = {lit_insights}
-
-# --- Story Configuration ---
-STORY_TITLE = "{title}"
-STORY_SUBTITLE = "{subtitle}"
-INCLUDE_INTRO = {include_intro}
-INCLUDE_CONCLUSION = {include_conclusion}
-
-# --- Timing ---
-INTRO_DURATION = {intro_duration}
-REVEAL_DURATION = {reveal_duration}
-HOLD_DURATION = {hold_duration}
-OUTRO_DURATION = {outro_duration}
-BAR_GROW_TIME = {bar_grow_time}
-STAGGER_DELAY = {stagger_delay}
-
-# --- Layout ---
-BAR_HEIGHT = {bar_height}
-BAR_SPACING = {bar_spacing}
-MAX_BAR_WIDTH = {max_bar_width}
-CHART_TOP = {chart_top}
-VALUE_MARGIN = {value_margin}
-
-
-def format_value(value: float) -> str:
-    """Format value with K/M/B suffix"""
-    abs_value = abs(value)
-    sign = "-" if value < 0 else ""
-
-    if abs_value >= 1_000_000_000:
-        return f"{{sign}}{{abs_value / 1_000_000_000:.1f}}B"
-    elif abs_value >= 1_000_000:
-        return f"{{sign}}{{abs_value / 1_000_000:.1f}}M"
-    elif abs_value >= 1_000:
-        return f"{{sign}}{{abs_value / 1_000:.1f}}K"
-    elif abs_value >= 100:
-        return f"{{sign}}{{abs_value:.0f}}"
-    elif abs_value >= 1:
-        return f"{{sign}}{{abs_value:.1f}}"
-    elif abs_value > 0:
-        return f"{{sign}}{{abs_value:.2f}}"
-    else:
-        return "0"
-
-
-class GenScene(Scene):
-    def construct(self):
-        # Set background
-        self.camera.background_color = BG_COLOR
-
-        # --- Intro Scene ---
-        if INCLUDE_INTRO:
-            self.play_intro()
-
-        # --- Main Chart ---
-        self.play_chart()
-
-        # --- Conclusion Scene ---
-        if INCLUDE_CONCLUSION:
-            self.play_conclusion()
-
-    def play_intro(self):
-        """Animated title sequence"""
-        title = Text(
-            STORY_TITLE,
-            font_size=48,
-            color=TEXT_COLOR,
-            weight=BOLD,
-        ).move_to(UP * 0.5)
-
-        subtitle = Text(
-            STORY_SUBTITLE,
-            font_size=24,
-            color=TEXT_SECONDARY,
-        ).next_to(title, DOWN, buff=0.3)
-
-        # Animate in
-        self.play(
-            FadeIn(title, shift=UP * 0.3),
-            run_time=0.8,
-        )
-        self.play(
-            FadeIn(subtitle, shift=UP * 0.2),
-            run_time=0.5,
-        )
-
-        self.wait(INTRO_DURATION - 1.3)
-
-        # Animate out
-        self.play(
-            FadeOut(title, shift=UP * 0.3),
-            FadeOut(subtitle, shift=UP * 0.3),
-            run_time=0.5,
-        )
-
-    def play_chart(self):
-        """Main chart animation with staggered bar growth"""
-        num_bars = len(CATEGORIES)
-
-        # Create all bar components
-        bars = []
-        labels = []
-        value_texts = []
-
-        # Calculate vertical positions
-        start_y = CHART_TOP - BAR_HEIGHT / 2
-
-        for i, (category, value) in enumerate(zip(CATEGORIES, VALUES)):
-            y_pos = start_y - i * (BAR_HEIGHT + BAR_SPACING)
-
-            # Calculate bar width (scaled to max value)
-            # Handle negative values by using absolute value for width
-            abs_value = abs(value)
-            width_ratio = abs_value / MAX_VALUE if MAX_VALUE > 0 else 0
-            bar_width = width_ratio * MAX_BAR_WIDTH
-
-            # Category label (left side)
-            label = Text(
-                category[:20] + "..." if len(category) > 20 else category,
-                font_size=18,
-                color=TEXT_COLOR,
-            ).move_to(LEFT * 6 + UP * y_pos)
-            label.align_to(LEFT * 5.5, RIGHT)
-            labels.append(label)
-
-            # Bar (starts at width 0)
-            bar = Rectangle(
-                width=0.001,  # Start nearly invisible
-                height=BAR_HEIGHT,
-                fill_color=BAR_COLORS[i % len(BAR_COLORS)],
-                fill_opacity=0.9,
-                stroke_width=0,
-            )
-            bar.move_to(LEFT * 5 + UP * y_pos)
-            bar.align_to(LEFT * 5, LEFT)
-            bar.target_width = bar_width  # Store target width
-            bars.append(bar)
-
-            # Value label (will appear at end of bar)
-            value_text = Text(
-                format_value(value),
-                font_size=16,
-                color=TEXT_COLOR,
-                weight=BOLD,
-            )
-            value_text.move_to(LEFT * 5 + RIGHT * bar_width + RIGHT * VALUE_MARGIN + UP * y_pos)
-            value_text.set_opacity(0)
-            value_texts.append(value_text)
-
-        # Add small title at top
-        chart_title = Text(
-            STORY_TITLE,
-            font_size=28,
-            color=TEXT_COLOR,
-            weight=BOLD,
-        ).move_to(UP * 3.2)
-
-        # Animate: First show labels and title
-        self.play(
-            FadeIn(chart_title, shift=DOWN * 0.2),
-            *[FadeIn(label, shift=RIGHT * 0.2) for label in labels],
-            run_time=0.6,
-        )
-
-        # Animate: Staggered bar growth
-        bar_animations = []
-        for i, (bar, value_text) in enumerate(zip(bars, value_texts)):
-            # Create custom animation for bar growth
-            target_width = bar.target_width
-
-            def grow_bar(mob, alpha, tw=target_width):
-                new_width = max(0.001, tw * alpha)
-                mob.stretch_to_fit_width(new_width)
-                mob.align_to(LEFT * 5, LEFT)
-                return mob
-
-            bar_anim = UpdateFromAlphaFunc(
-                bar,
-                grow_bar,
-                run_time=BAR_GROW_TIME,
-                rate_func=rate_functions.ease_out_cubic,
-            )
-
-            # Value appears as bar finishes
-            value_anim = Succession(
-                Wait(BAR_GROW_TIME * 0.7),
-                AnimationGroup(
-                    value_text.animate.set_opacity(1),
-                    run_time=BAR_GROW_TIME * 0.3,
-                ),
-            )
-
-            bar_animations.append(
-                Succession(
-                    Wait(i * STAGGER_DELAY),
-                    AnimationGroup(bar_anim, value_anim),
-                )
-            )
-
-        # Add bars to scene first
-        for bar in bars:
-            self.add(bar)
-        for vt in value_texts:
-            self.add(vt)
-
-        # Play staggered animations
-        self.play(*bar_animations)
-
-        # Hold on final result
-        self.wait(HOLD_DURATION)
-
-        # Store for cleanup
-        self.chart_elements = [chart_title] + labels + bars + value_texts
-
-    def play_conclusion(self):
-        """Conclusion with optional insight callout"""
-        # Fade out chart elements
-        if hasattr(self, 'chart_elements'):
-            self.play(
-                *[FadeOut(elem) for elem in self.chart_elements],
-                run_time=0.5,
-            )
-
-        # Show insight if available
-        if INSIGHTS:
-            insight = INSIGHTS[0]
-            insight_text = Text(
-                insight["desc"],
-                font_size=32,
-                color=TEXT_COLOR,
-            ).move_to(ORIGIN)
-
-            self.play(FadeIn(insight_text, shift=UP * 0.3), run_time=0.5)
-            self.wait(OUTRO_DURATION - 1.0)
-            self.play(FadeOut(insight_text, shift=UP * 0.3), run_time=0.5)
-        else:
-            # Simple fade to end
-            self.wait(OUTRO_DURATION)
-'''
+    values = {
+        "CATEGORIES": data.categories,
+        "VALUES": data.values,
+        "MAX_VALUE": data.max_value,
+        "MIN_VALUE": data.min_value,
+        "TOTAL_VALUE": data.total_value,
+        "CATEGORY_COLUMN": data.category_column,
+        "VALUE_COLUMN": data.value_column,
+        "BAR_COLORS": bar_colors,
+        "BG_COLOR": bg_color,
+        "TEXT_COLOR": text_color,
+        "TEXT_SECONDARY": text_secondary,
+        "INSIGHTS": insight_items,
+        "STORY_TITLE": title,
+        "STORY_SUBTITLE": subtitle,
+        "INCLUDE_INTRO": include_intro,
+        "INCLUDE_CONCLUSION": include_conclusion,
+        "INTRO_DURATION": intro_duration,
+        "REVEAL_DURATION": reveal_duration,
+        "HOLD_DURATION": hold_duration,
+        "OUTRO_DURATION": outro_duration,
+        "BAR_GROW_TIME": bar_grow_time,
+        "STAGGER_DELAY": stagger_delay,
+        "BAR_HEIGHT": bar_height,
+        "BAR_SPACING": bar_spacing,
+        "MAX_BAR_WIDTH": max_bar_width,
+        "CHART_TOP": chart_top,
+        "VALUE_MARGIN": value_margin,
+    }
+    code = template_scene_code(
+        "single_numeric",
+        "SingleNumericScene",
+        values,
+        comment=f"Theme: {theme}\nCategory Column: {data.category_column}\nValue Column: {data.value_column}",
+    )
 
     return code.strip()
 
@@ -2,7 +2,7 @@
 Lightweight validation and auto-fix helpers for Manim code.
 
 This module provides:
-- quick_validate(code): fast syntax checks (AST + simple patterns)
+- quick_validate(code): fast syntax checks (AST + simple patterns) and the static scene linter
 - parse_runtime_error(stderr): extract a concise error message from Manim/Python tracebacks
 - attempt_auto_fix(bad_code, error, engine, model): LLM-based code correction using existing code generation logic
 
@@ -19,6 +19,8 @@ import re
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
+from agents.tools.scene_lint import lint_scene
+
 
 # --- Results -----------------------------------------------------------------
 
@@ -70,6 +72,7 @@ def quick_validate(code: str) -> ValidationResult:
     - Required class and method signatures (GenScene(Scene), construct(self))
     - Naive bracket balance
     - Python AST parsing (syntax errors with line/column)
+    - Static lint: undefined names, unknown Manim kwargs/methods, unknown dataset columns
 
     Returns:
         ValidationResult(ok=True) if code seems valid enough to attempt running Manim.
@@ -105,6 +108,10 @@ def quick_validate(code: str) -> ValidationResult:
         details = f"{line}" if line else None
         return ValidationResult(False, msg, details)
 
+    report = lint_scene(code)
+    if not report.ok:
+        return ValidationResult(False, f"Static check failed: {report.issues[0]}", report.summary())
+
     return ValidationResult(True)
 
 
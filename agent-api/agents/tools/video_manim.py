@@ -9,6 +9,8 @@ import select
 import logging
 from typing import Generator, Tuple, Optional
 from shutil import which
+from agents.tools.scene_runtime import runtime_env
+from agents.tools.templates.scene_data import stage_scene_data
 from api.settings import api_settings
 
 # Setup module logger
@@ -176,6 +178,10 @@ config.frame_width = {frame_width}
     scene_file_path = os.path.join(work_dir, scene_file_name)
     with open(scene_file_path, "w", encoding="utf-8") as f:
         f.write(mod_code)
+    # Dataset sidecars referenced by template scenes go next to the scene file
+    staged = stage_scene_data(mod_code, work_dir)
+    if staged:
+        logger.debug(f"[RENDER] Staged scene data: {staged}")
 
     # Prepare output naming
     out_stem = f"video-{user_id}-{project_name}-{iteration}-{uuid.uuid4().hex[:6]}"
@@ -212,6 +218,7 @@ config.frame_width = {frame_width}
                 cmd=cmd,
                 role="render",
                 cwd=work_dir,
+                env=runtime_env(),
                 text=True,
                 bufsize=1,
                 stdout=subprocess.PIPE,
@@ -223,6 +230,7 @@ config.frame_width = {frame_width}
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 cwd=work_dir,
+                env=runtime_env(),
                 text=True,
                 bufsize=1,
             )
@@ -0,0 +1,214 @@
+"""
+Non-blocking chat streaming for the agent fallback path.
+
+The chat fallback used to call the synchronous ``agent.run(message,
+stream=True)`` and walk the returned iterator with a plain ``for`` loop inside
+the async SSE generator, so every wait for the next LLM token blocked the
+event loop -- and with it every other request and stream.
+
+This module provides:
+- stream_agent_chunks(): chunks of an agent response as an async iterator,
+  using the agent's async API (``arun``) when it has one and otherwise
+  running ``run`` and its iterator on a dedicated thread
+- iterate_in_thread(): bridge any blocking iterator to an async iterator
+  through an asyncio queue
+- chat_event_stream(): the SSE 'data:' lines served by the chat endpoints
+  (RunContent per chunk, RunError on failure, RunCompleted at the end)
+
+Notes:
+- Each bridged stream gets its own daemon thread rather than a slot in the
+  default executor, so long-lived streams cannot starve each other (or
+  other run_in_executor users) of workers.
+- The queue between the thread and the loop is bounded; a slow client
+  pauses the producer instead of buffering the whole response.
+- When the consumer stops early (client disconnect), the producer stops at
+  the next chunk and the iterator is closed on its own thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Chunks buffered between a producer thread and the event loop
+STREAM_QUEUE_SIZE = 64
+
+_DONE = object()
+
+
+class _Raised:
+    """Exception raised by the producer, re-raised in the consumer."""
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+async def iterate_in_thread(
+    make_iterable: Callable[[], Any],
+    *,
+    queue_size: int = STREAM_QUEUE_SIZE,
+    thread_name: str = "chat-stream",
+) -> AsyncIterator[Any]:
+    """
+    Iterate a blocking iterable without blocking the event loop.
+
+    ``make_iterable()`` is called on a worker thread (the call itself may
+    block, e.g. an HTTP request), as is every ``next()``. Items are handed
+    to the loop through a bounded asyncio queue. A result that is not
+    iterable (str/bytes/dict count as single values) is yielded once.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item: Any) -> bool:
+        """Blocking put from the producer thread; False once the consumer is gone."""
+        while not stop.is_set():
+            try:
+                future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+                future.result(timeout=0.5)
+                return True
+            except TimeoutError:
+                # Queue still full; re-check whether the consumer left. A put
+                # that completed meanwhile cannot be cancelled.
+                if not future.cancel():
+                    return True
+            except Exception:
+                # Loop closed or put cancelled
+                return False
+        return False
+
+    def produce() -> None:
+        iterator = None
+        try:
+            result = make_iterable()
+            if hasattr(result, "__iter__") and not isinstance(result, (str, bytes, dict)):
+                iterator = iter(result)
+                for item in iterator:
+                    if not put(item):
+                        break
+            else:
+                put(result)
+        except BaseException as exc:
+            put(_Raised(exc))
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None and stop.is_set():
+                try:
+                    close()
+                except Exception:
+                    logger.debug("Error closing abandoned chat stream", exc_info=True)
+            put(_DONE)
+
+    worker = threading.Thread(target=produce, name=thread_name, daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Raised):
+                raise item.exc
+            yield item
+    finally:
+        stop.set()
+
+
+async def stream_agent_chunks(agent: Any, message: str) -> AsyncIterator[Any]:
+    """
+    Stream an agent response chunk by chunk without blocking the loop.
+
+    Prefers ``agent.arun(message, stream=True)`` (an async iterator, or an
+    awaitable resolving to one or to a single response); agents without an
+    async API run ``agent.run(message, stream=True)`` on a worker thread.
+    """
+    arun = getattr(agent, "arun", None)
+    if callable(arun):
+        response = arun(message, stream=True)
+        if inspect.isawaitable(response):
+            response = await response
+        if hasattr(response, "__aiter__"):
+            async for chunk in response:
+                yield chunk
+            return
+        if hasattr(response, "__iter__") and not isinstance(response, (str, bytes, dict)):
+            # A blocking iterator after all: keep its waits off the loop
+            async for chunk in iterate_in_thread(lambda: response):
+                yield chunk
+            return
+        yield response
+        return
+
+    async for chunk in iterate_in_thread(lambda: agent.run(message, stream=True)):
+        yield chunk
+
+
+def chunk_payload(chunk: Any, event: str = "RunContent") -> dict:
+    """SSE payload for one response chunk (content normalized to a string)."""
+    if hasattr(chunk, "content"):
+        if chunk.content is None:
+            content = ""
+        elif isinstance(chunk.content, str):
+            content = chunk.content
+        else:
+            try:
+                content = json.dumps(chunk.content)
+            except Exception:
+                content = str(chunk.content)
+    else:
+        content = str(chunk)
+
+    payload = {
+        "event": event,
+        "content": content,
+        "created_at": int(getattr(chunk, "created_at", None) or time.time()),
+    }
+    if getattr(chunk, "session_id", None):
+        payload["session_id"] = chunk.session_id
+    return payload
+
+
+def _sse(payload: dict) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def chat_event_stream(
+    agent: Any,
+    message: str,
+    chunks: Optional[Callable[[Any, str], AsyncIterator[Any]]] = None,
+) -> AsyncIterator[str]:
+    """
+    Agent response as SSE 'data:' lines with JSON objects:
+    {"event": "RunContent" | "RunError" | "RunCompleted", "content": ...,
+     "created_at": <unix ts>, "session_id": <optional>}
+    """
+    chunks = chunks or stream_agent_chunks
+    try:
+        async for chunk in chunks(agent, message):
+            try:
+                yield _sse(chunk_payload(chunk))
+            except Exception as inner_e:
+                logger.exception("Error while processing chunk: %s", inner_e)
+                yield _sse({"event": "RunError", "content": str(inner_e), "created_at": int(time.time())})
+    except Exception as e:
+        logger.exception("Unhandled error during chat streaming: %s", e)
+        yield _sse({"event": "RunError", "content": str(e), "created_at": int(time.time())})
+
+    yield _sse({"event": "RunCompleted", "content": "", "created_at": int(time.time())})
+
+
+__all__ = [
+    "STREAM_QUEUE_SIZE",
+    "iterate_in_thread",
+    "stream_agent_chunks",
+    "chunk_payload",
+    "chat_event_stream",
+]
@@ -8,8 +8,14 @@ from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 from starlette.staticfiles import StaticFiles
 
+from agents.tools.dry_run import dry_run_enabled, get_dry_run_pool
+from agents.tools.scene_lint import load_manim_symbols, scene_lint_enabled
+from api.routes.templates import template_catalog
 from api.routes.v1_router import v1_router
 from api.settings import api_settings
+from api.persistence.run_store import flush_run_writes
+from api.run_broker import set_broker
+from api.state_backend import get_state_backend
 
 
 def configure_logging():
@@ -187,6 +193,7 @@ async def lifespan(app: FastAPI):
     logger.info("=" * 60)
     logger.info(f"Environment | LOG_LEVEL={os.environ.get('LOG_LEVEL', 'INFO')}")
     logger.info(f"Environment | AUTO_SELECT_TEMPLATES={api_settings.auto_select_templates}")
+    logger.info(f"Environment | STATE_BACKEND={type(get_state_backend()).__name__}")
 
     # Ensure artifacts directories exist
     artifacts_dir = os.path.join(os.getcwd(), "artifacts")
@@ -199,6 +206,17 @@ async def lifespan(app: FastAPI):
     # Optionally generate GIF previews (controlled by env var)
     check_and_generate_gif_previews()
 
+    # Rebuild the template gallery cache when preview files change
+    template_catalog.start_watching()
+
+    # Start a dry-run worker and load the Manim symbol table now so the first
+    # run does not wait for the manim import
+    import threading
+    if dry_run_enabled():
+        threading.Thread(target=get_dry_run_pool().warm, name="dry-run-warmup", daemon=True).start()
+    if scene_lint_enabled():
+        threading.Thread(target=load_manim_symbols, name="manim-symbols", daemon=True).start()
+
     logger.info("=" * 60)
     logger.info("API STARTUP COMPLETE - READY TO ACCEPT REQUESTS")
     logger.info("=" * 60)
@@ -206,6 +224,11 @@ async def lifespan(app: FastAPI):
     yield
 
     # Shutdown
+    template_catalog.stop_watching()
+    get_dry_run_pool().close()
+    flush_run_writes()
+    set_broker(None)
+    get_state_backend().close()
     logger.info("=" * 60)
     logger.info("ANIMATION ENGINE API SHUTTING DOWN")
     logger.info("=" * 60)
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import json
 import logging
 from dataclasses import dataclass
 from typing import Optional, List
@@ -198,3 +199,82 @@ def get_dataset_by_id(dataset_id: str, db: Optional[Session] = None) -> Optional
     finally:
         if auto_close:
             session.close()
+
+# ---------------------------------------------------------------------------
+# Profile (upload-time dataset profile)
+# ---------------------------------------------------------------------------
+
+def update_dataset_profile(
+    dataset_id: str,
+    profile: Optional[dict],
+    status: str = "ready",
+    db: Optional[Session] = None,
+) -> bool:
+    """
+    Store the dataset's profile JSON and status (pending | ready | failed).
+    Returns False if the update failed or no row matched.
+    """
+    session = _new_session(db)
+    auto_close = db is None
+    try:
+        sql = text("""
+            update public.datasets
+            set profile = cast(:profile as jsonb),
+                profile_status = :status,
+                profiled_at = case when :status = 'ready' then now() else profiled_at end
+            where id = :id
+        """)
+        result = session.execute(sql, {
+            "id": dataset_id,
+            "profile": json.dumps(profile) if profile is not None else None,
+            "status": status,
+        })
+        session.commit()
+        return (result.rowcount or 0) > 0
+    except Exception as e:
+        session.rollback()
+        logger.warning("update_dataset_profile failed id=%s error=%s", dataset_id, e)
+        return False
+    finally:
+        if auto_close:
+            session.close()
+
+def get_dataset_profile(
+    dataset_id: Optional[str] = None,
+    storage_path: Optional[str] = None,
+    db: Optional[Session] = None,
+) -> Optional[dict]:
+    """
+    Fetch a ready profile by dataset id or storage_path (most recent first).
+    Returns None if not found or not yet profiled.
+    """
+    if not dataset_id and not storage_path:
+        return None
+    session = _new_session(db)
+    auto_close = db is None
+    try:
+        if dataset_id:
+            sql = text("""
+                select profile from public.datasets
+                where id = :id and profile_status = 'ready'
+                limit 1
+            """)
+            row = session.execute(sql, {"id": dataset_id}).mappings().first()
+        else:
+            sql = text("""
+                select profile from public.datasets
+                where storage_path = :storage_path and profile_status = 'ready'
+                order by profiled_at desc
+                limit 1
+            """)
+            row = session.execute(sql, {"storage_path": storage_path}).mappings().first()
+        if not row or row["profile"] is None:
+            return None
+        profile = row["profile"]
+        return json.loads(profile) if isinstance(profile, str) else profile
+    except Exception as e:
+        logger.warning("get_dataset_profile failed id=%s storage_path=%s error=%s", dataset_id, storage_path, e)
+        return None
+    finally:
+        if auto_close:
+            session.close()
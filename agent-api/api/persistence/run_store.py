@@ -46,6 +46,22 @@ NOTE:
 - All functions open a short-lived session (recommended for streaming generators).
   Alternatively, you can pass an existing session object.
 
+Write-behind (default):
+- Without an explicit `db` session, persist_run_created / persist_run_state /
+  persist_run_failed / persist_run_completed / persist_artifact queue their
+  write and return immediately (persist_run_created / persist_artifact then
+  return None; persist_run_state returns True). A background thread flushes
+  the queue every RUN_STORE_FLUSH_INTERVAL_MS in one transaction with
+  multi-row statements.
+- Consecutive state updates of a run are coalesced into one (the latest
+  state; the latest non-null message), and folded into the run's insert
+  when that has not been flushed yet.
+- Terminal states (COMPLETED, ERROR, CANCELED) flush synchronously, as does
+  reaching RUN_STORE_MAX_BATCH queued writes.
+- If a batch fails, its writes are retried one by one so a single bad row
+  (e.g. an artifact for an unknown run) only loses itself, as before.
+- Passing `db`, or RUN_STORE_WRITE_BEHIND=0, writes synchronously.
+
 Migration Considerations (Supabase):
 - Foreign key user_id will be updated to reference `auth.users.id`.
 - RLS policies will be added; ensure queries include user_id filters when listing runs.
@@ -53,10 +69,14 @@ Migration Considerations (Supabase):
 
 from __future__ import annotations
 
+import atexit
 import logging
 import json
+import os
+import re
+import threading
 from dataclasses import dataclass
-from typing import Optional, Any, Dict, List
+from typing import Callable, Optional, Any, Dict, List, Tuple
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
@@ -65,6 +85,11 @@ from db.session import SessionLocal
 
 logger = logging.getLogger(__name__)
 
+WRITE_BEHIND_ENABLED = os.getenv("RUN_STORE_WRITE_BEHIND", "1").strip().lower() not in ("0", "false", "no")
+FLUSH_INTERVAL_SECONDS = float(os.getenv("RUN_STORE_FLUSH_INTERVAL_MS", "250")) / 1000.0
+MAX_BATCH = int(os.getenv("RUN_STORE_MAX_BATCH", "200"))
+TERMINAL_STATES = ("COMPLETED", "ERROR", "CANCELED")
+
 
 # ---------------------------------------------------------------------------
 # Data classes for typed return values
@@ -103,6 +128,14 @@ def _new_session(provided: Optional[Session]) -> Session:
     return provided or SessionLocal()
 
 
+def _db_user_id(user_id: Optional[str]) -> Optional[str]:
+    """Convert non-UUID user_id values to None (NULL in DB)."""
+    if user_id is not None and not re.fullmatch(r"[0-9a-fA-F-]{36}", user_id):
+        logger.warning("Non-UUID user_id received (%s); persisting as NULL", user_id)
+        return None
+    return user_id
+
+
 def _row_to_run(row) -> RunRow:
     return RunRow(
         run_id=row["run_id"],
@@ -146,16 +179,15 @@ def persist_run_created(
 ) -> Optional[RunRow]:
     """
     Insert a new agent run record. Fails gracefully if duplicate exists.
+    Queued (returns None) when write-behind applies.
     """
+    user_id = _db_user_id(user_id)
+    if db is None and WRITE_BEHIND_ENABLED:
+        get_write_queue().add_run(run_id, user_id, session_id, agent_id, state, message, metadata)
+        return None
     session = _new_session(db)
     auto_close = db is None
     try:
-        # Basic guard: convert non-UUID user_id values to None (NULL in DB)
-        if user_id is not None:
-            import re
-            if not re.fullmatch(r"[0-9a-fA-F-]{36}", user_id):
-                logger.warning("Non-UUID user_id received (%s); persisting as NULL", user_id)
-                user_id = None
         sql = text(
             """
             insert into public.agent_runs (run_id, user_id, session_id, agent_id, state, message, metadata)
@@ -197,8 +229,11 @@ def persist_run_state(
 ) -> bool:
     """
     Update the state (and optional message) of an existing run.
-    Returns True if a row was updated.
+    Returns True if a row was updated (or the update was queued).
     """
+    if db is None and WRITE_BEHIND_ENABLED:
+        get_write_queue().set_state(run_id, state, message)
+        return True
     session = _new_session(db)
     auto_close = db is None
     try:
@@ -259,7 +294,11 @@ def persist_artifact(
 ) -> Optional[ArtifactRow]:
     """
     Insert a produced artifact for a run.
+    Queued (returns None) when write-behind applies.
     """
+    if db is None and WRITE_BEHIND_ENABLED:
+        get_write_queue().add_artifact(run_id, kind, storage_path, width, height, duration_ms)
+        return None
     session = _new_session(db)
     auto_close = db is None
     try:
@@ -302,8 +341,9 @@ def persist_artifact(
 
 def get_run_row(run_id: str, db: Optional[Session] = None) -> Optional[RunRow]:
     """
-    Fetch a persisted run row.
+    Fetch a persisted run row (after flushing queued writes).
     """
+    flush_run_writes()
     session = _new_session(db)
     auto_close = db is None
     try:
@@ -333,8 +373,9 @@ def list_runs_rows(
     db: Optional[Session] = None,
 ) -> List[RunRow]:
     """
-    List run rows ordered by created_at descending.
+    List run rows ordered by created_at descending (after flushing queued writes).
     """
+    flush_run_writes()
     session = _new_session(db)
     auto_close = db is None
     try:
@@ -356,3 +397,212 @@ def list_runs_rows(
     finally:
         if auto_close:
             session.close()
+
+
+# ---------------------------------------------------------------------------
+# Write-behind queue
+# ---------------------------------------------------------------------------
+
+class RunWriteQueue:
+    """
+    Coalescing write-behind queue for agent_runs / artifacts writes.
+
+    Writes are kept as pending run inserts, per-run state updates and
+    artifact inserts, and flushed together (inserts first, so updates and
+    artifacts find their run) by a background thread or on demand.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        interval: float = FLUSH_INTERVAL_SECONDS,
+        max_batch: int = MAX_BATCH,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_batch = max(1, max_batch)
+        self._runs: Dict[str, Dict[str, Any]] = {}
+        self._states: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._artifacts: List[Dict[str, Any]] = []
+        self._lock = threading.Condition()
+        # Held for a whole flush so batches reach the database in order
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.stats = {"queued": 0, "coalesced": 0, "flushes": 0, "statements": 0, "fallbacks": 0}
+
+    def _pending(self) -> int:
+        return len(self._runs) + len(self._states) + len(self._artifacts)
+
+    def _queued(self, coalesced: bool = False) -> None:
+        """Account for a write and wake the flusher. Call with _lock held."""
+        self.stats["queued"] += 1
+        if coalesced:
+            self.stats["coalesced"] += 1
+        if self._thread is None and not self._closed:
+            self._thread = threading.Thread(target=self._run, name="run-store-flush", daemon=True)
+            self._thread.start()
+        self._lock.notify_all()
+
+    def add_run(self, run_id, user_id, session_id, agent_id, state, message, metadata) -> None:
+        with self._lock:
+            self._runs.setdefault(run_id, {
+                "run_id": run_id,
+                "user_id": user_id,
+                "session_id": session_id,
+                "agent_id": agent_id,
+                "state": state,
+                "message": message,
+                "metadata": json.dumps(metadata or {}),
+            })
+            self._queued()
+            full = self._pending() >= self.max_batch
+        if full:
+            self.flush()
+
+    def set_state(self, run_id: str, state: str, message: Optional[str] = None) -> None:
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is not None:
+                # Not inserted yet: the insert carries the latest state
+                run["state"] = state
+                if message is not None:
+                    run["message"] = message
+                self._queued(coalesced=True)
+            else:
+                previous = self._states.get(run_id)
+                if previous is not None and message is None:
+                    message = previous[1]
+                self._states[run_id] = (state, message)
+                self._queued(coalesced=previous is not None)
+            full = self._pending() >= self.max_batch
+        if full or state in TERMINAL_STATES:
+            self.flush()
+
+    def add_artifact(self, run_id, kind, storage_path, width=None, height=None, duration_ms=None) -> None:
+        with self._lock:
+            self._artifacts.append({
+                "run_id": run_id,
+                "kind": kind,
+                "storage_path": storage_path,
+                "width": width,
+                "height": height,
+                "duration_ms": duration_ms,
+            })
+            self._queued()
+            full = self._pending() >= self.max_batch
+        if full:
+            self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                self._lock.wait_for(lambda: self._pending() or self._closed)
+                if self._closed and not self._pending():
+                    return
+            # Let writes accumulate for one interval
+            with self._lock:
+                self._lock.wait_for(lambda: self._closed, timeout=self.interval)
+            self.flush()
+
+    def flush(self) -> int:
+        """Write everything queued so far. Returns the number of writes flushed."""
+        with self._flush_lock:
+            with self._lock:
+                runs, self._runs = list(self._runs.values()), {}
+                states, self._states = list(self._states.items()), {}
+                artifacts, self._artifacts = self._artifacts, []
+            count = len(runs) + len(states) + len(artifacts)
+            if not count:
+                return 0
+            self.stats["flushes"] += 1
+            session = self.session_factory()
+            try:
+                self._write_batch(session, runs, states, artifacts)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                logger.warning("Run store batch of %d writes failed (%s); retrying individually", count, e)
+                self.stats["fallbacks"] += 1
+                self._write_individually(session, runs, states, artifacts)
+            finally:
+                session.close()
+            return count
+
+    def _execute(self, session: Session, sql: str, params: Dict[str, Any]) -> None:
+        session.execute(text(sql), params)
+        self.stats["statements"] += 1
+
+    def _write_batch(self, session, runs, states, artifacts) -> None:
+        if runs:
+            values, params = [], {}
+            for i, run in enumerate(runs):
+                values.append(
+                    f"(:run_id_{i}, :user_id_{i}, :session_id_{i}, :agent_id_{i}, :state_{i}, :message_{i}, (:metadata_{i})::jsonb)"
+                )
+                params.update({f"{k}_{i}": v for k, v in run.items()})
+            self._execute(
+                session,
+                "insert into public.agent_runs (run_id, user_id, session_id, agent_id, state, message, metadata) "
+                f"values {', '.join(values)} on conflict (run_id) do nothing",
+                params,
+            )
+        if states:
+            values, params = [], {}
+            for i, (run_id, (state, message)) in enumerate(states):
+                values.append(f"(cast(:run_id_{i} as uuid), cast(:state_{i} as text), cast(:message_{i} as text))")
+                params.update({f"run_id_{i}": run_id, f"state_{i}": state, f"message_{i}": message})
+            self._execute(
+                session,
+                "update public.agent_runs r set state = v.state, message = coalesce(v.message, r.message), updated_at = now() "
+                f"from (values {', '.join(values)}) as v(run_id, state, message) where r.run_id = v.run_id",
+                params,
+            )
+        if artifacts:
+            values, params = [], {}
+            for i, artifact in enumerate(artifacts):
+                values.append(f"(:run_id_{i}, :kind_{i}, :storage_path_{i}, :width_{i}, :height_{i}, :duration_ms_{i})")
+                params.update({f"{k}_{i}": v for k, v in artifact.items()})
+            self._execute(
+                session,
+                "insert into public.artifacts (run_id, kind, storage_path, width, height, duration_ms) "
+                f"values {', '.join(values)}",
+                params,
+            )
+
+    def _write_individually(self, session, runs, states, artifacts) -> None:
+        for run in runs:
+            persist_run_created(
+                run["run_id"], run["user_id"], run["session_id"], run["agent_id"],
+                run["state"], run["message"], json.loads(run["metadata"]), db=session,
+            )
+        for run_id, (state, message) in states:
+            persist_run_state(run_id, state, message, db=session)
+        for artifact in artifacts:
+            persist_artifact(db=session, **artifact)
+
+    def close(self) -> None:
+        """Flush and stop the background thread."""
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+        self.flush()
+
+
+_write_queue: Optional[RunWriteQueue] = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue() -> RunWriteQueue:
+    global _write_queue
+    if _write_queue is None:
+        with _write_queue_lock:
+            if _write_queue is None:
+                _write_queue = RunWriteQueue()
+                atexit.register(_write_queue.close)
+    return _write_queue
+
+
+def flush_run_writes() -> int:
+    """Flush queued run/artifact writes now (e.g. before reading them back or on shutdown)."""
+    return _write_queue.flush() if _write_queue is not None else 0
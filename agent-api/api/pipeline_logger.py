@@ -27,6 +27,8 @@ from enum import Enum
 from typing import Any, Dict, Optional, List
 from functools import wraps
 
+from api.state_backend import PIPELINE_LOGGERS, StateBackendError, shared_backend
+
 # Configure root logger for pipeline
 _pipeline_logger = logging.getLogger("animation_pipeline")
 _pipeline_logger.setLevel(logging.DEBUG)
@@ -364,11 +366,24 @@ def get_pipeline_logger(
     Get or create a pipeline logger for a run.
 
     If run_id is provided and a logger exists, return it.
-    Otherwise, create a new logger.
+    Otherwise, create a new logger. With a shared state backend the run's
+    session/user identity is stored there, so a logger created for the same
+    run on another worker tags its entries the same way.
     """
     if run_id and run_id in _logger_registry:
         return _logger_registry[run_id]
 
+    backend = shared_backend() if run_id else None
+    if backend is not None:
+        try:
+            identity = backend.get(PIPELINE_LOGGERS, run_id) or {}
+            session_id = session_id or identity.get("session_id")
+            user_id = user_id or identity.get("user_id")
+            if not identity:
+                backend.put(PIPELINE_LOGGERS, run_id, {"session_id": session_id, "user_id": user_id}, ttl=24 * 3600)
+        except StateBackendError as e:
+            _pipeline_logger.warning("Pipeline logger identity for run %s unavailable: %s", run_id, e)
+
     logger = PipelineLogger(run_id=run_id, session_id=session_id, user_id=user_id)
 
     if run_id:
@@ -380,6 +395,12 @@ def get_pipeline_logger(
 def cleanup_logger(run_id: str):
     """Remove a logger from the registry (call after run completes)."""
     _logger_registry.pop(run_id, None)
+    backend = shared_backend()
+    if backend is not None:
+        try:
+            backend.delete(PIPELINE_LOGGERS, run_id)
+        except StateBackendError:
+            pass
 
 
 def log_step(step: PipelineStep, message: str = ""):
@@ -19,6 +19,8 @@ from typing import List, Literal, Optional
 from fastapi import APIRouter, BackgroundTasks, HTTPException, status
 from pydantic import BaseModel, Field
 
+from api.routes.templates import invalidate_template_catalog
+
 
 logger = logging.getLogger(__name__)
 
@@ -199,6 +201,8 @@ def regenerate_previews(request: RegenerateRequest) -> RegenerateResponse:
         except Exception as e:
             logger.error(f"Failed to generate placeholders: {e}")
             errors.append(f"Placeholder generation error: {str(e)}")
+        finally:
+            invalidate_template_catalog()
 
     # Generate GIFs
     if request.regenerate_gifs:
@@ -227,6 +231,8 @@ def regenerate_previews(request: RegenerateRequest) -> RegenerateResponse:
 
             except Exception as e:
                 logger.error(f"GIF generation failed: {e}")
+            finally:
+                invalidate_template_catalog()
 
         if request.async_gifs:
             # Run in background thread
@@ -290,6 +296,9 @@ def delete_gif_previews(templates: Optional[List[str]] = None) -> dict:
         else:
             not_found.append(template_id)
 
+    if deleted:
+        invalidate_template_catalog()
+
     return {
         "deleted": deleted,
         "not_found": not_found,
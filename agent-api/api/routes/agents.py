@@ -12,20 +12,30 @@ from pydantic_core.core_schema import is_instance_schema
 from starlette.responses import Content
 
 from agno.agent import Agent, AgentKnowledge
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from agents.agno_assist import get_agno_assist_knowledge
 from agents.selector import AgentType, get_agent, get_available_agents
-from agents.tools.code_generation import generate_manim_code, CodeGenerationError
-from agents.tools.preview_manim import generate_manim_preview_stream
+from agents.tools.code_generation import (
+    generate_manim_code, stream_manim_code, discard_generated_code, CodeGenerationError
+)
+from agents.tools.data_reduction import reduce_for_render, SUPPORTED_CHART_TYPES as REDUCIBLE_CHART_TYPES
+from agents.tools.dry_run import dry_run_scene
+from agents.tools.inference_cache import inference_cache_stats
+from agents.tools.llm_gateway import llm_gateway_stats
+from agents.tools.preview_manim import classify_preview_error, generate_manim_preview_stream
+from agents.tools.scene_lint import lint_scene
 from agents.tools.video_manim import render_manim_stream
 from agents.tools.export_ffmpeg import export_merge_stream
 from sqlalchemy.orm import Session
 from api.settings import api_settings
+from api.chat_stream import chat_event_stream
+from api.run_broker import TERMINAL_STATES, get_broker, run_status_event, subscription_sse
+from api.run_events import get_event_log, start_detached_run, stream_run_events
 from api.run_registry import (
-    create_run, set_state, RunState, complete_run, fail_run, cancel_run, get_run, list_runs,
+    create_run, set_state, RunState, complete_run, fail_run, cancel_run, get_run, list_runs, is_canceled,
     set_pending_template_selection, get_pending_template_selection, clear_pending_template_selection,
 )
 from db.session import get_db
@@ -46,6 +56,7 @@ from api.pipeline_logger import (
 from api.session_context import (
     get_session_context,
     update_session_context,
+    clear_session_pending_selection,
     AnimationContext,
 )
 
@@ -90,6 +101,23 @@ def _quick_validate(code: str) -> tuple[bool, str]:
     return True, ""
 
 
+def _dry_run_validate(code: str) -> tuple[bool, str, bool]:
+    """
+    Execute construct() without rendering to catch runtime errors before the
+    preview. Returns (ok, error, allow_llm_fix); ``error`` starts with a
+    one-line summary followed by the scene's own traceback frames. A dry run
+    that cannot run (disabled, no worker, timeout) counts as passed.
+    """
+    result = dry_run_scene(code)
+    if result.ok or result.skipped:
+        return True, "", True
+    _category, _msg, allow_llm_fix = classify_preview_error(f"{result.error_type}: {result.error}")
+    error = result.message
+    if result.details:
+        error += "\n" + result.details
+    return False, error, allow_llm_fix
+
+
 def _build_fix_prompt(bad_code: str, error: str) -> str:
     return f"""
 The following Manim Python code has an error.
@@ -133,6 +161,20 @@ def _attempt_auto_fix(
         raise e
 
 
+def _code_progress_event(progress, run_id: str, session_id: Optional[str] = None) -> str:
+    """SSE line for a stream_manim_code() progress event (text only at milestones)."""
+    payload = {
+        "event": "RunContent",
+        "content": progress.message,
+        "created_at": int(time.time()),
+        "run_id": run_id,
+        "code_progress": progress.to_dict(),
+    }
+    if session_id:
+        payload["session_id"] = session_id
+    return f"data: {json.dumps(payload)}\n\n"
+
+
 agents_router = APIRouter(prefix="/agents", tags=["Agents"])
 
 
@@ -182,118 +224,18 @@ async def chat_response_streamer(agent: Agent, message: str) -> AsyncGenerator:
 
     Each yielded value is an SSE 'data:' line that contains a JSON object:
     {
-      "event": "RunContent" | "RunStarted" | "RunError" | "RunCompleted",
+      "event": "RunContent" | "RunError" | "RunCompleted",
       "content": "<text or json>",
       "created_at": <unix ts>,
       "session_id": "<optional>"
-      ...other fields if available...
     }
-    """
-    import inspect
-
-    try:
-        # Call agent.arun. It may return:
-        # - an async generator (stream=True) -> iterate with `async for` (no await)
-        # - or a coroutine/result (some implementations) -> await then handle
-        run_response = agent.run(message, stream=True)
-
-        # If agent.arun returned a coroutine/awaitable, await it to get the result
-        if inspect.isawaitable(run_response):
-            run_response = await run_response
-
-        # Now handle async iterable (generator) or sync iterable result
-        if hasattr(run_response, "__aiter__"):
-            # Async generator: iterate asynchronously
-            async for chunk in run_response:
-                try:
-                    # Normalize content to string (safe-guard)
-                    content = ""
-                    if hasattr(chunk, "content"):
-                        if chunk.content is None:
-                            content = ""
-                        elif isinstance(chunk.content, str):
-                            content = chunk.content
-                        else:
-                            try:
-                                content = json.dumps(chunk.content)
-                            except Exception:
-                                content = str(chunk.content)
-                    else:
-                        content = str(chunk)
-
-                    payload = {
-                        "event": "RunContent",
-                        "content": content,
-                        "created_at": int(getattr(chunk, "created_at", time.time())),
-                    }
-                    if getattr(chunk, "session_id", None):
-                        payload["session_id"] = chunk.session_id
-
-                    yield f"data: {json.dumps(payload)}\n\n"
-                except Exception as inner_e:
-                    logger.exception("Error while processing chunk: %s", inner_e)
-                    err_payload = {
-                        "event": "RunError",
-                        "content": str(inner_e),
-                        "created_at": int(time.time()),
-                    }
-                    yield f"data: {json.dumps(err_payload)}\n\n"
-        else:
-            # Not an async iterable. It might be a single response object or list.
-            # Normalize single response into one chunk and yield it.
-            # If it's an iterable, iterate synchronously.
-            if hasattr(run_response, "__iter__") and not isinstance(run_response, (str, bytes, dict)):
-                for chunk in run_response:
-                    content = getattr(chunk, "content", str(chunk))
-                    payload = {
-                        "event": "RunContent",
-                        "content": content,
-                        "created_at": int(getattr(chunk, "created_at", time.time())),
-                    }
-                    if getattr(chunk, "session_id", None):
-                        payload["session_id"] = chunk.session_id
-                    yield f"data: {json.dumps(payload)}\n\n"
-            else:
-                # Single response object
-                content = getattr(run_response, "content", str(run_response))
-                payload = {
-                    "event": "RunContent",
-                    "content": content,
-                    "created_at": int(getattr(run_response, "created_at", time.time())),
-                }
-                if getattr(run_response, "session_id", None):
-                    payload["session_id"] = run_response.session_id
-                yield f"data: {json.dumps(payload)}\n\n"
-
-        # Normal completion
-        completed_payload = {
-            "event": "RunCompleted",
-            "content": "",
-            "created_at": int(time.time()),
-        }
-        yield f"data: {json.dumps(completed_payload)}\n\n"
 
-    except Exception as e:
-        logger.exception("Unhandled error during chat_response_streamer: %s", e)
-        err_payload = {
-            "event": "RunError",
-            "content": str(e),
-            "created_at": int(time.time()),
-        }
-        try:
-            yield f"data: {json.dumps(err_payload)}\n\n"
-        except Exception:
-            logger.exception("Failed to yield error payload")
-    finally:
-        try:
-            final_payload = {
-                "event": "RunCompleted",
-                "content": "",
-                "created_at": int(time.time()),
-            }
-            yield f"data: {json.dumps(final_payload)}\n\n"
-        except Exception:
-            logger.debug("Could not emit final RunCompleted payload")
+    Streaming never blocks the event loop: the agent's async API is used
+    when available, otherwise the blocking run() iterator is consumed on a
+    worker thread (see api.chat_stream).
+    """
+    async for line in chat_event_stream(agent, message):
+        yield line
 
 
 class RunRequest(BaseModel):
@@ -411,6 +353,7 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
         # Intent detection gate (decide whether to run animation pipeline or fallback to chat)
         should_animate = False
         detected_chart_type = None  # Store detected chart type for later use
+        intent_memo = None  # Per-run intent memo, shared with animation_sse below
 
         if body.animate_data is True:
             should_animate = True
@@ -418,7 +361,8 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
             should_animate = False
         else:
             try:
-                from agents.tools.intent_detection import detect_animation_intent  # type: ignore
+                from agents.tools.intent_detection import IntentMemo  # type: ignore
+                intent_memo = IntentMemo()
                 # Pass csv_path for data-driven inference; check session context if not in body
                 csv_path_for_intent = getattr(body, "csv_path", None)
                 if not csv_path_for_intent and body.session_id:
@@ -426,7 +370,7 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
                     _session_ctx = get_session_context(body.session_id)
                     if _session_ctx and _session_ctx.has_dataset():
                         csv_path_for_intent = _session_ctx.get_effective_csv_path()
-                intent = detect_animation_intent(body.message, csv_path=csv_path_for_intent)
+                intent = intent_memo.detect(body.message, csv_path=csv_path_for_intent)
                 should_animate = bool(getattr(intent, "animation_requested", False))
                 detected_chart_type = getattr(intent, "chart_type", "unknown")
 
@@ -473,6 +417,14 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
                 media_type="text/event-stream",
             )
 
+        # Create and track run (before the pipeline is detached, so the
+        # response and reconnects can find its event log)
+        run = create_run(
+            user_id=(current_user.id if current_user else "local"),
+            session_id=body.session_id,
+            message=body.message or "",
+        )
+
         def animation_sse():
             msg = body.message or ""
             # In-memory registry keeps 'local'; DB persistence must store NULL for anonymous
@@ -480,8 +432,6 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
             db_user_id = (current_user.id if current_user else None)
             user_id = registry_user_id
             session_id = body.session_id
-            # Create and track run
-            run = create_run(user_id=registry_user_id, session_id=session_id, message=msg)
             run_id = run.run_id
             set_state(run_id, RunState.STARTING, "Starting")
 
@@ -503,7 +453,8 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
                 pass
             # Initial SSE event to signal animation pipeline activation (intent-based)
             try:
-                from agents.tools.intent_detection import detect_animation_intent  # type: ignore
+                from agents.tools.intent_detection import IntentMemo  # type: ignore
+                _intent_memo = intent_memo or IntentMemo()
                 # Pass csv_path for smart data-driven inference; check session context if not in body
                 csv_path_for_intent = getattr(body, "csv_path", None)
                 if not csv_path_for_intent and session_id:
@@ -511,7 +462,11 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
                     _session_ctx_intent = get_session_context(session_id)
                     if _session_ctx_intent and _session_ctx_intent.has_dataset():
                         csv_path_for_intent = _session_ctx_intent.get_effective_csv_path()
-                _intent_info = detect_animation_intent(msg, csv_path=csv_path_for_intent)
+                _intent_info = _intent_memo.detect(msg, csv_path=csv_path_for_intent)
+                plog.debug(PipelineStep.INTENT_DETECTION_COMPLETE, "Inference cache stats", {
+                    "intent": _intent_memo.stats().to_dict(),
+                    **inference_cache_stats(),
+                })
                 _chart = getattr(_intent_info, "chart_type", "unknown")
                 _conf = getattr(_intent_info, "confidence", 0.0)
                 _data_analyzed = getattr(_intent_info, "data_analyzed", False)
@@ -639,7 +594,7 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
                     try:
                         import os
                         import pandas as pd
-                        from api.services.data_modules import preprocess_dataset, validate_for_animation, read_csv_smart, resolve_csv_path, detect_header_row  # type: ignore
+                        from api.services.data_modules import preprocess_dataset, preprocess_csv_chunked, select_melt_columns, validate_for_animation, read_csv_smart, resolve_csv_path, detect_header_row  # type: ignore
 
                         plog.info(PipelineStep.DATA_PREPROCESSING, "Starting data preprocessing", {
                             "raw_dataset_path": raw_dataset_path,
@@ -657,10 +612,17 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
                             "cwd": os.getcwd(),
                         })
                         if _path_exists:
-                            # Detect header row for World Bank and similar formats
-                            header_row = detect_header_row(raw_dataset_path)
+                            # Header row from the upload-time profile when current; otherwise
+                            # detect it (World Bank and similar formats)
+                            from agents.tools.dataset_profile import get_profile
+                            _stored_profile = get_profile(os.path.abspath(raw_dataset_path))
+                            if _stored_profile is not None:
+                                header_row = _stored_profile.header_row
+                            else:
+                                header_row = detect_header_row(raw_dataset_path)
                             plog.debug(PipelineStep.DATA_PREPROCESSING, "Detected header row", {
                                 "header_row": header_row,
+                                "from_profile": _stored_profile is not None,
                             })
 
                             # Preview for structural detection with robust CSV parsing
@@ -868,40 +830,37 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
                             # If dataset is wide, perform full melt on entire file to a new artifacts CSV
                             if is_wide:
                                 try:
-                                    # Use header_row and skip_blank_lines=False to match preview reading
-                                    # Use utf-8-sig encoding to handle BOM
-                                    full_df = pd.read_csv(raw_dataset_path, header=header_row, skip_blank_lines=False, encoding='utf-8-sig')
-                                    # Identify year-like columns (4-digit) or numeric sequential headers
-                                    year_cols = [c for c in full_df.columns if isinstance(c, str) and c.isdigit() and len(c) == 4]
-                                    if not year_cols:
-                                        # Fallback: treat all numeric headers except first as value columns
-                                        candidate_cols = full_df.columns[1:]
-                                        # Use those that are mostly numeric
-                                        year_cols = [
-                                            c for c in candidate_cols
-                                            if pd.to_numeric(full_df[c], errors="coerce").notna().mean() > 0.5
-                                        ]
-                                    group_col = full_df.columns[0]
+                                    # Stream the file in row chunks so multi-GB exports never
+                                    # materialize (wide or long) in memory. Same header_row /
+                                    # skip_blank_lines / utf-8-sig handling as the preview read.
+                                    group_col, year_cols = select_melt_columns(
+                                        raw_dataset_path, header_row=header_row, encoding='utf-8-sig'
+                                    )
                                     if year_cols:
-                                        df_long = full_df.melt(id_vars=[group_col], value_vars=year_cols,
-                                                               var_name="time", value_name="value")
-                                        # Cast time -> int when possible
-                                        try:
-                                            df_long["time"] = df_long["time"].astype(int)
-                                        except Exception:
-                                            pass
-                                        df_long["value"] = pd.to_numeric(df_long["value"], errors="coerce")
                                         artifacts_datasets = os.path.join(os.getcwd(), "artifacts", "datasets")
                                         os.makedirs(artifacts_datasets, exist_ok=True)
                                         melted_dataset_path = os.path.join(
                                             artifacts_datasets,
                                             f"melted-{os.path.splitext(os.path.basename(raw_dataset_path))[0]}-{run_id}.csv"
                                         )
-                                        df_long.to_csv(melted_dataset_path, index=False)
+                                        melt_res = preprocess_csv_chunked(
+                                            raw_dataset_path,
+                                            melted_dataset_path,
+                                            header_row=header_row,
+                                            encoding='utf-8-sig',
+                                            group_column=group_col,
+                                            value_columns=year_cols,
+                                            include_derived=False,
+                                        )
+                                        plog.debug(PipelineStep.DATA_PREPROCESSING, "Chunked melt complete", {
+                                            "rows": melt_res.rows_written,
+                                            "chunks": melt_res.chunks,
+                                            "value_stats": melt_res.value_stats,
+                                        })
                                         dataset_melt_applied = True
                                         stats_payload = {
                                             "event": "RunContent",
-                                            "content": f"Melted wide dataset -> {melted_dataset_path} (rows={len(df_long)}, groups={df_long[group_col].nunique()}, time_points={df_long['time'].nunique()})",
+                                            "content": f"Melted wide dataset -> {melted_dataset_path} (rows={melt_res.rows_written}, groups={melt_res.group_count}, time_points={melt_res.time_points})",
                                             "created_at": int(time.time()),
                                             "run_id": run_id,
                                         }
@@ -1410,6 +1369,33 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
                                     yield f"data: {json.dumps(status)}\n\n"
                         except Exception as ie:
                             template_error = f"Ingestion failed: {ie}"
+                    # Enforce the render budget (time steps / entities / line points) before codegen
+                    if spec.chart_type in REDUCIBLE_CHART_TYPES and dataset_path and os.path.exists(dataset_path):
+                        try:
+                            artifacts_datasets = os.path.join(os.getcwd(), "artifacts", "datasets")
+                            reduction = reduce_for_render(
+                                dataset_path,
+                                spec.chart_type,
+                                spec=spec,
+                                output_path=os.path.join(artifacts_datasets, f"reduced-{run_id}.csv"),
+                            )
+                            plog.info(PipelineStep.DATA_PREPROCESSING, "Render budget reduction", reduction.to_dict())
+                            if reduction.applied:
+                                dataset_path = reduction.output_path
+                                reduce_payload = {
+                                    "event": "RunContent",
+                                    "content": reduction.summary(),
+                                    "reduction": reduction.to_dict(),
+                                    "created_at": int(time.time()),
+                                    "run_id": run_id,
+                                }
+                                if session_id:
+                                    reduce_payload["session_id"] = session_id
+                                yield f"data: {json.dumps(reduce_payload)}\n\n"
+                        except Exception as _rerr:
+                            plog.warning(PipelineStep.DATA_PREPROCESSING, f"Render budget reduction skipped: {_rerr}", {
+                                "dataset_path": dataset_path,
+                            })
                     if spec.chart_type == "bubble" and dataset_path and os.path.exists(dataset_path):
                         try:
                             # If user explicitly requested chart_type, validate CSV headers strictly
@@ -1907,7 +1893,8 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
                             "model": body.code_model or "default",
                         })
 
-                        code = generate_manim_code(
+                        code = None
+                        for progress in stream_manim_code(
                             prompt=msg,
                             engine=(body.code_engine or "anthropic"),
                             model=(body.code_model or None),
@@ -1915,7 +1902,11 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
                             max_tokens=1200,
                             extra_rules=(body.code_system_prompt or None),
                             run_id=run_id,
-                        )
+                        ):
+                            if progress.kind == "done":
+                                code = progress.code
+                            else:
+                                yield _code_progress_event(progress, run_id, session_id)
 
                         plog.step_with_duration(PipelineStep.CODE_GENERATION_COMPLETE, "LLM code generation completed successfully", {
                             "code_length": len(code) if code else 0,
@@ -2017,6 +2008,14 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
             fix_attempt = 0
             while fix_attempt <= max_fix_attempts:
                 ok, v_err = _quick_validate(code)
+                issue, allow_llm_fix = "Syntax issue", True
+                if ok:
+                    lint = lint_scene(code)
+                    ok, v_err, issue = lint.ok, lint.summary(), "Static check issue"
+                if ok:
+                    # Runtime errors surface here in about a second instead of after a preview launch
+                    ok, v_err, allow_llm_fix = _dry_run_validate(code)
+                    issue = "Runtime issue"
                 if ok:
                     plog.info(PipelineStep.CODE_VALIDATION_PASS, "Code validation passed", {
                         "attempts": fix_attempt,
@@ -2033,21 +2032,29 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
                         yield f"data: {json.dumps(status)}\n\n"
                     break
                 # Not ok
+                discard_generated_code(code)
                 plog.warning(PipelineStep.CODE_VALIDATION_FAIL, f"Code validation failed: {v_err}", {
                     "attempt": fix_attempt,
                     "max_attempts": max_fix_attempts,
                     "error": v_err,
                 })
-                if fix_attempt == max_fix_attempts:
-                    plog.error(PipelineStep.CODE_VALIDATION_FAIL, "Code validation failed after all attempts", {
+                if fix_attempt == max_fix_attempts or not allow_llm_fix:
+                    plog.error(PipelineStep.CODE_VALIDATION_FAIL, "Code validation failed after all attempts or LLM fix not allowed", {
                         "error": v_err,
                         "attempts": fix_attempt,
+                        "allow_llm_fix": allow_llm_fix,
                     })
+                    if allow_llm_fix:
+                        content = f"Code validation failed: {v_err.splitlines()[0]}"
+                    else:
+                        category, msg, _ = classify_preview_error(v_err.splitlines()[0])
+                        content = f"[{category}] {msg}"
                     err_payload = {
                         "event": "RunError",
-                        "content": f"Code validation failed: {v_err}",
+                        "content": content,
                         "created_at": int(time.time()),
                         "run_id": run_id,
+                        "allow_llm_fix": allow_llm_fix,
                     }
                     if session_id:
                         err_payload["session_id"] = session_id
@@ -2063,7 +2070,7 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
                 })
                 notice = {
                     "event": "RunContent",
-                    "content": f"Syntax issue detected ({v_err}). Attempting auto-fix {fix_attempt + 1}/{max_fix_attempts}...",
+                    "content": f"{issue} detected ({v_err.splitlines()[0]}). Attempting auto-fix {fix_attempt + 1}/{max_fix_attempts}...",
                     "created_at": int(time.time()),
                     "run_id": run_id,
                 }
@@ -2160,7 +2167,12 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
                     })
                     break
 
+                if is_canceled(run_id):
+                    # The error came from cancel_run() killing the preview; keep the code
+                    return
+
                 # We had a preview error (classified)
+                discard_generated_code(code)
                 plog.error(PipelineStep.PREVIEW_ERROR, f"Preview error: {last_error_msg}", {
                     "attempt": runtime_attempt,
                     "max_attempts": max_runtime_fix_attempts,
@@ -2285,6 +2297,8 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
             # 4) Done
             plog.info(PipelineStep.RUN_COMPLETED, "Animation pipeline completed successfully", {
                 "summary": plog.get_summary(),
+                "inference_cache": inference_cache_stats(),
+                **llm_gateway_stats(),
             })
             complete_run(run_id, "Completed")
             try:
@@ -2332,10 +2346,7 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
             cleanup_logger(run_id)
             yield f"data: {json.dumps(done)}\n\n"
 
-        return StreamingResponse(
-            animation_sse(),
-            media_type="text/event-stream",
-        )
+        return _detached_sse(run.run_id, animation_sse())
 
     try:
         agent: Agent = get_agent(
@@ -2360,10 +2371,97 @@ async def create_agent_run(agent_id: AgentType, body: RunRequest, current_user=D
         return response.content
 
 
+def _detached_sse(run_id: str, events) -> StreamingResponse:
+    """
+    Run a pipeline generator independently of this connection and stream
+    its events from the run's event log (resumable via /runs/{run_id}/events).
+    """
+    after = start_detached_run(run_id, events)
+    return StreamingResponse(
+        stream_run_events(run_id, after),
+        media_type="text/event-stream",
+        headers={"X-Run-Id": run_id},
+    )
+
+
+@agents_router.get("/runs/{run_id}/events", status_code=status.HTTP_200_OK)
+async def stream_run_events_endpoint(
+    run_id: str,
+    last_event_id: Optional[int] = Query(None, ge=0, description="Resume after this event id (for clients that cannot set headers)"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Stream a run's events as SSE, replaying those after Last-Event-ID and then
+    following the run until its pipeline finishes.
+
+    Without Last-Event-ID the stream starts from the oldest retained event.
+    If this worker has no event log for the run (it runs on another worker,
+    or the log expired), the stream starts with the run's current status and
+    follows it live through the run event broker.
+    """
+    if get_event_log(run_id) is None:
+        # Subscribe before reading the status so no update falls in between
+        subscription = get_broker().subscribe(run_id)
+        info = get_run(run_id)
+        if info is None:
+            subscription.close()
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+        return StreamingResponse(
+            _live_run_sse(info, subscription),
+            media_type="text/event-stream",
+            headers={"X-Run-Id": run_id},
+        )
+    after = last_event_id or 0
+    if last_event_id_header:
+        try:
+            after = max(after, int(last_event_id_header))
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Last-Event-ID") from None
+    return StreamingResponse(
+        stream_run_events(run_id, after),
+        media_type="text/event-stream",
+        headers={"X-Run-Id": run_id},
+    )
+
+
+async def _live_run_sse(info, subscription):
+    status_event = run_status_event(info)
+    yield f"data: {json.dumps(status_event)}\n\n"
+    if status_event["state"] in TERMINAL_STATES:
+        subscription.close()
+        return
+    async for chunk in subscription_sse(subscription, stop_on_terminal=True):
+        yield chunk
+
+
+@agents_router.get("/runs/stream", status_code=status.HTTP_200_OK)
+async def stream_runs_endpoint(
+    run_id: Optional[str] = Query(None, description="Only this run (default: all runs)"),
+    include_pipeline_events: bool = Query(False, description="Also stream pipeline events, not just RunStatus"),
+):
+    """
+    Push run updates as SSE instead of polling GET /runs or GET /runs/{run_id}.
+
+    Sends a RunStatus event whenever a run is created or changes state or
+    message. Subscribers that fall behind get a RunEventsDropped event.
+    """
+    subscription = get_broker().subscribe(
+        run_id, events=None if include_pipeline_events else {"RunStatus"},
+    )
+    return StreamingResponse(
+        subscription_sse(subscription, event_ids=run_id is not None),
+        media_type="text/event-stream",
+    )
+
+
 @agents_router.post("/runs/{run_id}/cancel", status_code=status.HTTP_202_ACCEPTED)
-async def cancel_run_endpoint(run_id: str):
+def cancel_run_endpoint(run_id: str):
     """
     Cancel a running job by run_id.
+
+    A plain def: cancelling a run owned by another worker waits (up to a
+    few seconds) for the owner to acknowledge, which must not block the
+    event loop.
     """
     ok = cancel_run(run_id, reason="user_request")
     if not ok:
@@ -2561,7 +2659,7 @@ async def select_template_for_run(
 
         # Get schema information from chart inference
         try:
-            from agents.tools.chart_inference import analyze_schema
+            from agents.tools.chart_inference import load_schema
 
             # Resolve the CSV path
             resolved_csv_path = csv_path
@@ -2571,7 +2669,8 @@ async def select_template_for_run(
                     resolved_csv_path = os.path.join(os.getcwd(), resolved_csv_path)
 
             if os.path.exists(resolved_csv_path):
-                schema = analyze_schema(resolved_csv_path)
+                # Upload-time profile when current, else a fresh analysis
+                schema = load_schema(resolved_csv_path)
 
                 # =========================================================
                 # AUTO-FILL MISSING REQUIRED MAPPINGS
@@ -2667,7 +2766,7 @@ async def select_template_for_run(
                     clear_pending_template_selection(run_id)
                     plog_init.debug(PipelineStep.DATA_BINDING, "Cleared pending state from run registry after successful validation", {})
                 elif pending_data_source == "session_context" and session_ctx:
-                    session_ctx.clear_pending_template_selection()
+                    clear_session_pending_selection(session_id)
                     plog_init.debug(PipelineStep.DATA_BINDING, "Cleared pending state from session context after successful validation", {})
             else:
                 plog_init.warning(PipelineStep.DATA_BINDING, "Could not validate column mappings - CSV not found", {
@@ -2678,7 +2777,7 @@ async def select_template_for_run(
                 if pending_data_source == "run_registry":
                     clear_pending_template_selection(run_id)
                 elif pending_data_source == "session_context" and session_ctx:
-                    session_ctx.clear_pending_template_selection()
+                    clear_session_pending_selection(session_id)
 
         except ImportError as e:
             plog_init.warning(PipelineStep.DATA_BINDING, f"Could not import chart_inference for validation: {e}", {})
@@ -2686,7 +2785,7 @@ async def select_template_for_run(
             if pending_data_source == "run_registry":
                 clear_pending_template_selection(run_id)
             elif pending_data_source == "session_context" and session_ctx:
-                session_ctx.clear_pending_template_selection()
+                clear_session_pending_selection(session_id)
         except HTTPException:
             # Re-raise HTTP exceptions - DO NOT clear pending state, user can retry
             raise
@@ -2699,7 +2798,7 @@ async def select_template_for_run(
             if pending_data_source == "run_registry":
                 clear_pending_template_selection(run_id)
             elif pending_data_source == "session_context" and session_ctx:
-                session_ctx.clear_pending_template_selection()
+                clear_session_pending_selection(session_id)
     else:
         # No column_mapping or csv_path - clear pending state and proceed
         plog_init.debug(PipelineStep.DATA_BINDING, "Skipping column mapping validation - no mappings or csv_path provided", {
@@ -2709,7 +2808,7 @@ async def select_template_for_run(
         if pending_data_source == "run_registry":
             clear_pending_template_selection(run_id)
         elif pending_data_source == "session_context" and session_ctx:
-            session_ctx.clear_pending_template_selection()
+            clear_session_pending_selection(session_id)
 
     # Resume the animation pipeline with the selected template
     def resume_animation_sse():
@@ -2851,6 +2950,33 @@ async def select_template_for_run(
                 "dataset_exists": os.path.exists(dataset_path) if dataset_path else False,
             })
 
+            # Enforce the render budget (time steps / entities / line points) before codegen
+            if body.template_id in REDUCIBLE_CHART_TYPES and dataset_path and os.path.exists(dataset_path):
+                try:
+                    reduction = reduce_for_render(
+                        dataset_path,
+                        body.template_id,
+                        spec=spec,
+                        output_path=os.path.join(os.getcwd(), "artifacts", "datasets", f"reduced-{run_id}.csv"),
+                    )
+                    plog.info(PipelineStep.DATA_PREPROCESSING, "Render budget reduction", reduction.to_dict())
+                    if reduction.applied:
+                        dataset_path = reduction.output_path
+                        reduce_payload = {
+                            "event": "RunContent",
+                            "content": reduction.summary(),
+                            "reduction": reduction.to_dict(),
+                            "created_at": int(time.time()),
+                            "run_id": run_id,
+                        }
+                        if session_id:
+                            reduce_payload["session_id"] = session_id
+                        yield f"data: {json.dumps(reduce_payload)}\n\n"
+                except Exception as _rerr:
+                    plog.warning(PipelineStep.DATA_PREPROCESSING, f"Render budget reduction skipped: {_rerr}", {
+                        "dataset_path": dataset_path,
+                    })
+
             # Generate code based on selected template with user column mappings
             if body.template_id == "bubble" and dataset_path and os.path.exists(dataset_path):
                 # Bubble chart: x_col, y_col, r_col, entity_col, time_col, group_col
@@ -2996,13 +3122,18 @@ async def select_template_for_run(
                     "engine": "anthropic",
                     "prompt_length": len(original_message),
                 })
-                code = generate_manim_code(
+                for progress in stream_manim_code(
                     prompt=original_message,
                     engine="anthropic",
                     model=None,
                     temperature=0.2,
                     max_tokens=1200,
-                )
+                    run_id=run_id,
+                ):
+                    if progress.kind == "done":
+                        code = progress.code
+                    else:
+                        yield _code_progress_event(progress, run_id, session_id)
                 plog.info(PipelineStep.LLM_API_CALL_COMPLETE, "LLM code generation complete", {
                     "code_length": len(code) if code else 0,
                 })
@@ -3065,6 +3196,8 @@ async def select_template_for_run(
                     plog.debug(PipelineStep.PREVIEW_FRAME_GENERATED, f"Preview frames generated: {preview_frame_count}", {
                         "frames_in_event": len(preview_event["images"]),
                     })
+                if preview_payload["event"] == "RunError":
+                    discard_generated_code(code)
                 yield f"data: {json.dumps(preview_payload)}\n\n"
 
             plog.info(PipelineStep.PREVIEW_COMPLETE, "=== PREVIEW GENERATION PHASE COMPLETE ===", {
@@ -3170,7 +3303,7 @@ async def select_template_for_run(
             # Cleanup logger
             cleanup_logger(run_id)
 
-    return StreamingResponse(resume_animation_sse(), media_type="text/event-stream")
+    return _detached_sse(run_id, resume_animation_sse())
 
 
 @agents_router.post("/{agent_id}/knowledge/load", status_code=status.HTTP_200_OK)
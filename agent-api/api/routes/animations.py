@@ -140,10 +140,9 @@ async def generate_animation(
         )
 
     # Validate dataset exists
-    from api.routes.datasets import _DATASET_REGISTRY, _REGISTRY_LOCK
+    from api.routes.datasets import lookup_dataset
 
-    with _REGISTRY_LOCK:
-        dataset_meta = _DATASET_REGISTRY.get(body.dataset_id)
+    dataset_meta = lookup_dataset(body.dataset_id)
 
     if not dataset_meta:
         # Try to load from database
@@ -12,12 +12,18 @@ Provides:
       * Get metadata for a specific dataset.
   - DELETE /v1/datasets/{dataset_id}
       * Remove dataset files & metadata.
+  - GET /v1/datasets/{dataset_id}/profile
+      * Upload-time profile (schema, column stats, wide/long detection,
+        ranked chart recommendations) once the background job finished.
 
 Notes:
   - Datasets are stored under artifacts/datasets. StaticFiles already mounted
     at /static in api.main, so a dataset's relative URL is /static/datasets/<file>.
-  - Registry is in-memory; if the server restarts, previously uploaded files
-    remain on disk but are not auto-registered. (Could be extended later.)
+  - Registry is in-memory, or kept in the shared state backend
+    (api.state_backend) so every worker sees uploads; with the in-memory
+    backend, previously uploaded files remain on disk after a restart but are
+    not auto-registered. (Could be extended later.) While the shared backend
+    is unreachable, this worker's in-memory registry is used instead.
   - Unified bubble dataset columns: entity,time,x,y,r,group
   - A single uploaded CSV is assumed ready for use; minimal header inspection done.
 
@@ -30,8 +36,10 @@ Future extensions:
 
 from __future__ import annotations
 
+import asyncio
 import csv
 import hashlib
+import logging
 import os
 import re
 import shutil
@@ -44,11 +52,11 @@ from typing import Dict, List, Optional
 from fastapi import APIRouter, UploadFile, File, HTTPException, status, Query, Depends
 from pydantic import BaseModel, Field
 
-# Import analyze_schema for column type inference
+# Import the dataset profiler for column type inference
 try:
-    from agents.tools.chart_inference import analyze_schema
+    from agents.tools.dataset_profile import build_profile
 except ImportError:
-    analyze_schema = None
+    build_profile = None
 
 from api.persistence.dataset_store import (
     persist_dataset,
@@ -59,6 +67,8 @@ from api.persistence.dataset_store import (
     get_dataset_by_id,
 )
 from api.routes.auth import get_current_user_optional
+from api.services.dataset_profiles import load_dataset_profile, schedule_dataset_profile
+from api.state_backend import DATASETS, StateBackendError, shared_backend
 
 # Attempt to import the existing Danim ingestion helper (bubble unifier).
 try:
@@ -69,7 +79,12 @@ except Exception:
 DATASETS_SUBDIR = os.path.join("artifacts", "datasets")
 os.makedirs(DATASETS_SUBDIR, exist_ok=True)
 
+# How long the upload response waits for the background profile before
+# returning without column_analysis (clients can poll /{dataset_id}/profile).
+PROFILE_WAIT_SECONDS = float(os.getenv("DATASET_PROFILE_WAIT_SECONDS", "5"))
+
 router = APIRouter(prefix="/datasets", tags=["datasets"])
+logger = logging.getLogger(__name__)
 
 # In-memory registry
 _DATASET_REGISTRY: Dict[str, "DatasetMeta"] = {}
@@ -99,12 +114,71 @@ class DatasetMeta(BaseModel):
     sha256: Optional[str] = None
 
 
+def register_dataset(meta: DatasetMeta) -> None:
+    """Add (or replace) a dataset in the registry."""
+    backend = shared_backend()
+    if backend is not None:
+        try:
+            backend.put(DATASETS, meta.dataset_id, meta.model_dump())
+            return
+        except StateBackendError as e:
+            logger.warning("Dataset %s: shared registry unavailable (%s); registering locally", meta.dataset_id, e)
+    with _REGISTRY_LOCK:
+        _DATASET_REGISTRY[meta.dataset_id] = meta
+
+
+def lookup_dataset(dataset_id: str) -> Optional[DatasetMeta]:
+    """Registered metadata for a dataset, or None."""
+    backend = shared_backend()
+    if backend is not None:
+        try:
+            data = backend.get(DATASETS, dataset_id)
+        except StateBackendError as e:
+            logger.warning("Dataset %s: shared registry read failed (%s); using local registry", dataset_id, e)
+        else:
+            if data is not None:
+                return DatasetMeta(**data)
+    # Also holds datasets registered here while the shared backend was down
+    with _REGISTRY_LOCK:
+        return _DATASET_REGISTRY.get(dataset_id)
+
+
+def list_registered_datasets() -> List[DatasetMeta]:
+    with _REGISTRY_LOCK:
+        datasets = dict(_DATASET_REGISTRY)
+    backend = shared_backend()
+    if backend is not None:
+        try:
+            shared = backend.items(DATASETS)
+        except StateBackendError as e:
+            logger.warning("Shared dataset registry unavailable (%s); listing local datasets", e)
+        else:
+            datasets.update((dataset_id, DatasetMeta(**data)) for dataset_id, data in shared.items())
+    return list(datasets.values())
+
+
+def unregister_dataset(dataset_id: str) -> bool:
+    with _REGISTRY_LOCK:
+        removed = _DATASET_REGISTRY.pop(dataset_id, None) is not None
+    backend = shared_backend()
+    if backend is not None:
+        try:
+            removed = backend.delete(DATASETS, dataset_id) or removed
+        except StateBackendError as e:
+            logger.warning("Dataset %s: shared registry delete failed (%s)", dataset_id, e)
+    return removed
+
+
 class ColumnAnalysis(BaseModel):
     """Analysis of a single column in the dataset."""
     name: str = Field(..., description="Column name")
     inferred_type: str = Field(..., description="Inferred type: 'numeric', 'categorical', or 'temporal'")
     unique_count: int = Field(0, description="Number of unique values")
     sample_values: List[str] = Field(default_factory=list, description="Sample values from this column")
+    null_ratio: Optional[float] = Field(None, description="Fraction of empty values over the whole file")
+    min: Optional[float] = Field(None, description="Smallest numeric value (if any parse as numbers)")
+    max: Optional[float] = Field(None, description="Largest numeric value (if any parse as numbers)")
+    mean: Optional[float] = Field(None, description="Mean of the numeric values")
 
 
 class DatasetListResponse(BaseModel):
@@ -120,16 +194,32 @@ class UploadResponse(BaseModel):
 
 @router.get("", response_model=DatasetListResponse, status_code=status.HTTP_200_OK)
 def list_datasets() -> DatasetListResponse:
-    with _REGISTRY_LOCK:
-        return DatasetListResponse(datasets=list(_DATASET_REGISTRY.values()))
+    return DatasetListResponse(datasets=list_registered_datasets())
 
 
 @router.get("/{dataset_id}", response_model=DatasetMeta, status_code=status.HTTP_200_OK)
 def get_dataset(dataset_id: str) -> DatasetMeta:
-    with _REGISTRY_LOCK:
-        if dataset_id not in _DATASET_REGISTRY:
-            raise HTTPException(status_code=404, detail="Dataset not found")
-        return _DATASET_REGISTRY[dataset_id]
+    meta = lookup_dataset(dataset_id)
+    if meta is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    return meta
+
+
+@router.get("/{dataset_id}/profile", status_code=status.HTTP_200_OK)
+def get_dataset_profile_route(dataset_id: str) -> Dict[str, object]:
+    """
+    Return the upload-time profile for a dataset. 404 while the background
+    job has not produced a (current) profile yet.
+    """
+    meta = lookup_dataset(dataset_id)
+    profile = None
+    if meta and meta.unified_rel_url:
+        profile = load_dataset_profile(csv_path=meta.unified_rel_url)
+    if profile is None:
+        profile = load_dataset_profile(dataset_id=dataset_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Dataset profile not available")
+    return {"dataset_id": dataset_id, "profile": profile.to_dict()}
 
 
 @router.delete("/{dataset_id}", status_code=status.HTTP_200_OK)
@@ -144,36 +234,34 @@ def delete_dataset(dataset_id: str, current_user=Depends(get_current_user_option
         if not current_user or current_user.id != persisted.user_id:
             raise HTTPException(status_code=403, detail="Not owner of dataset")
 
-    with _REGISTRY_LOCK:
-        meta = _DATASET_REGISTRY.get(dataset_id)
-        if not meta and not persisted:
-            raise HTTPException(status_code=404, detail="Dataset not found")
-
-        # Prefer meta from registry for file cleanup; if absent but persisted exists we cannot safely infer file paths.
-        if meta:
-            # Remove files
-            for rel_path in meta.original_files:
-                abs_path = os.path.join(os.getcwd(), rel_path) if not os.path.isabs(rel_path) else rel_path
-                if os.path.exists(abs_path):
-                    try:
-                        os.remove(abs_path)
-                    except Exception:
-                        pass
-            if meta.unified_path and os.path.exists(meta.unified_path):
+    meta = lookup_dataset(dataset_id)
+    if not meta and not persisted:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+    # Prefer meta from registry for file cleanup; if absent but persisted exists we cannot safely infer file paths.
+    if meta:
+        # Remove files
+        for rel_path in meta.original_files:
+            abs_path = os.path.join(os.getcwd(), rel_path) if not os.path.isabs(rel_path) else rel_path
+            if os.path.exists(abs_path):
+                try:
+                    os.remove(abs_path)
+                except Exception:
+                    pass
+        if meta.unified_path and os.path.exists(meta.unified_path):
+            try:
+                os.remove(meta.unified_path)
+            except Exception:
+                pass
+        # Remove containing temp dir if empty (best-effort)
+        if meta.unified_path:
+            _parent = os.path.dirname(meta.unified_path)
+            if os.path.isdir(_parent):
                 try:
-                    os.remove(meta.unified_path)
+                    os.rmdir(_parent)
                 except Exception:
                     pass
-            # Remove containing temp dir if empty (best-effort)
-            if meta.unified_path:
-                _parent = os.path.dirname(meta.unified_path)
-                if os.path.isdir(_parent):
-                    try:
-                        os.rmdir(_parent)
-                    except Exception:
-                        pass
-            if dataset_id in _DATASET_REGISTRY:
-                del _DATASET_REGISTRY[dataset_id]
+        unregister_dataset(dataset_id)
 
     # Remove DB row (ignore failures)
     try:
@@ -360,15 +448,20 @@ async def upload_dataset(
                     columns=columns,
                     sha256=sha256,
                 )
-                with _REGISTRY_LOCK:
-                    _DATASET_REGISTRY[existing_row.dataset_id] = existing_meta
-                return UploadResponse(dataset=existing_meta)
+                register_dataset(existing_meta)
+                # Runs will read the existing file, so that is the one to profile
+                existing_path = abs_path_for(existing_row.storage_path)
+                column_analysis = None
+                if existing_path and os.path.exists(existing_path):
+                    column_analysis = await _await_column_analysis(
+                        schedule_dataset_profile(existing_row.dataset_id, existing_path)
+                    )
+                return UploadResponse(dataset=existing_meta, column_analysis=column_analysis)
         except Exception:
             # Ignore checksum lookup errors; proceed as normal
             pass
 
-    with _REGISTRY_LOCK:
-        _DATASET_REGISTRY[dataset_id] = meta
+    register_dataset(meta)
 
     # Persist to DB with authenticated user_id (if any)
     try:
@@ -376,14 +469,11 @@ async def upload_dataset(
     except Exception:
         pass
 
-    # Analyze columns for type inference
+    # Profile in the background (persisted with the dataset); column analysis
+    # for the response comes from that profile when it finishes in time.
     column_analysis = None
-    if unified_path and os.path.exists(unified_path) and analyze_schema is not None:
-        try:
-            column_analysis = analyze_columns(unified_path)
-        except Exception:
-            # Non-critical: proceed without analysis
-            pass
+    if unified_path and os.path.exists(unified_path):
+        column_analysis = await _await_column_analysis(schedule_dataset_profile(dataset_id, unified_path))
 
     return UploadResponse(dataset=meta, column_analysis=column_analysis)
 
@@ -420,47 +510,36 @@ def sha256_file(path: str) -> str:
     return h.hexdigest()
 
 
+async def _await_column_analysis(future) -> Optional[List[ColumnAnalysis]]:
+    """
+    Column analysis from a scheduled profile job, or None if not ready in time.
+    Waits without blocking the event loop; shield() keeps a timeout from
+    cancelling the job itself.
+    """
+    try:
+        profile = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), PROFILE_WAIT_SECONDS)
+    except Exception:
+        # Timed out or failed; the job keeps running and persists when done
+        return None
+    if profile is None:
+        return None
+    return [ColumnAnalysis(**entry) for entry in profile.columns]
+
+
 def analyze_columns(csv_path: str) -> List[ColumnAnalysis]:
     """
     Analyze columns in a CSV file to determine types and sample values.
-    Uses chart_inference.analyze_schema for type detection.
+    Uses the streaming dataset profile (one pass over the whole file).
     """
-    import pandas as pd
-
-    if analyze_schema is None:
+    if build_profile is None:
         return []
 
     try:
-        schema = analyze_schema(csv_path)
+        profile = build_profile(csv_path)
     except Exception:
         return []
 
-    # Read a small sample for sample values
-    try:
-        df = pd.read_csv(csv_path, nrows=100, encoding='utf-8-sig')
-    except Exception:
-        df = None
-
-    results: List[ColumnAnalysis] = []
-    for col in schema.columns:
-        col_type = schema.column_types.get(col, "categorical")
-        unique_count = schema.unique_counts.get(col, 0)
-
-        # Get sample values
-        sample_values: List[str] = []
-        if df is not None and col in df.columns:
-            # Get up to 5 unique non-null sample values
-            samples = df[col].dropna().unique()[:5]
-            sample_values = [str(s) for s in samples]
-
-        results.append(ColumnAnalysis(
-            name=col,
-            inferred_type=col_type,
-            unique_count=unique_count,
-            sample_values=sample_values
-        ))
-
-    return results
+    return [ColumnAnalysis(**entry) for entry in profile.columns]
 
 
 def rel_url_for(abs_path: str) -> str:
@@ -474,6 +553,13 @@ def rel_url_for(abs_path: str) -> str:
     return f"/static/{rel_inside}".replace("\\", "/")
 
 
+def abs_path_for(rel_url: Optional[str]) -> Optional[str]:
+    """Inverse of rel_url_for: /static/... -> absolute path under artifacts."""
+    if not rel_url or not rel_url.startswith("/static/"):
+        return None
+    return os.path.join(os.path.abspath("artifacts"), rel_url[len("/static/"):].lstrip("/"))
+
+
 @router.get("/db", status_code=status.HTTP_200_OK)
 def list_datasets_db(
     user_only: bool = Query(
@@ -7,6 +7,10 @@ Provides:
   - GET /v1/templates/{template_id}
       * Get details for a specific template
 
+Both gallery routes are served from a cached catalog (see TemplateCatalog)
+with strong ETags and Cache-Control, and answer conditional requests
+(If-None-Match) with 304 Not Modified.
+
 Each template defines:
   - template_id: unique identifier (e.g., "bar_race")
   - display_name: human-readable name (e.g., "Bar Chart Race")
@@ -23,15 +27,25 @@ Column Mapping Validation:
 
 from __future__ import annotations
 
+import hashlib
 import os
 import logging
+import threading
+import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Literal, Optional, Dict, Any, Tuple
+from typing import List, Literal, Optional, Dict, Any, FrozenSet, Tuple
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from pydantic import BaseModel, Field
 
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,22 +57,31 @@ ARTIFACTS_DIR = Path(os.getcwd()) / "artifacts"
 PREVIEWS_DIR = ARTIFACTS_DIR / "previews"
 
 
+def _resolve_preview_urls(
+    template_id: str, preview_files: FrozenSet[str]
+) -> tuple[Optional[str], Optional[str]]:
+    gif_name = f"{template_id}.gif"
+    svg_name = f"{template_id}_placeholder.svg"
+
+    preview_url = f"/static/previews/{gif_name}" if gif_name in preview_files else None
+    fallback_url = f"/static/previews/{svg_name}" if svg_name in preview_files else None
+
+    return preview_url, fallback_url
+
+
 def get_preview_urls(template_id: str) -> tuple[Optional[str], Optional[str]]:
     """
     Get preview URLs for a template, checking which files actually exist.
 
+    File existence comes from the template catalog's listing of the previews
+    directory, which is refreshed when the directory changes.
+
     Returns:
         Tuple of (preview_url, fallback_url)
         - preview_url: Path to GIF if it exists, else None
         - fallback_url: Path to SVG placeholder if it exists, else None
     """
-    gif_path = PREVIEWS_DIR / f"{template_id}.gif"
-    svg_path = PREVIEWS_DIR / f"{template_id}_placeholder.svg"
-
-    preview_url = f"/static/previews/{template_id}.gif" if gif_path.exists() else None
-    fallback_url = f"/static/previews/{template_id}_placeholder.svg" if svg_path.exists() else None
-
-    return preview_url, fallback_url
+    return _resolve_preview_urls(template_id, template_catalog.snapshot().preview_files)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -331,10 +354,10 @@ _TEMPLATE_DEFINITIONS: List[dict] = [
 ]
 
 
-def _build_template_with_preview(defn: dict) -> TemplateSchema:
+def _build_template_with_preview(defn: dict, preview_files: FrozenSet[str]) -> TemplateSchema:
     """Build a TemplateSchema with resolved preview URLs."""
     template_id = defn["template_id"]
-    preview_url, fallback_url = get_preview_urls(template_id)
+    preview_url, fallback_url = _resolve_preview_urls(template_id, preview_files)
 
     return TemplateSchema(
         template_id=template_id,
@@ -347,9 +370,167 @@ def _build_template_with_preview(defn: dict) -> TemplateSchema:
     )
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Template Catalog (cached)
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Without a watchdog observer, how often the previews directory is re-checked
+CATALOG_POLL_SECONDS = float(os.getenv("TEMPLATE_CATALOG_POLL_SECONDS", "2"))
+# Cache-Control max-age for gallery responses
+CATALOG_MAX_AGE = int(os.getenv("TEMPLATE_CATALOG_MAX_AGE", "60"))
+
+
+def _strong_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _dir_mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable catalog state: template models, serialized bodies and ETags."""
+    templates: Tuple[TemplateSchema, ...]
+    by_id: Dict[str, TemplateSchema]
+    preview_files: FrozenSet[str]
+    list_body: bytes
+    list_etag: str
+    template_bodies: Dict[str, Tuple[bytes, str]]
+    previews_mtime_ns: Optional[int]
+    built_at: float
+
+
+class _PreviewsChangedHandler(FileSystemEventHandler):
+    def __init__(self, catalog: "TemplateCatalog"):
+        super().__init__()
+        self._catalog = catalog
+
+    def on_any_event(self, event) -> None:
+        self._catalog.invalidate()
+
+
+class TemplateCatalog:
+    """
+    Template gallery built once and shared by all readers.
+
+    A snapshot holds every TemplateSchema with preview URLs resolved from one
+    listing of the previews directory, plus the serialized list/detail JSON
+    bodies and their strong ETags. It is rebuilt on the next read after:
+      - invalidate() (admin preview regenerate/delete, watchdog events), or
+      - a change of the previews directory's mtime (checked at most every
+        ``poll_seconds`` when no watchdog observer is running).
+    """
+
+    def __init__(self, previews_dir: Path, poll_seconds: float = CATALOG_POLL_SECONDS):
+        self.previews_dir = previews_dir
+        self.poll_seconds = poll_seconds
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._dirty = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._observer = None
+
+    def invalidate(self) -> None:
+        self._dirty = True
+
+    def snapshot(self) -> CatalogSnapshot:
+        snap = self._snapshot
+        if not self._needs_rebuild(snap):
+            return snap
+        with self._lock:
+            if self._snapshot is not snap:
+                # Rebuilt by another thread meanwhile
+                return self._snapshot
+            self._dirty = False
+            self._snapshot = self._build()
+            return self._snapshot
+
+    def _needs_rebuild(self, snap: Optional[CatalogSnapshot]) -> bool:
+        if snap is None or self._dirty:
+            return True
+        if self._observer is not None:
+            return False
+        now = time.monotonic()
+        if now - self._checked_at < self.poll_seconds:
+            return False
+        self._checked_at = now
+        return _dir_mtime_ns(self.previews_dir) != snap.previews_mtime_ns
+
+    def _build(self) -> CatalogSnapshot:
+        start = time.time()
+        # Read the mtime before listing so a change during the build is seen next time
+        mtime_ns = _dir_mtime_ns(self.previews_dir)
+        try:
+            preview_files = frozenset(os.listdir(self.previews_dir))
+        except OSError:
+            preview_files = frozenset()
+
+        templates = tuple(
+            _build_template_with_preview(defn, preview_files) for defn in _TEMPLATE_DEFINITIONS
+        )
+        list_body = TemplateListResponse(
+            templates=list(templates), total=len(templates)
+        ).model_dump_json().encode("utf-8")
+        template_bodies: Dict[str, Tuple[bytes, str]] = {}
+        for template in templates:
+            body = template.model_dump_json().encode("utf-8")
+            template_bodies[template.template_id] = (body, _strong_etag(body))
+
+        self._checked_at = time.monotonic()
+        logger.info(
+            f"[TEMPLATES] Catalog built: {len(templates)} templates, "
+            f"{len(preview_files)} preview files in {round((time.time() - start) * 1000, 2)}ms"
+        )
+        return CatalogSnapshot(
+            templates=templates,
+            by_id={t.template_id: t for t in templates},
+            preview_files=preview_files,
+            list_body=list_body,
+            list_etag=_strong_etag(list_body),
+            template_bodies=template_bodies,
+            previews_mtime_ns=mtime_ns,
+            built_at=time.time(),
+        )
+
+    def start_watching(self) -> bool:
+        """Watch the previews directory with watchdog, if installed."""
+        if Observer is None or self._observer is not None:
+            return self._observer is not None
+        try:
+            self.previews_dir.mkdir(parents=True, exist_ok=True)
+            observer = Observer()
+            observer.schedule(_PreviewsChangedHandler(self), str(self.previews_dir), recursive=False)
+            observer.daemon = True
+            observer.start()
+        except Exception as e:
+            logger.warning(f"[TEMPLATES] Previews watch unavailable, polling instead: {e}")
+            return False
+        self._observer = observer
+        self.invalidate()
+        return True
+
+    def stop_watching(self) -> None:
+        observer, self._observer = self._observer, None
+        if observer is not None:
+            observer.stop()
+            observer.join(timeout=5)
+
+
+template_catalog = TemplateCatalog(PREVIEWS_DIR)
+
+
+def invalidate_template_catalog() -> None:
+    """Force the template catalog to rebuild on its next read."""
+    template_catalog.invalidate()
+
+
 def get_templates() -> List[TemplateSchema]:
     """Get all templates with resolved preview URLs."""
-    return [_build_template_with_preview(defn) for defn in _TEMPLATE_DEFINITIONS]
+    return list(template_catalog.snapshot().templates)
 
 
 # Legacy: Build static lookup for helper functions (preview URLs won't update dynamically here)
@@ -357,6 +538,26 @@ TEMPLATES: List[TemplateSchema] = get_templates()
 TEMPLATES_BY_ID: dict[str, TemplateSchema] = {t.template_id: t for t in TEMPLATES}
 
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 specifies for it)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _catalog_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CATALOG_MAX_AGE}, must-revalidate",
+    }
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Router
 # ─────────────────────────────────────────────────────────────────────────────
@@ -365,41 +566,39 @@ router = APIRouter(prefix="/templates", tags=["templates"])
 
 
 @router.get("", response_model=TemplateListResponse)
-def list_templates() -> TemplateListResponse:
+def list_templates(request: Request) -> Response:
     """
     List all available animation templates.
 
     Returns templates with their display names, descriptions, and axis requirements.
     Use this to show a template gallery in the UI.
 
-    Preview URLs are resolved at request time to check for actual file existence.
+    Served from the template catalog; preview URLs reflect the files present
+    in artifacts/previews. Send If-None-Match with the last ETag to get a 304.
     """
-    # Rebuild templates to check current preview file existence
-    templates = get_templates()
-    return TemplateListResponse(
-        templates=templates,
-        total=len(templates)
-    )
+    snap = template_catalog.snapshot()
+    return _catalog_response(request, snap.list_body, snap.list_etag)
 
 
 @router.get("/{template_id}", response_model=TemplateSchema)
-def get_template(template_id: str) -> TemplateSchema:
+def get_template(template_id: str, request: Request) -> Response:
     """
     Get details for a specific template.
 
     Returns the template's axis requirements, which define what columns
     the user needs to map from their dataset.
     """
-    # Find the template definition
-    defn = next((d for d in _TEMPLATE_DEFINITIONS if d["template_id"] == template_id), None)
-    if not defn:
+    snap = template_catalog.snapshot()
+    cached = snap.template_bodies.get(template_id)
+    if cached is None:
         available = [d["template_id"] for d in _TEMPLATE_DEFINITIONS]
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Template '{template_id}' not found. Available templates: {available}"
         )
 
-    return _build_template_with_preview(defn)
+    body, etag = cached
+    return _catalog_response(request, body, etag)
 
 
 class ColumnSuggestionsRequest(BaseModel):
@@ -408,6 +607,8 @@ class ColumnSuggestionsRequest(BaseModel):
     numeric_columns: List[str] = Field(default_factory=list, description="List of numeric column names")
     categorical_columns: List[str] = Field(default_factory=list, description="List of categorical column names")
     time_column: Optional[str] = Field(None, description="Detected time column (if any)")
+    csv_path: Optional[str] = Field(None, description="Dataset path; column metadata is read from its stored profile when not provided")
+    dataset_id: Optional[str] = Field(None, description="Dataset ID; alternative to csv_path for the stored profile")
 
 
 class ColumnSuggestionsResponse(BaseModel):
@@ -435,11 +636,21 @@ def get_column_suggestions(body: ColumnSuggestionsRequest) -> ColumnSuggestionsR
             detail=f"Template '{body.template_id}' not found. Available templates: {available}"
         )
 
+    numeric_columns = body.numeric_columns
+    categorical_columns = body.categorical_columns
+    time_column = body.time_column
+    if not numeric_columns and not categorical_columns:
+        schema = _stored_schema(body.csv_path, body.dataset_id)
+        if schema is not None:
+            numeric_columns = schema.numeric_columns
+            categorical_columns = schema.categorical_columns
+            time_column = time_column or schema.time_column
+
     suggestions = get_smart_column_suggestions(
         template_id=body.template_id,
-        numeric_columns=body.numeric_columns,
-        categorical_columns=body.categorical_columns,
-        time_column=body.time_column,
+        numeric_columns=numeric_columns,
+        categorical_columns=categorical_columns,
+        time_column=time_column,
     )
 
     return ColumnSuggestionsResponse(
@@ -458,6 +669,8 @@ class ValidateMappingsRequest(BaseModel):
     time_column: Optional[str] = Field(None, description="Detected time column (if any)")
     all_columns: List[str] = Field(default_factory=list, description="List of all column names")
     is_wide_format: bool = Field(False, description="Whether dataset is in wide format (dates/years as column headers)")
+    csv_path: Optional[str] = Field(None, description="Dataset path; column metadata is read from its stored profile when not provided")
+    dataset_id: Optional[str] = Field(None, description="Dataset ID; alternative to csv_path for the stored profile")
 
 
 class ValidateMappingsResponse(BaseModel):
@@ -481,15 +694,29 @@ def validate_mappings_endpoint(body: ValidateMappingsRequest) -> ValidateMapping
 
     Use this for client-side validation before submitting template selection.
     """
+    numeric_columns = body.numeric_columns
+    categorical_columns = body.categorical_columns
+    time_column = body.time_column
+    all_columns = body.all_columns
+    is_wide_format = body.is_wide_format
+    if not numeric_columns and not categorical_columns and not all_columns:
+        schema = _stored_schema(body.csv_path, body.dataset_id)
+        if schema is not None:
+            numeric_columns = schema.numeric_columns
+            categorical_columns = schema.categorical_columns
+            time_column = time_column or schema.time_column
+            all_columns = schema.columns
+            is_wide_format = schema.is_wide_format
+
     result = validate_column_mappings_with_schema(
         template_id=body.template_id,
         mappings=body.mappings,
-        csv_path="(validation request)",  # Not needed for validation-only
-        numeric_columns=body.numeric_columns,
-        categorical_columns=body.categorical_columns,
-        time_column=body.time_column,
-        all_columns=body.all_columns if body.all_columns else None,
-        is_wide_format=body.is_wide_format,
+        csv_path=body.csv_path or "(validation request)",  # Not needed for validation-only
+        numeric_columns=numeric_columns,
+        categorical_columns=categorical_columns,
+        time_column=time_column,
+        all_columns=all_columns if all_columns else None,
+        is_wide_format=is_wide_format,
     )
 
     return ValidateMappingsResponse(
@@ -504,6 +731,20 @@ def validate_mappings_endpoint(body: ValidateMappingsRequest) -> ValidateMapping
 # Helper Functions (for use by other modules)
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _stored_schema(csv_path: Optional[str], dataset_id: Optional[str]):
+    """DataSchema from the dataset's upload-time profile, or None."""
+    if not csv_path and not dataset_id:
+        return None
+    try:
+        from api.services.dataset_profiles import load_dataset_profile
+
+        profile = load_dataset_profile(csv_path=csv_path, dataset_id=None if csv_path else dataset_id)
+    except Exception as e:
+        logger.warning(f"[SUGGESTIONS] Stored profile lookup failed: {e}")
+        return None
+    return profile.to_schema() if profile is not None else None
+
+
 def get_template_by_id(template_id: str) -> Optional[TemplateSchema]:
     """Get a template by ID, or None if not found."""
     return TEMPLATES_BY_ID.get(template_id)
@@ -0,0 +1,440 @@
+"""
+Publish/subscribe broker for run events.
+
+Run progress used to reach clients only through the SSE stream that started
+the run, or by polling GET /runs/{run_id} and GET /runs. The broker fans
+events out to any number of subscribers instead: the UI, admin dashboards
+and the export flow can all follow the same run.
+
+Published events:
+- every pipeline event of a detached run (api.run_events), with its event id
+- RunStatus events from the run registry (state / message changes)
+
+Each subscriber has a bounded buffer. A slow consumer does not hold up the
+publisher or other subscribers: when its buffer is full the oldest events
+are dropped and counted (subscription.dropped), and the SSE stream reports
+them with a RunEventsDropped event. Clients can fill the gap from the run's
+event log via GET /runs/{run_id}/events?last_event_id=...
+
+SSE streams read subscriptions from the event loop (Subscription.aget):
+publishers wake them through an asyncio.Queue fed with
+loop.call_soon_threadsafe, so an idle stream holds no threadpool thread.
+
+Transports carry events between processes:
+- LocalTransport (default): in-process only.
+- PostgresNotifyTransport: LISTEN/NOTIFY on the app database, so subscribers
+  on any worker see events published by all of them. NOTIFY payloads are
+  limited (~8 KB); larger events are sent in summary form ("truncated": true).
+
+Environment:
+    RUN_BROKER_TRANSPORT   local | postgres (default local)
+    RUN_BROKER_URL         database URL for postgres (default STATE_BACKEND_URL,
+                           then the app database)
+    RUN_BROKER_BUFFER      events buffered per subscriber (default 256)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER = int(os.getenv("RUN_BROKER_BUFFER", "256"))
+HEARTBEAT_SECONDS = float(os.getenv("RUN_EVENT_HEARTBEAT_SECONDS", "15"))
+
+# Subscribe to every run
+ALL_RUNS = "*"
+
+# Events after which a single-run stream ends (RunError is followed by RunCompleted)
+TERMINAL_EVENTS = {"RunCompleted"}
+TERMINAL_STATES = {"COMPLETED", "ERROR", "CANCELED"}
+
+Message = Dict[str, Any]
+
+
+class Subscription:
+    """A subscriber's bounded queue of messages ({"run_id", "id", "data"})."""
+
+    def __init__(
+        self,
+        broker: "RunEventBroker",
+        topic: str,
+        max_buffer: int,
+        events: Optional[Iterable[str]] = None,
+    ):
+        self.topic = topic
+        self.max_buffer = max(1, max_buffer)
+        # Event names to accept (None: all)
+        self.events = set(events) if events is not None else None
+        self.dropped = 0
+        self.closed = False
+        self._broker = broker
+        self._queue: Deque[Message] = deque()
+        self._cond = threading.Condition()
+        # Event loop of an async reader and the queue that wakes it
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeups: Optional[asyncio.Queue] = None
+        self._wake_pending = False
+
+    def _wake(self) -> None:
+        # Caller holds _cond
+        self._cond.notify_all()
+        if self._loop is not None and not self._wake_pending:
+            self._wake_pending = True
+            try:
+                self._loop.call_soon_threadsafe(self._wakeups.put_nowait, None)
+            except RuntimeError:
+                pass  # loop closed
+
+    def _offer(self, message: Message) -> bool:
+        """Queue a message; drops the oldest when full. False if it dropped one."""
+        if self.events is not None and message["data"].get("event") not in self.events:
+            return True
+        with self._cond:
+            if self.closed:
+                return True
+            overflow = len(self._queue) >= self.max_buffer
+            if overflow:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(message)
+            self._wake()
+            return not overflow
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Message]:
+        """Next message, or None on timeout or when closed."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue or self.closed, timeout=timeout)
+            return self._queue.popleft() if self._queue else None
+
+    async def aget(self, timeout: Optional[float] = None) -> Optional[Message]:
+        """get() for coroutines: waits on the event loop instead of blocking a thread."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        while True:
+            with self._cond:
+                self._wake_pending = False
+                if self._queue:
+                    return self._queue.popleft()
+                if self.closed:
+                    return None
+                if self._loop is not loop:
+                    self._loop, self._wakeups = loop, asyncio.Queue()
+                wakeups = self._wakeups
+            remaining = deadline - loop.time() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(wakeups.get(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def close(self) -> None:
+        self._broker._unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            self._wake()
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class BrokerTransport:
+    """Carries messages between processes; deliver() receives those from other processes."""
+
+    def start(self, deliver: Callable[[Message], None]) -> None:
+        pass
+
+    def publish(self, message: Message) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class LocalTransport(BrokerTransport):
+    """In-process only (the broker delivers locally itself)."""
+
+
+class PostgresNotifyTransport(BrokerTransport):
+    """Cross-process fan-out with Postgres LISTEN/NOTIFY."""
+
+    # NOTIFY payloads must stay under 8000 bytes
+    MAX_PAYLOAD_BYTES = 7800
+    # Fields kept when an event is too large to send whole
+    SUMMARY_FIELDS = ("event", "run_id", "session_id", "created_at", "state", "message", "template_id")
+
+    def __init__(self, url: str, channel: str = "run_events"):
+        from sqlalchemy.engine import make_url
+
+        # SQLAlchemy URL (postgresql+psycopg://) -> libpq conninfo
+        self.conninfo = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._publish_conn = None
+        self._publish_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _encode(self, message: Message) -> str:
+        payload = json.dumps({**message, "origin": self.origin})
+        if len(payload.encode("utf-8")) <= self.MAX_PAYLOAD_BYTES:
+            return payload
+        data = message.get("data") or {}
+        summary = {k: data[k] for k in self.SUMMARY_FIELDS if k in data}
+        summary["truncated"] = True
+        return json.dumps({**message, "data": summary, "origin": self.origin})
+
+    def start(self, deliver: Callable[[Message], None]) -> None:
+        self._thread = threading.Thread(target=self._listen, args=(deliver,), name="run-broker-listen", daemon=True)
+        self._thread.start()
+
+    def _listen(self, deliver: Callable[[Message], None]) -> None:
+        import psycopg
+
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(self.conninfo, autocommit=True) as conn:
+                    conn.execute(f'listen "{self.channel}"')
+                    while not self._stop.is_set():
+                        for notify in conn.notifies(timeout=1.0):
+                            message = json.loads(notify.payload)
+                            if message.pop("origin", None) != self.origin:
+                                deliver(message)
+            except Exception as e:
+                logger.warning("Run broker listener error: %s; reconnecting", e)
+                self._stop.wait(2.0)
+
+    def publish(self, message: Message) -> None:
+        import psycopg
+
+        payload = self._encode(message)
+        with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publish_conn is None or self._publish_conn.closed:
+                        self._publish_conn = psycopg.connect(self.conninfo, autocommit=True)
+                    self._publish_conn.execute("select pg_notify(%s, %s)", (self.channel, payload))
+                    return
+                except psycopg.Error as e:
+                    self._publish_conn = None
+                    if attempt:
+                        logger.warning("Run broker publish failed: %s", e)
+
+    def close(self) -> None:
+        self._stop.set()
+        with self._publish_lock:
+            if self._publish_conn is not None:
+                self._publish_conn.close()
+                self._publish_conn = None
+
+
+class RunEventBroker:
+    """Fans run events out to subscribers of a run (or of all runs)."""
+
+    def __init__(self, transport: Optional[BrokerTransport] = None, max_buffer: int = DEFAULT_BUFFER):
+        self.transport = transport or LocalTransport()
+        self.max_buffer = max_buffer
+        self._subs: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"published": 0, "delivered": 0, "dropped": 0, "received": 0}
+        self.transport.start(self._receive)
+
+    def subscribe(
+        self,
+        run_id: Optional[str] = None,
+        max_buffer: Optional[int] = None,
+        events: Optional[Iterable[str]] = None,
+    ) -> Subscription:
+        """
+        Subscribe to one run's events, or to all runs (run_id None).
+        events: only these event names (e.g. {"RunStatus"}); default all.
+        """
+        topic = run_id or ALL_RUNS
+        subscription = Subscription(self, topic, max_buffer or self.max_buffer, events)
+        with self._lock:
+            self._subs.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(subscription.topic)
+            if subs is not None:
+                subs.discard(subscription)
+                if not subs:
+                    del self._subs[subscription.topic]
+
+    def subscriber_count(self, run_id: Optional[str] = None) -> int:
+        with self._lock:
+            return len(self._subs.get(run_id or ALL_RUNS, ()))
+
+    def publish(self, run_id: str, data: Dict[str, Any], event_id: Optional[int] = None) -> int:
+        """Publish an event of a run. Returns the number of local subscribers reached."""
+        message = {"run_id": run_id, "id": event_id, "data": data}
+        delivered = self._deliver(message)
+        with self._lock:
+            self._stats["published"] += 1
+        if not isinstance(self.transport, LocalTransport):
+            try:
+                self.transport.publish(message)
+            except Exception as e:
+                logger.warning("Run broker transport publish failed: %s", e)
+        return delivered
+
+    def _receive(self, message: Message) -> None:
+        with self._lock:
+            self._stats["received"] += 1
+        self._deliver(message)
+
+    def _deliver(self, message: Message) -> int:
+        with self._lock:
+            targets = list(self._subs.get(message["run_id"], ())) + list(self._subs.get(ALL_RUNS, ()))
+        dropped = sum(1 for sub in targets if not sub._offer(message))
+        with self._lock:
+            self._stats["delivered"] += len(targets)
+            self._stats["dropped"] += dropped
+        return len(targets)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "subscribers": sum(len(s) for s in self._subs.values())}
+
+    def close(self) -> None:
+        with self._lock:
+            subs = [sub for group in self._subs.values() for sub in group]
+        for sub in subs:
+            sub.close()
+        self.transport.close()
+
+
+def create_transport() -> BrokerTransport:
+    """Build the transport selected by RUN_BROKER_TRANSPORT."""
+    kind = os.getenv("RUN_BROKER_TRANSPORT", "local").strip().lower()
+    if kind == "local":
+        return LocalTransport()
+    if kind == "postgres":
+        url = os.getenv("RUN_BROKER_URL") or os.getenv("STATE_BACKEND_URL")
+        if not url:
+            from db.url import get_db_url
+            url = get_db_url()
+        return PostgresNotifyTransport(url)
+    raise ValueError(f"Unknown RUN_BROKER_TRANSPORT '{kind}' (expected 'local' or 'postgres')")
+
+
+_broker: Optional[RunEventBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> RunEventBroker:
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = RunEventBroker(create_transport())
+    return _broker
+
+
+def set_broker(broker: Optional[RunEventBroker]) -> None:
+    """Install a broker (None: rebuild from the environment on next use)."""
+    global _broker
+    with _broker_lock:
+        previous, _broker = _broker, broker
+    if previous is not None and previous is not broker:
+        previous.close()
+
+
+def run_status_event(info: Any) -> Dict[str, Any]:
+    """RunStatus event payload for a run registry entry."""
+    return {
+        "event": "RunStatus",
+        "run_id": info.run_id,
+        "session_id": info.session_id,
+        "state": info.state.name,
+        "message": info.message,
+        "error": info.error,
+        "updated_at": info.updated_at,
+        "created_at": int(time.time()),
+    }
+
+
+def publish_run_status(info: Any) -> None:
+    """Publish a RunStatus event for a run registry entry."""
+    get_broker().publish(info.run_id, run_status_event(info))
+
+
+def _is_terminal(data: Dict[str, Any]) -> bool:
+    return data.get("event") in TERMINAL_EVENTS or (
+        data.get("event") == "RunStatus" and data.get("state") in TERMINAL_STATES
+    )
+
+
+async def subscription_sse(
+    subscription: Subscription,
+    heartbeat_seconds: float = HEARTBEAT_SECONDS,
+    stop_on_terminal: bool = False,
+    event_ids: bool = True,
+) -> AsyncIterator[str]:
+    """
+    SSE chunks for a subscription: events (with their run event ids when
+    event_ids is set), RunEventsDropped notices after overflow, and keep-alive
+    comments. Closes the subscription when the stream ends.
+
+    Event ids are per run, so multi-run streams should pass event_ids=False.
+    """
+    reported = 0
+    try:
+        while True:
+            message = await subscription.aget(timeout=heartbeat_seconds)
+            if subscription.dropped > reported:
+                missed, reported = subscription.dropped - reported, subscription.dropped
+                yield "data: " + json.dumps({
+                    "event": "RunEventsDropped",
+                    "content": f"{missed} event(s) dropped; this subscriber fell behind.",
+                    "missed": missed,
+                    "created_at": int(time.time()),
+                }) + "\n\n"
+            if message is None:
+                if subscription.closed:
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            data = message["data"]
+            if "run_id" not in data:
+                data = {**data, "run_id": message["run_id"]}
+            prefix = f"id: {message['id']}\n" if event_ids and message.get("id") is not None else ""
+            yield f"{prefix}data: {json.dumps(data)}\n\n"
+            if stop_on_terminal and _is_terminal(data):
+                return
+    finally:
+        subscription.close()
+
+
+__all__ = [
+    "ALL_RUNS",
+    "Subscription",
+    "BrokerTransport",
+    "LocalTransport",
+    "PostgresNotifyTransport",
+    "RunEventBroker",
+    "create_transport",
+    "get_broker",
+    "set_broker",
+    "run_status_event",
+    "publish_run_status",
+    "subscription_sse",
+]
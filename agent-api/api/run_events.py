@@ -0,0 +1,312 @@
+"""
+Per-run event logs for detached pipeline execution.
+
+The animation pipeline is a generator of SSE chunks. When the HTTP response
+drove it, a dropped connection abandoned the run (or left the user to start
+over, re-running intent detection, code generation and rendering). Routes now
+hand the generator to start_detached_run(): a background thread runs it to
+completion and appends every event to the run's RunEventLog. Responses stream
+from the log with SSE ``id:`` fields, so a client that loses its connection
+reconnects to GET /runs/{run_id}/events with ``Last-Event-ID`` and continues
+where it left off.
+
+Event ids increase per run and keep counting across pipeline phases (the
+initial run and the resume after template selection share one log), and
+across logs: when an expired log's run starts a new phase, the new log
+continues after the expired log's last id. A client whose Last-Event-ID is
+ahead of the log anyway (its log was forgotten, e.g. after a restart) gets a
+RunEventsReset event and the log from its start.
+
+A pipeline outlives its connection, so cancel_run() stops it here: between
+events the driver checks whether the run was canceled and, if so, logs the
+run's final RunStatus instead of the event and closes the generator (raising
+GeneratorExit at its current yield).
+
+Logs are bounded: when more than RUN_EVENT_LOG_MAX_EVENTS events are kept
+the oldest are dropped, and a client resuming from before them is told how
+many it missed. Finished logs are kept for RUN_EVENT_LOG_RETENTION_SECONDS.
+Logs live in the process that runs the pipeline. Every logged event is also
+published on the run event broker (api.run_broker) for live subscribers.
+
+Usage:
+    from api.run_events import start_detached_run, stream_run_events
+
+    after = start_detached_run(run_id, animation_sse())
+    return StreamingResponse(stream_run_events(run_id, after), media_type="text/event-stream")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from api.run_broker import get_broker, run_status_event
+
+logger = logging.getLogger(__name__)
+
+MAX_EVENTS = int(os.getenv("RUN_EVENT_LOG_MAX_EVENTS", "2000"))
+RETENTION_SECONDS = float(os.getenv("RUN_EVENT_LOG_RETENTION_SECONDS", "900"))
+HEARTBEAT_SECONDS = float(os.getenv("RUN_EVENT_HEARTBEAT_SECONDS", "15"))
+
+# Last ids of expired logs remembered for runs that start another phase
+_MAX_RETIRED_LOGS = 10000
+
+
+@dataclass
+class RunEvent:
+    id: int
+    data: str  # JSON payload as emitted by the pipeline
+
+    def to_sse(self) -> str:
+        return f"id: {self.id}\ndata: {self.data}\n\n"
+
+
+class RunEventLog:
+    """Bounded, append-only event log of one run. Thread-safe."""
+
+    def __init__(self, run_id: str, max_events: int = MAX_EVENTS, first_id: int = 1):
+        self.run_id = run_id
+        self.first_id = first_id
+        self._events: Deque[RunEvent] = deque(maxlen=max(1, max_events))
+        self._next_id = first_id
+        self._cond = threading.Condition()
+        # Readers on event loops: (loop, queue) woken with call_soon_threadsafe
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self.closed = False
+        self.closed_at: Optional[float] = None
+
+    @property
+    def last_id(self) -> int:
+        with self._cond:
+            return self._next_id - 1
+
+    def append(self, data: str) -> int:
+        """Add an event; returns its id."""
+        with self._cond:
+            event = RunEvent(id=self._next_id, data=data)
+            self._next_id += 1
+            self._events.append(event)
+            self._notify()
+            return event.id
+
+    def close(self) -> None:
+        """Mark the pipeline finished; readers drain and stop."""
+        with self._cond:
+            self.closed = True
+            self.closed_at = time.time()
+            self._notify()
+
+    def reopen(self) -> None:
+        with self._cond:
+            self.closed = False
+            self.closed_at = None
+
+    def since(self, last_id: int) -> Tuple[List[RunEvent], int, bool]:
+        """
+        Events after last_id, the number of such events already dropped from
+        the log, and whether the log is closed.
+        """
+        with self._cond:
+            events = [e for e in self._events if e.id > last_id]
+            first_kept = self._events[0].id if self._events else self._next_id
+            missed = max(0, first_kept - last_id - 1)
+            return events, missed, self.closed
+
+    def _notify(self) -> None:
+        # Caller holds _cond
+        self._cond.notify_all()
+        for loop, wakeups in self._waiters:
+            try:
+                loop.call_soon_threadsafe(wakeups.put_nowait, None)
+            except RuntimeError:
+                pass  # loop closed
+
+    def wait(self, last_id: int, timeout: float) -> bool:
+        """Wait until an event after last_id exists or the log closes. False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._next_id - 1 > last_id or self.closed, timeout=timeout)
+
+    async def wait_async(self, last_id: int, timeout: float) -> bool:
+        """wait() for coroutines: waits on the event loop instead of blocking a thread."""
+        waiter = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._cond:
+            if self._next_id - 1 > last_id or self.closed:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].get(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._cond:
+                self._waiters.discard(waiter)
+
+
+_logs_lock = threading.Lock()
+_logs: Dict[str, RunEventLog] = {}
+_retired_ids: "OrderedDict[str, int]" = OrderedDict()
+
+
+def _purge_expired(now: float) -> None:
+    """Drop finished logs past retention. Call with _logs_lock held."""
+    expired = [
+        run_id for run_id, log in _logs.items()
+        if log.closed and log.closed_at is not None and now - log.closed_at > RETENTION_SECONDS
+    ]
+    for run_id in expired:
+        _retired_ids[run_id] = _logs.pop(run_id).last_id
+        _retired_ids.move_to_end(run_id)
+    while len(_retired_ids) > _MAX_RETIRED_LOGS:
+        _retired_ids.popitem(last=False)
+
+
+def open_event_log(run_id: str) -> RunEventLog:
+    """Get the run's log for a new pipeline phase (created or reopened)."""
+    with _logs_lock:
+        _purge_expired(time.time())
+        log = _logs.get(run_id)
+        if log is None:
+            # Ids continue after an expired log of the same run
+            first_id = _retired_ids.pop(run_id, 0) + 1
+            log = _logs[run_id] = RunEventLog(run_id, first_id=first_id)
+        else:
+            log.reopen()
+        return log
+
+
+def get_event_log(run_id: str) -> Optional[RunEventLog]:
+    with _logs_lock:
+        _purge_expired(time.time())
+        return _logs.get(run_id)
+
+
+def _sse_data(chunk: str) -> Optional[str]:
+    """The data field of an SSE chunk ("data: ...\\n\\n"), or None for comments/empty chunks."""
+    lines = [line[5:].lstrip() for line in chunk.splitlines() if line.startswith("data:")]
+    return "\n".join(lines) if lines else None
+
+
+def _publish(run_id: str, event_id: int, data: str) -> None:
+    try:
+        get_broker().publish(run_id, json.loads(data), event_id=event_id)
+    except Exception as e:
+        logger.debug("Run %s: event publish failed: %s", run_id, e)
+
+
+def _log_canceled(log: RunEventLog) -> None:
+    from api.run_registry import get_run
+
+    info = get_run(log.run_id)
+    if info is not None:
+        # Broker subscribers already got this status from cancel_run()
+        log.append(json.dumps(run_status_event(info)))
+    logger.info("Run %s canceled; stopped its pipeline", log.run_id)
+
+
+def _drive(log: RunEventLog, events: Iterator[str]) -> None:
+    from api.run_registry import is_canceled
+
+    try:
+        for chunk in events:
+            if is_canceled(log.run_id):
+                _log_canceled(log)
+                break
+            data = _sse_data(chunk)
+            if data is not None:
+                _publish(log.run_id, log.append(data), data)
+    except Exception as e:
+        if is_canceled(log.run_id):
+            # Failing because its processes were killed
+            logger.debug("Canceled run %s raised: %s", log.run_id, e)
+            _log_canceled(log)
+            return
+        logger.exception("Detached run %s failed", log.run_id)
+        from api.run_registry import fail_run
+
+        fail_run(log.run_id, f"Pipeline error: {e}")
+        data = json.dumps({
+            "event": "RunError",
+            "content": f"Pipeline error: {e}",
+            "created_at": int(time.time()),
+            "run_id": log.run_id,
+        })
+        _publish(log.run_id, log.append(data), data)
+    finally:
+        close = getattr(events, "close", None)
+        if close is not None:
+            close()
+        log.close()
+
+
+def start_detached_run(run_id: str, events: Iterator[str]) -> int:
+    """
+    Run a pipeline generator in a background thread, independent of any
+    connection, logging its events under run_id.
+
+    Returns the id of the last event logged before this pipeline's first
+    event; stream_run_events(run_id, after=that) shows just this phase.
+    """
+    log = open_event_log(run_id)
+    after = log.last_id
+    threading.Thread(target=_drive, args=(log, events), name=f"run-{run_id[:8]}", daemon=True).start()
+    return after
+
+
+async def stream_run_events(
+    run_id: str,
+    after: int = 0,
+    heartbeat_seconds: float = HEARTBEAT_SECONDS,
+) -> AsyncIterator[str]:
+    """
+    SSE chunks for the run's events with id > after, following the log
+    until the pipeline finishes. Emits keep-alive comments while idle;
+    waiting happens on the event loop, so idle streams hold no thread.
+    """
+    log = get_event_log(run_id)
+    if log is None:
+        return
+    last = after
+    if last > log.last_id:
+        # An id this log never issued: the client saw an earlier log of the run
+        yield "data: " + json.dumps({
+            "event": "RunEventsReset",
+            "content": "The run's event history was restarted; replaying it from the start.",
+            "created_at": int(time.time()),
+            "run_id": run_id,
+        }) + "\n\n"
+        last = log.first_id - 1
+    while True:
+        events, missed, closed = log.since(last)
+        if missed:
+            yield "data: " + json.dumps({
+                "event": "RunEventsDropped",
+                "content": f"{missed} earlier event(s) are no longer available.",
+                "missed": missed,
+                "created_at": int(time.time()),
+                "run_id": run_id,
+            }) + "\n\n"
+        for event in events:
+            yield event.to_sse()
+            last = event.id
+        if closed and not events:
+            return
+        if not events and not await log.wait_async(last, heartbeat_seconds):
+            yield ": keep-alive\n\n"
+
+
+__all__ = [
+    "RunEvent",
+    "RunEventLog",
+    "open_event_log",
+    "get_event_log",
+    "start_detached_run",
+    "stream_run_events",
+]
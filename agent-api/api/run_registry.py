@@ -5,13 +5,30 @@ and supporting user-initiated cancellation.
 This module provides:
 - RunState: lifecycle states for a run
 - RunInfo / ProcessInfo: data structures for run/process tracking
-- create_run(), set_state(), update_message(), get_run(), list_runs()
+- create_run(), set_state(), update_message(), get_run(), list_runs(), is_canceled()
 - register_temp_path(), register_artifact()
 - add_process() to attach an externally-created subprocess to a run
 - start_tracked_process() to spawn a subprocess with a new process group/session
 - cancel_run() to gracefully terminate a run's processes (and force-kill if needed)
 - remove_run() to purge registry entries
 
+Shared state (api.state_backend):
+- With the default in-memory backend the registry is a process-local dict, as before.
+- With a shared backend, run state lives in the backend so any worker can read,
+  update and cancel a run. The process that starts a run's subprocesses owns it
+  (RunInfo.owner) and keeps the Popen handles; cancel_run() from another process
+  stores a cancel signal that the owner's watcher thread picks up within
+  CANCEL_POLL_SECONDS and acts on.
+
+State changes (create, set_state, update_message, complete, fail, cancel) are
+published as RunStatus events on the run event broker (api.run_broker), so
+clients can subscribe instead of polling.
+
+A finished run (COMPLETED, ERROR, CANCELED) keeps its outcome: set_state(),
+complete_run() and fail_run() do not move it to another state, so a pipeline
+still winding down after cancel_run() cannot overwrite CANCELED. Detached
+pipelines check is_canceled() between events and stop there.
+
 Notes:
 - On POSIX systems, cancellation targets the entire process group (killpg) when available.
 - On Windows, cancellation uses terminate()/kill() on each process.
@@ -27,17 +44,26 @@ import os
 import platform
 import shutil
 import signal
+import socket
 import subprocess
 import threading
 import time
 import uuid
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, asdict, replace
 from enum import Enum, auto
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
+
+from api.run_broker import publish_run_status
+from api.state_backend import RUN_CANCELS, RUNS, StateBackendError, shared_backend
 
 
 logger = logging.getLogger(__name__)
 
+# Shared-backend settings
+RUN_STATE_TTL_SECONDS = float(os.getenv("RUN_STATE_TTL_SECONDS", str(24 * 3600)))
+CANCEL_POLL_SECONDS = float(os.getenv("RUN_CANCEL_POLL_SECONDS", "0.5"))
+CANCEL_SIGNAL_TTL_SECONDS = 300.0
+
 
 class RunState(Enum):
     CREATED = auto()
@@ -60,11 +86,15 @@ class ProcessInfo:
     created_at: float = field(default_factory=lambda: time.time())
     # popen is optional; may be absent if we only know pid (e.g., restored state)
     popen: Optional[subprocess.Popen] = field(default=None, repr=False)
+    # Running flag as last reported by the owning process (shared state only)
+    last_known_running: Optional[bool] = field(default=None, repr=False)
 
     def is_running(self) -> bool:
         try:
             if self.popen is not None:
                 return self.popen.poll() is None
+            if self.last_known_running is not None:
+                return self.last_known_running
             # Fall back to os.kill with signal 0 on POSIX
             if os.name == "posix":
                 os.kill(self.pid, 0)
@@ -87,6 +117,8 @@ class RunInfo:
     started_at: Optional[float] = None
     ended_at: Optional[float] = None
     error: Optional[str] = None
+    # Process that owns the run's subprocesses ("host:pid"; shared state only)
+    owner: Optional[str] = None
 
     # Tracking
     processes: Dict[str, ProcessInfo] = field(default_factory=dict)  # key by role or unique key
@@ -100,7 +132,8 @@ class RunInfo:
     pending_data_binding: Dict[str, Optional[str]] = field(default_factory=dict)
 
     def to_dict(self) -> dict:
-        d = asdict(self)
+        # Processes are serialized by hand: asdict() would deep-copy Popen
+        d = asdict(replace(self, processes={}))
         # Serialize Enums
         d["state"] = self.state.name
         # Drop popen from process dict (not JSON-serializable)
@@ -114,6 +147,25 @@ class RunInfo:
             }
         return d
 
+    @classmethod
+    def from_state(cls, data: Dict[str, Any]) -> "RunInfo":
+        """Rebuild a run from its to_dict() form (shared state)."""
+        data = dict(data)
+        processes = data.pop("processes", None) or {}
+        state = RunState[data.pop("state", RunState.CREATED.name)]
+        info = cls(state=state, **{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        info.processes = {
+            key: ProcessInfo(
+                role=p["role"],
+                pid=p["pid"],
+                pgid=p.get("pgid"),
+                created_at=p.get("created_at") or 0.0,
+                last_known_running=p.get("running"),
+            )
+            for key, p in processes.items()
+        }
+        return info
+
     def has_pending_template_selection(self) -> bool:
         """Check if this run has pending template selection data."""
         return bool(self.pending_template_suggestions)
@@ -141,10 +193,15 @@ class RunInfo:
         self.updated_at = time.time()
 
 
-# Global registry and lock
+# Global registry and lock. With a shared backend this holds the runs whose
+# subprocesses this process owns (and their Popen handles).
 _registry_lock = threading.RLock()
 _registry: Dict[str, RunInfo] = {}
 
+_TERMINAL_STATES = (RunState.COMPLETED, RunState.ERROR, RunState.CANCELED)
+
+_watcher_started = False
+
 
 def _now() -> float:
     return time.time()
@@ -154,38 +211,179 @@ def _is_windows() -> bool:
     return platform.system().lower().startswith("win")
 
 
+def _owner_id() -> str:
+    """Identity of this process as a run owner (computed per call: workers may fork)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _leaves_terminal(info: RunInfo, state: RunState) -> bool:
+    """True if moving ``info`` to ``state`` would change a finished run's outcome."""
+    return info.state in _TERMINAL_STATES and state is not info.state
+
+
 def generate_run_id() -> str:
     """Create a unique run identifier."""
     return str(uuid.uuid4())
 
 
+def _sync_local(local: RunInfo, latest: RunInfo) -> None:
+    """Copy shared state onto the locally owned run, keeping its Popen handles."""
+    for name in RunInfo.__dataclass_fields__:
+        if name != "processes":
+            setattr(local, name, getattr(latest, name))
+
+
+def _mutate(run_id: str, fn: Callable[[RunInfo], None]) -> Optional[RunInfo]:
+    """
+    Apply fn to a run and persist it. Returns the updated run, or None if unknown.
+
+    In-memory: fn runs on the registered RunInfo under the registry lock.
+    Shared: fn runs inside an atomic backend update (it may be retried, so it
+    must only set fields); the local copy, if any, is refreshed afterwards.
+    """
+    backend = shared_backend()
+    if backend is None:
+        with _registry_lock:
+            info = _registry.get(run_id)
+            if info is not None:
+                fn(info)
+            return info
+
+    with _registry_lock:
+        local = _registry.get(run_id)
+
+    def apply(data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if data is None:
+            return None
+        info = RunInfo.from_state(data)
+        if local is not None:
+            info.processes = dict(local.processes)
+        fn(info)
+        return info.to_dict()
+
+    try:
+        data = backend.update(RUNS, run_id, apply, ttl=RUN_STATE_TTL_SECONDS)
+    except StateBackendError as e:
+        logger.warning("Run %s: shared state update failed (%s); updating local copy only", run_id, e)
+        if local is not None:
+            with _registry_lock:
+                fn(local)
+        return local
+    if data is None:
+        return None
+    latest = RunInfo.from_state(data)
+    if local is None:
+        return latest
+    with _registry_lock:
+        _sync_local(local, latest)
+    return local
+
+
+def _publish(info: Optional[RunInfo]) -> None:
+    """Publish a run's status to broker subscribers (never fails the caller)."""
+    if info is None:
+        return
+    try:
+        publish_run_status(info)
+    except Exception as e:
+        logger.debug("Run %s: status publish failed: %s", info.run_id, e)
+
+
+def _adopt(run_id: str) -> Optional[RunInfo]:
+    """
+    Make this process the owner of a run (shared backend), creating the local
+    entry that will hold its Popen handles. Returns the local run.
+    """
+    owner = _owner_id()
+
+    def claim(info: RunInfo) -> None:
+        info.owner = owner
+
+    updated = _mutate(run_id, claim)
+    if updated is None:
+        return None
+    with _registry_lock:
+        local = _registry.setdefault(run_id, updated)
+    _ensure_cancel_watcher()
+    return local
+
+
 def create_run(user_id: Optional[str] = None, session_id: Optional[str] = None, message: str = "") -> RunInfo:
     """Create and register a new run."""
     run_id = generate_run_id()
     info = RunInfo(run_id=run_id, user_id=user_id, session_id=session_id, message=message)
+    backend = shared_backend()
+    if backend is not None:
+        info.owner = _owner_id()
+        try:
+            backend.put(RUNS, run_id, info.to_dict(), ttl=RUN_STATE_TTL_SECONDS)
+        except StateBackendError as e:
+            logger.warning("Run %s: could not publish to shared state (%s)", run_id, e)
+        _ensure_cancel_watcher()
     with _registry_lock:
         _registry[run_id] = info
+    _publish(info)
     logger.debug("Created run %s", run_id)
     return info
 
 
 def get_run(run_id: str) -> Optional[RunInfo]:
-    """Fetch a run by id."""
+    """
+    Fetch a run by id.
+
+    With a shared backend, runs owned by this process are returned as the
+    local object (refreshed from shared state); others as a snapshot.
+    """
+    backend = shared_backend()
+    if backend is not None:
+        try:
+            data = backend.get(RUNS, run_id)
+        except StateBackendError as e:
+            logger.warning("Run %s: shared state read failed (%s); using local copy", run_id, e)
+        else:
+            with _registry_lock:
+                local = _registry.get(run_id)
+                if data is None:
+                    return local
+                latest = RunInfo.from_state(data)
+                if local is None:
+                    return latest
+                _sync_local(local, latest)
+                return local
     with _registry_lock:
         return _registry.get(run_id)
 
 
 def list_runs() -> List[dict]:
     """Return a list of run summaries as dictionaries."""
+    backend = shared_backend()
+    if backend is not None:
+        try:
+            shared = backend.items(RUNS)
+        except StateBackendError as e:
+            logger.warning("Shared run state unavailable (%s); listing local runs", e)
+        else:
+            with _registry_lock:
+                runs = []
+                for run_id, data in shared.items():
+                    local = _registry.get(run_id)
+                    if local is not None:
+                        _sync_local(local, RunInfo.from_state(data))
+                        runs.append(local.to_dict())
+                    else:
+                        runs.append(data)
+                return runs
     with _registry_lock:
         return [info.to_dict() for info in _registry.values()]
 
 
 def set_state(run_id: str, state: RunState, message: Optional[str] = None) -> None:
-    """Update run state and optional message."""
-    with _registry_lock:
-        info = _registry.get(run_id)
-        if not info:
+    """Update run state and optional message (ignored once the run finished with another state)."""
+    outcome = {"refused": False}
+
+    def apply(info: RunInfo) -> None:
+        outcome["refused"] = _leaves_terminal(info, state)
+        if outcome["refused"]:
             return
         info.state = state
         if message is not None:
@@ -193,20 +391,33 @@ def set_state(run_id: str, state: RunState, message: Optional[str] = None) -> No
         info.updated_at = _now()
         if state in (RunState.STARTING, RunState.PREVIEWING, RunState.RENDERING, RunState.EXPORTING) and info.started_at is None:
             info.started_at = _now()
-        if state in (RunState.COMPLETED, RunState.ERROR, RunState.CANCELED):
+        if state in _TERMINAL_STATES:
             info.ended_at = _now()
+
+    info = _mutate(run_id, apply)
+    if info is None:
+        return
+    if outcome["refused"]:
+        logger.debug("Run %s is %s; not setting %s", run_id, info.state.name, state.name)
+        return
+    _publish(info)
     logger.debug("Run %s set to %s (%s)", run_id, state.name, message or "")
 
 
+def is_canceled(run_id: str) -> bool:
+    """True if the run was canceled (unknown runs are not)."""
+    info = get_run(run_id)
+    return info is not None and info.state is RunState.CANCELED
+
+
 def update_message(run_id: str, message: str) -> None:
     """Update run message without changing the state."""
-    with _registry_lock:
-        info = _registry.get(run_id)
-        if not info:
-            return
+    def apply(info: RunInfo) -> None:
         info.message = message
         info.updated_at = _now()
 
+    _publish(_mutate(run_id, apply))
+
 
 def set_pending_template_selection(
     run_id: str,
@@ -216,22 +427,18 @@ def set_pending_template_selection(
     data_binding: Optional[Dict[str, Optional[str]]] = None,
 ) -> None:
     """Store pending template selection state in a run."""
-    with _registry_lock:
-        info = _registry.get(run_id)
-        if not info:
-            return
-        info.set_pending_template_selection(
-            suggestions=suggestions,
-            original_message=original_message,
-            csv_path=csv_path,
-            data_binding=data_binding,
-        )
+    _mutate(run_id, lambda info: info.set_pending_template_selection(
+        suggestions=suggestions,
+        original_message=original_message,
+        csv_path=csv_path,
+        data_binding=data_binding,
+    ))
 
 
 def get_pending_template_selection(run_id: str) -> Optional[Dict]:
     """Get pending template selection state from a run."""
+    info = get_run(run_id)
     with _registry_lock:
-        info = _registry.get(run_id)
         if not info or not info.has_pending_template_selection():
             return None
         return {
@@ -244,38 +451,36 @@ def get_pending_template_selection(run_id: str) -> Optional[Dict]:
 
 def clear_pending_template_selection(run_id: str) -> None:
     """Clear pending template selection state from a run."""
-    with _registry_lock:
-        info = _registry.get(run_id)
-        if not info:
-            return
-        info.clear_pending_template_selection()
+    _mutate(run_id, lambda info: info.clear_pending_template_selection())
 
 
 def register_temp_path(run_id: str, path: str) -> None:
     """Register a path for cleanup on cancellation."""
-    with _registry_lock:
-        info = _registry.get(run_id)
-        if not info:
-            return
+    if shared_backend() is not None and _adopt(run_id) is None:
+        return
+
+    def apply(info: RunInfo) -> None:
         if path and path not in info.temp_paths:
             info.temp_paths.append(path)
 
+    _mutate(run_id, apply)
+
 
 def register_artifact(run_id: str, path: str) -> None:
     """Register a produced artifact path (not auto-deleted)."""
-    with _registry_lock:
-        info = _registry.get(run_id)
-        if not info:
-            return
+    def apply(info: RunInfo) -> None:
         if path and path not in info.artifacts:
             info.artifacts.append(path)
 
+    _mutate(run_id, apply)
+
 
 def add_process(run_id: str, popen: subprocess.Popen, role: str = "worker", key: Optional[str] = None) -> None:
     """
     Attach an existing subprocess to a run for later cancellation.
 
     key: optional unique key; defaults to role if not supplied (overwrites previous with same key)
+    With a shared backend the calling process becomes the run's owner.
     """
     if not popen or popen.pid is None:
         return
@@ -288,13 +493,16 @@ def add_process(run_id: str, popen: subprocess.Popen, role: str = "worker", key:
             pgid = None
 
     proc_info = ProcessInfo(role=role, pid=popen.pid, pgid=pgid, popen=popen)
+    if shared_backend() is not None and _adopt(run_id) is None:
+        return
     with _registry_lock:
         info = _registry.get(run_id)
         if not info:
             return
         proc_key = key or role
         info.processes[proc_key] = proc_info
-        info.updated_at = _now()
+    # Publishes the process list (shared backend) and bumps updated_at
+    _mutate(run_id, lambda info: setattr(info, "updated_at", _now()))
     logger.debug("Run %s added process pid=%s role=%s pgid=%s", run_id, popen.pid, role, pgid)
 
 
@@ -409,22 +617,87 @@ def cancel_run(run_id: str, reason: str = "user_canceled", grace_seconds: float
     - Wait up to grace_seconds for exit.
     - Force kill remaining.
     - Clean up registered temp_paths.
+
+    With a shared backend, a run owned by another process is canceled by that
+    process: a cancel signal is stored and this call waits for the run to
+    reach a terminal state. If the owner does not respond (it exited), the
+    run is marked CANCELED here.
     """
+    backend = shared_backend()
+    if backend is None:
+        return _cancel_local(run_id, reason, grace_seconds)
+
+    info = get_run(run_id)
+    if info is None:
+        return False
+    if info.state in _TERMINAL_STATES:
+        return True
     with _registry_lock:
-        info = _registry.get(run_id)
-        if not info:
-            return False
+        owned_here = run_id in _registry
+    if owned_here or info.owner in (None, _owner_id()):
+        return _cancel_local(run_id, reason, grace_seconds)
 
-        # If already terminal state, nothing to do
-        if info.state in (RunState.COMPLETED, RunState.ERROR, RunState.CANCELED):
-            return True
+    try:
+        backend.put(
+            RUN_CANCELS,
+            run_id,
+            {"reason": reason, "requested_at": _now(), "requested_by": _owner_id()},
+            ttl=CANCEL_SIGNAL_TTL_SECONDS,
+        )
+    except StateBackendError as e:
+        logger.warning("Run %s: could not signal owner %s (%s)", run_id, info.owner, e)
+    else:
+        update_message(run_id, f"Cancel requested: {reason}")
+        end_by = time.time() + float(grace_seconds or 0) + 4 * CANCEL_POLL_SECONDS + 1.0
+        while time.time() < end_by:
+            time.sleep(CANCEL_POLL_SECONDS / 2)
+            current = get_run(run_id)
+            if current is None:
+                return False
+            if current.state in _TERMINAL_STATES:
+                return True
 
-        # Mark as canceling (message only for now)
-        info.message = f"Cancel requested: {reason}"
-        info.updated_at = _now()
+    logger.warning("Run %s: owner %s did not acknowledge cancel; marking canceled", run_id, info.owner)
+    _publish(_mutate(run_id, lambda i: _mark_canceled(i, reason)))
+    try:
+        backend.delete(RUN_CANCELS, run_id)
+    except StateBackendError:
+        pass
+    return True
+
+
+def _mark_canceled(info: RunInfo, reason: str) -> None:
+    if _leaves_terminal(info, RunState.CANCELED):
+        # Finished while its processes were being stopped
+        return
+    info.state = RunState.CANCELED
+    info.message = f"Canceled: {reason}"
+    info.ended_at = _now()
+    info.updated_at = _now()
+
+
+def _cancel_local(run_id: str, reason: str, grace_seconds: float) -> bool:
+    """Cancel a run whose processes (if any) belong to this process."""
+    outcome = {"terminal": False}
 
-        # Snapshot processes to operate outside of lock
-        procs = list(info.processes.values())
+    def request(info: RunInfo) -> None:
+        # If already terminal state, nothing to do
+        outcome["terminal"] = info.state in _TERMINAL_STATES
+        if not outcome["terminal"]:
+            # Mark as canceling (message only for now)
+            info.message = f"Cancel requested: {reason}"
+            info.updated_at = _now()
+
+    info = _mutate(run_id, request)
+    if info is None:
+        return False
+    if outcome["terminal"]:
+        return True
+
+    # Snapshot processes to operate outside of lock
+    with _registry_lock:
+        local = _registry.get(run_id)
+        procs = list(local.processes.values()) if local else []
 
     # Step 1: graceful termination
     for p in procs:
@@ -450,51 +723,123 @@ def cancel_run(run_id: str, reason: str = "user_canceled", grace_seconds: float
             _kill_process(p)
 
     # Cleanup temp paths
-    with _registry_lock:
-        info = _registry.get(run_id)
-        if not info:
-            return False
-        for path in list(info.temp_paths):
-            try:
-                shutil.rmtree(path, ignore_errors=True)
-            except Exception:
-                pass
-        info.state = RunState.CANCELED
-        info.message = f"Canceled: {reason}"
-        info.ended_at = _now()
-        info.updated_at = _now()
+    for path in list(info.temp_paths):
+        try:
+            shutil.rmtree(path, ignore_errors=True)
+        except Exception:
+            pass
+    canceled = _mutate(run_id, lambda i: _mark_canceled(i, reason))
+    if canceled is None:
+        return False
+    _publish(canceled)
 
     logger.debug("Run %s canceled (%s)", run_id, reason)
     return True
 
 
+def _finish(run_id: str, state: RunState, fn: Callable[[RunInfo], None]) -> None:
+    """Apply fn to a run and publish it, unless the run already finished with another state."""
+    outcome = {"refused": False}
+
+    def apply(info: RunInfo) -> None:
+        outcome["refused"] = _leaves_terminal(info, state)
+        if not outcome["refused"]:
+            fn(info)
+
+    info = _mutate(run_id, apply)
+    if info is not None and outcome["refused"]:
+        logger.debug("Run %s is %s; not setting %s", run_id, info.state.name, state.name)
+        return
+    _publish(info)
+
+
 def complete_run(run_id: str, message: str = "") -> None:
     """Mark a run as completed."""
-    with _registry_lock:
-        info = _registry.get(run_id)
-        if not info:
-            return
+    def apply(info: RunInfo) -> None:
         info.state = RunState.COMPLETED
         if message:
             info.message = message
         info.ended_at = _now()
         info.updated_at = _now()
 
+    _finish(run_id, RunState.COMPLETED, apply)
+
 
 def fail_run(run_id: str, error_message: str) -> None:
     """Mark a run as failed."""
-    with _registry_lock:
-        info = _registry.get(run_id)
-        if not info:
-            return
+    def apply(info: RunInfo) -> None:
         info.state = RunState.ERROR
         info.error = error_message
         info.message = error_message
         info.ended_at = _now()
         info.updated_at = _now()
 
+    _finish(run_id, RunState.ERROR, apply)
+
 
 def remove_run(run_id: str) -> bool:
     """Remove a run from the registry (no process interaction)."""
     with _registry_lock:
-        return _registry.pop(run_id, None) is not None
+        removed = _registry.pop(run_id, None) is not None
+    backend = shared_backend()
+    if backend is not None:
+        try:
+            removed = backend.delete(RUNS, run_id) or removed
+        except StateBackendError as e:
+            logger.warning("Run %s: shared state delete failed (%s)", run_id, e)
+    return removed
+
+
+def poll_cancel_signals() -> int:
+    """
+    Act on cancel signals for runs owned by this process (shared backend).
+
+    Also forgets local runs that finished or were adopted elsewhere and have
+    no live subprocesses. Returns the number of runs canceled.
+    """
+    backend = shared_backend()
+    if backend is None:
+        return 0
+    with _registry_lock:
+        owned = list(_registry)
+    if not owned:
+        return 0
+
+    states = backend.get_many(RUNS, owned)
+    signals = backend.get_many(RUN_CANCELS, owned)
+    me = _owner_id()
+    canceled = 0
+    for run_id in owned:
+        data = states.get(run_id)
+        signal_data = signals.get(run_id)
+        if signal_data is not None:
+            if data is not None and data.get("owner") == me:
+                _cancel_local(run_id, signal_data.get("reason") or "user_canceled", grace_seconds=5.0)
+                canceled += 1
+            backend.delete(RUN_CANCELS, run_id)
+            continue
+        if data is None or data.get("owner") != me or data.get("state") in {s.name for s in _TERMINAL_STATES}:
+            with _registry_lock:
+                local = _registry.get(run_id)
+                if local is not None and not any(p.is_running() for p in local.processes.values()):
+                    _registry.pop(run_id, None)
+    return canceled
+
+
+def _watch_cancel_signals() -> None:
+    while True:
+        time.sleep(CANCEL_POLL_SECONDS)
+        try:
+            poll_cancel_signals()
+        except Exception as e:
+            logger.warning("Cancel signal poll failed: %s", e)
+
+
+def _ensure_cancel_watcher() -> None:
+    """Start the cancel-signal watcher thread once per process."""
+    global _watcher_started
+    with _registry_lock:
+        if _watcher_started:
+            return
+        _watcher_started = True
+    threading.Thread(target=_watch_cancel_signals, name="run-cancel-watcher", daemon=True).start()
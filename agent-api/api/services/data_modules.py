@@ -6,6 +6,8 @@ Includes:
 - WideToLongTransformer: Converts wide format to long tidy format (group, time, value).
 - VisualScaler: Scales raw numeric values into normalized range (0..1) with optional log scaling logic.
 - AnomalyFlagger: Flags (does NOT remove) anomalous points; supports optional visual clamping metadata.
+- preprocess_csv_chunked: Out-of-core variant for files larger than memory (row-chunked reads,
+  incremental melt, streaming min/max/quantile sketch, per-group rolling windows carried across chunks).
 
 Design Principles:
 - Non-destructive: Original values are retained; anomalies are only flagged.
@@ -16,6 +18,7 @@ Design Principles:
 from __future__ import annotations
 
 import math
+import os
 import re
 from dataclasses import dataclass, field
 from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
@@ -25,9 +28,11 @@ try:
 except ImportError:  # Lightweight fallback if pandas is absent
     pd = None  # type: ignore
 
-import csv
 import logging
 
+from agents.tools.csv_sniffer import PROFILE_STRICT, sniff_csv
+from agents.tools.csv_sniffer import detect_header_row as _sniff_header_row
+
 # Setup logging
 _logger = logging.getLogger("data_modules")
 
@@ -91,11 +96,8 @@ def detect_header_row(filepath: str, max_rows_to_check: int = 10) -> int:
         "Country Name","Country Code","Indicator Name",...,1960,1961,...
         "Afghanistan","AFG","Inflation...",...
 
-    This function scans the first few rows to find where the real data starts
-    by looking for:
-    1. A row with significantly more columns than previous rows
-    2. A row containing year-like column headers (1960, 1970, etc.)
-    3. A row containing common data column names (Country, Name, Code, etc.)
+    Delegates to the shared memoized sniffer (agents.tools.csv_sniffer) using
+    the "strict" scoring profile.
 
     Args:
         filepath: Path to the CSV file
@@ -104,69 +106,7 @@ def detect_header_row(filepath: str, max_rows_to_check: int = 10) -> int:
     Returns:
         0-based index of the header row (0 if no special header detected)
     """
-    try:
-        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-            # Read first N rows
-            rows = []
-            reader = csv.reader(f)
-            for i, row in enumerate(reader):
-                if i >= max_rows_to_check:
-                    break
-                rows.append(row)
-
-        if not rows:
-            return 0
-
-        # Patterns indicating a data header row
-        header_patterns = [
-            r'country', r'name', r'code', r'indicator', r'region',
-            r'year', r'date', r'value', r'series', r'id',
-        ]
-        year_pattern = re.compile(r'^(19|20)\d{2}$')  # Years like 1960, 2023
-
-        best_row = 0
-        best_score = 0
-        max_cols = 0
-
-        for i, row in enumerate(rows):
-            col_count = len([c for c in row if c.strip()])  # Non-empty columns
-            score = 0
-
-            # Score: more columns than previous rows (data tables are wider)
-            if col_count > max_cols * 1.5 and col_count >= 4:
-                score += 3
-            max_cols = max(max_cols, col_count)
-
-            # Score: contains year columns
-            year_cols = sum(1 for c in row if year_pattern.match(str(c).strip()))
-            if year_cols >= 3:
-                score += 5
-
-            # Score: contains header-like column names
-            header_matches = sum(
-                1 for c in row
-                if any(re.search(p, str(c).lower()) for p in header_patterns)
-            )
-            if header_matches >= 2:
-                score += 3
-
-            # Score: row has many columns (at least 5)
-            if col_count >= 5:
-                score += 1
-
-            if score > best_score:
-                best_score = score
-                best_row = i
-
-        if best_score >= 3:
-            _logger.debug(f"[data_modules] Detected header row {best_row} with score {best_score}")
-            return best_row
-
-        return 0
-
-    except Exception as e:
-        _logger.warning(f"[data_modules] Header detection failed: {e}")
-        return 0
+    return _sniff_header_row(filepath, max_rows_to_check=max_rows_to_check, profile=PROFILE_STRICT)
 
 
 def resolve_csv_path(csv_path: str) -> str:
@@ -232,8 +172,14 @@ def read_csv_smart(filepath: str, nrows: Optional[int] = None, **kwargs) -> Any:
     # Resolve path if needed
     resolved_path = resolve_csv_path(filepath)
 
-    # Detect header row
-    header_row = detect_header_row(resolved_path)
+    # Sniff header row + encoding in one bounded read (memoized per file version)
+    try:
+        sniff = sniff_csv(resolved_path)
+        header_row = sniff.header_row
+        encoding = "latin-1" if sniff.encoding == "latin-1" else "utf-8-sig"
+    except OSError:
+        header_row = 0
+        encoding = "utf-8-sig"
 
     # Read with detected header
     # IMPORTANT: Use skip_blank_lines=False to match the row indexing from csv.reader
@@ -244,13 +190,12 @@ def read_csv_smart(filepath: str, nrows: Optional[int] = None, **kwargs) -> Any:
         read_kwargs["nrows"] = nrows
 
     try:
-        # Use utf-8-sig encoding to automatically handle BOM (Byte Order Mark)
-        # which is common in World Bank and Excel-exported CSVs
-        df = pd.read_csv(resolved_path, encoding='utf-8-sig', **read_kwargs)
-        _logger.debug(f"[data_modules] Read CSV with header_row={header_row}, shape={df.shape}")
+        # utf-8-sig transparently handles the BOM common in World Bank and Excel-exported CSVs
+        df = pd.read_csv(resolved_path, encoding=encoding, **read_kwargs)
+        _logger.debug(f"[data_modules] Read CSV with header_row={header_row}, encoding={encoding}, shape={df.shape}")
         return df
     except UnicodeDecodeError:
-        # Try latin-1 encoding as fallback
+        # Non UTF-8 bytes beyond the sniffed prefix: fall back to latin-1
         df = pd.read_csv(resolved_path, encoding='latin-1', **read_kwargs)
         _logger.debug(f"[data_modules] Read CSV with latin-1 encoding, shape={df.shape}")
         return df
@@ -317,6 +262,23 @@ class AnomalyFlagResult:
     clamped_col: Optional[str] = None
 
 
+@dataclass
+class AnomalyStreamState:
+    """
+    Per-group carry-over for AnomalyFlagger.flag_chunk().
+
+    tails keeps the last (window - 1) values of each group so rolling windows
+    continue across chunk boundaries; has_std records whether any window in
+    the group produced a standard deviation.
+    """
+    tails: Dict[Any, List[float]] = field(default_factory=dict)
+    has_std: Dict[Any, bool] = field(default_factory=dict)
+    total_points: int = 0
+    flagged_points: int = 0
+    clamp_low: Optional[float] = None
+    clamp_high: Optional[float] = None
+
+
 # ---------------------------------------------------------------------------
 # Data Validation
 # ---------------------------------------------------------------------------
@@ -749,12 +711,8 @@ class VisualScaler:
 
         vmin = float(series.min())
         vmax = float(series.max())
-        log_used = False
-        method = "minmax"
 
         # Determine clamping bounds (for visualization, not altering original value_col)
-        clamped_min = None
-        clamped_max = None
         if self.clamp_quantiles is not None:
             q_low, q_high = self.clamp_quantiles
             clamped_min = float(series.quantile(q_low))
@@ -763,13 +721,49 @@ class VisualScaler:
             clamped_min = vmin
             clamped_max = vmax
 
+        meta = self.fit(vmin, vmax, clamped_min, clamped_max)
+        df[self.normalized_col_name] = self.normalize(df[value_col].values, meta)
+        return ScalingResult(
+            df_scaled=df,
+            normalized_col=self.normalized_col_name,
+            original_col=value_col,
+            metadata=meta,
+        )
+
+    def fit(self, vmin: float, vmax: float, clamped_min: float, clamped_max: float) -> ScaleMetadata:
+        """
+        Build scaling metadata from precomputed bounds.
+
+        Shared by scale() and the chunked pipeline, which derives the bounds
+        from a StreamingValueStats pass instead of an in-memory Series.
+        """
+        log_used = False
+        method = "minmax"
+
         # Log scaling decision
         if vmin > 0 and (vmax / max(vmin, self.epsilon)) >= self.log_ratio_threshold:
             log_used = True
             method = "log-minmax"
 
+        return ScaleMetadata(
+            method=method,
+            min_value=vmin,
+            max_value=vmax,
+            epsilon=self.epsilon,
+            log_used=log_used,
+            clamped_min=clamped_min,
+            clamped_max=clamped_max,
+        )
+
+    def normalize(self, values: Iterable[Any], meta: ScaleMetadata) -> List[float]:
+        """Normalize raw values to 0..1 using fitted metadata (NaN stays NaN)."""
+        vmin = meta.min_value
+        vmax = meta.max_value
+        clamped_min = meta.clamped_min if meta.clamped_min is not None else vmin
+        clamped_max = meta.clamped_max if meta.clamped_max is not None else vmax
+
         # Prepare denominator
-        if log_used:
+        if meta.log_used:
             log_min = math.log10(max(vmin, self.epsilon))
             log_max = math.log10(max(vmax, self.epsilon))
             denom = log_max - log_min if log_max != log_min else 1.0
@@ -786,7 +780,7 @@ class VisualScaler:
 
         # Apply scaling on clamped value (for visual normalization)
         normalized_values: List[float] = []
-        for x in df[value_col].values:
+        for x in values:
             if x is None or (isinstance(x, float) and math.isnan(x)):
                 normalized_values.append(float("nan"))
                 continue
@@ -794,24 +788,7 @@ class VisualScaler:
             # Visual clamping (non-destructive)
             vis_x = min(max(original_x, clamped_min), clamped_max)
             normalized_values.append(_scale(vis_x))
-
-        df[self.normalized_col_name] = normalized_values
-
-        meta = ScaleMetadata(
-            method=method,
-            min_value=vmin,
-            max_value=vmax,
-            epsilon=self.epsilon,
-            log_used=log_used,
-            clamped_min=clamped_min,
-            clamped_max=clamped_max,
-        )
-        return ScalingResult(
-            df_scaled=df,
-            normalized_col=self.normalized_col_name,
-            original_col=value_col,
-            metadata=meta,
-        )
+        return normalized_values
 
 
 # ---------------------------------------------------------------------------
@@ -936,6 +913,92 @@ class AnomalyFlagger:
         )
 
 
+    def flag_chunk(self, chunk, group_col: str, time_col: str, value_col: str, state: AnomalyStreamState):
+        """
+        Flag one chunk of a streamed long-form dataset.
+
+        Produces the same flags as flag() provided each group's points arrive
+        in time order across chunks (true for melted wide files, where a
+        group's whole series lives in one source row). Memory is bounded by
+        the chunk plus (window - 1) carried values per group.
+
+        Returns the chunk sorted by (group_col, time_col) with the anomaly
+        column (and clamped column when clamp bounds are set on state) added.
+        """
+        work = chunk.sort_values([group_col, time_col])
+        if work.empty:
+            work[self.anomaly_col_name] = pd.Series(dtype=bool)
+            return work
+
+        vals = pd.to_numeric(work[value_col], errors="coerce").astype(float).to_numpy()
+        groups = work[group_col].to_numpy()
+
+        # Prepend carried tails so rolling windows span chunk boundaries
+        carry_groups: List[Any] = []
+        carry_vals: List[float] = []
+        for g in pd.unique(groups):
+            tail = state.tails.get(g)
+            if tail:
+                carry_groups.extend([g] * len(tail))
+                carry_vals.extend(tail)
+        n_carry = len(carry_vals)
+        frame = pd.DataFrame({
+            "g": carry_groups + list(groups),
+            "v": carry_vals + list(vals),
+            "carried": [True] * n_carry + [False] * len(vals),
+        })
+        # Stable sort keeps carried values ahead of the chunk's values per group
+        frame = frame.sort_values("g", kind="mergesort")
+
+        rolling = frame.groupby("g", sort=False)["v"].rolling(self.window, min_periods=self.min_window)
+        med = rolling.median().reset_index(level=0, drop=True)
+        sd = rolling.std().reset_index(level=0, drop=True)
+        frame["med"] = med
+        frame["sd"] = sd
+
+        v = frame["v"].to_numpy()
+        m = frame["med"].to_numpy()
+        d = frame["sd"].to_numpy()
+        valid = ~(pd.isna(v) | pd.isna(m) | pd.isna(d) | (d == 0))
+        flags = valid & (abs(v - m) > self.deviation_factor * d)
+        frame["flag"] = flags
+
+        keep_tail = max(self.window - 1, 0)
+        for g, gdf in frame.groupby("g", sort=False):
+            has_sd = bool(gdf["sd"].notna().any())
+            state.has_std[g] = state.has_std.get(g, False) or has_sd
+            state.tails[g] = gdf["v"].tolist()[-keep_tail:] if keep_tail else []
+
+        # Restore chunk order (frame index == position in carry + chunk)
+        own = frame[~frame["carried"]].sort_index()
+        work[self.anomaly_col_name] = own["flag"].to_numpy()
+
+        if state.clamp_low is not None and state.clamp_high is not None:
+            clamped = pd.Series(vals, index=work.index).clip(state.clamp_low, state.clamp_high)
+            work[self.clamped_col_name] = clamped
+
+        state.total_points += len(work)
+        state.flagged_points += int(work[self.anomaly_col_name].sum())
+        return work
+
+    def stream_report(self, state: AnomalyStreamState) -> AnomalyReport:
+        """Build the AnomalyReport once all chunks have gone through flag_chunk()."""
+        notes = [
+            f"Group '{g}': insufficient data for std"
+            for g, has_sd in state.has_std.items()
+            if not has_sd
+        ]
+        total = state.total_points
+        return AnomalyReport(
+            algorithm="rolling_median",
+            total_points=total,
+            flagged_points=state.flagged_points,
+            pct_flagged=state.flagged_points / total if total else 0.0,
+            threshold=self.deviation_factor,
+            notes=notes,
+        )
+
+
 # ---------------------------------------------------------------------------
 # Orchestrator convenience function
 # ---------------------------------------------------------------------------
@@ -1039,6 +1102,391 @@ def preprocess_dataset(
     }
 
 
+# ---------------------------------------------------------------------------
+# Chunked (out-of-core) preprocessing
+# ---------------------------------------------------------------------------
+
+# Source rows per read_csv chunk; a wide row melts into one row per time column
+DEFAULT_CHUNK_ROWS = 20_000
+
+
+class QuantileSketch:
+    """
+    Bounded-memory, mergeable quantile estimator (KLL-style compactors).
+
+    Exact (same linear interpolation as pandas.Series.quantile) until more than
+    `capacity` values have been added; after that each level holds at most
+    `capacity` items and rank error stays around 1/capacity.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = max(int(capacity), 2)
+        self._levels: List[List[float]] = [[]]
+        self._compacted = False
+        self._flip = False
+
+    @property
+    def exact(self) -> bool:
+        return not self._compacted
+
+    def update(self, values: Iterable[float]) -> None:
+        self._levels[0].extend(float(v) for v in values if not math.isnan(v))
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for h, items in enumerate(other._levels):
+            while len(self._levels) <= h:
+                self._levels.append([])
+            self._levels[h].extend(items)
+        self._compacted = self._compacted or other._compacted
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self._levels):
+            level = self._levels[h]
+            if len(level) > self.capacity:
+                level.sort()
+                # Odd-length levels keep their largest item at this weight
+                spill = level.pop() if len(level) % 2 else None
+                self._flip = not self._flip
+                promoted = level[int(self._flip)::2]
+                if h + 1 == len(self._levels):
+                    self._levels.append([])
+                self._levels[h + 1].extend(promoted)
+                self._levels[h] = [spill] if spill is not None else []
+                self._compacted = True
+            h += 1
+
+    def quantile(self, q: float) -> float:
+        if self.exact:
+            items = sorted(self._levels[0])
+            if not items:
+                return float("nan")
+            pos = q * (len(items) - 1)
+            lo = int(math.floor(pos))
+            hi = min(lo + 1, len(items) - 1)
+            return items[lo] + (items[hi] - items[lo]) * (pos - lo)
+
+        weighted = sorted(
+            (v, 1 << h) for h, items in enumerate(self._levels) for v in items
+        )
+        total = sum(w for _, w in weighted)
+        target = q * total
+        running = 0
+        for v, w in weighted:
+            running += w
+            if running >= target:
+                return v
+        return weighted[-1][0]
+
+
+class StreamingValueStats:
+    """
+    Incremental count / null / min / max / quantile summary of a numeric column.
+
+    Feeds VisualScaler.fit() and the AnomalyFlagger clamp bounds in the
+    chunked pipeline without holding the column in memory.
+    """
+
+    def __init__(self, sketch_capacity: int = 4096):
+        self.count = 0
+        self.null_count = 0
+        self.min_value: Optional[float] = None
+        self.max_value: Optional[float] = None
+        self.sketch = QuantileSketch(sketch_capacity)
+
+    def update(self, series) -> None:
+        values = pd.to_numeric(series, errors="coerce").astype(float)
+        present = values.dropna()
+        self.null_count += len(values) - len(present)
+        if present.empty:
+            return
+        self.count += len(present)
+        cmin = float(present.min())
+        cmax = float(present.max())
+        self.min_value = cmin if self.min_value is None else min(self.min_value, cmin)
+        self.max_value = cmax if self.max_value is None else max(self.max_value, cmax)
+        self.sketch.update(present.to_numpy())
+
+    def quantile(self, q: float) -> float:
+        return self.sketch.quantile(q)
+
+
+@dataclass
+class ChunkedPreprocessResult:
+    output_path: str
+    rows_written: int
+    chunks: int
+    group_count: int
+    time_points: int
+    detection: WideDetectionResult
+    columns: Dict[str, Optional[str]]
+    scaling: Optional[ScaleMetadata] = None
+    anomalies: Optional[AnomalyReport] = None
+    value_stats: Optional[Dict[str, Any]] = None
+
+
+def _resolve_read_params(filepath: str, header_row: Optional[int], encoding: Optional[str]) -> Tuple[int, str]:
+    """Fill header_row/encoding from the memoized sniffer when not supplied."""
+    if header_row is not None and encoding is not None:
+        return header_row, encoding
+    try:
+        sniff = sniff_csv(filepath)
+        sniffed_header = sniff.header_row
+        sniffed_encoding = "latin-1" if sniff.encoding == "latin-1" else "utf-8-sig"
+    except OSError:
+        sniffed_header, sniffed_encoding = 0, "utf-8-sig"
+    return (
+        header_row if header_row is not None else sniffed_header,
+        encoding or sniffed_encoding,
+    )
+
+
+def iter_csv_chunks(
+    filepath: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    header_row: Optional[int] = None,
+    encoding: Optional[str] = None,
+    **kwargs,
+):
+    """
+    Yield DataFrame chunks of a CSV with the same header handling as read_csv_smart.
+
+    Memory is bounded by chunk_rows regardless of file size.
+    """
+    if pd is None:
+        raise RuntimeError("pandas is required for CSV reading")
+    header_row, encoding = _resolve_read_params(filepath, header_row, encoding)
+    reader = pd.read_csv(
+        filepath,
+        header=header_row,
+        skip_blank_lines=False,
+        encoding=encoding,
+        chunksize=chunk_rows,
+        **kwargs,
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+def select_melt_columns(
+    filepath: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    header_row: Optional[int] = None,
+    encoding: Optional[str] = None,
+) -> Tuple[Optional[str], List[str]]:
+    """
+    Pick (group_col, value_cols) for melting a wide file.
+
+    Prefers 4-digit year headers; otherwise keeps columns after the first whose
+    values are more than 50% numeric, counted over the whole file in chunks.
+    """
+    header_row, encoding = _resolve_read_params(filepath, header_row, encoding)
+    head = pd.read_csv(filepath, header=header_row, skip_blank_lines=False, encoding=encoding, nrows=0)
+    columns = list(head.columns)
+    if not columns:
+        return None, []
+    group_col = columns[0]
+    year_cols = [c for c in columns if isinstance(c, str) and c.isdigit() and len(c) == 4]
+    if year_cols:
+        return group_col, year_cols
+
+    candidate_cols = columns[1:]
+    numeric_counts = {c: 0 for c in candidate_cols}
+    total_rows = 0
+    for chunk in iter_csv_chunks(filepath, chunk_rows, header_row, encoding, usecols=candidate_cols):
+        total_rows += len(chunk)
+        for c in candidate_cols:
+            numeric_counts[c] += int(pd.to_numeric(chunk[c], errors="coerce").notna().sum())
+    if not total_rows:
+        return group_col, []
+    return group_col, [c for c in candidate_cols if numeric_counts[c] / total_rows > 0.5]
+
+
+def preprocess_csv_chunked(
+    filepath: str,
+    output_path: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    header_row: Optional[int] = None,
+    encoding: Optional[str] = None,
+    group_column: Optional[str] = None,
+    value_columns: Optional[Sequence[str]] = None,
+    detector: Optional[WideFormatDetector] = None,
+    transformer: Optional[WideToLongTransformer] = None,
+    scaler: Optional[VisualScaler] = None,
+    anomaly_flagger: Optional[AnomalyFlagger] = None,
+    include_derived: bool = True,
+) -> ChunkedPreprocessResult:
+    """
+    Out-of-core counterpart of preprocess_dataset for files larger than memory.
+
+    Reads the CSV in row chunks, melts each chunk (when wide), and appends the
+    long-form rows to output_path, so peak memory is bounded by chunk_rows.
+
+    Steps:
+    1. Detect wide format on the first chunk (or use group_column/value_columns).
+    2. Pass 1: stream values into StreamingValueStats (min/max/quantile sketch).
+    3. Pass 2: melt, flag anomalies per group with carried windows, scale with
+       the fitted metadata, and append to output_path.
+
+    With include_derived=False only (group, time, value) are written in a
+    single pass: scaling metadata is still fitted, anomalies are not flagged
+    (result.anomalies is None).
+
+    When the file fits in a single chunk, output rows and order match
+    preprocess_dataset + DataFrame.to_csv; otherwise rows are ordered chunk by chunk.
+    """
+    if pd is None:
+        raise RuntimeError("pandas is required for chunked preprocessing")
+
+    detector = detector or WideFormatDetector()
+    transformer = transformer or WideToLongTransformer()
+    scaler = scaler or VisualScaler()
+    anomaly_flagger = anomaly_flagger or AnomalyFlagger()
+    header_row, encoding = _resolve_read_params(filepath, header_row, encoding)
+
+    first = next(iter_csv_chunks(filepath, chunk_rows, header_row, encoding), None)
+    if first is None:
+        first = pd.DataFrame()
+    detection = detector.detect(first)
+    if value_columns is not None:
+        detection = WideDetectionResult(
+            is_wide=True,
+            group_column=group_column or (first.columns[0] if len(first.columns) else None),
+            value_columns=list(value_columns),
+            time_like_headers=detection.time_like_headers,
+            reason="value columns supplied by caller",
+            metadata=detection.metadata,
+        )
+
+    # Operative columns, resolved the same way preprocess_dataset does
+    if detection.is_wide:
+        group_col = detection.group_column
+        time_col = transformer.time_col_name
+        value_col = transformer.value_col_name
+        # Time labels are column headers, so the int cast is decided once for all chunks
+        cast_time = all(
+            YEAR_REGEX.match(str(c)) or NUMERIC_HEADER_REGEX.match(str(c))
+            for c in detection.value_columns
+        )
+        # Read the group column as text so its dtype can't drift between chunks
+        read_kwargs: Dict[str, Any] = {"dtype": {group_col: str}}
+    else:
+        cols = list(first.columns)
+        if len(cols) < 2:
+            raise ValueError("Chunked preprocessing needs at least two columns")
+        group_col = cols[0]
+        time_col = "time" if "time" in cols else cols[1]
+        numeric = list(first.select_dtypes("number").columns)
+        value_col = numeric[0] if numeric else None
+        if value_col is None:
+            raise ValueError("No numeric columns found - cannot perform anomaly detection or scaling")
+        cast_time = False
+        read_kwargs = {}
+
+    def _long_chunks():
+        for chunk in iter_csv_chunks(filepath, chunk_rows, header_row, encoding, **read_kwargs):
+            if not detection.is_wide:
+                yield chunk
+                continue
+            long_df = chunk.melt(
+                id_vars=[group_col],
+                value_vars=detection.value_columns,
+                var_name=time_col,
+                value_name=value_col,
+            )
+            long_df["raw_time_label"] = long_df[time_col]
+            if cast_time:
+                try:
+                    long_df[time_col] = long_df[time_col].astype(int)
+                except Exception:
+                    pass
+            long_df[value_col] = pd.to_numeric(long_df[value_col], errors="coerce")
+            yield long_df
+
+    stats = StreamingValueStats()
+    scale_meta: Optional[ScaleMetadata] = None
+    state = AnomalyStreamState()
+    groups_seen: set = set()
+    times_seen: set = set()
+
+    def _fit_scale() -> Optional[ScaleMetadata]:
+        if stats.count == 0:
+            return ScaleMetadata(method="none", min_value=0, max_value=0, epsilon=scaler.epsilon, log_used=False)
+        vmin, vmax = stats.min_value, stats.max_value
+        if scaler.clamp_quantiles is not None:
+            q_low, q_high = scaler.clamp_quantiles
+            return scaler.fit(vmin, vmax, stats.quantile(q_low), stats.quantile(q_high))
+        return scaler.fit(vmin, vmax, vmin, vmax)
+
+    if include_derived:
+        # Pass 1: global bounds needed before any normalized value can be written
+        for long_df in _long_chunks():
+            stats.update(long_df[value_col])
+        scale_meta = _fit_scale()
+        if anomaly_flagger.clamp_quantiles is not None and stats.count:
+            q_low, q_high = anomaly_flagger.clamp_quantiles
+            state.clamp_low = stats.quantile(q_low)
+            state.clamp_high = stats.quantile(q_high)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    rows_written = 0
+    chunks = 0
+    for long_df in _long_chunks():
+        chunks += 1
+        groups_seen.update(long_df[group_col].dropna().unique().tolist())
+        times_seen.update(long_df[time_col].dropna().unique().tolist())
+        if include_derived:
+            out = anomaly_flagger.flag_chunk(long_df, group_col, time_col, value_col, state)
+            if scale_meta is not None and scale_meta.method == "none":
+                out[scaler.normalized_col_name] = 0.0
+            else:
+                out[scaler.normalized_col_name] = scaler.normalize(out[value_col].values, scale_meta)
+        else:
+            stats.update(long_df[value_col])
+            out = long_df[[group_col, time_col, value_col]] if detection.is_wide else long_df
+        out.to_csv(output_path, mode="w" if chunks == 1 else "a", header=chunks == 1, index=False)
+        rows_written += len(out)
+
+    if chunks == 0:
+        # Still leave a valid (header-only) file for downstream readers
+        pd.DataFrame(columns=[group_col, time_col, value_col]).to_csv(output_path, index=False)
+    if scale_meta is None:
+        scale_meta = _fit_scale()
+
+    _logger.info(
+        f"[data_modules] Chunked preprocessing wrote {rows_written} rows in {chunks} chunks -> {output_path}"
+    )
+
+    return ChunkedPreprocessResult(
+        output_path=output_path,
+        rows_written=rows_written,
+        chunks=chunks,
+        group_count=len(groups_seen),
+        time_points=len(times_seen),
+        detection=detection,
+        columns={
+            "group": group_col,
+            "time": time_col,
+            "value": value_col,
+            "normalized": scaler.normalized_col_name if include_derived else None,
+            "anomaly_flag": anomaly_flagger.anomaly_col_name if include_derived else None,
+            "clamped_value": anomaly_flagger.clamped_col_name if include_derived and state.clamp_low is not None else None,
+        },
+        scaling=scale_meta,
+        anomalies=anomaly_flagger.stream_report(state) if include_derived else None,
+        value_stats={
+            "count": stats.count,
+            "null_count": stats.null_count,
+            "min": stats.min_value,
+            "max": stats.max_value,
+            "quantiles_exact": stats.sketch.exact,
+        },
+    )
+
+
 # ---------------------------------------------------------------------------
 # Categorical Count Transformation
 # ---------------------------------------------------------------------------
@@ -1124,6 +1572,14 @@ __all__ = [
     "DataValidationResult",
     "validate_for_animation",
     "preprocess_dataset",
+    "AnomalyStreamState",
+    "QuantileSketch",
+    "StreamingValueStats",
+    "ChunkedPreprocessResult",
+    "DEFAULT_CHUNK_ROWS",
+    "iter_csv_chunks",
+    "select_melt_columns",
+    "preprocess_csv_chunked",
     "transform_count_by_column",
     "detect_header_row",
     "resolve_csv_path",
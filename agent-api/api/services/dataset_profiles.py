@@ -0,0 +1,130 @@
+"""
+Upload-time dataset profiling.
+
+upload_dataset schedules a profile job per dataset; the job computes the
+DatasetProfile (agents.tools.dataset_profile), registers it in the in-process
+store and persists it to public.datasets.profile. Readers (run pipeline,
+template suggestions/validation, chart recommendation) look profiles up by
+file path: memory first, then the database via the loader installed here.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Dict, Optional
+
+from agents.tools.dataset_profile import (
+    DatasetProfile,
+    build_profile,
+    get_profile,
+    register_profile,
+    set_profile_loader,
+)
+from api.persistence.dataset_store import get_dataset_profile, update_dataset_profile
+
+logger = logging.getLogger(__name__)
+
+DATASETS_ROOT = os.path.abspath(os.path.join("artifacts", "datasets"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DATASET_PROFILE_WORKERS", "2")),
+    thread_name_prefix="dataset-profile",
+)
+
+# dataset_id -> in-flight profile job
+_pending: Dict[str, Future] = {}
+_pending_lock = Lock()
+
+
+def _storage_path_for(abs_path: str) -> Optional[str]:
+    """Map an absolute dataset file path to its /static storage_path."""
+    try:
+        rel = os.path.relpath(abs_path, DATASETS_ROOT)
+    except ValueError:
+        return None
+    if rel.startswith(".."):
+        return None
+    return "/static/datasets/" + rel.replace(os.sep, "/")
+
+
+def _load_from_db(abs_path: str) -> Optional[dict]:
+    storage_path = _storage_path_for(abs_path)
+    if not storage_path:
+        return None
+    return get_dataset_profile(storage_path=storage_path)
+
+
+def _profile_job(dataset_id: str, csv_path: str) -> Optional[DatasetProfile]:
+    update_dataset_profile(dataset_id, None, status="pending")
+    try:
+        profile = build_profile(csv_path)
+    except Exception as e:
+        logger.warning("Dataset profiling failed id=%s error=%s", dataset_id, e)
+        update_dataset_profile(dataset_id, {"error": str(e)}, status="failed")
+        return None
+    register_profile(profile)
+    update_dataset_profile(dataset_id, profile.to_dict(), status="ready")
+    return profile
+
+
+def _forget(dataset_id: str, future: Future) -> None:
+    with _pending_lock:
+        if _pending.get(dataset_id) is future:
+            _pending.pop(dataset_id, None)
+
+
+def schedule_dataset_profile(dataset_id: str, csv_path: str) -> Future:
+    """
+    Profile ``csv_path`` in the background. Returns the job's future (resolves
+    to the DatasetProfile or None). An existing, still-current profile is
+    reused without re-reading the file.
+    """
+    with _pending_lock:
+        running = _pending.get(dataset_id)
+        if running is not None:
+            return running
+
+    existing = get_profile(os.path.abspath(csv_path))
+    if existing is not None:
+        done: Future = Future()
+        done.set_result(existing)
+        update_dataset_profile(dataset_id, existing.to_dict(), status="ready")
+        return done
+
+    future = _executor.submit(_profile_job, dataset_id, csv_path)
+    with _pending_lock:
+        _pending[dataset_id] = future
+    future.add_done_callback(lambda f: _forget(dataset_id, f))
+    return future
+
+
+def load_dataset_profile(
+    csv_path: Optional[str] = None,
+    dataset_id: Optional[str] = None,
+) -> Optional[DatasetProfile]:
+    """
+    Resolve a dataset profile by file path (memory, then database) or by
+    dataset id (database, checked against the file it was computed from).
+    """
+    if csv_path:
+        from agents.tools.chart_inference import _resolve_csv_path
+
+        return get_profile(os.path.abspath(_resolve_csv_path(csv_path)))
+    if dataset_id:
+        profile = DatasetProfile.from_dict(get_dataset_profile(dataset_id=dataset_id) or {})
+        if profile is not None and profile.matches_file():
+            register_profile(profile)
+            return profile
+    return None
+
+
+set_profile_loader(_load_from_db)
+
+
+__all__ = [
+    "schedule_dataset_profile",
+    "load_dataset_profile",
+]
@@ -11,6 +11,9 @@ Key Features:
 - Automatic TTL-based expiration to prevent memory leaks
 - Thread-safe operations for concurrent request handling
 - Optional merging of partial updates
+- Shared across workers when api.state_backend is a shared backend
+  (contexts are then stored there; returned objects are snapshots, so
+  changes go through update_session_context / clear_session_pending_selection)
 
 Usage:
     from api.session_context import (
@@ -37,6 +40,8 @@ import time
 from dataclasses import dataclass, field, asdict
 from typing import Dict, List, Optional, Any
 
+from api.state_backend import SESSIONS, shared_backend
+
 
 logger = logging.getLogger(__name__)
 
@@ -119,6 +124,11 @@ class AnimationContext:
         """Serialize to dictionary."""
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AnimationContext":
+        """Rebuild a context from its to_dict() form."""
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
     def merge(self, **kwargs) -> None:
         """
         Merge partial updates into this context.
@@ -183,6 +193,18 @@ def get_session_context(session_id: Optional[str]) -> Optional[AnimationContext]
     if not session_id:
         return None
 
+    backend = shared_backend()
+    if backend is not None:
+        def refresh(data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            if data is None:
+                return None
+            ctx = AnimationContext.from_dict(data)
+            ctx.refresh_ttl()
+            return ctx.to_dict()
+
+        data = backend.update(SESSIONS, session_id, refresh, ttl=DEFAULT_TTL_SECONDS)
+        return AnimationContext.from_dict(data) if data is not None else None
+
     with _context_lock:
         _cleanup_expired()
 
@@ -200,6 +222,40 @@ def get_session_context(session_id: Optional[str]) -> Optional[AnimationContext]
         return ctx
 
 
+def _merge_context(
+    session_id: str,
+    ctx: Optional[AnimationContext],
+    ttl_seconds: float,
+    fields: Dict[str, Any],
+) -> AnimationContext:
+    """Create a context from fields, or merge them into an existing live one."""
+    if ctx is None or ctx.is_expired():
+        # Create new context
+        ctx = AnimationContext(
+            csv_path=fields["csv_path"],
+            original_csv_path=fields["original_csv_path"] or fields["csv_path"],
+            chart_type=fields["chart_type"],
+            data_binding=fields["data_binding"] or {},
+            creation_mode=fields["creation_mode"],
+            aspect_ratio=fields["aspect_ratio"],
+            render_quality=fields["render_quality"],
+            melted_dataset_path=fields["melted_dataset_path"],
+            user_preferences=fields["user_preferences"] or {},
+            last_intent_message=fields["last_intent_message"],
+            pending_template_suggestions=fields["pending_template_suggestions"] or [],
+            pending_run_id=fields["pending_run_id"],
+            pending_original_message=fields["pending_original_message"],
+        )
+        ctx.refresh_ttl(ttl_seconds)
+        logger.debug("Created new session context for %s", session_id)
+    else:
+        # Merge into existing context
+        ctx.merge(**fields)
+        ctx.refresh_ttl(ttl_seconds)
+        logger.debug("Updated session context for %s", session_id)
+    return ctx
+
+
 def update_session_context(
     session_id: Optional[str],
     csv_path: Optional[str] = None,
@@ -243,51 +299,35 @@ def update_session_context(
     if not session_id:
         return None
 
-    with _context_lock:
-        _cleanup_expired()
+    fields = dict(
+        csv_path=csv_path,
+        original_csv_path=original_csv_path,
+        chart_type=chart_type,
+        data_binding=data_binding,
+        creation_mode=creation_mode,
+        aspect_ratio=aspect_ratio,
+        render_quality=render_quality,
+        melted_dataset_path=melted_dataset_path,
+        user_preferences=user_preferences,
+        last_intent_message=last_intent_message,
+        pending_template_suggestions=pending_template_suggestions,
+        pending_run_id=pending_run_id,
+        pending_original_message=pending_original_message,
+    )
 
-        ctx = _context_store.get(session_id)
+    backend = shared_backend()
+    if backend is not None:
+        def apply(data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            current = AnimationContext.from_dict(data) if data is not None else None
+            return _merge_context(session_id, current, ttl_seconds, fields).to_dict()
 
-        if ctx is None or ctx.is_expired():
-            # Create new context
-            ctx = AnimationContext(
-                csv_path=csv_path,
-                original_csv_path=original_csv_path or csv_path,
-                chart_type=chart_type,
-                data_binding=data_binding or {},
-                creation_mode=creation_mode,
-                aspect_ratio=aspect_ratio,
-                render_quality=render_quality,
-                melted_dataset_path=melted_dataset_path,
-                user_preferences=user_preferences or {},
-                last_intent_message=last_intent_message,
-                pending_template_suggestions=pending_template_suggestions or [],
-                pending_run_id=pending_run_id,
-                pending_original_message=pending_original_message,
-            )
-            ctx.refresh_ttl(ttl_seconds)
-            _context_store[session_id] = ctx
-            logger.debug("Created new session context for %s", session_id)
-        else:
-            # Merge into existing context
-            ctx.merge(
-                csv_path=csv_path,
-                original_csv_path=original_csv_path,
-                chart_type=chart_type,
-                data_binding=data_binding,
-                creation_mode=creation_mode,
-                aspect_ratio=aspect_ratio,
-                render_quality=render_quality,
-                melted_dataset_path=melted_dataset_path,
-                user_preferences=user_preferences,
-                last_intent_message=last_intent_message,
-                pending_template_suggestions=pending_template_suggestions,
-                pending_run_id=pending_run_id,
-                pending_original_message=pending_original_message,
-            )
-            ctx.refresh_ttl(ttl_seconds)
-            logger.debug("Updated session context for %s", session_id)
+        return AnimationContext.from_dict(backend.update(SESSIONS, session_id, apply, ttl=ttl_seconds))
 
+    with _context_lock:
+        _cleanup_expired()
+
+        ctx = _merge_context(session_id, _context_store.get(session_id), ttl_seconds, fields)
+        _context_store[session_id] = ctx
         return ctx
 
 
@@ -304,6 +344,13 @@ def clear_session_context(session_id: Optional[str]) -> bool:
     if not session_id:
         return False
 
+    backend = shared_backend()
+    if backend is not None:
+        removed = backend.delete(SESSIONS, session_id)
+        if removed:
+            logger.debug("Cleared session context for %s", session_id)
+        return removed
+
     with _context_lock:
         if session_id in _context_store:
             del _context_store[session_id]
@@ -312,6 +359,35 @@ def clear_session_context(session_id: Optional[str]) -> bool:
         return False
 
 
+def clear_session_pending_selection(session_id: Optional[str]) -> None:
+    """
+    Clear the pending template selection of a session's context.
+
+    Use this instead of AnimationContext.clear_pending_template_selection()
+    on a fetched context, which only changes the local snapshot when the
+    state backend is shared.
+    """
+    if not session_id:
+        return
+
+    backend = shared_backend()
+    if backend is not None:
+        def apply(data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            if data is None:
+                return None
+            ctx = AnimationContext.from_dict(data)
+            ctx.clear_pending_template_selection()
+            return ctx.to_dict()
+
+        backend.update(SESSIONS, session_id, apply, ttl=DEFAULT_TTL_SECONDS)
+        return
+
+    with _context_lock:
+        ctx = _context_store.get(session_id)
+        if ctx is not None:
+            ctx.clear_pending_template_selection()
+
+
 def get_all_contexts() -> Dict[str, dict]:
     """
     Get all active (non-expired) session contexts.
@@ -320,6 +396,10 @@ def get_all_contexts() -> Dict[str, dict]:
     Returns:
         Dict mapping session_id to context dict
     """
+    backend = shared_backend()
+    if backend is not None:
+        return backend.items(SESSIONS)
+
     with _context_lock:
         _cleanup_expired()
         return {
@@ -336,6 +416,10 @@ def get_context_count() -> int:
     Returns:
         Number of non-expired contexts
     """
+    backend = shared_backend()
+    if backend is not None:
+        return len(backend.items(SESSIONS))
+
     with _context_lock:
         _cleanup_expired()
         return len(_context_store)
@@ -349,6 +433,10 @@ def force_cleanup() -> int:
         Number of contexts removed
     """
     global _last_cleanup
+    backend = shared_backend()
+    if backend is not None:
+        return backend.purge_expired()
+
     with _context_lock:
         _last_cleanup = 0  # Reset to force cleanup
         return _cleanup_expired()
@@ -0,0 +1,425 @@
+"""
+Shared state backend for the API's per-run and per-session registries.
+
+The run registry, session contexts, pipeline logger identities and the
+dataset registry used to live only in module-level dicts, so a request that
+landed on another uvicorn worker (select_template, cancel, GET /runs/{id})
+could not find the run. They now go through a StateBackend:
+
+- MemoryStateBackend (default): process-local. The registries keep their
+  in-process dicts and objects exactly as before.
+- SQLStateBackend: one table in a SQL database shared by every worker and
+  replica. Postgres (the app database by default) for several nodes;
+  SQLite works as a local stand-in for several workers on one machine.
+
+The interface is a namespaced key/value store of JSON objects:
+
+    get / get_many / items      read (expired entries are invisible)
+    put / delete                write
+    update(ns, key, fn)         atomic read-modify-write: fn(current) -> new
+    purge_expired()             drop expired entries
+
+update() is optimistic (a version column; retried on conflict), so it
+needs no row locks and behaves the same on Postgres and SQLite.
+
+Cross-process cancellation is built on top of it by api.run_registry: a
+cancel request for a run owned by another process stores a signal entry
+that the owning process polls for.
+
+Environment:
+    STATE_BACKEND          memory | sql (default memory)
+    STATE_BACKEND_URL      SQLAlchemy URL for sql (default: the app database,
+                           e.g. sqlite:///artifacts/state.sqlite3 for one host)
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Namespaces used by the registries
+RUNS = "runs"
+RUN_CANCELS = "run_cancels"
+SESSIONS = "sessions"
+PIPELINE_LOGGERS = "pipeline_loggers"
+DATASETS = "datasets"
+
+Mutator = Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]]
+
+
+class StateBackendError(Exception):
+    """Raised when the shared store cannot complete an operation."""
+
+
+class StateBackend:
+    """
+    Interface for registry state. Values are JSON-serializable dicts;
+    ``ttl`` is in seconds (None = no expiry).
+    """
+
+    # True when other processes see the same state; registries only
+    # write through when it is set.
+    shared: bool = False
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for key in keys:
+            value = self.get(namespace, key)
+            if value is not None:
+                result[key] = value
+        return result
+
+    def items(self, namespace: str) -> Dict[str, Dict[str, Any]]:
+        raise NotImplementedError
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def update(self, namespace: str, key: str, fn: Mutator, ttl: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Atomically replace the value with ``fn(current)`` (current is None
+        when missing or expired). If ``fn`` returns None nothing is written.
+        Returns the value now stored (or None).
+        """
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str) -> bool:
+        raise NotImplementedError
+
+    def purge_expired(self) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryStateBackend(StateBackend):
+    """Process-local store. Values are copied in and out, as a shared store would."""
+
+    shared = False
+
+    def __init__(self):
+        self._data: Dict[str, Dict[str, tuple]] = {}
+        self._lock = threading.RLock()
+
+    def _live(self, namespace: str, key: str, now: float) -> Optional[Dict[str, Any]]:
+        entry = self._data.get(namespace, {}).get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self._data[namespace][key]
+            return None
+        return value
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return copy.deepcopy(self._live(namespace, key, time.time()))
+
+    def items(self, namespace: str) -> Dict[str, Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            keys = list(self._data.get(namespace, {}))
+            return {
+                key: copy.deepcopy(value)
+                for key in keys
+                if (value := self._live(namespace, key, now)) is not None
+            }
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data.setdefault(namespace, {})[key] = (copy.deepcopy(value), expires_at)
+
+    def update(self, namespace: str, key: str, fn: Mutator, ttl: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            current = self._live(namespace, key, time.time())
+            new = fn(copy.deepcopy(current))
+            if new is None:
+                return copy.deepcopy(current)
+            self.put(namespace, key, new, ttl)
+            return copy.deepcopy(new)
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            return self._data.get(namespace, {}).pop(key, None) is not None
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for entries in self._data.values():
+                for key in [k for k, (_, exp) in entries.items() if exp is not None and exp <= now]:
+                    del entries[key]
+                    removed += 1
+        return removed
+
+
+_SQL_SCHEMA = """
+create table if not exists api_state (
+    namespace text not null,
+    key text not null,
+    value text not null,
+    version integer not null default 0,
+    expires_at double precision,
+    updated_at double precision not null,
+    primary key (namespace, key)
+)
+"""
+
+
+class SQLStateBackend(StateBackend):
+    """
+    Shared store in a single ``api_state`` table (see db/schema_local.sql).
+    Works on Postgres and SQLite; the table is created on first use.
+    """
+
+    shared = True
+
+    # Attempts for update() before giving up on a contended key
+    MAX_UPDATE_ATTEMPTS = 20
+    # Run purge_expired() after this many writes
+    PURGE_EVERY_WRITES = 500
+
+    def __init__(self, url: str, engine: Any = None):
+        from sqlalchemy import create_engine, event
+
+        self.url = url
+        if engine is None:
+            kwargs: Dict[str, Any] = {"pool_pre_ping": True}
+            if url.startswith("sqlite"):
+                kwargs["connect_args"] = {"timeout": 10, "check_same_thread": False}
+            engine = create_engine(url, **kwargs)
+            if url.startswith("sqlite"):
+                @event.listens_for(engine, "connect")
+                def _sqlite_pragmas(dbapi_conn, _record):
+                    cursor = dbapi_conn.cursor()
+                    cursor.execute("pragma journal_mode=wal")
+                    cursor.execute("pragma synchronous=normal")
+                    cursor.close()
+        self.engine = engine
+        self._writes = 0
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _ensure_schema(self) -> None:
+        if self._schema_ready:
+            return
+        from sqlalchemy import text
+
+        with self._schema_lock:
+            if not self._schema_ready:
+                with self.engine.begin() as conn:
+                    conn.execute(text(_SQL_SCHEMA))
+                    conn.execute(text("create index if not exists idx_api_state_expires on api_state(expires_at)"))
+                self._schema_ready = True
+
+    def _run(self, fn: Callable[[Any], Any]) -> Any:
+        from sqlalchemy.exc import SQLAlchemyError
+
+        try:
+            self._ensure_schema()
+            with self.engine.begin() as conn:
+                return fn(conn)
+        except SQLAlchemyError as e:
+            raise StateBackendError(f"state backend error: {e}") from e
+
+    def _after_write(self) -> None:
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY_WRITES == 0:
+            try:
+                self.purge_expired()
+            except StateBackendError as e:
+                logger.warning("State backend purge failed: %s", e)
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        from sqlalchemy import text
+
+        row = self._run(lambda conn: conn.execute(
+            text(
+                "select value from api_state where namespace = :ns and key = :key "
+                "and (expires_at is null or expires_at > :now)"
+            ),
+            {"ns": namespace, "key": key, "now": time.time()},
+        ).fetchone())
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        from sqlalchemy import bindparam, text
+
+        keys = list(keys)
+        if not keys:
+            return {}
+        statement = text(
+            "select key, value from api_state where namespace = :ns and key in :keys "
+            "and (expires_at is null or expires_at > :now)"
+        ).bindparams(bindparam("keys", expanding=True))
+        rows = self._run(lambda conn: conn.execute(
+            statement, {"ns": namespace, "keys": keys, "now": time.time()},
+        ).fetchall())
+        return {key: json.loads(value) for key, value in rows}
+
+    def items(self, namespace: str) -> Dict[str, Dict[str, Any]]:
+        from sqlalchemy import text
+
+        rows = self._run(lambda conn: conn.execute(
+            text(
+                "select key, value from api_state where namespace = :ns "
+                "and (expires_at is null or expires_at > :now)"
+            ),
+            {"ns": namespace, "now": time.time()},
+        ).fetchall())
+        return {key: json.loads(value) for key, value in rows}
+
+    def put(self, namespace: str, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        from sqlalchemy import text
+
+        now = time.time()
+        self._run(lambda conn: conn.execute(
+            text(
+                "insert into api_state (namespace, key, value, version, expires_at, updated_at) "
+                "values (:ns, :key, :value, 0, :exp, :now) "
+                "on conflict (namespace, key) do update set value = excluded.value, "
+                "version = api_state.version + 1, expires_at = excluded.expires_at, updated_at = excluded.updated_at"
+            ),
+            {"ns": namespace, "key": key, "value": json.dumps(value), "exp": now + ttl if ttl else None, "now": now},
+        ))
+        self._after_write()
+
+    def update(self, namespace: str, key: str, fn: Mutator, ttl: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        from sqlalchemy import text
+
+        for _ in range(self.MAX_UPDATE_ATTEMPTS):
+            now = time.time()
+
+            def attempt(conn, now=now):
+                row = conn.execute(
+                    text(
+                        "select value, version, expires_at from api_state "
+                        "where namespace = :ns and key = :key"
+                    ),
+                    {"ns": namespace, "key": key},
+                ).fetchone()
+                live = row is not None and (row[2] is None or row[2] > now)
+                current = json.loads(row[0]) if live else None
+                new = fn(current)
+                if new is None:
+                    return True, current
+                params = {
+                    "ns": namespace, "key": key, "value": json.dumps(new),
+                    "exp": now + ttl if ttl else None, "now": now,
+                }
+                if row is None:
+                    written = conn.execute(
+                        text(
+                            "insert into api_state (namespace, key, value, version, expires_at, updated_at) "
+                            "values (:ns, :key, :value, 0, :exp, :now) on conflict (namespace, key) do nothing"
+                        ),
+                        params,
+                    ).rowcount
+                else:
+                    written = conn.execute(
+                        text(
+                            "update api_state set value = :value, version = version + 1, "
+                            "expires_at = :exp, updated_at = :now "
+                            "where namespace = :ns and key = :key and version = :version"
+                        ),
+                        {**params, "version": row[1]},
+                    ).rowcount
+                return written == 1, new
+
+            done, value = self._run(attempt)
+            if done:
+                self._after_write()
+                return value
+            time.sleep(0.005)
+        raise StateBackendError(f"update of {namespace}/{key} kept conflicting")
+
+    def delete(self, namespace: str, key: str) -> bool:
+        from sqlalchemy import text
+
+        return self._run(lambda conn: conn.execute(
+            text("delete from api_state where namespace = :ns and key = :key"),
+            {"ns": namespace, "key": key},
+        ).rowcount) > 0
+
+    def purge_expired(self) -> int:
+        from sqlalchemy import text
+
+        return self._run(lambda conn: conn.execute(
+            text("delete from api_state where expires_at is not null and expires_at <= :now"),
+            {"now": time.time()},
+        ).rowcount)
+
+    def close(self) -> None:
+        self.engine.dispose()
+
+
+_backend: Optional[StateBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_state_backend() -> StateBackend:
+    """Build the backend selected by STATE_BACKEND / STATE_BACKEND_URL."""
+    kind = os.getenv("STATE_BACKEND", "memory").strip().lower()
+    if kind == "memory":
+        return MemoryStateBackend()
+    if kind == "sql":
+        url = os.getenv("STATE_BACKEND_URL")
+        if not url:
+            from db.url import get_db_url
+            url = get_db_url()
+        return SQLStateBackend(url)
+    raise ValueError(f"Unknown STATE_BACKEND '{kind}' (expected 'memory' or 'sql')")
+
+
+def get_state_backend() -> StateBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_state_backend()
+                logger.info("State backend: %s", type(_backend).__name__)
+    return _backend
+
+
+def set_state_backend(backend: Optional[StateBackend]) -> None:
+    """Install a backend (None: rebuild from the environment on next use)."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    if previous is not None and previous is not backend:
+        previous.close()
+
+
+def shared_backend() -> Optional[StateBackend]:
+    """The backend if it is shared across processes, else None."""
+    backend = get_state_backend()
+    return backend if backend.shared else None
+
+
+__all__ = [
+    "RUNS",
+    "RUN_CANCELS",
+    "SESSIONS",
+    "PIPELINE_LOGGERS",
+    "DATASETS",
+    "StateBackendError",
+    "StateBackend",
+    "MemoryStateBackend",
+    "SQLStateBackend",
+    "create_state_backend",
+    "get_state_backend",
+    "set_state_backend",
+    "shared_backend",
+]
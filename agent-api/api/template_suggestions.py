@@ -19,7 +19,7 @@ import logging
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass, field, asdict
 
-from api.routes.templates import get_templates, get_preview_urls
+from api.routes.templates import get_preview_urls, template_catalog
 
 
 logger = logging.getLogger(__name__)
@@ -103,11 +103,8 @@ def get_template_by_id(template_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Template definition dict or None if not found
     """
-    templates = get_templates()
-    for template in templates:
-        if template.template_id == template_id:
-            return template.model_dump()
-    return None
+    template = template_catalog.snapshot().by_id.get(template_id)
+    return template.model_dump() if template is not None else None
 
 
 def build_template_suggestions_from_inference(
@@ -131,8 +128,7 @@ def build_template_suggestions_from_inference(
         TemplateSuggestionsPayload ready for SSE emission
     """
     suggestions: List[TemplateSuggestion] = []
-    templates = get_templates()
-    template_map = {t.template_id: t for t in templates}
+    template_map = template_catalog.snapshot().by_id
 
     # Map chart types to template IDs
     # Some chart types map directly, others need translation
@@ -251,8 +247,7 @@ def build_template_suggestions_from_templates(
         TemplateSuggestionsPayload ready for SSE emission
     """
     suggestions: List[TemplateSuggestion] = []
-    templates = get_templates()
-    template_map = {t.template_id: t for t in templates}
+    template_map = template_catalog.snapshot().by_id
 
     for template_id in template_ids:
         template = template_map.get(template_id)
@@ -346,8 +341,7 @@ def validate_template_selection(template_id: str) -> tuple[bool, Optional[str]]:
     Returns:
         Tuple of (is_valid, error_message)
     """
-    templates = get_templates()
-    valid_ids = {t.template_id for t in templates}
+    valid_ids = template_catalog.snapshot().by_id.keys()
 
     if not template_id:
         return False, "No template ID provided"
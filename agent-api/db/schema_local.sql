@@ -121,6 +121,14 @@ create index if not exists idx_datasets_user_id on public.datasets(user_id);
 create index if not exists idx_datasets_created_at on public.datasets(created_at);
 create index if not exists idx_datasets_filename on public.datasets(filename);
 
+-- Upload-time profile (schema, column stats, wide/long detection, ranked chart
+-- recommendations). Written by a background job after upload.
+alter table public.datasets add column if not exists profile jsonb;
+alter table public.datasets add column if not exists profile_status text;  -- pending | ready | failed
+alter table public.datasets add column if not exists profiled_at timestamptz;
+
+comment on column public.datasets.profile is 'Precomputed dataset profile (JSON) read by the run pipeline and template endpoints.';
+
 -- ============================================================================
 -- 5) Artifacts
 --    Output products (preview frames, final videos, logs, compressed bundles).
@@ -236,4 +244,26 @@ comment on column public.chat_messages.extra_json is 'Optional structured metada
 create index if not exists idx_chat_messages_session_created on public.chat_messages(session_id, created_at);
 create index if not exists idx_chat_messages_user_id on public.chat_messages(user_id);
 
+-- ============================================================================
+-- API State
+-- Shared registry state (runs, cancel signals, session contexts, datasets)
+-- used when STATE_BACKEND=sql so every API worker sees the same runs.
+-- value is JSON text; version backs optimistic read-modify-write updates.
+-- The API also creates this table on first use.
+-- ============================================================================
+create table if not exists public.api_state (
+  namespace text not null,
+  key text not null,
+  value text not null,
+  version integer not null default 0,
+  expires_at double precision,
+  updated_at double precision not null,
+  primary key (namespace, key)
+);
+
+comment on table public.api_state is 'Namespaced key/value state shared by API workers (see api/state_backend.py).';
+comment on column public.api_state.expires_at is 'Epoch seconds after which the entry is ignored and purged (null = no expiry).';
+
+create index if not exists idx_api_state_expires on public.api_state(expires_at);
+
 -- End of schema_local.sql
@@ -34,6 +34,7 @@ from typing import Any, Dict, List, Optional
 # Add parent paths for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+from agents.tools.scene_runtime import runtime_env
 from scripts.previews.sample_data import create_all_sample_data
 
 logging.basicConfig(
@@ -284,6 +285,7 @@ def render_to_video(code: str, output_dir: Path, template_id: str) -> Optional[P
             capture_output=True,
             text=True,
             cwd=str(work_dir),
+            env=runtime_env(),
             timeout=120,  # 2 minute timeout
         )
 
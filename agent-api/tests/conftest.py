@@ -0,0 +1,92 @@
+"""
+Shared fixtures for built-in template scene tests.
+
+- template_code: a template's generated scene for a tiny dataset
+- render_template: that scene constructed in-process under manim's dry run
+  (nothing rasterized per frame, no files written); skips without manim
+"""
+
+import importlib
+import re
+
+import pytest
+
+
+# Tiny datasets, one per built-in template
+TEMPLATE_DATASETS = {
+    "bar_race": ["year,country,value"] + [
+        f"{y},{c},{(i + 1) * (y - 1999)}" for y in (2000, 2001, 2002) for i, c in enumerate("ABC")
+    ],
+    "bento_grid": ["label,value,change", "Revenue,1200,5.0", "Users,340,-2.0", "Churn,3,0.5"],
+    "bubble_chart": ["year,country,gdp,life,pop,region"] + [
+        f"{y},{c},{1000 * (i + 1) + y},{60 + i},{(i + 1) * 1000000},R{i % 2}"
+        for y in (2000, 2001) for i, c in enumerate("ABC")
+    ],
+    "count_bar": ["brand"] + list("AABBBC"),
+    "distribution": ["time,value"] + [f"{2000 + i % 2},{v}" for i, v in enumerate((1, 2, 2, 3, 3, 3, 4, 5, 8))],
+    "line_evolution": ["year,value"] + [f"{2000 + i},{v}" for i, v in enumerate((3, 5, 4, 9, 7))],
+    "single_numeric": ["name,value", "A,3", "B,5", "C,1"],
+}
+
+_RUN_CONFIG = {
+    "dry_run": True,
+    "disable_caching": True,
+    "verbosity": "ERROR",
+    "progress_bar": "none",
+}
+
+
+class _TemplateSpec:
+    title = "Smoke"
+    subtitle = None
+    timing = None
+    data_binding = None
+
+
+@pytest.fixture
+def scene_data_store(tmp_path, monkeypatch):
+    path = tmp_path / "scene_data"
+    monkeypatch.setattr("agents.tools.templates.scene_data.SCENE_DATA_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def template_code(tmp_path, scene_data_store):
+    """template_code(name) -> generated scene code for TEMPLATE_DATASETS[name]."""
+
+    def generate(template: str) -> str:
+        module = importlib.import_module(f"agents.tools.templates.{template}")
+        csv_path = tmp_path / f"{template}.csv"
+        csv_path.write_text("\n".join(TEMPLATE_DATASETS[template]) + "\n")
+        return getattr(module, f"generate_{template}")(_TemplateSpec(), str(csv_path))
+
+    return generate
+
+
+@pytest.fixture
+def render_template(template_code, tmp_path):
+    """
+    render_template(name) -> the rendered manim Scene; its ``template``
+    attribute is the runtime TemplateScene that ran.
+    """
+    pytest.importorskip("manim")
+    from manim import Scene, tempconfig
+
+    def render(template: str):
+        code = template_code(template)
+        namespace = {}
+        exec(compile(code, "scene.py", "exec"), namespace)
+        runtime = namespace["template"]
+        class_name = re.search(r"template\.(\w+)\(self\)\.construct\(\)", code).group(1)
+
+        class Host(Scene):
+            def construct(self):
+                self.template = getattr(runtime, class_name)(self)
+                self.template.construct()
+
+        with tempconfig({**_RUN_CONFIG, "media_dir": str(tmp_path)}):
+            scene = Host(skip_animations=True)
+            scene.render()
+        return scene
+
+    return render
@@ -0,0 +1,85 @@
+"""
+Unit tests for the bulk bubble chart layout.
+
+Tests cover:
+- bubble_tables places DATA[time][entity] in T x E tables with NaN gaps
+- fill_missing carries values forward and uses the initial value before the first
+- compute_radii matches the sqrt (area-proportional) scaling
+- visible_labels culls small bubbles and caps the label count
+- circle_outlines scales/moves a unit circle for many bubbles at once
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from agents.tools.scene_runtime.bubble_layout import (
+    bubble_tables,
+    circle_outlines,
+    compute_radii,
+    fill_missing,
+    interpolate_tables,
+    visible_labels,
+)
+
+
+class TestTables:
+    def test_bubble_tables(self):
+        data = {
+            "2000": {"A": {"x": 1.0, "y": 2.0, "r": 3.0}},
+            "2001": {
+                "A": {"x": 2.0, "y": 3.0, "r": 4.0},
+                "B": {"x": 5.0, "y": 6.0, "r": 7.0},
+                "Z": {"x": 0, "y": 0, "r": 0},
+            },
+        }
+        tables = bubble_tables(["2000", "2001", "2002"], ["A", "B"], data)
+        assert tables["X"].shape == (3, 2)
+        assert tables["R"][1].tolist() == [4.0, 7.0]
+        assert np.isnan(tables["X"][0, 1]) and np.isnan(tables["Y"][2]).all()
+
+    def test_fill_missing(self):
+        nan = float("nan")
+        table = np.array([[nan, 1.0], [2.0, nan], [nan, nan], [3.0, 4.0]])
+        assert fill_missing(table, 0.5).tolist() == [[0.5, 1.0], [2.0, 1.0], [2.0, 1.0], [3.0, 4.0]]
+
+    def test_interpolate(self):
+        tables = {"X": np.array([[0.0, 10.0], [1.0, 20.0]])}
+        frame = interpolate_tables(tables, 0.5)
+        assert frame["X"].tolist() == [0.5, 15.0]
+        assert interpolate_tables(tables, 5.0)["X"].tolist() == [1.0, 20.0]
+
+
+class TestRadii:
+    def test_sqrt_scaling(self):
+        radii = compute_radii(np.array([1.0, 25.0, 100.0, -4.0]), 1.0, 100.0, 0.1, 1.0)
+        expected_mid = 0.1 + (5 - 1) / (10 - 1) * 0.9
+        assert radii.tolist() == pytest.approx([0.1, expected_mid, 1.0, 0.1])
+
+    def test_single_value_range(self):
+        radii = compute_radii(np.array([3.0, 5.0, 8.0]), 5.0, 5.0, 0.1, 0.5)
+        assert radii.tolist() == pytest.approx([0.1, 0.1, 0.5])
+
+
+class TestLabels:
+    def test_min_radius(self):
+        assert visible_labels(np.array([0.1, 0.2, 0.5])).tolist() == [False, True, True]
+
+    def test_limit_keeps_largest(self):
+        radii = np.linspace(0.2, 0.6, 50)
+        mask = visible_labels(radii, limit=5)
+        assert mask.sum() == 5
+        assert mask[-5:].all()
+        assert not visible_labels(radii, limit=0).any()
+
+
+class TestOutlines:
+    def test_circle_outlines(self):
+        angles = np.linspace(0, 2 * math.pi, 9)
+        template = np.column_stack([np.cos(angles), np.sin(angles), np.zeros(9)])
+        outlines = circle_outlines(template, np.array([[1.0, 2.0], [-3.0, 0.0]]), np.array([0.5, 2.0]))
+        assert outlines.shape == (2, 9, 3)
+        assert np.allclose(np.linalg.norm(outlines[0, :, :2] - [1.0, 2.0], axis=1), 0.5)
+        assert np.allclose(np.linalg.norm(outlines[1, :, :2] - [-3.0, 0.0], axis=1), 2.0)
+        assert np.allclose(template[:, 0], np.cos(angles))
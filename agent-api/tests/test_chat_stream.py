@@ -0,0 +1,154 @@
+"""
+Unit tests for non-blocking chat streaming.
+
+Tests cover:
+- Blocking agent.run() iterators are streamed as RunContent lines followed by RunCompleted
+- The async agent API (arun) is preferred when available
+- Errors surface as RunError without breaking the stream
+- Many simultaneous streams over blocking agents keep their time-to-first-token and a responsive loop
+- A consumer that stops early stops and closes the producer
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+from api.chat_stream import chat_event_stream, iterate_in_thread
+
+
+class Chunk:
+    def __init__(self, content, session_id=None):
+        self.content = content
+        self.session_id = session_id
+        self.created_at = int(time.time())
+
+
+class BlockingAgent:
+    """agent.run(stream=True) returning a generator that blocks before every token."""
+
+    def __init__(self, tokens, delay=0.0):
+        self.tokens = tokens
+        self.delay = delay
+        self.closed = threading.Event()
+        self.produced = 0
+
+    def run(self, message, stream=False):
+        def generate():
+            try:
+                for token in self.tokens:
+                    time.sleep(self.delay)
+                    self.produced += 1
+                    yield Chunk(token, session_id="s1")
+            finally:
+                self.closed.set()
+
+        return generate()
+
+
+class AsyncAgent:
+    def __init__(self, tokens):
+        self.tokens = tokens
+
+    def run(self, message, stream=False):
+        raise AssertionError("sync run() must not be used when arun() exists")
+
+    async def arun(self, message, stream=False):
+        async def generate():
+            for token in self.tokens:
+                await asyncio.sleep(0)
+                yield Chunk(token)
+
+        return generate()
+
+
+def _collect(agent, message="hi"):
+    async def run():
+        return [line async for line in chat_event_stream(agent, message)]
+
+    return [json.loads(line[len("data: "):]) for line in asyncio.run(run())]
+
+
+class TestChatEventStream:
+    def test_blocking_agent(self):
+        events = _collect(BlockingAgent(["Hel", "lo", {"k": 1}]))
+        assert [e["event"] for e in events] == ["RunContent"] * 3 + ["RunCompleted"]
+        assert [e["content"] for e in events[:3]] == ["Hel", "lo", '{"k": 1}']
+        assert events[0]["session_id"] == "s1"
+
+    def test_async_agent_preferred(self):
+        events = _collect(AsyncAgent(["a", "b"]))
+        assert [e["content"] for e in events] == ["a", "b", ""]
+
+    def test_single_response(self):
+        class OneShot:
+            def run(self, message, stream=False):
+                return Chunk("whole answer")
+
+        events = _collect(OneShot())
+        assert [e["content"] for e in events] == ["whole answer", ""]
+
+    def test_error(self):
+        class Failing:
+            def run(self, message, stream=False):
+                def generate():
+                    yield Chunk("partial")
+                    raise RuntimeError("model overloaded")
+
+                return generate()
+
+        events = _collect(Failing())
+        assert [e["event"] for e in events] == ["RunContent", "RunError", "RunCompleted"]
+        assert events[1]["content"] == "model overloaded"
+
+
+class TestConcurrency:
+    def test_streams_do_not_block_each_other(self):
+        streams, delay = 20, 0.2
+
+        async def first_token(agent):
+            start = time.perf_counter()
+            ttft = None
+            async for line in chat_event_stream(agent, "hi"):
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+            return ttft
+
+        async def ticker(stop):
+            # Largest gap between event loop ticks while the streams run
+            worst, last = 0.0, time.perf_counter()
+            while not stop.is_set():
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                worst, last = max(worst, now - last), now
+            return worst
+
+        async def run():
+            stop = asyncio.Event()
+            tick = asyncio.create_task(ticker(stop))
+            agents = [BlockingAgent(["x", "y"], delay=delay) for _ in range(streams)]
+            ttfts = await asyncio.gather(*(first_token(a) for a in agents))
+            stop.set()
+            return ttfts, await tick
+
+        start = time.perf_counter()
+        ttfts, worst_gap = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+
+        # Serialized streams would need streams * 2 * delay = 8s
+        assert max(ttfts) < delay * 3
+        assert elapsed < streams * delay
+        assert worst_gap < delay
+
+    def test_early_exit_closes_producer(self):
+        agent = BlockingAgent([str(i) for i in range(1000)])
+
+        async def run():
+            stream = iterate_in_thread(lambda: agent.run("hi", stream=True), queue_size=2)
+            async for _ in stream:
+                break
+            await stream.aclose()
+
+        asyncio.run(run())
+        assert agent.closed.wait(timeout=2)
+        assert agent.produced < 10
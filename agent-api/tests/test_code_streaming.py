@@ -0,0 +1,177 @@
+"""
+Unit tests for streamed code generation.
+
+Tests cover:
+- StreamingCodeValidator accepts valid code fed in arbitrary pieces, including unfinished statements
+- Syntax errors in completed lines are reported before the completion ends
+- Prose preambles before a code fence are tolerated; prose-only replies and missing GenScene are rejected
+- stream_manim_code() reports progress, aborts rejected completions mid-stream and retries
+- The last attempt is never aborted; gateway errors become CodeGenerationError
+"""
+
+import pytest
+
+from agents.tools import code_generation
+from agents.tools.code_generation import (
+    CodeGenerationError,
+    StreamingCodeValidator,
+    stream_manim_code,
+)
+from agents.tools.llm_gateway import CompletionStream, LLMGatewayError, LLMResponse
+
+
+GOOD = '''from manim import *
+
+class GenScene(Scene):
+    def construct(self):
+        c = Circle(
+            color=BLUE,
+        )
+        self.play(Create(c))
+        label = """multi
+line"""
+        self.wait(1)
+'''
+
+BROKEN = '''from manim import *
+
+class GenScene(Scene):
+    def construct(self):
+        c = Circle(color=BLUE))
+        self.play(Create(c))
+        self.wait(1)
+        self.wait(2)
+'''
+
+
+def feed_all(validator, text, size=3):
+    """Feed ``text`` in ``size``-character pieces; (rejection, characters fed)."""
+    for i in range(0, len(text), size):
+        rejection = validator.feed(text[i:i + size])
+        if rejection:
+            return rejection, i + size
+    return None, len(text)
+
+
+class TestStreamingCodeValidator:
+    @pytest.mark.parametrize("size", [1, 7, 50])
+    def test_valid(self, size):
+        validator = StreamingCodeValidator()
+        assert feed_all(validator, GOOD, size) == (None, len(GOOD))
+        assert validator.has_genscene
+        assert validator.lines == GOOD.count("\n")
+
+    def test_syntax_error_detected_early(self):
+        validator = StreamingCodeValidator()
+        rejection, fed = feed_all(validator, BROKEN)
+        assert rejection.startswith("syntax error")
+        assert "line 5" in rejection
+        assert fed < len(BROKEN) - 40
+
+    def test_fenced_with_preamble(self):
+        text = "Here is the scene you asked for:\n\n```python\n" + GOOD + "```\nEnjoy!\n"
+        validator = StreamingCodeValidator()
+        assert feed_all(validator, text) == (None, len(text))
+        assert validator.has_genscene
+
+    def test_fenced_syntax_error(self):
+        text = "Sure:\n```python\n" + BROKEN + "```\n"
+        rejection, _ = feed_all(StreamingCodeValidator(), text)
+        assert rejection.startswith("syntax error")
+
+    def test_prose_only(self):
+        text = "I cannot write that animation, but here is an explanation. " * 40
+        rejection, _ = feed_all(StreamingCodeValidator(prose_budget=500), text + "\n" * 3)
+        assert rejection == "response is not Python code"
+
+    def test_missing_genscene(self):
+        text = "from manim import *\n\n" + "x = 1\n" * 100
+        rejection, _ = feed_all(StreamingCodeValidator(header_budget=200), text)
+        assert rejection == "no 'class GenScene' definition"
+
+
+class FakeGateway:
+    """Serves scripted completions as streams, recording how much of each was consumed."""
+
+    def __init__(self, completions, fail=None):
+        self.completions = list(completions)
+        self.fail = fail
+        self.systems = []
+        self.consumed = []
+
+    def stream(self, prompt, *, model, system, max_tokens, temperature, accept=None):
+        self.systems.append(system)
+        text = self.completions.pop(0)
+        index = len(self.consumed)
+        self.consumed.append(0)
+
+        def deltas():
+            if self.fail:
+                raise self.fail
+            for i in range(0, len(text), 4):
+                self.consumed[index] = i + 4
+                yield text[i:i + 4]
+            return LLMResponse(text=text, model=model)
+
+        return CompletionStream(deltas())
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+
+    def install(*completions, fail=None):
+        fake = FakeGateway(completions, fail=fail)
+        monkeypatch.setattr(code_generation, "get_gateway", lambda api_key=None: fake)
+        return fake
+
+    return install
+
+
+class TestStreamManimCode:
+    def test_success(self, gateway):
+        fake = gateway(GOOD)
+        events = list(stream_manim_code("a blue circle", progress_every_seconds=0))
+        kinds = [e.kind for e in events]
+        assert kinds[0] == "started"
+        assert "scene_detected" in kinds
+        assert "progress" in kinds
+        assert kinds[-1] == "done"
+        assert events[-1].code == GOOD.strip()
+        assert events[-1].to_dict()["lines"] == GOOD.count("\n")
+        assert "code" not in events[-1].to_dict()
+        assert len(fake.systems) == 1
+
+    def test_abort_and_retry(self, gateway):
+        fake = gateway(BROKEN, GOOD)
+        events = list(stream_manim_code("a blue circle"))
+        retry = [e for e in events if e.kind == "retry"]
+        assert len(retry) == 1 and "syntax error" in retry[0].message
+        assert events[-1].kind == "done" and events[-1].code == GOOD.strip()
+        # The broken completion was cut off mid-stream
+        assert fake.consumed[0] < len(BROKEN)
+        # The retry tells the model what went wrong
+        assert "previous attempt was rejected" in fake.systems[1]
+
+    def test_last_attempt_not_aborted(self, gateway):
+        fake = gateway(BROKEN)
+        events = list(stream_manim_code("a blue circle", max_attempts=1))
+        assert events[-1].kind == "done"
+        assert events[-1].code == BROKEN.strip()
+        assert fake.consumed[0] >= len(BROKEN)
+
+    def test_missing_genscene(self, gateway):
+        gateway("from manim import *\n", "print('hello')\n")
+        with pytest.raises(CodeGenerationError, match="GenScene"):
+            list(stream_manim_code("a blue circle"))
+
+    def test_gateway_error(self, gateway):
+        gateway(GOOD, fail=LLMGatewayError("overloaded", kind="rate_limit", status_code=429))
+        with pytest.raises(CodeGenerationError, match="rate limit exceeded"):
+            list(stream_manim_code("a blue circle"))
+
+    def test_missing_api_key(self, gateway, monkeypatch):
+        gateway(GOOD)
+        monkeypatch.delenv("ANTHROPIC_API_KEY")
+        with pytest.raises(CodeGenerationError, match="ANTHROPIC_API_KEY"):
+            list(stream_manim_code("a blue circle"))
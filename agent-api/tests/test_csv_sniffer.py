@@ -0,0 +1,112 @@
+"""
+Unit tests for the shared CSV sniffer.
+
+Tests cover:
+- Header row detection for World Bank style files (strict profile)
+- Lenient profile used by template CSV helpers
+- Encoding / BOM / delimiter detection
+- Memoization keyed on file version (mtime, size)
+"""
+
+import os
+import time
+
+import pytest
+
+from agents.tools.csv_sniffer import (
+    PROFILE_LENIENT,
+    clear_cache,
+    detect_header_row,
+    get_cache_stats,
+    sniff_csv,
+)
+
+
+WORLD_BANK_CSV = (
+    '"Data Source","World Development Indicators",\n'
+    '"Last Updated Date","2025-01-28",\n'
+    "\n"
+    '"Country Name","Country Code","Indicator Name","Indicator Code","1960","1961","1962"\n'
+    '"Aruba","ABW","Population, total","SP.POP.TOTL","54608","55811","56682"\n'
+    '"Afghanistan","AFG","Population, total","SP.POP.TOTL","8622466","8790140","8969047"\n'
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def _write(tmp_path, name, content, encoding="utf-8"):
+    path = tmp_path / name
+    path.write_bytes(content.encode(encoding) if isinstance(content, str) else content)
+    return str(path)
+
+
+class TestHeaderDetection:
+    def test_world_bank_metadata_rows(self, tmp_path):
+        path = _write(tmp_path, "wb.csv", WORLD_BANK_CSV)
+        assert detect_header_row(path) == 3
+
+    def test_plain_csv_header_is_first_row(self, tmp_path):
+        path = _write(tmp_path, "plain.csv", "country,year,value\nA,2000,1\nB,2000,2\n")
+        assert detect_header_row(path) == 0
+        assert detect_header_row(path, profile=PROFILE_LENIENT) == 0
+
+    def test_lenient_profile_accepts_narrow_tables(self, tmp_path):
+        content = "Search interest report,,\n,,\ncategory,label,amount\nA,x,1\nB,y,2\n"
+        path = _write(tmp_path, "narrow.csv", content)
+        assert detect_header_row(path, profile=PROFILE_LENIENT) == 2
+
+    def test_cr_only_line_endings(self, tmp_path):
+        path = _write(tmp_path, "cr.csv", WORLD_BANK_CSV.replace("\n", "\r"))
+        assert detect_header_row(path) == 3
+
+    def test_missing_file_returns_zero(self, tmp_path):
+        assert detect_header_row(str(tmp_path / "missing.csv")) == 0
+
+
+class TestSniffing:
+    def test_bom_detected(self, tmp_path):
+        path = _write(tmp_path, "bom.csv", b"\xef\xbb\xbfcountry,year,value\nA,2000,1\n")
+        info = sniff_csv(path)
+        assert info.has_bom
+        assert info.encoding == "utf-8-sig"
+        assert info.rows[0][0] == "country"
+
+    def test_latin1_detected(self, tmp_path):
+        path = _write(tmp_path, "latin.csv", "pays,année,valeur\nCôte,2000,1\n", encoding="latin-1")
+        assert sniff_csv(path).encoding == "latin-1"
+
+    def test_semicolon_delimiter(self, tmp_path):
+        path = _write(tmp_path, "semi.csv", "country;year;value\nA;2000;1,5\nB;2001;2,5\n")
+        info = sniff_csv(path)
+        assert info.delimiter == ";"
+        assert info.rows[0] == ("country", "year", "value")
+
+    def test_prefix_is_bounded(self, tmp_path):
+        body = "country,year,value\n" + "A,2000,1\n" * 200_000
+        path = _write(tmp_path, "big.csv", body)
+        info = sniff_csv(path)
+        assert info.truncated
+        assert info.prefix_bytes < os.path.getsize(path)
+
+
+class TestMemoization:
+    def test_repeated_calls_hit_cache(self, tmp_path):
+        path = _write(tmp_path, "wb.csv", WORLD_BANK_CSV)
+        first = sniff_csv(path)
+        second = sniff_csv(path)
+        assert first is second
+        stats = get_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_modified_file_is_resniffed(self, tmp_path):
+        path = _write(tmp_path, "data.csv", WORLD_BANK_CSV)
+        assert detect_header_row(path) == 3
+        time.sleep(0.01)
+        _write(tmp_path, "data.csv", "country,year,value\nA,2000,1\n")
+        assert detect_header_row(path) == 0
@@ -0,0 +1,85 @@
+"""
+Unit tests for Danim bundle unification.
+
+Tests cover:
+- Vectorized and standard library paths produce identical unified CSVs
+- Duplicate entities (last row wins), blank and non-numeric cells
+- Long-form passthrough merge
+"""
+
+import os
+
+import pytest
+
+from agents.tools import data_ingestion
+from agents.tools.data_ingestion import unify_danim_files
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def wide_bundle(tmp_path):
+    _write(tmp_path / "X.csv", "Country,2000,2001,2002\nA,1,2,3\nB,4,,6\nA,7,8,9\nC,x,1,2\n")
+    _write(tmp_path / "Y.csv", "Country,2001,2000,2002\nA,10,20,30\nB,40,50,60\nC,1,1,1\n")
+    _write(tmp_path / "R.csv", "Country,2000,2001,2002,2003\nA,1.5,2.5,3.5,4\nB,1,1,1,1\nC,2,2,2,2\n")
+    _write(tmp_path / "Group_lable.csv", "Country,Continent\nA,Asia\nB,\n")
+    return tmp_path
+
+
+def _run(base_dir, name, vectorized):
+    out = os.path.join(str(base_dir), "out", name)
+    if vectorized:
+        return unify_danim_files(str(base_dir), output_path=out)
+    return data_ingestion._unify_python(
+        os.path.join(str(base_dir), "X.csv"),
+        os.path.join(str(base_dir), "Y.csv"),
+        os.path.join(str(base_dir), "R.csv"),
+        os.path.join(str(base_dir), "Group_lable.csv"),
+        out,
+        ("Entity", "Country"),
+    )
+
+
+class TestWideForm:
+    """Tests for the wide-form (X/Y/R) path."""
+
+    def test_paths_produce_identical_output(self, wide_bundle):
+        pytest.importorskip("pandas")
+        fast = _run(wide_bundle, "fast.csv", vectorized=True)
+        slow = _run(wide_bundle, "slow.csv", vectorized=False)
+
+        with open(fast.unified_path) as f1, open(slow.unified_path) as f2:
+            assert f1.read() == f2.read()
+        assert fast.rows_count == slow.rows_count
+        assert fast.warnings == slow.warnings
+
+    def test_last_duplicate_wins_and_gaps_skipped(self, wide_bundle):
+        result = unify_danim_files(str(wide_bundle), output_path=str(wide_bundle / "u.csv"))
+        with open(result.unified_path) as f:
+            lines = f.read().splitlines()
+
+        assert lines[0] == "entity,time,x,y,r,group"
+        assert "A,2000,7.0,20.0,1.5,Asia" in lines
+        assert not any(line.startswith("B,2001") for line in lines)
+        assert not any(line.startswith("C,2000") for line in lines)
+        assert result.times_count == 3
+        assert result.metadata["mode"] == "wide-form"
+
+
+class TestPassthrough:
+    """Tests for already-unified long-form inputs."""
+
+    def test_long_form_merge(self, tmp_path):
+        _write(tmp_path / "X.csv", "entity,time,x\na,1,1\nb,1,2\na,2,3\n")
+        _write(tmp_path / "Y.csv", "entity,time,y\na,1,5\nb,1,\na,2,6\n")
+        _write(tmp_path / "R.csv", "entity,time,r\na,1,9\nb,1,9\na,2,9\n")
+
+        result = unify_danim_files(str(tmp_path), output_path=str(tmp_path / "u.csv"))
+        with open(result.unified_path) as f:
+            lines = f.read().splitlines()
+
+        assert lines[1:] == ["a,1,1.0,5.0,9.0,ALL", "a,2,3.0,6.0,9.0,ALL"]
+        assert result.metadata["mode"] == "passthrough-long-form"
@@ -0,0 +1,98 @@
+"""
+Unit tests for chunked (out-of-core) preprocessing.
+
+Tests cover:
+- Chunked wide-file melt matches preprocess_dataset output
+- Rolling anomaly windows carried across chunk boundaries
+- QuantileSketch exactness and bounded memory
+"""
+
+import math
+
+import pandas as pd
+import pytest
+
+from api.services.data_modules import (
+    AnomalyFlagger,
+    QuantileSketch,
+    preprocess_csv_chunked,
+    preprocess_dataset,
+)
+
+
+def _sorted_csv(path, keys):
+    return pd.read_csv(path).sort_values(keys).reset_index(drop=True)
+
+
+@pytest.fixture
+def wide_csv(tmp_path):
+    years = [str(y) for y in range(2000, 2012)]
+    rows = []
+    for i in range(40):
+        rows.append([f"Country {i}"] + [float((i + 1) * (j + 1) ** 2) if (i + j) % 7 else "" for j in range(len(years))])
+    path = tmp_path / "wide.csv"
+    pd.DataFrame(rows, columns=["Country"] + years).to_csv(path, index=False)
+    return path
+
+
+class TestChunkedPreprocess:
+    """Tests for preprocess_csv_chunked."""
+
+    @pytest.mark.parametrize("chunk_rows", [7, 1000])
+    def test_matches_in_memory_pipeline(self, wide_csv, tmp_path, chunk_rows):
+        expected_path = tmp_path / "expected.csv"
+        preprocess_dataset(pd.read_csv(wide_csv))["data"].to_csv(expected_path, index=False)
+
+        out = tmp_path / "out.csv"
+        result = preprocess_csv_chunked(str(wide_csv), str(out), chunk_rows=chunk_rows)
+
+        keys = ["Country", "time"]
+        pd.testing.assert_frame_equal(_sorted_csv(out, keys), _sorted_csv(expected_path, keys))
+        assert result.rows_written == 40 * 12
+        assert result.group_count == 40
+        assert result.time_points == 12
+        assert result.chunks == math.ceil(40 / chunk_rows)
+
+    def test_melt_only_columns(self, wide_csv, tmp_path):
+        out = tmp_path / "melted.csv"
+        result = preprocess_csv_chunked(str(wide_csv), str(out), chunk_rows=5, include_derived=False)
+
+        assert list(pd.read_csv(out).columns) == ["Country", "time", "value"]
+        assert result.columns["normalized"] is None
+        assert result.anomalies is None
+        assert result.value_stats["min"] == 2.0
+
+    def test_anomaly_windows_span_chunks(self, tmp_path):
+        rows = []
+        for t in range(60):
+            for g in ("a", "b", "c"):
+                value = 100.0 + (t % 3) + (400.0 if t in (20, 41) else 0.0)
+                rows.append((g, f"T{t:02d}", value))
+        path = tmp_path / "long.csv"
+        pd.DataFrame(rows, columns=["name", "time", "amount"]).to_csv(path, index=False)
+        flagger = dict(window=10, deviation_factor=1.5)
+
+        expected = preprocess_dataset(pd.read_csv(path), anomaly_flagger=AnomalyFlagger(**flagger))
+        result = preprocess_csv_chunked(str(path), str(tmp_path / "out.csv"), chunk_rows=4,
+                                        anomaly_flagger=AnomalyFlagger(**flagger))
+
+        assert result.anomalies.flagged_points == expected["anomalies"].report.flagged_points > 0
+
+
+class TestQuantileSketch:
+    """Tests for the bounded-memory quantile sketch."""
+
+    def test_exact_below_capacity(self):
+        sketch = QuantileSketch(capacity=100)
+        values = [float(v) for v in range(50)]
+        sketch.update(values)
+        assert sketch.exact
+        assert sketch.quantile(0.25) == pd.Series(values).quantile(0.25)
+
+    def test_bounded_and_approximate(self):
+        sketch = QuantileSketch(capacity=256)
+        for start in range(0, 100_000, 1000):
+            sketch.update(float(v) for v in range(start, start + 1000))
+        assert not sketch.exact
+        assert sum(len(level) for level in sketch._levels) < 256 * 20
+        assert abs(sketch.quantile(0.5) - 50_000) < 2_000
@@ -0,0 +1,86 @@
+"""
+Unit tests for the render-aware data reduction stage.
+
+Tests cover:
+- Time resampling keeps first/last keys and respects the step budget
+- Bar race per-step top-K entity selection
+- Line "Other" bucket and LTTB downsampling
+- Passthrough when the dataset already fits the budget
+"""
+
+import csv
+import math
+
+from agents.tools.data_reduction import (
+    OTHER_LABEL,
+    RenderBudget,
+    lttb_indices,
+    reduce_for_render,
+    resample_time_keys,
+)
+from agents.tools.templates.csv_utils import read_csv_rows
+
+
+def _write_long(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+class TestHelpers:
+    """Tests for resampling and LTTB helpers."""
+
+    def test_resample_keeps_endpoints(self):
+        times = [str(t) for t in range(1000)]
+        kept = resample_time_keys(times, 50)
+        assert len(kept) == 50
+        assert kept[0] == "0" and kept[-1] == "999"
+
+    def test_resample_noop_within_budget(self):
+        assert resample_time_keys(["a", "b"], 10) == ["a", "b"]
+
+    def test_lttb_preserves_extremes(self):
+        xs = [float(i) for i in range(1000)]
+        ys = [math.sin(i / 30.0) for i in range(1000)]
+        ys[500] = 25.0
+        kept = lttb_indices(xs, ys, 100)
+        assert len(kept) == 100
+        assert kept[0] == 0 and kept[-1] == 999
+        assert 500 in kept
+
+
+class TestReduceForRender:
+    """Tests for reduce_for_render()."""
+
+    def test_bar_race_budget(self, tmp_path):
+        rows = [(f"E{e}", t, (e * 7 + t) % 50) for t in range(400) for e in range(30)]
+        path = _write_long(tmp_path / "race.csv", ["entity", "time", "value"], rows)
+
+        report = reduce_for_render(path, "bar_race", budget=RenderBudget(max_time_steps=40, bar_top_k=5))
+
+        assert report.applied
+        assert report.time_points_before == 400
+        assert report.time_points_after == 40
+        _headers, out_rows = read_csv_rows(report.output_path)
+        times = {r["time"] for r in out_rows}
+        assert {"0", "399"} <= times and len(times) == 40
+
+    def test_line_other_bucket_and_lttb(self, tmp_path):
+        rows = [(f"G{g}", t, (g + 1) * math.cos(t / 40.0)) for g in range(6) for t in range(2000)]
+        path = _write_long(tmp_path / "line.csv", ["group", "time", "value"], rows)
+
+        budget = RenderBudget(max_line_series=3, max_line_points=200)
+        report = reduce_for_render(path, "line_evolution", budget=budget)
+
+        _headers, out_rows = read_csv_rows(report.output_path)
+        groups = {r["group"] for r in out_rows}
+        assert groups == {"G5", "G4", OTHER_LABEL}
+        assert len(out_rows) == 3 * 200
+
+    def test_passthrough_when_within_budget(self, tmp_path):
+        path = _write_long(tmp_path / "small.csv", ["entity", "time", "value"], [("A", 1, 2), ("B", 1, 3)])
+        report = reduce_for_render(path, "bar_race")
+        assert not report.applied
+        assert report.output_path == path
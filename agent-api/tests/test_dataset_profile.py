@@ -0,0 +1,172 @@
+"""
+Unit tests for upload-time dataset profiles.
+
+Tests cover:
+- Profile contents and JSON round trip
+- Stored profiles feed chart recommendation without re-reading the file
+- Profiles are dropped once the file changes
+- Loader fallback on a memory miss; cached misses expire and are bounded
+- Upload waits for the profile without blocking the event loop or cancelling the job
+"""
+
+import asyncio
+import json
+import os
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from agents.tools import chart_inference, dataset_profile
+from agents.tools.dataset_profile import (
+    DatasetProfile,
+    build_profile,
+    clear_profiles,
+    get_profile,
+    register_profile,
+    set_profile_loader,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clean_store():
+    clear_profiles()
+    set_profile_loader(None)
+    yield
+    clear_profiles()
+    set_profile_loader(None)
+
+
+@pytest.fixture
+def wide_csv(tmp_path):
+    path = tmp_path / "wide.csv"
+    rows = ["Country,2000,2001,2002,2003"]
+    rows += [f"C{i},{i},{i + 1},{i + 2},{i + 3}" for i in range(12)]
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    return str(path)
+
+
+class TestBuildProfile:
+    """Tests for build_profile()."""
+
+    def test_profile_contents(self, wide_csv):
+        profile = build_profile(wide_csv)
+
+        assert profile.header_row == 0
+        assert profile.is_wide_format
+        assert profile.wide_time_columns == ["2000", "2001", "2002", "2003"]
+        assert [c["name"] for c in profile.columns][:2] == ["Country", "2000"]
+        assert profile.columns[0]["sample_values"][:2] == ["C0", "C1"]
+        scores = [r["score"] for r in profile.recommendations]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_json_round_trip(self, wide_csv):
+        profile = build_profile(wide_csv)
+        restored = DatasetProfile.from_dict(json.loads(json.dumps(profile.to_dict())))
+
+        assert restored.recommendations == profile.recommendations
+        assert restored.to_schema() == chart_inference.analyze_schema(wide_csv)
+
+
+class TestStore:
+    """Tests for the in-process profile store."""
+
+    def test_recommend_uses_stored_schema(self, wide_csv, monkeypatch):
+        register_profile(build_profile(wide_csv))
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("analyze_schema should not run")
+
+        monkeypatch.setattr(chart_inference, "analyze_schema", _fail)
+        recs = chart_inference.recommend_chart(wide_csv)
+        assert recs and recs[0].score >= recs[-1].score
+
+    def test_changed_file_invalidates(self, wide_csv):
+        register_profile(build_profile(wide_csv))
+        with open(wide_csv, "a", encoding="utf-8") as f:
+            f.write("C99,1,2,3,4\n")
+
+        assert get_profile(wide_csv) is None
+
+    def test_loader_fallback_and_miss_cache(self, wide_csv):
+        stored = build_profile(wide_csv).to_dict()
+        calls = []
+
+        def loader(path):
+            calls.append(path)
+            return stored if len(calls) > 1 else None
+
+        set_profile_loader(loader)
+        assert get_profile(wide_csv) is None
+        assert get_profile(wide_csv) is None  # cached miss, loader not called
+        assert len(calls) == 1
+
+        dataset_profile._misses.clear()
+        assert get_profile(wide_csv) is not None
+        assert get_profile(os.path.abspath(wide_csv)) is not None
+        assert len(calls) == 2
+
+    def test_miss_cache_expires(self, wide_csv, monkeypatch):
+        stored = build_profile(wide_csv).to_dict()
+        results = [None]
+        set_profile_loader(lambda path: results[-1])
+        assert get_profile(wide_csv) is None
+        # Persisted later, e.g. by another worker
+        results.append(stored)
+        assert get_profile(wide_csv) is None
+        monkeypatch.setattr(dataset_profile, "_MISS_TTL_SECONDS", 0.0)
+        dataset_profile._misses.clear()
+        results.append(None)
+        assert get_profile(wide_csv) is None
+        results.append(stored)
+        assert get_profile(wide_csv) is not None
+
+    def test_miss_cache_bounded(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(dataset_profile, "_MAX_MISSES", 3)
+        set_profile_loader(lambda path: None)
+        for i in range(5):
+            path = tmp_path / f"d{i}.csv"
+            path.write_text("a,b\n1,2\n", encoding="utf-8")
+            assert get_profile(str(path)) is None
+        assert list(dataset_profile._misses) == [str(tmp_path / f"d{i}.csv") for i in (2, 3, 4)]
+
+
+class TestUploadWait:
+    @pytest.fixture
+    def datasets_route(self, monkeypatch):
+        # db.session builds its engine (without connecting) at import time
+        monkeypatch.setenv("DB_PORT", os.environ.get("DB_PORT", "5432"))
+        from api.routes import datasets
+
+        monkeypatch.setattr(datasets, "PROFILE_WAIT_SECONDS", 0.05)
+        return datasets
+
+    def test_timeout_keeps_loop_and_job(self, datasets_route):
+        pending: Future = Future()
+        order = []
+
+        async def wait():
+            analysis = await datasets_route._await_column_analysis(pending)
+            order.append("timeout")
+            return analysis
+
+        async def ticker():
+            for _ in range(3):
+                order.append("tick")
+                await asyncio.sleep(0.005)
+
+        async def main():
+            return await asyncio.gather(wait(), ticker())
+
+        analysis, _ = asyncio.run(main())
+        assert analysis is None
+        # Other tasks kept running while the upload waited
+        assert order == ["tick", "tick", "tick", "timeout"]
+        assert not pending.cancelled()
+
+    def test_ready_profile(self, datasets_route, wide_csv):
+        done: Future = Future()
+        done.set_result(build_profile(wide_csv))
+        analysis = asyncio.run(datasets_route._await_column_analysis(done))
+        assert [c.name for c in analysis][:2] == ["Country", "2000"]
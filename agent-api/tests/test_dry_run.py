@@ -0,0 +1,198 @@
+"""
+Unit tests for the dry-run scene executor.
+
+Tests cover:
+- DryRunResult messages (error type, text and scene line)
+- Disabled dry runs and unavailable workers are skipped, not failed
+- Workers that fail to start are retried after a growing backoff
+- Worker protocol: results, scene prelude, temp file cleanup
+- Timeouts and crashed workers are skipped and the worker replaced
+- Workers are reused, and recycled after max_scenes_per_worker
+- With manim installed: runtime errors are reported with their scene line
+"""
+
+import importlib.util
+import os
+import sys
+import textwrap
+import time
+
+import pytest
+
+from agents.tools import dry_run
+from agents.tools.dry_run import SCENE_PRELUDE, DryRunPool, DryRunResult, dry_run_scene
+
+
+HAS_MANIM = importlib.util.find_spec("manim") is not None
+
+# Speaks the worker protocol without manim; behaviour is chosen by the scene text
+FAKE_WORKER = textwrap.dedent('''
+    import json, os, sys, time
+    print(json.dumps({"ready": True}), flush=True)
+    for line in sys.stdin:
+        request = json.loads(line)
+        source = open(request["scene_file"]).read()
+        if "HANG" in source:
+            time.sleep(60)
+        if "CRASH" in source:
+            os._exit(3)
+        if "BOOM" in source:
+            reply = {"ok": False, "error_type": "NameError", "error": "name 'BOOM' is not defined",
+                     "line": 4, "details": "  File \\"scene.py\\", line 8\\nNameError", "plays": 1}
+        else:
+            reply = {"ok": True, "plays": source.count("self.play"), "elapsed_ms": 1.5,
+                     "error": "%%d:%%s" %% (os.getpid(), source.startswith(%r))}
+        print(json.dumps(reply), flush=True)
+''' % SCENE_PRELUDE)
+
+
+@pytest.fixture
+def fake_pool(tmp_path):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER)
+    pools = []
+
+    def make(**kwargs):
+        kwargs.setdefault("timeout", 5.0)
+        pool = DryRunPool(command=[sys.executable, str(script)], **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def worker_pid(result):
+    return int(result.error.split(":")[0])
+
+
+class TestDryRunResult:
+    def test_message(self):
+        result = DryRunResult(ok=False, error_type="KeyError", error="'price'", line=12)
+        assert result.message == "KeyError: 'price' (line 12)"
+        assert result.to_dict()["message"] == result.message
+
+    def test_message_without_line(self):
+        assert DryRunResult(ok=False, error_type="ValueError", error="bad").message == "ValueError: bad"
+
+    def test_skipped(self):
+        result = DryRunResult(ok=True, skipped=True, error="dry run disabled")
+        assert result.message == "dry run disabled"
+
+
+class TestSkipped:
+    def test_disabled(self, monkeypatch, fake_pool):
+        monkeypatch.setenv("DRY_RUN_ENABLED", "0")
+        result = dry_run_scene("class GenScene(Scene): pass", pool=fake_pool())
+        assert result.ok and result.skipped
+
+    @pytest.mark.skipif(HAS_MANIM, reason="manim is installed")
+    def test_worker_without_manim(self):
+        pool = DryRunPool(startup_timeout=30)
+        try:
+            result = dry_run_scene("class GenScene(Scene): pass", pool=pool)
+            assert result.ok and result.skipped
+            assert "manim" in result.error
+            # Not retried on every run
+            assert pool.unavailable
+            assert dry_run_scene("class GenScene(Scene): pass", pool=pool).skipped
+        finally:
+            pool.close()
+
+
+class TestStartupRetry:
+    HANG = [sys.executable, "-c", "import time; time.sleep(60)"]
+    NOT_READY = [sys.executable, "-c", 'print(\'{"ready": false, "error": "no manim"}\')']
+
+    def test_retried_after_backoff(self, fake_pool):
+        pool = fake_pool(startup_timeout=0.3, retry_seconds=0.5)
+        worker_command, pool.command = pool.command, self.HANG
+        result = dry_run_scene("class GenScene(Scene): pass", pool=pool)
+        assert result.skipped and "timed out" in result.error
+        # A slow start (e.g. under load) does not disable dry runs for good
+        pool.command = worker_command
+        assert dry_run_scene("class GenScene(Scene): pass", pool=pool).skipped
+        time.sleep(0.5)
+        result = dry_run_scene("class GenScene(Scene): pass", pool=pool)
+        assert result.ok and not result.skipped
+        assert pool.unavailable is None
+
+    def test_backoff_grows(self, fake_pool):
+        pool = fake_pool(retry_seconds=10, max_retry_seconds=25)
+        pool.command = self.NOT_READY
+        for delay in (10, 20, 25):
+            pool._retry_at = 0.0  # backoff elapsed
+            started = time.monotonic()
+            assert dry_run_scene("class GenScene(Scene): pass", pool=pool).error == "no manim"
+            assert pool._retry_at - started == pytest.approx(delay, abs=2)
+        assert pool.unavailable == "no manim"
+
+
+class TestWorkerProtocol:
+    def test_ok(self, fake_pool, tmp_path):
+        result = dry_run_scene("class GenScene(Scene):\n    def construct(self):\n        self.play(x)\n", pool=fake_pool())
+        assert result.ok and not result.skipped
+        assert result.plays == 1
+        # The scene file starts with the same prelude as the preview's
+        assert result.error.endswith(":True")
+
+    def test_error(self, fake_pool):
+        result = dry_run_scene("class GenScene(Scene):\n    BOOM\n", pool=fake_pool())
+        assert not result.ok and not result.skipped
+        assert result.message == "NameError: name 'BOOM' is not defined (line 4)"
+        assert "scene.py" in result.details
+
+    def test_temp_files_removed(self, fake_pool, monkeypatch, tmp_path):
+        monkeypatch.setattr(dry_run.tempfile, "tempdir", str(tmp_path / "tmp"))
+        os.makedirs(tmp_path / "tmp")
+        dry_run_scene("class GenScene(Scene): pass", pool=fake_pool())
+        assert os.listdir(tmp_path / "tmp") == []
+
+    def test_worker_reused(self, fake_pool):
+        pool = fake_pool()
+        first = dry_run_scene("class GenScene(Scene): pass", pool=pool)
+        second = dry_run_scene("class GenScene(Scene): pass", pool=pool)
+        assert worker_pid(first) == worker_pid(second)
+
+    def test_worker_recycled(self, fake_pool):
+        pool = fake_pool(max_scenes_per_worker=2)
+        pids = [worker_pid(dry_run_scene("class GenScene(Scene): pass", pool=pool)) for _ in range(3)]
+        assert pids[0] == pids[1] != pids[2]
+
+    def test_timeout(self, fake_pool):
+        pool = fake_pool(timeout=0.5)
+        result = dry_run_scene("class GenScene(Scene): HANG", pool=pool)
+        assert result.ok and result.skipped
+        assert "timed out" in result.error
+        # The stuck worker was killed; the next scene gets a fresh one
+        assert dry_run_scene("class GenScene(Scene): pass", pool=pool).ok
+        assert pool._count == 1
+
+    def test_crash(self, fake_pool):
+        pool = fake_pool()
+        result = dry_run_scene("class GenScene(Scene): CRASH", pool=pool)
+        assert result.ok and result.skipped
+        assert "exited" in result.error
+        assert not dry_run_scene("class GenScene(Scene):\n    BOOM\n", pool=pool).ok
+
+
+@pytest.mark.skipif(not HAS_MANIM, reason="manim is not installed")
+class TestManimWorker:
+    def test_runtime_error_line(self):
+        code = textwrap.dedent("""
+            class GenScene(Scene):
+                def construct(self):
+                    c = Circle()
+                    self.play(Create(c))
+                    self.play(FadeIn(Squre()))
+        """).lstrip()
+        pool = DryRunPool()
+        try:
+            result = dry_run_scene(code, pool=pool)
+        finally:
+            pool.close()
+        assert not result.ok and not result.skipped
+        assert result.error_type == "NameError"
+        assert result.line == 5
+        assert result.plays == 1
@@ -0,0 +1,84 @@
+"""
+Unit tests for chart-inference memoization.
+
+Tests cover:
+- Recommendations are reused per (fingerprint, prompt) and refreshed on file change
+- Cached results are copies
+- Per-run intent memo analyzes a dataset once
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from agents.tools import chart_inference
+from agents.tools.inference_cache import clear_inference_caches, dataset_fingerprint, recommendation_cache
+from agents.tools.intent_detection import IntentMemo
+
+
+@pytest.fixture(autouse=True)
+def _clean_caches():
+    clear_inference_caches()
+    yield
+    clear_inference_caches()
+
+
+@pytest.fixture
+def long_csv(tmp_path):
+    path = tmp_path / "long.csv"
+    rows = ["country,year,value"] + [f"C{c},{2000 + y},{c * y}" for c in range(8) for y in range(10)]
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def _count_analyze(monkeypatch):
+    calls = []
+    original = chart_inference.analyze_schema
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(chart_inference, "analyze_schema", counting)
+    return calls
+
+
+class TestRecommendationCache:
+    """Tests for recommend_chart() memoization."""
+
+    def test_reuse_and_invalidate(self, long_csv, monkeypatch):
+        calls = _count_analyze(monkeypatch)
+
+        first = chart_inference.recommend_chart(long_csv, "race")
+        chart_inference.recommend_chart(long_csv, "race")
+        chart_inference.recommend_chart(long_csv, "show trends")  # new prompt, cached schema
+        assert len(calls) == 1
+        assert recommendation_cache.stats().hits == 1
+
+        first[0].score = -1.0  # caller mutation must not leak into the cache
+        assert chart_inference.recommend_chart(long_csv, "race")[0].score >= 0
+
+        before = dataset_fingerprint(long_csv)
+        with open(long_csv, "a", encoding="utf-8") as f:
+            f.write("C9,2000,1\n")
+        os.utime(long_csv, ns=(0, os.stat(long_csv).st_mtime_ns + 1))
+        assert dataset_fingerprint(long_csv) != before
+        chart_inference.recommend_chart(long_csv, "race")
+        assert len(calls) == 2
+
+
+class TestIntentMemo:
+    """Tests for the per-run intent memo."""
+
+    def test_same_message_and_dataset_detected_once(self, long_csv, monkeypatch):
+        calls = _count_analyze(monkeypatch)
+        memo = IntentMemo()
+
+        a = memo.detect("animate a bar race", csv_path=long_csv)
+        b = memo.detect("animate a bar race", csv_path=long_csv)
+
+        assert a.chart_type == b.chart_type
+        assert memo.stats().hits == 1 and memo.stats().misses == 1
+        assert len(calls) == 1
@@ -0,0 +1,71 @@
+"""
+Unit tests for the shared keyword matcher.
+
+Tests cover:
+- Hits match running each group's regex on its own (counts and match texts)
+- Stem prefilter does not drop IGNORECASE-only matches
+- Callers in specs, intent detection and chart inference keep their results
+"""
+
+import re
+
+import pytest
+
+from agents.tools import keyword_matcher
+from agents.tools.chart_inference import _match_intent_patterns
+from agents.tools.intent_detection import _infer_chart_type_from_keywords, quick_intent_check
+from agents.tools.keyword_matcher import scan
+from agents.tools.specs import infer_creation_mode, infer_style_language, normalize_chart_type
+
+
+MESSAGES = [
+    "",
+    "Animasi bubble chart populasi per tahun",
+    "make a bar chart race of the top 10 countries over time",
+    "line chart trend, line graph and evolution of sales by region",
+    "Dashboard with KPI metrics overview",
+    "class GenScene(Scene):\n    pass\nfrom manim import *",
+    "grouped random mode 3 kelompok 人均寿命 年 区域",
+    "histogram vs density, compare revenue per year",
+]
+
+
+class TestScan:
+    @pytest.mark.parametrize("text", MESSAGES)
+    def test_matches_each_group_regex(self, text):
+        hits = scan(text)
+        for group in keyword_matcher._GROUPS:
+            expected = [m.group(0) for m in group.regex.finditer(text)]
+            assert hits.matches(group.key) == expected
+            assert hits.count(group.key) == len(re.findall(group.regex, text))
+            assert hits.has(group.key) == bool(expected)
+
+    def test_case_folded_stems(self):
+        # IGNORECASE matches "ſ" (long s) to "s"; the stem check must too
+        assert scan("ſcatter").has("spec:bubble")
+        assert scan("SCATTER").has("spec:bubble")
+
+    def test_memoized(self):
+        assert scan("video of a ranking") is scan("video of a ranking")
+
+
+class TestCallers:
+    def test_specs(self):
+        assert normalize_chart_type("bar race and line chart") == "bar_race"
+        assert normalize_chart_type("nothing here") == "unknown"
+        assert infer_creation_mode("show by group") == 3
+        assert infer_creation_mode("option 2 please, grouped") == 3
+        assert infer_style_language("Life expectancy per tahun") == "id"
+        assert infer_style_language("人口") == "cn"
+
+    def test_intent_detection(self):
+        result = quick_intent_check("Animate a ranking video")
+        assert result.animation_requested
+        assert result.chart_type == "bar_race"
+        assert result.reasons == ["strong:Animate", "strong:video"]
+        assert _infer_chart_type_from_keywords("trend trend bubble") == "line_evolution"
+
+    def test_chart_inference_counts_distinct_patterns(self):
+        # rank + race + explicit "bar chart race" -> 3 patterns
+        assert _match_intent_patterns("bar chart race ranking", "bar_race") == pytest.approx(0.9)
+        assert _match_intent_patterns("", "bar_race") == 0.0
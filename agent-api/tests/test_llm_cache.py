@@ -0,0 +1,242 @@
+"""
+Unit tests for the persistent LLM response cache.
+
+Tests cover:
+- Cache keys depend on every request field and nothing else
+- Entries persist across cache instances (and processes sharing the file)
+- Expired entries are ignored and purged; the least recently used are evicted past max_entries
+- Storage errors degrade to cache misses
+- The gateway answers repeated deterministic requests from the cache (sync and async calls)
+- Temperature policy, forced caching, and completions rejected by the caller or truncated
+- Completions rejected downstream are invalidated (gateway and generated scenes)
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from agents.tools import code_generation
+from agents.tools.llm_cache import CachedResponse, LLMResponseCache, cache_key
+from agents.tools.llm_gateway import GatewayConfig, LLMGateway
+
+
+MODEL = "claude-sonnet-4-20250514"
+
+
+def key(**overrides):
+    request = dict(
+        model=MODEL,
+        system="sys",
+        messages=[{"role": "user", "content": "hi"}],
+        max_tokens=100,
+        temperature=0.0,
+    )
+    request.update(overrides)
+    return cache_key(**request)
+
+
+class FakeMessages:
+    def __init__(self, text="class GenScene(Scene): pass", stop_reason="end_turn"):
+        self.text = text
+        self.stop_reason = stop_reason
+        self.calls = 0
+
+    def create(self, **request):
+        self.calls += 1
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=self.text)],
+            model=request["model"],
+            stop_reason=self.stop_reason,
+            usage=SimpleNamespace(input_tokens=5, output_tokens=9),
+        )
+
+
+class AsyncFakeMessages(FakeMessages):
+    async def create(self, **request):
+        return FakeMessages.create(self, **request)
+
+
+def make_gateway(tmp_path, messages=None, **config):
+    gateway = LLMGateway(
+        GatewayConfig(api_key="k", **config),
+        cache=LLMResponseCache(str(tmp_path / "llm.sqlite3")),
+    )
+    messages = messages or FakeMessages()
+    gateway._client = SimpleNamespace(messages=messages, close=lambda: None)
+    return gateway, messages
+
+
+class TestCacheKey:
+    def test_stable(self):
+        assert key() == key()
+        assert len(key()) == 64
+
+    @pytest.mark.parametrize("field,value", [
+        ("model", "other-model"),
+        ("system", "other system"),
+        ("messages", [{"role": "user", "content": "hi!"}]),
+        ("max_tokens", 101),
+        ("temperature", 0.2),
+    ])
+    def test_fields(self, field, value):
+        assert key(**{field: value}) != key()
+
+
+class TestLLMResponseCache:
+    def test_roundtrip_and_persistence(self, tmp_path):
+        path = str(tmp_path / "c.sqlite3")
+        cache = LLMResponseCache(path)
+        assert cache.get("k1") is None
+        cache.put("k1", CachedResponse(text="out", model=MODEL, input_tokens=1, output_tokens=2))
+        cache.close()
+
+        reopened = LLMResponseCache(path)
+        hit = reopened.get("k1")
+        assert (hit.text, hit.model, hit.output_tokens) == ("out", MODEL, 2)
+        stats = reopened.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 0, 1)
+
+    def test_ttl(self, tmp_path):
+        cache = LLMResponseCache(str(tmp_path / "c.sqlite3"), ttl_seconds=0.05)
+        cache.put("old", CachedResponse(text="a", model=MODEL))
+        time.sleep(0.1)
+        assert cache.get("old") is None
+        cache.put("new", CachedResponse(text="b", model=MODEL))
+        assert cache.stats().size == 1
+        assert cache.stats().evictions == 1
+
+    def test_lru_eviction(self, tmp_path):
+        cache = LLMResponseCache(str(tmp_path / "c.sqlite3"), max_entries=10)
+        for i in range(10):
+            cache.put(f"k{i}", CachedResponse(text=str(i), model=MODEL))
+            time.sleep(0.001)
+        cache.get("k0")  # most recently used now
+        cache.put("k10", CachedResponse(text="10", model=MODEL))
+        assert cache.stats().size == 9
+        assert cache.get("k0") is not None
+        assert cache.get("k1") is None
+        assert cache.get("k10") is not None
+
+    def test_discard(self, tmp_path):
+        cache = LLMResponseCache(str(tmp_path / "c.sqlite3"))
+        cache.put("k", CachedResponse(text="a", model=MODEL))
+        assert cache.discard("k")
+        assert not cache.discard("k")
+        assert cache.get("k") is None
+
+    def test_unwritable_path(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("x")
+        cache = LLMResponseCache(str(blocker / "c.sqlite3"))
+        # A broken cache degrades to misses instead of failing the call
+        assert cache.get("k") is None
+        cache.put("k", CachedResponse(text="a", model=MODEL))
+        assert cache.stats().errors == 2
+
+
+class TestGatewayCache:
+    def test_repeat_request_hits_cache(self, tmp_path):
+        gateway, messages = make_gateway(tmp_path)
+        first = gateway.complete("hi", model=MODEL, system="sys", temperature=0.0)
+        second = gateway.complete("hi", model=MODEL, system="sys", temperature=0.0)
+        assert messages.calls == 1
+        assert not first.cached and second.cached
+        assert second.text == first.text
+        assert second.output_tokens == 9
+        assert gateway.stats().cache_hits == 1
+
+    def test_shared_across_gateways(self, tmp_path):
+        gateway, _ = make_gateway(tmp_path)
+        gateway.complete("hi", model=MODEL, temperature=0.0)
+        other, messages = make_gateway(tmp_path)
+        assert other.complete("hi", model=MODEL, temperature=0.0).cached
+        assert messages.calls == 0
+
+    def test_temperature_policy(self, tmp_path):
+        # The pipeline's own temperatures (0.1-0.3) are cached by default
+        gateway, messages = make_gateway(tmp_path)
+        for temperature in (0.1, 0.1, 0.3, 0.3, 0.7, 0.7):
+            gateway.complete("hi", model=MODEL, temperature=temperature)
+        assert messages.calls == 4
+
+        gateway, messages = make_gateway(tmp_path / "b", cache_max_temperature=0.0)
+        for _ in range(2):
+            gateway.complete("hi", model=MODEL, temperature=0.2)
+        assert messages.calls == 2
+
+    def test_forced(self, tmp_path):
+        gateway, messages = make_gateway(tmp_path)
+        gateway.complete("hi", model=MODEL, temperature=0.7, cache=True)
+        assert gateway.complete("hi", model=MODEL, temperature=0.7, cache=True).cached
+        gateway.complete("hi", model=MODEL, temperature=0.0, cache=False)
+        assert messages.calls == 2
+
+    def test_rejected_not_stored(self, tmp_path):
+        gateway, messages = make_gateway(tmp_path)
+        for _ in range(2):
+            gateway.complete("hi", model=MODEL, temperature=0.0, accept=lambda text: "Circle" in text)
+        assert messages.calls == 2
+
+    def test_truncated_not_stored(self, tmp_path):
+        gateway, messages = make_gateway(tmp_path, FakeMessages(stop_reason="max_tokens"))
+        for _ in range(2):
+            gateway.complete("hi", model=MODEL, temperature=0.0)
+        assert messages.calls == 2
+
+    def test_invalidate(self, tmp_path):
+        gateway, messages = make_gateway(tmp_path)
+        first = gateway.complete("hi", model=MODEL, temperature=0.0)
+        second = gateway.complete("hi", model=MODEL, temperature=0.0)
+        assert first.cache_key is not None and second.cache_key == first.cache_key
+        gateway.invalidate(second.cache_key)
+        assert not gateway.complete("hi", model=MODEL, temperature=0.0).cached
+        assert messages.calls == 2
+
+    def test_async(self, tmp_path):
+        gateway, sync_messages = make_gateway(tmp_path)
+        messages = AsyncFakeMessages()
+
+        async def run():
+            gateway._async_clients[asyncio.get_running_loop()] = SimpleNamespace(messages=messages)
+            first = await gateway.acomplete("hi", model=MODEL, temperature=0.0)
+            second = await gateway.acomplete("hi", model=MODEL, temperature=0.0)
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert messages.calls == 1
+        assert second.cached and second.text == first.text
+        # One cache for both call paths
+        assert gateway.complete("hi", model=MODEL, temperature=0.0).cached
+        assert sync_messages.calls == 0
+
+
+class TestGeneratedCode:
+    @pytest.fixture
+    def gateway(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "k")
+        gateway, messages = make_gateway(tmp_path)
+        monkeypatch.setattr(code_generation, "get_gateway", lambda api_key=None: gateway)
+        return messages
+
+    def test_rejected_scene_not_replayed(self, gateway):
+        code = code_generation.generate_manim_code("a circle")
+        assert code_generation.generate_manim_code("a circle") == code
+        assert gateway.calls == 1
+        # e.g. the dry run failed: the same prompt goes back to the model
+        assert code_generation.discard_generated_code(code)
+        code_generation.generate_manim_code("a circle")
+        assert gateway.calls == 2
+
+    def test_streamed_scene(self, gateway):
+        code_generation.generate_manim_code("a square")
+        # Answered from the cache, and tracked like a fresh completion
+        code = list(code_generation.stream_manim_code("a square"))[-1].code
+        assert gateway.calls == 1
+        assert code_generation.discard_generated_code(code)
+        code_generation.generate_manim_code("a square")
+        assert gateway.calls == 2
+
+    def test_untracked_code(self, gateway):
+        assert not code_generation.discard_generated_code("class GenScene(Scene): pass  # template")
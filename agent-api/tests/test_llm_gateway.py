@@ -0,0 +1,438 @@
+"""
+Unit tests for the shared LLM gateway.
+
+Tests cover:
+- Sequential calls reuse one pooled connection; async calls use a pooled async client
+- In-flight calls never exceed the concurrency limit shared by threads and
+  coroutines; waiting coroutines are woken by release(), also when cancelled
+- Overloaded / 5xx responses are retried with backoff; 4xx errors are not
+- Timeouts surface as LLMGatewayError(kind="timeout")
+- Streamed calls yield text deltas and report usage; closing a stream aborts it
+- Token bucket reservations and settlement
+- Metrics and the process-wide gateway (a replaced gateway stays usable)
+- code_generation / summarization map gateway errors to their own errors
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("anthropic")
+
+from agents.tools.llm_gateway import (
+    ConcurrencyLimiter,
+    GatewayConfig,
+    LLMGateway,
+    LLMGatewayError,
+    TokenBucket,
+    get_gateway,
+    llm_gateway_stats,
+    reset_gateway,
+)
+
+
+MODEL = "claude-sonnet-4-20250514"
+
+
+class FakeMessagesAPI:
+    """Local /v1/messages endpoint; ``script`` holds status codes to return before succeeding."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.script = []
+        self.requests = []
+        self.client_ports = set()
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with api.lock:
+                    api.requests.append(body)
+                    api.client_ports.add(self.client_address[1])
+                    api.in_flight += 1
+                    api.peak = max(api.peak, api.in_flight)
+                    status = api.script.pop(0) if api.script else 200
+                try:
+                    time.sleep(api.delay)
+                finally:
+                    with api.lock:
+                        api.in_flight -= 1
+                if status == 200 and body.get("stream"):
+                    self._stream(body)
+                    return
+                if status == 200:
+                    payload = {
+                        "id": "msg_1",
+                        "type": "message",
+                        "role": "assistant",
+                        "model": body["model"],
+                        "content": [{"type": "text", "text": "echo: " + body["messages"][0]["content"]}],
+                        "stop_reason": "end_turn",
+                        "stop_sequence": None,
+                        "usage": {"input_tokens": 11, "output_tokens": 7},
+                    }
+                else:
+                    payload = {"type": "error", "error": {"type": "overloaded_error", "message": f"status {status}"}}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("retry-after", "0")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, body):
+                words = ("echo: " + body["messages"][0]["content"]).split(" ")
+                events = [
+                    ("message_start", {"type": "message_start", "message": {
+                        "id": "msg_1", "type": "message", "role": "assistant", "model": body["model"],
+                        "content": [], "stop_reason": None, "stop_sequence": None,
+                        "usage": {"input_tokens": 11, "output_tokens": 1},
+                    }}),
+                    ("content_block_start", {
+                        "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""},
+                    }),
+                ]
+                for i, word in enumerate(words):
+                    text = word if i == 0 else " " + word
+                    events.append(("content_block_delta", {
+                        "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text},
+                    }))
+                events += [
+                    ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+                    ("message_delta", {
+                        "type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                        "usage": {"output_tokens": 7},
+                    }),
+                    ("message_stop", {"type": "message_stop"}),
+                ]
+                data = "".join(f"event: {name}\ndata: {json.dumps(event)}\n\n" for name, event in events).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def api():
+    server = FakeMessagesAPI()
+    yield server
+    server.close()
+
+
+def make_gateway(api, **overrides):
+    config = GatewayConfig(
+        api_key="test-key",
+        base_url=api.url,
+        max_concurrency=4,
+        timeout_seconds=5.0,
+        max_retries=2,
+        retry_base_seconds=0.01,
+        retry_max_seconds=0.05,
+    )
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    return LLMGateway(config)
+
+
+class TestCalls:
+    def test_complete(self, api):
+        gateway = make_gateway(api)
+        response = gateway.complete("hello", model=MODEL, system="be brief", max_tokens=64)
+        assert response.text == "echo: hello"
+        assert (response.input_tokens, response.output_tokens) == (11, 7)
+        assert response.attempts == 1
+        assert api.requests[0]["system"] == "be brief"
+        assert api.requests[0]["max_tokens"] == 64
+
+    def test_connection_reused(self, api):
+        gateway = make_gateway(api)
+        for i in range(5):
+            gateway.complete(f"call {i}", model=MODEL)
+        assert len(api.requests) == 5
+        assert len(api.client_ports) == 1
+
+    def test_acomplete(self, api):
+        gateway = make_gateway(api)
+
+        async def run():
+            return await asyncio.gather(*(gateway.acomplete(f"a{i}", model=MODEL, max_tokens=64) for i in range(3)))
+
+        responses = asyncio.run(run())
+        assert sorted(r.text for r in responses) == ["echo: a0", "echo: a1", "echo: a2"]
+        assert all((r.input_tokens, r.output_tokens, r.attempts) == (11, 7, 1) for r in responses)
+        assert gateway.stats().calls == 3
+
+    def test_acomplete_retries(self, api):
+        api.script = [529, 500]
+        gateway = make_gateway(api)
+        response = asyncio.run(gateway.acomplete("hi", model=MODEL))
+        assert response.attempts == 3 and gateway.stats().retries == 2
+
+    def test_missing_key(self, api):
+        gateway = make_gateway(api, api_key=None)
+        with pytest.raises(LLMGatewayError) as exc:
+            gateway.complete("x", model=MODEL)
+        assert exc.value.kind == "config"
+
+
+class TestLimits:
+    def test_concurrency_limit_sync(self):
+        api = FakeMessagesAPI(delay=0.05)
+        try:
+            gateway = make_gateway(api, max_concurrency=3)
+            threads = [
+                threading.Thread(target=gateway.complete, args=(f"t{i}",), kwargs={"model": MODEL})
+                for i in range(12)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert len(api.requests) == 12
+            assert api.peak <= 3
+            assert gateway.stats().peak_in_flight == 3
+        finally:
+            api.close()
+
+    def test_concurrency_limit_async(self):
+        api = FakeMessagesAPI(delay=0.05)
+        try:
+            gateway = make_gateway(api, max_concurrency=2)
+
+            async def run():
+                await asyncio.gather(*(gateway.acomplete(f"a{i}", model=MODEL) for i in range(8)))
+
+            asyncio.run(run())
+            assert len(api.requests) == 8
+            assert api.peak <= 2
+        finally:
+            api.close()
+
+    def test_limit_shared_by_threads_and_coroutines(self):
+        api = FakeMessagesAPI(delay=0.05)
+        try:
+            gateway = make_gateway(api, max_concurrency=3)
+            threads = [
+                threading.Thread(target=gateway.complete, args=(f"t{i}",), kwargs={"model": MODEL})
+                for i in range(6)
+            ]
+
+            async def run():
+                await asyncio.gather(*(gateway.acomplete(f"a{i}", model=MODEL) for i in range(6)))
+
+            for t in threads:
+                t.start()
+            asyncio.run(run())
+            for t in threads:
+                t.join()
+            assert len(api.requests) == 12
+            assert api.peak <= 3 and gateway.limiter.peak == 3
+        finally:
+            api.close()
+
+    def test_async_waiters_woken_by_release(self):
+        limiter = ConcurrencyLimiter(1)
+        limiter.acquire()
+
+        async def run():
+            cancelled = asyncio.ensure_future(limiter.acquire_async())
+            waiting = asyncio.ensure_future(limiter.acquire_async())
+            await asyncio.sleep(0.01)
+            assert len(limiter._async_waiters) == 2
+            # Released from another thread, while the first waiter is cancelled
+            releaser = threading.Thread(target=limiter.release)
+            releaser.start()
+            releaser.join()
+            cancelled.cancel()
+            await asyncio.wait_for(waiting, timeout=2)
+            return cancelled
+
+        cancelled = asyncio.run(run())
+        assert cancelled.cancelled()
+        assert limiter.in_flight == 1 and not limiter._async_waiters
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(tokens_per_minute=600)  # 10 tokens/s
+        assert bucket.reserve(600) == 0.0
+        assert bucket.reserve(50) == pytest.approx(5.0, abs=0.1)
+        # Actual usage below the estimate gives the difference back
+        bucket.settle(estimated=50, actual=0)
+        assert bucket.reserve(1) == pytest.approx(0.1, abs=0.05)
+        assert not TokenBucket(0).enabled
+        assert TokenBucket(0).reserve(10 ** 9) == 0.0
+
+
+class TestRetries:
+    def test_retry_then_success(self, api):
+        api.script = [529, 500, 429]
+        gateway = make_gateway(api, max_retries=3)
+        response = gateway.complete("x", model=MODEL)
+        assert response.attempts == 4
+        assert len(api.requests) == 4
+        assert gateway.stats().retries == 3
+
+    def test_retries_exhausted(self, api):
+        api.script = [503, 503, 503]
+        gateway = make_gateway(api, max_retries=2)
+        with pytest.raises(LLMGatewayError) as exc:
+            gateway.complete("x", model=MODEL)
+        assert exc.value.kind == "status"
+        assert exc.value.status_code == 503
+        assert gateway.stats().errors == {"status": 1}
+
+    def test_client_error_not_retried(self, api):
+        api.script = [400]
+        gateway = make_gateway(api)
+        with pytest.raises(LLMGatewayError) as exc:
+            gateway.complete("x", model=MODEL)
+        assert exc.value.status_code == 400
+        assert len(api.requests) == 1
+
+    def test_authentication_error(self, api):
+        api.script = [401]
+        gateway = make_gateway(api)
+        with pytest.raises(LLMGatewayError) as exc:
+            gateway.complete("x", model=MODEL)
+        assert exc.value.kind == "authentication"
+
+    def test_timeout(self):
+        api = FakeMessagesAPI(delay=0.5)
+        try:
+            gateway = make_gateway(api, timeout_seconds=0.1, max_retries=1)
+            with pytest.raises(LLMGatewayError) as exc:
+                gateway.complete("x", model=MODEL)
+            assert exc.value.kind == "timeout"
+            assert len(api.requests) == 2
+        finally:
+            api.close()
+
+
+class TestStream:
+    def test_deltas_and_response(self, api):
+        gateway = make_gateway(api)
+        stream = gateway.stream("one two three", model=MODEL)
+        deltas = list(stream)
+        assert len(deltas) == 4
+        assert "".join(deltas) == "echo: one two three"
+        assert api.requests[0]["stream"] is True
+        response = stream.response
+        assert response.text == "echo: one two three"
+        assert (response.input_tokens, response.output_tokens) == (11, 7)
+        assert response.first_token_ms is not None
+        assert gateway.stats().calls == 1
+
+    def test_retry_before_first_token(self, api):
+        api.script = [529]
+        gateway = make_gateway(api)
+        stream = gateway.stream("x", model=MODEL)
+        assert "".join(stream) == "echo: x"
+        assert stream.response.attempts == 2
+
+    def test_close_aborts(self, api):
+        gateway = make_gateway(api)
+        stream = gateway.stream("a b c d", model=MODEL)
+        for _ in stream:
+            break
+        stream.close()
+        stats = gateway.stats()
+        assert stats.streams_aborted == 1
+        assert stats.in_flight == 0
+        assert stream.response is None
+
+    def test_error(self, api):
+        api.script = [400]
+        gateway = make_gateway(api)
+        with pytest.raises(LLMGatewayError) as exc:
+            list(gateway.stream("x", model=MODEL))
+        assert exc.value.status_code == 400
+        assert gateway.stats().in_flight == 0
+
+
+class TestStats:
+    def test_metrics(self, api):
+        gateway = make_gateway(api)
+        for _ in range(3):
+            gateway.complete("x", model=MODEL)
+        stats = gateway.stats().to_dict()
+        assert stats["calls"] == 3
+        assert stats["input_tokens"] == 33
+        assert stats["output_tokens"] == 21
+        assert stats["in_flight"] == 0
+        assert stats["latency_p95_ms"] >= stats["latency_p50_ms"] > 0
+
+    def test_process_gateway(self, api, monkeypatch, tmp_path):
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "env-key")
+        monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.sqlite3"))
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", api.url)
+        reset_gateway()
+        try:
+            first = get_gateway()
+            assert get_gateway() is first
+            assert get_gateway("env-key") is first
+            first.complete("x", model=MODEL)
+            other = get_gateway("other-key")
+            assert other is not first and other.config.api_key == "other-key"
+            other.complete("y", model=MODEL)
+            assert llm_gateway_stats()["llm_gateway"]["calls"] == 1
+            # Calls still holding the replaced gateway keep working
+            assert first.complete("z", model=MODEL).text == "echo: z"
+        finally:
+            reset_gateway()
+
+
+class TestCallSites:
+    @pytest.fixture
+    def process_gateway(self, api, monkeypatch, tmp_path):
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", api.url)
+        # Error mapping repeats identical requests, which the cache would answer
+        monkeypatch.setenv("LLM_CACHE_ENABLED", "0")
+        monkeypatch.setenv("LLM_RETRY_BASE_SECONDS", "0.01")
+        monkeypatch.setenv("LLM_RETRY_MAX_SECONDS", "0.01")
+        reset_gateway()
+        yield api
+        reset_gateway()
+
+    def test_code_generation(self, process_gateway):
+        from agents.tools.code_generation import CodeGenerationError, _call_anthropic
+
+        code = _call_anthropic("class GenScene", MODEL, 0.2, 128, "sys", "key")
+        assert "class GenScene" in code
+
+        process_gateway.script = [401]
+        with pytest.raises(CodeGenerationError, match="authentication failed"):
+            _call_anthropic("class GenScene", MODEL, 0.2, 128, "sys", "key")
+
+    def test_summarization(self, process_gateway):
+        from agents.tools.summarization import SummarizationError, _call_anthropic
+
+        kwargs = dict(model=MODEL, temperature=0.3, max_tokens=64, system_prompt="sys", api_key="key")
+        assert _call_anthropic("abc", **kwargs).startswith("echo: Summarize the following text:")
+
+        process_gateway.script = [400]
+        with pytest.raises(SummarizationError, match="summarization failed"):
+            _call_anthropic("abc", **kwargs)
@@ -0,0 +1,132 @@
+"""
+Unit tests for the bar race layout tables.
+
+Tests cover:
+- race_layout ranks by value with ties kept in CATEGORIES order
+- Y positions and widths follow the rank/value tables
+- interpolate_layout blends values/widths linearly and eases positions
+- bar_outlines resizes the template bar without distorting its corners
+- generate_bar_race stores the tables as the runtime's CONFIG_KEYS
+"""
+
+import ast
+import math
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from agents.tools import scene_runtime
+from agents.tools.scene_runtime.data import load_scene_data
+from agents.tools.scene_runtime.race_layout import (
+    BAR_MAX_WIDTH,
+    BAR_MIN_WIDTH,
+    BAR_TEMPLATE_WIDTH,
+    CORNER_RADIUS,
+    LEFT_MARGIN,
+    TABLE_KEYS,
+    bar_outlines,
+    get_y_position,
+    interpolate_layout,
+    race_layout,
+)
+from agents.tools.templates.bar_race import generate_bar_race
+
+
+TIMES = ["2000", "2001", "2002"]
+CATEGORIES = ["A", "B", "C"]
+DATA = {
+    "2000": {"A": 10.0, "B": 30.0, "C": 20.0},
+    "2001": {"A": 25.0, "B": 25.0, "C": 0.0},
+    "2002": {"A": 40.0, "B": 20.0},
+}
+
+
+@pytest.fixture
+def layout():
+    return race_layout(TIMES, CATEGORIES, DATA, 40.0)
+
+
+class TestRaceLayout:
+    def test_ranks(self, layout):
+        assert layout["RANKS"] == [[2, 0, 1], [0, 1, 2], [0, 1, 2]]
+        assert layout["VALUES"][2] == [40.0, 20.0, 0.0]
+
+    def test_positions_and_widths(self, layout):
+        assert layout["BAR_Y"][0] == [get_y_position(2), get_y_position(0), get_y_position(1)]
+        assert layout["BAR_WIDTHS"][2] == [BAR_MAX_WIDTH, BAR_MAX_WIDTH / 2, BAR_MIN_WIDTH]
+
+    def test_no_max_value(self):
+        layout = race_layout(["t"], ["A"], {"t": {"A": 0.0}}, 0.0)
+        assert layout["BAR_WIDTHS"] == [[BAR_MIN_WIDTH]]
+
+    def test_interpolate(self, layout):
+        tables = {key: np.array(layout[key], dtype=float) for key in TABLE_KEYS}
+        frame = interpolate_layout(tables, 0.25, ease=lambda x: x * x)
+        assert frame["step"] == 0
+        assert frame["VALUES"].tolist() == [13.75, 28.75, 15.0]
+        y0, y1 = np.array(layout["BAR_Y"][0]), np.array(layout["BAR_Y"][1])
+        assert np.allclose(frame["BAR_Y"], y0 + (y1 - y0) * 0.0625)
+
+        assert interpolate_layout(tables, 2.0)["VALUES"].tolist() == layout["VALUES"][2]
+        assert interpolate_layout(tables, 9.0)["step"] == 2
+
+
+class TestBarOutlines:
+    @pytest.fixture
+    def template(self):
+        # Corner arc points and straight edge endpoints of a rounded bar
+        half_w, half_h, r = BAR_TEMPLATE_WIDTH / 2, 0.25, CORNER_RADIUS
+        angles = np.linspace(0, math.pi / 2, 5)
+        arc = np.stack([half_w - r + r * np.cos(angles), half_h - r + r * np.sin(angles)], axis=1)
+        quarter = np.concatenate([arc, arc * [-1, 1], arc * [-1, -1], arc * [1, -1]])
+        return np.column_stack([quarter, np.zeros(len(quarter))])
+
+    def test_wide_bar_keeps_corners(self, template):
+        points = bar_outlines(template, [4.0, 2.0], [1.0, -1.0])
+        assert points.shape == (2,) + template.shape
+        first = points[0]
+        assert first[:, 0].min() == pytest.approx(LEFT_MARGIN)
+        assert first[:, 0].max() == pytest.approx(LEFT_MARGIN + 4.0)
+        assert np.allclose(first[:, 1], template[:, 1] + 1.0)
+        # The right corner arc is the template's, shifted
+        right = first[:5] - first[:5].mean(axis=0)
+        assert np.allclose(right, template[:5] - template[:5].mean(axis=0))
+
+    def test_narrow_bar(self, template):
+        points = bar_outlines(template, [0.1], [0.0])[0]
+        assert points[:, 0].max() - points[:, 0].min() == pytest.approx(0.1)
+        assert points[:, 0].min() == pytest.approx(LEFT_MARGIN)
+
+
+class TestGenerator:
+    def test_tables_in_config(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("agents.tools.templates.scene_data.SCENE_DATA_DIR", str(tmp_path / "store"))
+        csv_path = tmp_path / "race.csv"
+        csv_path.write_text(
+            "year,country,value\n"
+            + "".join(f"{t},{c},{v}\n" for t, row in DATA.items() for c, v in row.items())
+        )
+
+        class Spec:
+            title = "Race"
+            subtitle = None
+            timing = None
+            style = None
+            data_binding = None
+
+        code = generate_bar_race(Spec(), str(csv_path))
+        call = ast.parse(code).body[-2].value.args[0]
+        name, store_dir = (arg.value for arg in call.args)
+        config = load_scene_data(name, store_dir, str(tmp_path / "scene.py"))
+
+        runtime = ast.parse((Path(scene_runtime.__file__).parent / "bar_race.py").read_text())
+        keys = next(
+            ast.literal_eval(node.value) for node in runtime.body
+            if isinstance(node, ast.Assign) and getattr(node.targets[0], "id", None) == "CONFIG_KEYS"
+        )
+        assert list(config) == list(keys)
+        categories = config["CATEGORIES"]
+        expected = race_layout(config["TIMES"], categories, DATA, 40.0)
+        for key in TABLE_KEYS:
+            assert config[key] == expected[key]
@@ -0,0 +1,220 @@
+"""
+Unit tests for the run event broker.
+
+Tests cover:
+- Fan-out to per-run and all-run subscribers, with event filters
+- Bounded per-subscriber buffers: slow consumers drop their oldest events only
+- Unsubscribing on close
+- Run registry status changes and detached pipeline events are published
+- SSE formatting: ids, dropped notices, keep-alives, ending on completion
+- SSE streams wait on the event loop and are woken by publishers on other threads
+- Transports: remote messages are delivered, oversized NOTIFY payloads summarized
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from api import run_events, run_registry
+from api.run_broker import (
+    BrokerTransport,
+    LocalTransport,
+    PostgresNotifyTransport,
+    RunEventBroker,
+    create_transport,
+    set_broker,
+    subscription_sse,
+)
+from api.run_registry import RunState
+
+
+@pytest.fixture
+def broker():
+    instance = RunEventBroker(max_buffer=4)
+    set_broker(instance)
+    yield instance
+    set_broker(None)
+
+
+def drain(subscription):
+    messages = []
+    while subscription.pending():
+        messages.append(subscription.get(timeout=0))
+    return messages
+
+
+def sse_payloads(chunks):
+    return [json.loads(c.split("data: ", 1)[1]) for c in chunks if "data: " in c]
+
+
+async def collect_async(stream):
+    return [chunk async for chunk in stream]
+
+
+def collect(stream):
+    """All chunks of an async SSE stream."""
+    return asyncio.run(collect_async(stream))
+
+
+class TestFanOut:
+    def test_run_and_all_subscribers(self, broker):
+        run_a = broker.subscribe("a")
+        run_b = broker.subscribe("b")
+        everything = broker.subscribe()
+        assert broker.publish("a", {"event": "RunContent"}, event_id=1) == 2
+        broker.publish("b", {"event": "RunContent"})
+        assert [m["id"] for m in drain(run_a)] == [1]
+        assert [m["run_id"] for m in drain(run_b)] == ["b"]
+        assert [m["run_id"] for m in drain(everything)] == ["a", "b"]
+
+    def test_event_filter(self, broker):
+        statuses = broker.subscribe(events={"RunStatus"})
+        broker.publish("a", {"event": "RunContent"})
+        broker.publish("a", {"event": "RunStatus", "state": "PREVIEWING"})
+        assert [m["data"]["event"] for m in drain(statuses)] == ["RunStatus"]
+
+    def test_slow_consumer_drops_oldest(self, broker):
+        slow = broker.subscribe("a")
+        fast = broker.subscribe("a", max_buffer=100)
+        for i in range(10):
+            broker.publish("a", {"event": "RunContent", "n": i})
+        assert [m["data"]["n"] for m in drain(slow)] == [6, 7, 8, 9]
+        assert slow.dropped == 6
+        assert len(drain(fast)) == 10 and fast.dropped == 0
+        assert broker.stats()["dropped"] == 6
+
+    def test_close_unsubscribes(self, broker):
+        with broker.subscribe("a") as subscription:
+            assert broker.subscriber_count("a") == 1
+        assert broker.subscriber_count("a") == 0
+        assert subscription.get(timeout=0) is None
+        assert broker.publish("a", {"event": "RunContent"}) == 0
+
+
+class TestPublishers:
+    def test_run_registry_status(self, broker):
+        subscription = broker.subscribe(events={"RunStatus"})
+        run = run_registry.create_run(message="start")
+        try:
+            run_registry.set_state(run.run_id, RunState.PREVIEWING, "Previewing")
+            run_registry.complete_run(run.run_id, "done")
+            events = [m["data"] for m in drain(subscription)]
+            assert [(e["state"], e["message"]) for e in events] == [
+                ("CREATED", "start"),
+                ("PREVIEWING", "Previewing"),
+                ("COMPLETED", "done"),
+            ]
+            assert all(e["run_id"] == run.run_id for e in events)
+        finally:
+            run_registry.remove_run(run.run_id)
+
+    def test_detached_run_events(self, broker):
+        subscription = broker.subscribe("r1", max_buffer=10)
+        run_events.start_detached_run("r1", iter([
+            'data: {"event": "RunContent", "content": "a"}\n\n',
+            'data: {"event": "RunCompleted"}\n\n',
+        ]))
+        chunks = collect(subscription_sse(subscription, heartbeat_seconds=5, stop_on_terminal=True))
+        assert chunks[0].startswith("id: 1\n")
+        assert [p["event"] for p in sse_payloads(chunks)] == ["RunContent", "RunCompleted"]
+        assert sse_payloads(chunks)[0]["run_id"] == "r1"
+        run_events._logs.pop("r1", None)
+
+
+class TestSubscriptionSSE:
+    def test_dropped_notice_and_keep_alive(self, broker):
+        subscription = broker.subscribe("a", max_buffer=2)
+        for i in range(3):
+            broker.publish("a", {"event": "RunContent", "n": i}, event_id=i + 1)
+
+        async def run():
+            stream = subscription_sse(subscription, heartbeat_seconds=0.01)
+            chunks = [await stream.__anext__() for _ in range(4)]
+            await stream.aclose()
+            return chunks
+
+        chunks = asyncio.run(run())
+        dropped = sse_payloads(chunks[:1])[0]
+        assert dropped["event"] == "RunEventsDropped" and dropped["missed"] == 1
+        assert chunks[1].startswith("id: 2\n")
+        assert chunks[2].startswith("id: 3\n")
+        assert chunks[3] == ": keep-alive\n\n"
+        assert broker.subscriber_count("a") == 0
+
+    def test_ends_on_terminal_status(self, broker):
+        subscription = broker.subscribe("a")
+        broker.publish("a", {"event": "RunStatus", "state": "CANCELED"})
+        broker.publish("a", {"event": "RunContent"})
+        chunks = collect(subscription_sse(subscription, stop_on_terminal=True, event_ids=False))
+        assert [p["state"] for p in sse_payloads(chunks)] == ["CANCELED"]
+
+    def test_idle_streams_hold_no_threads(self, broker):
+        # More idle streams than the threadpool has tokens (40)
+        subscriptions = [broker.subscribe("a") for _ in range(60)]
+
+        async def run():
+            threads = threading.active_count()
+            streams = [
+                asyncio.ensure_future(collect_async(subscription_sse(s, heartbeat_seconds=30, stop_on_terminal=True)))
+                for s in subscriptions
+            ]
+            await asyncio.sleep(0.05)
+            # All waiting, none of them on a thread
+            assert threading.active_count() == threads
+            publisher = threading.Thread(target=broker.publish, args=("a", {"event": "RunCompleted"}))
+            publisher.start()
+            results = await asyncio.wait_for(asyncio.gather(*streams), timeout=5)
+            publisher.join()
+            return results
+
+        results = asyncio.run(run())
+        assert all(sse_payloads(chunks) == [{"event": "RunCompleted", "run_id": "a"}] for chunks in results)
+        assert broker.subscriber_count("a") == 0
+
+
+class FakeTransport(BrokerTransport):
+    def __init__(self):
+        self.sent = []
+        self.deliver = None
+
+    def start(self, deliver):
+        self.deliver = deliver
+
+    def publish(self, message):
+        self.sent.append(message)
+
+
+class TestTransports:
+    def test_remote_delivery(self):
+        transport = FakeTransport()
+        broker = RunEventBroker(transport)
+        subscription = broker.subscribe("a")
+        broker.publish("a", {"event": "RunContent"}, event_id=3)
+        assert transport.sent == [{"run_id": "a", "id": 3, "data": {"event": "RunContent"}}]
+        # A message published by another process
+        transport.deliver({"run_id": "a", "id": 4, "data": {"event": "RunCompleted"}})
+        assert [m["id"] for m in drain(subscription)] == [3, 4]
+        assert broker.stats()["received"] == 1
+
+    def test_notify_payload_summary(self):
+        transport = PostgresNotifyTransport("postgresql+psycopg://u:p@localhost:5432/db")
+        assert transport.conninfo == "postgresql://u:p@localhost:5432/db"
+        small = json.loads(transport._encode({"run_id": "a", "id": 1, "data": {"event": "RunContent"}}))
+        assert small["data"] == {"event": "RunContent"} and small["origin"] == transport.origin
+        big = json.loads(transport._encode({
+            "run_id": "a", "id": 2, "data": {"event": "RunContent", "content": "x" * 20000, "run_id": "a"},
+        }))
+        assert big["data"] == {"event": "RunContent", "run_id": "a", "truncated": True}
+        assert big["id"] == 2
+
+    def test_create_from_env(self, monkeypatch):
+        monkeypatch.delenv("RUN_BROKER_TRANSPORT", raising=False)
+        assert isinstance(create_transport(), LocalTransport)
+        monkeypatch.setenv("RUN_BROKER_TRANSPORT", "postgres")
+        monkeypatch.setenv("RUN_BROKER_URL", "postgresql+psycopg://u@db:5432/app")
+        assert isinstance(create_transport(), PostgresNotifyTransport)
+        monkeypatch.setenv("RUN_BROKER_TRANSPORT", "kafka")
+        with pytest.raises(ValueError):
+            create_transport()
@@ -0,0 +1,228 @@
+"""
+Unit tests for per-run event logs and detached pipeline execution.
+
+Tests cover:
+- Detached pipelines run to completion without a reader
+- SSE output carries event ids; streams resume after a given id
+- Phases of one run share a log and keep counting ids, also after the log expired
+- A Last-Event-ID the log never issued gets a RunEventsReset and a full replay
+- Bounded logs report dropped events to resuming clients
+- Pipeline exceptions become a RunError event and fail the run
+- Canceling a detached run stops and closes its pipeline
+- Keep-alive comments while a run is idle
+- Streams wait on the event loop and are woken by the pipeline thread
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from api import run_events, run_registry
+from api.run_events import RunEventLog, get_event_log, start_detached_run, stream_run_events
+from api.run_registry import RunState
+
+
+def sse(payload):
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def pipeline(run_id, count, gate=None):
+    for i in range(count):
+        if gate is not None and i == 1:
+            gate.wait(5)
+        yield sse({"event": "RunContent", "content": f"step {i}", "run_id": run_id})
+    yield sse({"event": "RunCompleted", "run_id": run_id})
+
+
+async def collect_async(stream):
+    return [chunk async for chunk in stream]
+
+
+def collect(stream):
+    """All chunks of an async SSE stream."""
+    return asyncio.run(collect_async(stream))
+
+
+def payloads(chunks):
+    result = []
+    for chunk in chunks:
+        ids = [line[4:] for line in chunk.splitlines() if line.startswith("id: ")]
+        data = [line[6:] for line in chunk.splitlines() if line.startswith("data: ")]
+        if data:
+            result.append((int(ids[0]) if ids else None, json.loads(data[0])))
+    return result
+
+
+def wait_closed(run_id):
+    log = get_event_log(run_id)
+    log.wait(10**9, timeout=5)
+    assert log.closed
+    return log
+
+
+@pytest.fixture(autouse=True)
+def clean_logs():
+    run_events._logs.clear()
+    run_events._retired_ids.clear()
+    yield
+    run_events._logs.clear()
+    run_events._retired_ids.clear()
+
+
+class TestDetachedRun:
+    def test_runs_without_reader(self):
+        start_detached_run("r1", pipeline("r1", 3))
+        log = wait_closed("r1")
+        assert log.last_id == 4
+
+    def test_stream_and_resume(self):
+        start_detached_run("r1", pipeline("r1", 3))
+        events = payloads(collect(stream_run_events("r1")))
+        assert [i for i, _ in events] == [1, 2, 3, 4]
+        assert events[-1][1]["event"] == "RunCompleted"
+        # A client that saw event 2 gets the rest
+        resumed = payloads(collect(stream_run_events("r1", after=2)))
+        assert [(i, p["content"] if "content" in p else p["event"]) for i, p in resumed] == [
+            (3, "step 2"),
+            (4, "RunCompleted"),
+        ]
+
+    def test_follows_live_run(self):
+        gate = threading.Event()
+        start_detached_run("r1", pipeline("r1", 3, gate=gate))
+
+        async def run():
+            stream = stream_run_events("r1")
+            first = await stream.__anext__()
+            gate.set()
+            return [first] + await collect_async(stream)
+
+        assert [i for i, _ in payloads(asyncio.run(run()))] == [1, 2, 3, 4]
+
+    def test_phases_share_log(self):
+        start_detached_run("r1", pipeline("r1", 1))
+        wait_closed("r1")
+        after = start_detached_run("r1", pipeline("r1", 2))
+        assert after == 2
+        assert [i for i, _ in payloads(collect(stream_run_events("r1", after)))] == [3, 4, 5]
+        assert [i for i, _ in payloads(collect(stream_run_events("r1")))] == [1, 2, 3, 4, 5]
+
+    def test_ids_continue_after_expiry(self, monkeypatch):
+        start_detached_run("r1", pipeline("r1", 1))
+        wait_closed("r1")
+        monkeypatch.setattr(run_events, "RETENTION_SECONDS", 0.0)
+        assert get_event_log("r1") is None
+        monkeypatch.setattr(run_events, "RETENTION_SECONDS", 900.0)
+        after = start_detached_run("r1", pipeline("r1", 1))
+        assert after == 2
+        wait_closed("r1")
+        # A client that saw the expired log resumes without losing the new phase
+        assert [i for i, _ in payloads(collect(stream_run_events("r1", after)))] == [3, 4]
+
+    def test_stale_last_event_id(self):
+        start_detached_run("r1", pipeline("r1", 1))
+        wait_closed("r1")
+        events = payloads(collect(stream_run_events("r1", after=50)))
+        assert events[0][1]["event"] == "RunEventsReset"
+        assert [i for i, _ in events[1:]] == [1, 2]
+
+    def test_unknown_run(self):
+        assert collect(stream_run_events("missing")) == []
+
+    def test_pipeline_error(self):
+        run = run_registry.create_run()
+
+        def failing():
+            yield sse({"event": "RunContent", "content": "start"})
+            raise RuntimeError("boom")
+
+        start_detached_run(run.run_id, failing())
+        events = payloads(collect(stream_run_events(run.run_id)))
+        assert events[-1][1]["event"] == "RunError"
+        assert "boom" in events[-1][1]["content"]
+        assert run_registry.get_run(run.run_id).state == RunState.ERROR
+        run_registry.remove_run(run.run_id)
+
+    def test_cancel_stops_pipeline(self):
+        run = run_registry.create_run()
+        started, gate, closed = threading.Event(), threading.Event(), threading.Event()
+
+        def gated():
+            try:
+                yield sse({"event": "RunContent", "content": "start"})
+                started.set()
+                gate.wait(5)
+                # The pipeline does not notice the cancel on its own
+                run_registry.set_state(run.run_id, RunState.RENDERING, "Rendering...")
+                run_registry.complete_run(run.run_id, "done")
+                yield sse({"event": "RunContent", "content": "late"})
+                yield sse({"event": "RunCompleted"})
+            finally:
+                closed.set()
+
+        start_detached_run(run.run_id, gated())
+        assert started.wait(5)
+        assert run_registry.cancel_run(run.run_id, reason="user_request")
+        gate.set()
+        wait_closed(run.run_id)
+
+        assert closed.is_set()
+        events = [p for _, p in payloads(collect(stream_run_events(run.run_id)))]
+        assert [p.get("content", p["event"]) for p in events] == ["start", "RunStatus"]
+        assert events[-1]["state"] == "CANCELED"
+        assert run_registry.get_run(run.run_id).state == RunState.CANCELED
+        run_registry.remove_run(run.run_id)
+
+    def test_canceled_pipeline_error(self):
+        run = run_registry.create_run()
+
+        def killed():
+            yield sse({"event": "RunContent", "content": "start"})
+            run_registry.cancel_run(run.run_id)
+            raise RuntimeError("preview process killed")
+
+        start_detached_run(run.run_id, killed())
+        events = [p for _, p in payloads(collect(stream_run_events(run.run_id)))]
+        assert [p["event"] for p in events] == ["RunContent", "RunStatus"]
+        assert run_registry.get_run(run.run_id).state == RunState.CANCELED
+        run_registry.remove_run(run.run_id)
+
+
+class TestRunEventLog:
+    def test_dropped_events(self):
+        log = RunEventLog("r1", max_events=3)
+        for i in range(5):
+            log.append(json.dumps({"n": i}))
+        log.close()
+        run_events._logs["r1"] = log
+        events = payloads(collect(stream_run_events("r1", after=0)))
+        assert events[0][0] is None
+        assert events[0][1]["event"] == "RunEventsDropped" and events[0][1]["missed"] == 2
+        assert [i for i, _ in events[1:]] == [3, 4, 5]
+        # Nothing missed when resuming inside the window
+        assert [i for i, _ in payloads(collect(stream_run_events("r1", after=3)))] == [4, 5]
+
+    def test_keep_alive(self):
+        log = run_events.open_event_log("r1")
+
+        async def run():
+            stream = stream_run_events("r1", heartbeat_seconds=0.01)
+            assert await stream.__anext__() == ": keep-alive\n\n"
+            # Appended from another thread, as a detached pipeline does
+            appender = threading.Thread(target=log.append, args=(json.dumps({"event": "RunContent"}),))
+            appender.start()
+            chunk = await stream.__anext__()
+            while chunk.startswith(":"):
+                chunk = await stream.__anext__()
+            assert chunk.startswith("id: 1\n")
+            appender.join()
+            log.close()
+            assert await collect_async(stream) == []
+
+        asyncio.run(run())
+
+    def test_comments_are_not_logged(self):
+        start_detached_run("r1", iter([": ping\n\n", sse({"event": "RunCompleted"})]))
+        assert wait_closed("r1").last_id == 1
@@ -0,0 +1,185 @@
+"""
+Unit tests for the run store's write-behind queue.
+
+Tests cover:
+- Consecutive state updates of a run coalesce into one write
+- State updates fold into a run's not-yet-flushed insert
+- Writes across runs are batched into one multi-row statement per table
+- Terminal states and full batches flush synchronously; the timer flushes the rest
+- A failing batch is retried write by write
+- persist_* functions queue by default and write directly with an explicit session
+"""
+
+import os
+import threading
+
+import pytest
+
+# db.session builds its engine (without connecting) at import time
+os.environ.setdefault("DB_PORT", "5432")
+
+from api.persistence import run_store  # noqa: E402
+from api.persistence.run_store import RunWriteQueue  # noqa: E402
+
+
+RUN_A = "00000000-0000-0000-0000-00000000000a"
+RUN_B = "00000000-0000-0000-0000-00000000000b"
+
+
+class FakeResult:
+    rowcount = 1
+
+    def mappings(self):
+        return self
+
+    def first(self):
+        return None
+
+
+class FakeSession:
+    def __init__(self, log, fail_on=None):
+        self.log = log
+        self.fail_on = fail_on
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        # Only the multi-row form (suffixed parameters) is rejected
+        if self.fail_on and self.fail_on in sql and ":run_id_0" in sql:
+            raise RuntimeError("batch rejected")
+        self.log.append((sql, dict(params or {})))
+        return FakeResult()
+
+    def commit(self):
+        self.log.append(("commit", {}))
+
+    def rollback(self):
+        self.log.append(("rollback", {}))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def executed():
+    return []
+
+
+@pytest.fixture
+def make_queue(executed):
+    queues = []
+
+    def make(interval=60.0, max_batch=100, fail_on=None):
+        queue = RunWriteQueue(lambda: FakeSession(executed, fail_on), interval=interval, max_batch=max_batch)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def statements(executed):
+    return [sql for sql, _ in executed if sql not in ("commit", "rollback")]
+
+
+class TestCoalescing:
+    def test_state_updates_coalesce(self, make_queue, executed):
+        queue = make_queue()
+        queue.set_state(RUN_A, "PREVIEWING", "Generating preview")
+        queue.set_state(RUN_A, "PREVIEWING", "Generating preview")
+        queue.set_state(RUN_A, "RENDERING", None)
+        assert queue.flush() == 1
+        [(sql, params)] = [e for e in executed if e[0] != "commit"]
+        assert sql.startswith("update public.agent_runs")
+        assert params == {"run_id_0": RUN_A, "state_0": "RENDERING", "message_0": "Generating preview"}
+        assert queue.stats["coalesced"] == 2
+
+    def test_state_folds_into_insert(self, make_queue, executed):
+        queue = make_queue()
+        queue.add_run(RUN_A, None, "s1", "animation_agent", "STARTING", "Starting", {"k": 1})
+        queue.set_state(RUN_A, "STARTING", "Starting")
+        queue.set_state(RUN_A, "PREVIEWING", "Previewing")
+        queue.flush()
+        [(sql, params)] = [e for e in executed if e[0] != "commit"]
+        assert sql.startswith("insert into public.agent_runs")
+        assert params["state_0"] == "PREVIEWING" and params["message_0"] == "Previewing"
+        assert params["metadata_0"] == '{"k": 1}'
+
+
+class TestBatching:
+    def test_multi_row_statements(self, make_queue, executed):
+        queue = make_queue()
+        queue.add_run(RUN_A, None, None, "animation_agent", "STARTING", "a", None)
+        queue.add_run(RUN_B, None, None, "animation_agent", "STARTING", "b", None)
+        queue.add_artifact(RUN_A, "video", "/static/a.mp4")
+        queue.add_artifact(RUN_B, "video", "/static/b.mp4", width=640)
+        assert queue.flush() == 4
+        sqls = statements(executed)
+        assert len(sqls) == 2
+        assert sqls[0].startswith("insert into public.agent_runs") and ":run_id_1" in sqls[0]
+        assert sqls[1].startswith("insert into public.artifacts") and ":storage_path_1" in sqls[1]
+        assert executed[-1][0] == "commit"
+
+    def test_terminal_state_flushes(self, make_queue, executed):
+        queue = make_queue()
+        queue.add_run(RUN_A, None, None, "animation_agent", "STARTING", "a", None)
+        queue.add_artifact(RUN_A, "video", "/static/a.mp4")
+        assert statements(executed) == []
+        queue.set_state(RUN_A, "COMPLETED", "done")
+        assert len(statements(executed)) == 2
+        assert executed[0][1]["state_0"] == "COMPLETED"
+
+    def test_full_batch_flushes(self, make_queue, executed):
+        queue = make_queue(max_batch=2)
+        queue.add_artifact(RUN_A, "video", "/a.mp4")
+        assert statements(executed) == []
+        queue.add_artifact(RUN_A, "video", "/b.mp4")
+        assert len(statements(executed)) == 1
+
+    def test_timer_flush(self, make_queue, executed):
+        queue = make_queue(interval=0.01)
+        done = threading.Event()
+        original = queue.flush
+
+        def flush():
+            count = original()
+            if count:
+                done.set()
+            return count
+
+        queue.flush = flush
+        queue.set_state(RUN_A, "RENDERING")
+        assert done.wait(5)
+        assert len(statements(executed)) == 1
+
+    def test_failed_batch_retried_individually(self, make_queue, executed):
+        queue = make_queue(fail_on="insert into public.artifacts")
+        queue.add_artifact(RUN_A, "video", "/a.mp4")
+        queue.add_artifact(RUN_B, "video", "/b.mp4")
+        queue.flush()
+        assert ("rollback", {}) in executed
+        singles = [p for sql, p in executed if sql.startswith("insert into public.artifacts")]
+        assert [p["storage_path"] for p in singles] == ["/a.mp4", "/b.mp4"]
+        assert queue.stats["fallbacks"] == 1
+
+
+class TestPersistFunctions:
+    def test_queued_by_default(self, make_queue, executed, monkeypatch):
+        queue = make_queue()
+        monkeypatch.setattr(run_store, "_write_queue", queue)
+        monkeypatch.setattr(run_store, "WRITE_BEHIND_ENABLED", True)
+        assert run_store.persist_run_created(RUN_A, "local", None, "animation_agent", "STARTING", "s") is None
+        assert run_store.persist_run_state(RUN_A, "PREVIEWING")
+        assert statements(executed) == []
+        run_store.persist_run_failed(RUN_A, "boom")
+        [(sql, params)] = [e for e in executed if e[0] != "commit"]
+        # Non-UUID user ids are still stored as NULL
+        assert params["user_id_0"] is None
+        assert (params["state_0"], params["message_0"]) == ("ERROR", "boom")
+
+    def test_explicit_session_writes_directly(self, make_queue, executed, monkeypatch):
+        queue = make_queue()
+        monkeypatch.setattr(run_store, "_write_queue", queue)
+        assert run_store.persist_run_state(RUN_A, "RENDERING", db=FakeSession(executed))
+        assert statements(executed)[0].startswith("update public.agent_runs set state = :state")
+        assert queue.flush() == 0
@@ -0,0 +1,122 @@
+"""
+Unit tests for the scene data sidecar.
+
+Tests cover:
+- Nested, list and JSON encodings round-trip exactly (key order, int/float, NaN, missing keys)
+- Small payloads and unstorable values stay inline as literals
+- Generated blocks load from the scene directory after staging, or from the store
+"""
+
+import math
+import os
+
+import pytest
+
+from agents.tools.scene_runtime.data import decode_value
+from agents.tools.templates import scene_data
+from agents.tools.templates.scene_data import (
+    format_literal,
+    scene_data_block,
+    scene_data_refs,
+    stage_scene_data,
+)
+
+
+def _run_block(block, scene_file):
+    namespace = {"__file__": str(scene_file)}
+    exec(compile(block, str(scene_file), "exec"), namespace)
+    return namespace
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "store"
+    path.mkdir()
+    return str(path)
+
+
+def _bubble_values():
+    times = [str(2000 + t) for t in range(40)]
+    entities = [f"E{e}" for e in range(30)]
+    data = {}
+    for t, time_value in enumerate(times):
+        # Entities appear late and disappear, so frames hold different key subsets
+        frame = {}
+        for e, entity in enumerate(entities):
+            if (t + e) % 7 == 0:
+                continue
+            frame[entity] = {"x": t * 1.5 + e, "y": float("nan") if e == 3 else e / 3, "r": 1e6 * e}
+        data[time_value] = frame
+    return {
+        "TIMES": times,
+        "ENTITIES": entities,
+        "DATA": data,
+        "COUNTS": [t * 2 for t in range(300)],
+        "HIST": {t: [t + b for b in range(12)] for t in range(30)},
+    }
+
+
+def _assert_same(expected, actual):
+    for name, value in expected.items():
+        assert scene_data._same(value, actual[name]), name
+    # NaN positions survive as well
+    assert math.isnan(actual["DATA"]["2001"]["E3"]["y"])
+
+
+class TestEncoding:
+    def test_roundtrip_kinds(self, store):
+        values = _bubble_values()
+        index, arrays, inline = scene_data._encode(values)
+        assert inline == []
+        kinds = {k: v["kind"] for k, v in index["values"].items()}
+        assert kinds == {"TIMES": "json", "ENTITIES": "json", "DATA": "nested", "COUNTS": "list", "HIST": "nested"}
+        decoded = {k: decode_value(v, arrays) for k, v in index["values"].items()}
+        _assert_same(values, decoded)
+
+    def test_irregular_values_fall_back(self):
+        values = {
+            "REORDERED": [{"a": 1, "b": 2}, {"b": 3, "a": 4}],
+            "MIXED": [1, 2.5],
+            "HUGE": [2 ** 70],
+            "TUPLE_KEYS": {(1, 2): 1.0},
+        }
+        index, arrays, inline = scene_data._encode(values)
+        assert {k: v["kind"] for k, v in index["values"].items()} == {
+            "REORDERED": "json",
+            "MIXED": "json",
+            "HUGE": "json",
+        }
+        assert inline == ["TUPLE_KEYS"]
+
+
+class TestSceneDataBlock:
+    def test_small_payload_inline(self, store):
+        values = {"CATEGORIES": ["a", "b"], "COUNTS": [1, 2]}
+        block = scene_data_block(values, store_dir=store)
+        assert block == "CATEGORIES = ['a', 'b']\nCOUNTS = [1, 2]"
+        assert os.listdir(store) == []
+
+    def test_sidecar_block_loads(self, store, tmp_path):
+        values = _bubble_values()
+        values["TAGS"] = {"x", "y"}
+        block = scene_data_block(values, store_dir=store)
+        assert len(block) < len(format_literal(values["DATA"]))
+        assert f"TAGS = {values['TAGS']!r}" in block
+        [name] = scene_data_refs(block)
+
+        # Loads from the store when nothing is staged next to the scene
+        namespace = _run_block(block, tmp_path / "elsewhere" / "scene.py")
+        _assert_same(values, namespace)
+
+        work_dir = tmp_path / "work"
+        work_dir.mkdir()
+        assert stage_scene_data(block, str(work_dir), store_dir=store) == [name]
+        assert sorted(os.listdir(work_dir)) == [name + ".json", name + ".npz"]
+        for entry in os.listdir(store):
+            os.remove(os.path.join(store, entry))
+        _assert_same(values, _run_block(block, work_dir / "scene.py"))
+
+    def test_content_addressed(self, store):
+        values = _bubble_values()
+        assert scene_data_block(values, store_dir=store) == scene_data_block(values, store_dir=store)
+        assert len(os.listdir(store)) == 2
@@ -0,0 +1,149 @@
+"""
+Unit tests for cached template scene labels.
+
+Tests cover (constructed scenes require manim):
+- Runtime template modules build text through the labels helpers, never Text()/DecimalNumber directly
+- Per-step labels (time displays, line value label) are glyph compositions present in the scene
+- Bento counters are NumberLabels that end on their KPI values
+- cached_text reuses one render per string/style and evicts least recently used entries
+- glyph_text / NumberLabel output (requires manim)
+"""
+
+import importlib
+
+import pytest
+
+
+TEMPLATE_MODULES = [
+    "bar_race", "bento_grid", "bubble_chart", "count_bar", "distribution", "line_evolution", "single_numeric",
+]
+
+
+@pytest.fixture
+def label_log(monkeypatch):
+    """
+    Record the strings rendered by Text (Pango) inside the labels helpers and
+    those passed to glyph_text by the runtime modules; direct Text() /
+    DecimalNumber() calls from a runtime module fail.
+    """
+    pytest.importorskip("manim")
+    from agents.tools.scene_runtime import labels
+
+    log = {"rendered": [], "glyph": []}
+    real_text, real_glyph_text = labels.Text, labels.glyph_text
+
+    def counting_text(text, **kwargs):
+        log["rendered"].append(str(text))
+        return real_text(text, **kwargs)
+
+    def logging_glyph_text(text, *args, **kwargs):
+        log["glyph"].append(str(text))
+        return real_glyph_text(text, *args, **kwargs)
+
+    def forbidden(name):
+        def call(*args, **kwargs):
+            raise AssertionError(f"{name}() called directly by a runtime module")
+        return call
+
+    monkeypatch.setattr(labels, "Text", counting_text)
+    monkeypatch.setattr(labels, "_text_cache", type(labels._text_cache)())
+    monkeypatch.setattr(labels, "_atlases", {})
+    for module in TEMPLATE_MODULES:
+        runtime = importlib.import_module(f"agents.tools.scene_runtime.{module}")
+        # Runtime modules star-import manim, so these are module globals
+        monkeypatch.setattr(runtime, "Text", forbidden("Text"), raising=False)
+        monkeypatch.setattr(runtime, "DecimalNumber", forbidden("DecimalNumber"), raising=False)
+        if hasattr(runtime, "glyph_text"):
+            monkeypatch.setattr(runtime, "glyph_text", logging_glyph_text)
+    return log
+
+
+def _family(scene):
+    return [mob for top in scene.mobjects for mob in top.get_family()]
+
+
+class TestTemplateLabels:
+    """Constructed template scenes (requires manim; datasets from conftest)."""
+
+    @pytest.mark.parametrize("module", TEMPLATE_MODULES)
+    def test_text_through_label_helpers(self, module, render_template, label_log):
+        render_template(module)
+        # Everything rendered went through cached_text/glyph_text
+        assert label_log["rendered"]
+
+    @pytest.mark.parametrize(
+        "module,attr",
+        [
+            ("bar_race", "time_display"),
+            ("bubble_chart", "time_display"),
+            ("distribution", "time_display"),
+            ("line_evolution", "value_label"),
+        ],
+    )
+    def test_changing_labels_are_glyphs(self, module, attr, render_template, label_log):
+        scene = render_template(module)
+        # The initial label plus at least one update
+        assert len(label_log["glyph"]) >= 2
+        # Composed from the glyph atlas, not rendered string by string
+        assert not set(label_log["glyph"]) & set(label_log["rendered"])
+
+        label = getattr(scene.template, attr)
+        assert any(mob is label for mob in _family(scene))
+        assert label.submobjects and all(len(glyph.points) for glyph in label.submobjects)
+
+    def test_bento_counters(self, render_template, label_log):
+        from agents.tools.scene_runtime.labels import NumberLabel
+
+        scene = render_template("bento_grid")
+        counters = scene.template.value_trackers
+        assert [target for _, target, _ in counters] == [1200, 340, 3]
+        for _, target, display in counters:
+            assert isinstance(display, NumberLabel)
+            assert display.get_value() == pytest.approx(target)
+            assert any(mob is display for mob in _family(scene))
+
+
+class TestLabels:
+    @pytest.fixture
+    def labels(self, monkeypatch):
+        pytest.importorskip("manim")
+        from agents.tools.scene_runtime import labels
+
+        monkeypatch.setattr(labels, "_text_cache", type(labels._text_cache)())
+        return labels
+
+    def test_cached_text_renders_once(self, labels, monkeypatch):
+        rendered = []
+        real_text = labels.Text
+
+        def counting_text(text, **kwargs):
+            rendered.append(text)
+            return real_text(text, **kwargs)
+
+        monkeypatch.setattr(labels, "Text", counting_text)
+        first = labels.cached_text("Revenue", font_size=24, color=labels.RED)
+        second = labels.cached_text("Revenue", font_size=24, color=labels.BLUE)
+        assert rendered == ["Revenue"]
+        assert first is not second
+        labels.cached_text("Revenue", font_size=30)
+        assert rendered == ["Revenue", "Revenue"]
+
+    def test_cache_is_bounded(self, labels, monkeypatch):
+        monkeypatch.setattr(labels, "TEXT_CACHE_SIZE", 2)
+        for text in ("a", "b", "a", "c"):
+            labels.cached_text(text)
+        assert [key[0] for key in labels._text_cache] == ["a", "c"]
+
+    def test_glyph_text_matches_text_layout(self, labels):
+        label = labels.glyph_text("2024", font_size=36)
+        reference = labels.Text("2024", font_size=36)
+        assert abs(label.width - reference.width) < 0.05
+        assert abs(label.get_center()).max() < 1e-6
+
+    def test_number_label(self, labels):
+        number = labels.NumberLabel(0, num_decimal_places=1, font_size=48)
+        number.move_to(labels.RIGHT * 2)
+        number.set_value(12345.67)
+        assert number.get_value() == 12345.67
+        assert number.format_number(12345.67) == "12,345.7"
+        assert abs(number.get_center()[0] - 2) < 1e-6
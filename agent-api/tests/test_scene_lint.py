@@ -0,0 +1,281 @@
+"""
+Unit tests for the static scene linter.
+
+Tests cover:
+- Undefined names are reported with suggestions; module, builtin, prelude and scoped names are not
+- Name checks are skipped for unknown star imports and without a symbol table
+- Unknown keyword arguments to constructors with closed signatures
+- Unknown methods on constructed objects and on self in Scene subclasses
+- Dataset columns checked against read_csv paths and stored dataset profiles
+- Symbol table introspection and its version-keyed disk cache
+- quick_validate() reports lint issues
+"""
+
+import json
+import types
+
+import pytest
+
+from agents.tools import scene_lint
+from agents.tools.dataset_profile import build_profile, clear_profiles, register_profile
+from agents.tools.scene_lint import ManimSymbols, collect_symbols, lint_scene, load_manim_symbols
+from agents.tools.validate_manim import quick_validate
+
+
+SYMBOLS = ManimSymbols(
+    version="test",
+    names=["Scene", "Circle", "Square", "Create", "FadeIn", "VGroup", "BLUE", "RED", "UP"],
+    classes={
+        "Scene": {"params": [], "open": True, "attributes": ["add", "play", "wait"], "getattr": False},
+        "Circle": {
+            "params": ["radius", "color", "arc_center", "fill_opacity"],
+            "open": False,
+            "attributes": ["get_center", "set_color", "set_fill", "shift"],
+            "getattr": True,
+        },
+        "Create": {"params": ["mobject", "lag_ratio"], "open": True, "attributes": [], "getattr": False},
+    },
+)
+
+
+def lint(code, **kwargs):
+    kwargs.setdefault("symbols", SYMBOLS)
+    return lint_scene(code, **kwargs)
+
+
+def messages(report):
+    return [(issue.line, issue.code, issue.message) for issue in report.issues]
+
+
+class TestNames:
+    def test_undefined(self):
+        report = lint("class GenScene(Scene):\n    def construct(self):\n        self.play(Create(Squre()))\n")
+        assert messages(report) == [
+            (3, "undefined-name", "name 'Squre' is not defined; did you mean 'Square'?"),
+        ]
+        assert str(report.issues[0]) == "line 3: name 'Squre' is not defined; did you mean 'Square'?"
+
+    def test_defined_names(self):
+        code = '''
+import numpy as np
+from random import choice
+COLORS = [BLUE, RED]
+total = 0
+
+def helper(x, *rest, scale=1, **opts):
+    global total
+    total += x
+    return [y * scale for y in rest if y] + list(opts)
+
+class GenScene(Scene):
+    SIZE = 2
+    def construct(self):
+        tmp = os.path.join("a", "b")
+        c = Circle(radius=sqrt(self.SIZE) * pi, color=choice(COLORS))
+        items = {k: v for k, v in enumerate(range(3))}
+        with open(__file__) as f, config.x as y:
+            pass
+        try:
+            np.array(items, dtype=float)
+        except ValueError as e:
+            print(e, len(tmp), helper(1), c.shift(UP))
+        self.play(Create(c))
+'''
+        report = lint(code)
+        assert report.ok, report.summary()
+        assert "names" in report.checks
+
+    def test_class_scope_not_visible_in_methods(self):
+        code = "class GenScene(Scene):\n    SIZE = 2\n    def construct(self):\n        print(SIZE)\n"
+        assert [i.message for i in lint(code).issues] == ["name 'SIZE' is not defined"]
+
+    def test_unknown_star_import(self):
+        code = "from manim_slides import *\nclass GenScene(Slide):\n    def construct(self):\n        self.next_slide()\n"
+        report = lint(code)
+        assert report.ok
+        assert "names" not in report.checks
+
+    def test_without_symbol_table(self, monkeypatch):
+        monkeypatch.setattr(scene_lint, "load_manim_symbols", lambda: None)
+        report = lint_scene("class GenScene(Scene):\n    def construct(self):\n        Squre()\n")
+        assert report.ok and report.checks == []
+
+    def test_syntax_error_and_disabled(self, monkeypatch):
+        assert lint("class GenScene(Scene:\n").ok
+        monkeypatch.setenv("SCENE_LINT_ENABLED", "0")
+        assert lint("Squre()\n").ok
+
+
+class TestConstructors:
+    def test_unknown_kwarg(self):
+        report = lint("c = Circle(colour=BLUE, radius=1, **{'fill_opacity': 1})\n")
+        assert messages(report) == [
+            (1, "unknown-kwarg", "Circle() got an unexpected keyword argument 'colour'; did you mean 'color'?"),
+        ]
+
+    def test_open_signature(self):
+        assert lint("a = Create(Circle(), run_time=2)\n").ok
+
+    def test_shadowed_class(self):
+        code = "class Circle(VGroup):\n    def __init__(self, colour):\n        super().__init__()\n\nc = Circle(colour=BLUE)\nc.glow()\n"
+        assert lint(code).ok
+
+    def test_unknown_method(self):
+        code = "c = Circle()\nc.shift(UP)\nc.move_too(UP)\nCircle().shfit(RED)\n"
+        assert messages(lint(code)) == [
+            (3, "unknown-attribute", "'Circle' object has no attribute 'move_too'"),
+            (4, "unknown-attribute", "'Circle' object has no attribute 'shfit'; did you mean 'shift'?"),
+        ]
+
+    def test_dynamic_and_assigned_attributes(self):
+        # Mobject.__getattr__ serves get_*/set_*; attributes set by the scene are its own
+        code = "c = Circle()\nc.get_radius()\nc.set_colour(RED)\nc.pulse = lambda: None\nc.pulse()\n"
+        assert lint(code).ok
+
+    def test_reassigned_variable(self):
+        assert lint("c = Circle()\nc = VGroup()\nc.arrange()\n").ok
+
+    def test_scene_methods(self):
+        code = '''
+class GenScene(Scene):
+    def setup_axes(self):
+        self.axes = 1
+    def construct(self):
+        self.setup_axes()
+        self.wait(1)
+        self.wiat(1)
+        self.axes.plot()
+'''
+        assert messages(lint(code)) == [
+            (8, "unknown-attribute", "'GenScene' object has no attribute 'wiat'; did you mean 'wait'?"),
+        ]
+
+
+COLUMNS = {"data.csv": ["Country", "Year", "Population"]}
+
+
+class TestColumns:
+    def test_references(self):
+        code = '''
+import pandas as pd
+df = pd.read_csv("data.csv")
+df["Country"]
+df[["Year", "Populaton"]]
+df.groupby(["Country", "Yr"]).sum()
+df.pivot(index="Year", columns="Nation", values="Population")
+for _, row in df.iterrows():
+    print(row["Year"], row["Pop"])
+for rec in df.to_dict("records"):
+    print(rec["Cntry"])
+'''
+        report = lint(code, columns=COLUMNS)
+        assert "columns" in report.checks
+        assert [(i.line, i.message.split(" is not")[0]) for i in report.issues] == [
+            (5, "column 'Populaton'"),
+            (6, "column 'Yr'"),
+            (7, "column 'Nation'"),
+            (9, "column 'Pop'"),
+            (11, "column 'Cntry'"),
+        ]
+        assert "did you mean 'Population'?" in report.issues[0].message
+        assert "(columns: Country, Year, Population)" in report.issues[0].message
+
+    def test_added_column(self):
+        code = 'import pandas as pd\ndf = pd.read_csv("data.csv")\ndf["Growth"] = 1\nprint(df["Growth"])\n'
+        assert lint(code, columns=COLUMNS).ok
+
+    @pytest.mark.parametrize("code", [
+        'df = pd.read_csv("data.csv", usecols=[0])\nprint(df["X"])\n',
+        'df = pd.read_csv("data.csv")\ndf.rename(columns={"Year": "X"}, inplace=True)\nprint(df["X"])\n',
+        'df = pd.read_csv("data.csv")\ndf.columns = ["X", "Y", "Z"]\nprint(df["X"])\n',
+        'df = pd.read_csv("data.csv")\ndf = df.melt(id_vars=["Country"])\nprint(df["value"])\n',
+        'df = pd.read_csv("other.csv")\nprint(df["X"])\n',
+    ])
+    def test_not_checked(self, code):
+        assert lint("import pandas as pd\n" + code, columns=COLUMNS).ok
+
+    def test_dataset_profile(self, tmp_path):
+        csv_path = tmp_path / "population.csv"
+        csv_path.write_text("Country,Year,Population\nA,2000,10\nB,2000,20\n")
+        clear_profiles()
+        register_profile(build_profile(str(csv_path)))
+        try:
+            code = f'import pandas as pd\ndf = pd.read_csv({str(csv_path)!r})\nprint(df["Populaton"])\n'
+            report = lint(code)
+            assert [i.code for i in report.issues] == ["unknown-column"]
+            assert "population.csv" in report.issues[0].message
+        finally:
+            clear_profiles()
+
+
+class TestSymbolTable:
+    def test_collect(self):
+        class Mobject:
+            def __init__(self, color=None, name=None):
+                pass
+
+            def __getattr__(self, attr):
+                raise AttributeError(attr)
+
+            def shift(self):
+                pass
+
+        class Circle(Mobject):
+            def __init__(self, radius=1, **kwargs):
+                super().__init__(**kwargs)
+
+        class Create:
+            def __init__(self, mobject, **kwargs):
+                pass
+
+        module = types.ModuleType("fake_manim")
+        module.Mobject, module.Circle, module.Create, module.BLUE = Mobject, Circle, Create, "#00f"
+        module._private = 1
+
+        symbols = collect_symbols(module, "1.0")
+        assert symbols.names == ["BLUE", "Circle", "Create", "Mobject"]
+        circle = symbols.classes["Circle"]
+        assert circle["params"] == ["color", "name", "radius"]
+        assert not circle["open"] and circle["getattr"]
+        assert "shift" in circle["attributes"]
+        assert symbols.classes["Create"]["open"]
+
+    def test_disk_cache(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "symbols.json")
+        builds = []
+
+        def build(target):
+            builds.append(target)
+            with open(target, "w") as f:
+                json.dump(ManimSymbols(version=scene_lint.manim_version(), names=["Circle"]).to_dict(), f)
+
+        monkeypatch.setattr(scene_lint, "_build_symbols", build)
+        monkeypatch.setattr(scene_lint, "manim_version", lambda: "0.18.0")
+        try:
+            assert load_manim_symbols(path, refresh=True).names == ["Circle"]
+            assert load_manim_symbols(path, refresh=True).version == "0.18.0"
+            assert len(builds) == 1
+            # A different manim version rebuilds
+            monkeypatch.setattr(scene_lint, "manim_version", lambda: "0.19.0")
+            assert load_manim_symbols(path, refresh=True).version == "0.19.0"
+            assert len(builds) == 2
+        finally:
+            monkeypatch.undo()
+            load_manim_symbols(refresh=True)
+
+    def test_manim_missing(self, monkeypatch):
+        monkeypatch.setattr(scene_lint, "manim_version", lambda: None)
+        try:
+            assert load_manim_symbols(refresh=True) is None
+        finally:
+            monkeypatch.undo()
+            load_manim_symbols(refresh=True)
+
+
+class TestQuickValidate:
+    def test_reports_lint_issue(self, monkeypatch):
+        monkeypatch.setattr(scene_lint, "load_manim_symbols", lambda: SYMBOLS)
+        code = "class GenScene(Scene):\n    def construct(self):\n        self.play(Create(Squre()))\n"
+        result = quick_validate(code)
+        assert not result.ok
+        assert result.error == "Static check failed: line 3: name 'Squre' is not defined; did you mean 'Square'?"
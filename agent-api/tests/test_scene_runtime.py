@@ -0,0 +1,179 @@
+"""
+Unit tests for the template scene runtime.
+
+Tests cover:
+- Generated template scenes are a fixed few lines that pass quick_validate
+- The generated configuration loads back with exactly the runtime module's CONFIG_KEYS
+- TemplateScene is abstract and forwards scene attributes (AttributeError
+  before it is bound, for copy/pickle); apply_config rejects missing/unknown keys
+- runtime_env puts the runtime root on PYTHONPATH once
+- With manim installed (the scene-smoke CI job): every template's scene constructs
+  on a tiny dataset, in a dry-run worker and in-process
+"""
+
+import ast
+import copy
+import os
+from pathlib import Path
+
+import pytest
+
+from agents.tools import scene_runtime
+from agents.tools.scene_runtime import RUNTIME_ROOT, runtime_env
+from agents.tools.scene_runtime.base import TemplateScene, apply_config
+from agents.tools.scene_runtime.data import load_scene_data
+from agents.tools.templates.count_bar import generate_count_bar
+from agents.tools.templates.scene_data import template_scene_code
+from agents.tools.validate_manim import quick_validate
+
+
+RUNTIME_DIR = Path(scene_runtime.__file__).parent
+TEMPLATE_MODULES = [
+    "bar_race", "bento_grid", "bubble_chart", "count_bar", "distribution", "line_evolution", "single_numeric",
+]
+
+
+def _config_keys(module: str):
+    """CONFIG_KEYS of a runtime module, read without importing manim."""
+    tree = ast.parse((RUNTIME_DIR / f"{module}.py").read_text())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and getattr(node.targets[0], "id", None) == "CONFIG_KEYS":
+            return list(ast.literal_eval(node.value))
+    raise AssertionError(f"{module} has no CONFIG_KEYS")
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    path = tmp_path / "store"
+    monkeypatch.setattr("agents.tools.templates.scene_data.SCENE_DATA_DIR", str(path))
+    return path
+
+
+class _Spec:
+    title = "Phones"
+    subtitle = None
+    timing = None
+
+    class data_binding:
+        group_col = "Brand"
+        category_col = None
+
+
+class TestTemplateSceneCode:
+    def test_sidecar_scene(self, store, tmp_path):
+        values = {"TIMES": ["2020", "2021"], "DATA": {"2020": {"a": 1.0}, "2021": {"a": 2.5}}, "TITLE": 'Say "hi"'}
+        code = template_scene_code("bar_race", "BarRaceScene", values, comment="Theme: dark")
+        assert quick_validate(code).ok
+        assert "from agents.tools.scene_runtime import bar_race as template" in code
+        assert "template.BarRaceScene(self).construct()" in code
+        assert "# Theme: dark" in code
+        assert len(code.splitlines()) == 11
+
+        call = ast.parse(code).body[-2].value.args[0]
+        name, store_dir = (arg.value for arg in call.args)
+        assert load_scene_data(name, store_dir, str(tmp_path / "scene.py")) == values
+
+    def test_literal_fallback(self, store, monkeypatch):
+        monkeypatch.setattr("agents.tools.templates.scene_data.SCENE_DATA_ENABLED", False)
+        code = template_scene_code("count_bar", "CountBarScene", {"COUNTS": [1, 2], "TITLE": "x"})
+        assert 'template.configure({\n    "COUNTS": [1, 2],\n    "TITLE": \'x\',\n})' in code
+        assert "load_scene_data" not in code
+        assert quick_validate(code).ok
+
+    def test_count_bar_config_matches_runtime(self, store, tmp_path):
+        csv_path = tmp_path / "phones.csv"
+        csv_path.write_text("Brand,Year\nA,2020\nB,2020\nA,2021\n")
+        code = generate_count_bar(_Spec(), str(csv_path))
+        assert len(code) < 1000
+
+        call = ast.parse(code).body[-2].value.args[0]
+        name, store_dir = (arg.value for arg in call.args)
+        config = load_scene_data(name, store_dir, str(tmp_path / "scene.py"))
+        assert list(config) == _config_keys("count_bar")
+        assert config["CATEGORIES"] == ["A", "B"] and config["COUNTS"] == [2, 1]
+        assert config["STORY_TITLE"] == "Phones"
+
+    @pytest.mark.parametrize("module", TEMPLATE_MODULES)
+    def test_runtime_modules_define_config(self, module):
+        tree = ast.parse((RUNTIME_DIR / f"{module}.py").read_text())
+        assigned = {
+            t.id for node in tree.body if isinstance(node, ast.Assign)
+            for t in ast.walk(node) if isinstance(t, ast.Name) and isinstance(t.ctx, ast.Store)
+        }
+        assert set(_config_keys(module)) <= assigned
+        classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+        assert any(base.id == "TemplateScene" for cls in classes for base in cls.bases)
+
+
+class TestBase:
+    def test_template_scene_forwards(self):
+        class FakeScene:
+            camera = "camera"
+
+            def play(self, *animations):
+                return animations
+
+        class Template(TemplateScene):
+            def construct(self):
+                pass
+
+        template = Template(FakeScene())
+        assert template.camera == "camera"
+        assert template.play(1, 2) == (1, 2)
+        template.chart_elements = [1]
+        assert not hasattr(template.scene, "chart_elements")
+        # copy builds the instance without __init__ and probes it first
+        assert copy.copy(template).camera == "camera"
+        unbound = Template.__new__(Template)
+        assert not hasattr(unbound, "camera")
+
+    def test_template_scene_is_abstract(self):
+        with pytest.raises(TypeError):
+            TemplateScene(object())
+
+    def test_apply_config(self):
+        namespace = {"A": None}
+        apply_config(namespace, ("A",), {"A": 1})
+        assert namespace["A"] == 1
+        with pytest.raises(KeyError):
+            apply_config(namespace, ("A", "B"), {"A": 1, "C": 2})
+
+    def test_runtime_env(self):
+        env = runtime_env({"PYTHONPATH": "/opt/lib"})
+        assert env["PYTHONPATH"] == os.pathsep.join([RUNTIME_ROOT, "/opt/lib"])
+        assert runtime_env(env)["PYTHONPATH"] == env["PYTHONPATH"]
+        assert (Path(RUNTIME_ROOT) / "agents" / "tools" / "scene_runtime").is_dir()
+
+
+@pytest.fixture(scope="module")
+def dry_run_pool():
+    pytest.importorskip("manim")
+    from agents.tools.dry_run import DryRunPool
+
+    pool = DryRunPool(max_workers=1, timeout=60.0)
+    yield pool
+    pool.close()
+
+
+class TestTemplateSmoke:
+    """Build each template on a tiny dataset (conftest.TEMPLATE_DATASETS); with manim, run its scene."""
+
+    @pytest.mark.parametrize("template", TEMPLATE_MODULES)
+    def test_generates(self, template, template_code):
+        code = template_code(template)
+        assert quick_validate(code).ok
+        assert f"scene_runtime import {template} as template" in code
+
+    @pytest.mark.parametrize("template", TEMPLATE_MODULES)
+    def test_constructs(self, template, template_code, dry_run_pool):
+        from agents.tools.dry_run import dry_run_scene
+
+        result = dry_run_scene(template_code(template), pool=dry_run_pool)
+        assert result.ok and not result.skipped, result.details or result.error
+        assert result.plays > 0
+
+    @pytest.mark.parametrize("template", TEMPLATE_MODULES)
+    def test_renders(self, template, render_template):
+        scene = render_template(template)
+        assert isinstance(scene.template, TemplateScene)
+        assert scene.renderer.num_plays > 0
@@ -0,0 +1,340 @@
+"""
+Unit tests for the shared state backend and the registries built on it.
+
+Tests cover:
+- Memory and SQL (SQLite) backends: get/put/delete, TTL expiry, get_many, items, purge
+- Atomic update(), including optimistic retries when writers conflict
+- Run registry in shared mode: state visible to other workers, local Popen ownership
+- Cross-process cancellation through cancel signals (and owners that are gone)
+- Finished runs keep their terminal state
+- Session contexts and the dataset registry in shared mode (and while the backend is down)
+- Backend selection from the environment
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+from api import run_registry
+from api.run_registry import RunInfo, RunState
+from api.session_context import (
+    clear_session_pending_selection,
+    get_session_context,
+    update_session_context,
+)
+from api.state_backend import (
+    RUNS,
+    MemoryStateBackend,
+    SQLStateBackend,
+    StateBackendError,
+    create_state_backend,
+    set_state_backend,
+)
+
+
+AGENT_API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(params=["memory", "sql"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        store = MemoryStateBackend()
+    else:
+        store = SQLStateBackend(f"sqlite:///{tmp_path / 'state.sqlite3'}")
+    yield store
+    store.close()
+
+
+class FlakyBackend(MemoryStateBackend):
+    """Shared-mode memory backend whose reads and writes fail while ``down``."""
+
+    shared = True
+    down = False
+
+    def _check(self):
+        if self.down:
+            raise StateBackendError("state backend error: connection refused")
+
+    def get(self, namespace, key):
+        self._check()
+        return super().get(namespace, key)
+
+    def items(self, namespace):
+        self._check()
+        return super().items(namespace)
+
+    def put(self, namespace, key, value, ttl=None):
+        self._check()
+        super().put(namespace, key, value, ttl=ttl)
+
+    def delete(self, namespace, key):
+        self._check()
+        return super().delete(namespace, key)
+
+
+@pytest.fixture
+def dataset_registry(monkeypatch):
+    # db.session builds its engine (without connecting) at import time
+    monkeypatch.setenv("DB_PORT", os.getenv("DB_PORT") or "5432")
+    from api.routes import datasets
+
+    return datasets
+
+
+@pytest.fixture
+def shared(tmp_path):
+    """Install a SQLite-backed shared backend for the registries."""
+    url = f"sqlite:///{tmp_path / 'shared.sqlite3'}"
+    store = SQLStateBackend(url)
+    set_state_backend(store)
+    run_registry._registry.clear()
+    yield store
+    run_registry._registry.clear()
+    set_state_backend(None)
+
+
+class TestBackends:
+    def test_get_put_delete(self, backend):
+        assert backend.get("ns", "a") is None
+        backend.put("ns", "a", {"x": 1, "items": [1, 2]})
+        backend.put("other", "a", {"x": 2})
+        assert backend.get("ns", "a") == {"x": 1, "items": [1, 2]}
+        backend.put("ns", "a", {"x": 3})
+        assert backend.get("ns", "a") == {"x": 3}
+        assert backend.delete("ns", "a")
+        assert not backend.delete("ns", "a")
+        assert backend.get("other", "a") == {"x": 2}
+
+    def test_values_are_copies(self, backend):
+        value = {"items": [1]}
+        backend.put("ns", "a", value)
+        value["items"].append(2)
+        backend.get("ns", "a")["items"].append(3)
+        assert backend.get("ns", "a") == {"items": [1]}
+
+    def test_ttl(self, backend):
+        backend.put("ns", "short", {"v": 1}, ttl=0.05)
+        backend.put("ns", "long", {"v": 2}, ttl=60)
+        backend.put("ns", "forever", {"v": 3})
+        time.sleep(0.1)
+        assert backend.get("ns", "short") is None
+        assert backend.get_many("ns", ["short", "long", "missing"]) == {"long": {"v": 2}}
+        assert backend.items("ns") == {"long": {"v": 2}, "forever": {"v": 3}}
+        backend.purge_expired()
+        assert backend.update("ns", "short", lambda cur: cur) is None
+
+    def test_update(self, backend):
+        assert backend.update("ns", "k", lambda cur: None) is None
+        assert backend.get("ns", "k") is None
+        assert backend.update("ns", "k", lambda cur: {"n": 1} if cur is None else cur) == {"n": 1}
+        assert backend.update("ns", "k", lambda cur: {"n": cur["n"] + 1}) == {"n": 2}
+        # None from fn keeps the stored value
+        assert backend.update("ns", "k", lambda cur: None) == {"n": 2}
+
+    def test_concurrent_updates(self, backend):
+        backend.put("ns", "counter", {"n": 0})
+
+        def bump():
+            for _ in range(20):
+                backend.update("ns", "counter", lambda cur: {"n": cur["n"] + 1})
+
+        threads = [threading.Thread(target=bump) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert backend.get("ns", "counter") == {"n": 80}
+
+    def test_sql_shared_between_instances(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'state.sqlite3'}"
+        first, second = SQLStateBackend(url), SQLStateBackend(url)
+        try:
+            first.put("ns", "k", {"v": 1})
+            assert second.get("ns", "k") == {"v": 1}
+            assert first.shared and not MemoryStateBackend().shared
+        finally:
+            first.close()
+            second.close()
+
+    def test_create_from_env(self, monkeypatch, tmp_path):
+        monkeypatch.delenv("STATE_BACKEND", raising=False)
+        assert isinstance(create_state_backend(), MemoryStateBackend)
+        monkeypatch.setenv("STATE_BACKEND", "sql")
+        monkeypatch.setenv("STATE_BACKEND_URL", f"sqlite:///{tmp_path / 'env.sqlite3'}")
+        store = create_state_backend()
+        assert isinstance(store, SQLStateBackend)
+        store.close()
+        monkeypatch.setenv("STATE_BACKEND", "redis")
+        with pytest.raises(ValueError):
+            create_state_backend()
+
+
+class TestRunRegistryShared:
+    def test_state_visible_to_other_workers(self, shared):
+        info = run_registry.create_run(user_id="u1", session_id="s1", message="start")
+        run_registry.set_state(info.run_id, RunState.AWAITING_TEMPLATE_SELECTION)
+        run_registry.set_pending_template_selection(info.run_id, [{"template_id": "bubble"}], csv_path="/d.csv")
+
+        # Another worker has no local entry; it reads the shared state
+        run_registry._registry.clear()
+        run = run_registry.get_run(info.run_id)
+        assert run is not info
+        assert run.state == RunState.AWAITING_TEMPLATE_SELECTION
+        assert run.owner == info.owner
+        assert run_registry.get_pending_template_selection(info.run_id)["csv_path"] == "/d.csv"
+        run_registry.clear_pending_template_selection(info.run_id)
+        assert run_registry.get_pending_template_selection(info.run_id) is None
+        assert [r["run_id"] for r in run_registry.list_runs()] == [info.run_id]
+
+        run_registry.complete_run(info.run_id, "done")
+        assert shared.get(RUNS, info.run_id)["state"] == "COMPLETED"
+        assert run_registry.remove_run(info.run_id)
+        assert run_registry.get_run(info.run_id) is None
+
+    def test_owner_keeps_processes(self, shared):
+        info = run_registry.create_run()
+        popen = run_registry.start_tracked_process(
+            info.run_id, [sys.executable, "-c", "import time; time.sleep(30)"], role="preview",
+        )
+        try:
+            # The owner's run is the local object, refreshed from shared state
+            run_registry.update_message(info.run_id, "rendering")
+            run = run_registry.get_run(info.run_id)
+            assert run is info and run.message == "rendering"
+            assert run.processes["preview"].popen is popen
+            stored = RunInfo.from_state(shared.get(RUNS, info.run_id))
+            assert stored.processes["preview"].pid == popen.pid
+            assert stored.processes["preview"].is_running()
+
+            assert run_registry.cancel_run(info.run_id, reason="test", grace_seconds=2)
+            assert popen.poll() is not None
+            assert shared.get(RUNS, info.run_id)["state"] == "CANCELED"
+        finally:
+            if popen.poll() is None:
+                popen.kill()
+
+    def test_cancel_run_owned_by_another_process(self, shared, tmp_path):
+        script = tmp_path / "owner.py"
+        script.write_text(textwrap.dedent("""
+            import sys, time
+            from api import run_registry
+            info = run_registry.create_run(message="owned elsewhere")
+            run_registry.start_tracked_process(
+                info.run_id, [sys.executable, "-c", "import time; time.sleep(60)"], role="preview",
+            )
+            print(info.run_id, flush=True)
+            time.sleep(60)
+        """))
+        env = dict(os.environ, STATE_BACKEND="sql", STATE_BACKEND_URL=shared.url, RUN_CANCEL_POLL_SECONDS="0.1")
+        env["PYTHONPATH"] = AGENT_API_DIR + os.pathsep + env.get("PYTHONPATH", "")
+        owner = subprocess.Popen(
+            [sys.executable, str(script)], cwd=AGENT_API_DIR, env=env, stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            run_id = owner.stdout.readline().strip()
+            assert run_id
+            child_pid = run_registry.get_run(run_id).processes["preview"].pid
+
+            assert run_registry.cancel_run(run_id, reason="user_request", grace_seconds=1)
+            run = run_registry.get_run(run_id)
+            assert run.state == RunState.CANCELED
+            assert run.message == "Canceled: user_request"
+            # The owner killed its subprocess
+            deadline = time.time() + 5
+            while time.time() < deadline and RunInfo.from_state(shared.get(RUNS, run_id)).processes["preview"].is_running():
+                time.sleep(0.05)
+            with pytest.raises(ProcessLookupError):
+                os.kill(child_pid, 0)
+        finally:
+            owner.kill()
+            owner.wait()
+
+    def test_cancel_run_with_gone_owner(self, shared, monkeypatch):
+        monkeypatch.setattr(run_registry, "CANCEL_POLL_SECONDS", 0.05)
+        info = RunInfo(run_id="orphan", state=RunState.PREVIEWING, owner="elsewhere:1")
+        shared.put(RUNS, info.run_id, info.to_dict())
+
+        assert run_registry.cancel_run("orphan", reason="user_request", grace_seconds=0)
+        assert run_registry.get_run("orphan").state == RunState.CANCELED
+        assert not run_registry.cancel_run("missing")
+
+    def test_terminal_states_stick(self, shared):
+        info = run_registry.create_run()
+        run_registry.cancel_run(info.run_id, reason="user_request")
+        assert run_registry.is_canceled(info.run_id)
+        run_registry.set_state(info.run_id, RunState.RENDERING, "Rendering...")
+        run_registry.complete_run(info.run_id, "done")
+        run_registry.fail_run(info.run_id, "boom")
+        run = run_registry.get_run(info.run_id)
+        assert run.state == RunState.CANCELED
+        assert run.message == "Canceled: user_request"
+        assert run.error is None
+
+        done = run_registry.create_run()
+        run_registry.complete_run(done.run_id, "Render completed.")
+        run_registry.fail_run(done.run_id, "late failure")
+        # Completing again only updates the message
+        run_registry.complete_run(done.run_id, "Completed")
+        run = run_registry.get_run(done.run_id)
+        assert (run.state, run.message, run.error) == (RunState.COMPLETED, "Completed", None)
+        assert not run_registry.is_canceled(done.run_id)
+
+    def test_poll_forgets_finished_runs(self, shared):
+        info = run_registry.create_run()
+        run_registry.complete_run(info.run_id)
+        assert info.run_id in run_registry._registry
+        run_registry.poll_cancel_signals()
+        assert info.run_id not in run_registry._registry
+        assert run_registry.get_run(info.run_id).state == RunState.COMPLETED
+
+
+class TestSessionAndDatasetsShared:
+    def test_session_context(self, shared):
+        update_session_context("s1", csv_path="/a.csv", data_binding={"x": "gdp"})
+        update_session_context(
+            "s1", data_binding={"y": "pop"}, pending_template_suggestions=[{"id": 1}], pending_run_id="r1",
+        )
+        ctx = get_session_context("s1")
+        assert ctx.csv_path == "/a.csv"
+        assert ctx.data_binding == {"x": "gdp", "y": "pop"}
+        assert ctx.has_pending_template_selection()
+
+        clear_session_pending_selection("s1")
+        ctx = get_session_context("s1")
+        assert not ctx.has_pending_template_selection() and ctx.pending_run_id is None
+        assert ctx.csv_path == "/a.csv"
+
+    def test_dataset_registry(self, shared, dataset_registry):
+        meta = dataset_registry.DatasetMeta(dataset_id="d1", created_at=1, columns=["a", "b"])
+        dataset_registry.register_dataset(meta)
+        assert dataset_registry.lookup_dataset("d1") == meta
+        assert [m.dataset_id for m in dataset_registry.list_registered_datasets()] == ["d1"]
+        assert dataset_registry.unregister_dataset("d1")
+        assert dataset_registry.lookup_dataset("d1") is None
+
+    def test_dataset_registry_backend_down(self, dataset_registry, monkeypatch):
+        store = FlakyBackend()
+        set_state_backend(store)
+        monkeypatch.setattr(dataset_registry, "_DATASET_REGISTRY", {})
+        try:
+            store.put("datasets", "shared", {"dataset_id": "shared", "created_at": 1})
+            store.down = True
+            # An outage degrades to this worker's registry instead of a 500
+            meta = dataset_registry.DatasetMeta(dataset_id="d2", created_at=2)
+            dataset_registry.register_dataset(meta)
+            assert dataset_registry.lookup_dataset("d2") == meta
+            assert dataset_registry.lookup_dataset("shared") is None
+            assert [m.dataset_id for m in dataset_registry.list_registered_datasets()] == ["d2"]
+
+            store.down = False
+            assert dataset_registry.lookup_dataset("d2") == meta
+            assert {m.dataset_id for m in dataset_registry.list_registered_datasets()} == {"d2", "shared"}
+            assert dataset_registry.unregister_dataset("d2")
+            assert dataset_registry.lookup_dataset("d2") is None
+        finally:
+            set_state_backend(None)
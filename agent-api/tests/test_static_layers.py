@@ -0,0 +1,120 @@
+"""
+Unit tests for pre-rasterized static scene layers.
+
+Tests cover:
+- freeze() draws mobjects over the current background once and removes them from the scene
+- Later freezes build on earlier ones; thaw() restores the background and mobjects
+- Renderers without a pixel background leave the scene untouched
+- Template scenes draw their axes/labels into the camera background (requires manim)
+"""
+
+import numpy as np
+import pytest
+
+from agents.tools.scene_runtime.static_layers import StaticLayer
+
+
+class FakeCamera:
+    """Cairo-style camera: frames start from ``background``; mobjects are ints added to pixels."""
+
+    def __init__(self):
+        self.background = np.zeros((2, 2))
+        self.pixel_array = self.background.copy()
+        self.captures = []
+
+    def reset(self):
+        self.pixel_array[:] = self.background
+
+    def capture_mobjects(self, mobjects):
+        self.captures.append(list(mobjects))
+        for mob in mobjects:
+            self.pixel_array += mob
+
+    def set_background(self, pixel_array):
+        self.background = pixel_array
+
+
+class FakeScene:
+    def __init__(self, *mobjects):
+        self.camera = FakeCamera()
+        self.mobjects = list(mobjects)
+
+    def remove(self, *mobjects):
+        self.mobjects = [m for m in self.mobjects if not any(m is x for x in mobjects)]
+
+    def bring_to_back(self, *mobjects):
+        self.remove(*mobjects)
+        self.mobjects = list(mobjects) + self.mobjects
+
+
+class TestStaticLayer:
+    def test_freeze(self):
+        axes, labels, bar = 1, 10, 100
+        scene = FakeScene(axes, labels, bar)
+        layer = StaticLayer(scene)
+
+        assert layer.freeze(axes, labels, None)
+        assert scene.mobjects == [bar]
+        assert scene.camera.captures == [[axes, labels]]
+        assert (scene.camera.background == 11).all()
+        # The background is a copy, not the live frame buffer
+        assert scene.camera.background is not scene.camera.pixel_array
+
+    def test_freeze_accumulates_and_thaws(self):
+        scene = FakeScene(1, 10, 100)
+        original = scene.camera.background
+        layer = StaticLayer(scene)
+
+        layer.freeze(1)
+        layer.freeze(10)
+        assert (scene.camera.background == 11).all()
+
+        layer.thaw()
+        assert scene.camera.background is original
+        assert scene.mobjects == [1, 10, 100]
+        assert layer.mobjects == []
+
+    def test_unsupported_renderer(self):
+        scene = FakeScene(1, 2)
+        scene.camera = type("OpenGLCamera", (), {})()
+        layer = StaticLayer(scene)
+        assert not layer.supported
+        assert not layer.freeze(1)
+        assert scene.mobjects == [1, 2]
+        layer.thaw()
+        assert scene.mobjects == [1, 2]
+
+
+class TestTemplates:
+    """Constructed template scenes (requires manim; datasets from conftest)."""
+
+    @pytest.fixture
+    def freezes(self, monkeypatch):
+        """Record every StaticLayer.freeze(): (result, mobjects, background before/after, scene mobjects after)."""
+        calls = []
+        real_freeze = StaticLayer.freeze
+
+        def recording_freeze(layer, *mobjects):
+            camera = layer.scene.camera
+            before = np.array(camera.background, copy=True)
+            frozen = real_freeze(layer, *mobjects)
+            after = np.array(camera.background, copy=True)
+            calls.append((frozen, [m for m in mobjects if m is not None], before, after, list(layer.scene.mobjects)))
+            return frozen
+
+        monkeypatch.setattr(StaticLayer, "freeze", recording_freeze)
+        return calls
+
+    @pytest.mark.parametrize("module", ["bubble_chart", "distribution", "line_evolution"])
+    def test_axes_drawn_into_background(self, module, render_template, freezes):
+        scene = render_template(module)
+        assert freezes
+        frozen, mobjects, before, after, remaining = freezes[0]
+        assert frozen and mobjects[0] is scene.template.axes
+        # Rasterized into the background and removed from the scene
+        assert (after != before).any()
+        assert not any(mob is top for mob in mobjects for top in remaining)
+        layer = scene.template.static_layer
+        assert all(any(mob is kept for kept in layer.mobjects) for mob in mobjects)
+        # Still the background when the scene ends
+        assert np.array_equal(scene.camera.background, freezes[-1][3])
@@ -0,0 +1,154 @@
+"""
+Unit tests for the streaming CSV profiler.
+
+Tests cover:
+- HyperLogLog accuracy and exact small-cardinality counts
+- Reservoir sample size and file order across chunks
+- Type votes, null ratios and numeric stats over the whole file
+- Distinct counts do not depend on the dtype pandas infers per chunk
+- Bounded scans (max_rows) estimate the row count
+- Parallel scans split between rows (not inside quoted fields) and merge to
+  the single-pass profile
+- analyze_schema() sees rows beyond the old head-of-file sample, up to its bound
+"""
+
+import numpy as np
+import pytest
+
+from agents.tools.chart_inference import analyze_schema
+from agents.tools.stream_profiler import HyperLogLog, _split_offsets, profile_csv
+
+
+def _write(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+class TestHyperLogLog:
+    """Tests for the HyperLogLog sketch."""
+
+    def test_estimate_within_error(self):
+        import pandas as pd
+
+        hll = HyperLogLog()
+        values = np.arange(200_000, dtype=np.float64)
+        hll.add_hashes(pd.util.hash_array(values))
+        hll.add_hashes(pd.util.hash_array(values[:50_000]))  # duplicates
+        assert abs(hll.estimate() - 200_000) / 200_000 < 0.03
+
+    def test_merge(self):
+        import pandas as pd
+
+        a, b = HyperLogLog(), HyperLogLog()
+        a.add_hashes(pd.util.hash_array(np.arange(0, 30_000, dtype=np.float64)))
+        b.add_hashes(pd.util.hash_array(np.arange(20_000, 50_000, dtype=np.float64)))
+        a.merge(b)
+        assert abs(a.estimate() - 50_000) / 50_000 < 0.03
+
+
+class TestProfileCsv:
+    """Tests for profile_csv()."""
+
+    def test_column_stats_across_chunks(self, tmp_path):
+        lines = ["name,year,value,note"]
+        lines += [f"E{i % 7},{1990 + i % 20},{i},{'' if i % 4 == 0 else 'x'}" for i in range(1000)]
+        path = _write(tmp_path / "data.csv", lines)
+
+        profile = profile_csv(path, chunk_rows=64, sample_size=50)
+
+        assert profile.row_count == 1000 and profile.chunks == 16
+        name, year, value, note = profile.columns
+        assert name.distinct == 7 and name.distinct_exact
+        assert year.year_ratio == 1.0 and year.distinct == 20
+        assert (value.numeric_min, value.numeric_max, value.mean) == (0.0, 999.0, 499.5)
+        assert value.all_numeric and not name.all_numeric
+        assert note.null_ratio == 0.25
+
+        sample = value.sample()
+        assert len(sample) == 50
+        assert sample == sorted(sample)  # file order
+
+    @pytest.mark.parametrize("chunk_rows", [10, 100])
+    def test_distinct_independent_of_chunk_dtype(self, tmp_path, chunk_rows):
+        # Chunks without the text value parse as float64, the one with it as object
+        lines = ["v"] + ["x" if i == 55 else f"{i % 4}" for i in range(100)] + ["-0", "2.0"]
+        profile = profile_csv(_write(tmp_path / "mixed.csv", lines), chunk_rows=chunk_rows)
+        assert profile.columns[0].distinct == 5
+
+    def test_max_rows_estimates_row_count(self, tmp_path):
+        lines = ["name,value"] + [f"E{i % 5},{i:06d}" for i in range(200_000)]
+        profile = profile_csv(_write(tmp_path / "big.csv", lines), chunk_rows=10_000, max_rows=20_000)
+        assert not profile.complete
+        assert profile.rows_scanned == 20_000
+        assert profile.columns[1].numeric_max == 19_999
+        assert abs(profile.row_count - 200_000) / 200_000 < 0.05
+
+    def test_max_rows_at_end_of_file(self, tmp_path):
+        lines = ["name,value"] + [f"E{i % 5},{i}" for i in range(100)]
+        profile = profile_csv(_write(tmp_path / "small.csv", lines), chunk_rows=30, max_rows=100)
+        assert profile.complete and profile.row_count == profile.rows_scanned == 100
+
+    def test_header_only(self, tmp_path):
+        profile = profile_csv(_write(tmp_path / "empty.csv", ["a,b"]))
+        assert profile.row_count == 0
+        assert [c.name for c in profile.columns] == ["a", "b"]
+
+
+class TestParallelScan:
+    """Tests for profiling byte ranges in worker processes."""
+
+    @staticmethod
+    def _quoted_csv(tmp_path):
+        lines = ["name,note,value"]
+        for i in range(3000):
+            if i % 7 == 0:
+                note = f'"line {i}\nsecond, ""quoted"" {i % 3}"'
+            else:
+                note = "" if i % 5 == 0 else f"n{i % 11}"
+            lines.append(f"E{i % 13},{note},{i if i % 9 else 'x'}")
+        return _write(tmp_path / "quoted.csv", lines)
+
+    def test_splits_outside_quotes(self, tmp_path):
+        path = self._quoted_csv(tmp_path)
+        data = open(path, "rb").read()
+        start = data.index(b"\n") + 1
+        with open(path, "rb") as handle:
+            offsets = _split_offsets(handle, start, len(data), 50)
+        assert len(offsets) == 49 and offsets == sorted(offsets)
+        for offset in offsets:
+            assert data[offset - 1:offset] == b"\n"
+            assert data.count(b'"', start, offset) % 2 == 0
+
+    def test_matches_single_pass(self, tmp_path):
+        path = self._quoted_csv(tmp_path)
+        single = profile_csv(path, chunk_rows=100, workers=1)
+        parallel = profile_csv(path, chunk_rows=100, workers=2)
+
+        assert parallel.chunks > single.chunks  # both workers ran
+        assert parallel.row_count == single.row_count == 3000
+        for a, b in zip(single.columns, parallel.columns, strict=True):
+            expected = a.to_dict()
+            expected["mean"] = pytest.approx(expected["mean"]) if expected["mean"] is not None else None
+            assert b.to_dict() == expected
+        sample = parallel.columns[0].sample()
+        assert len(sample) == 500 and set(sample) <= {f"E{i}" for i in range(13)}
+
+
+class TestAnalyzeSchemaFullFile:
+    """analyze_schema() reflects the whole file, not the first rows."""
+
+    def test_late_text_value_changes_type(self, tmp_path):
+        lines = ["entity,score"] + [f"E{i % 9},{i}" for i in range(2000)] + ["E1,n/a-late"]
+        schema = analyze_schema(_write(tmp_path / "late.csv", lines))
+
+        assert schema.row_count == 2001
+        assert "score" in schema.categorical_columns
+        assert schema.unique_counts["entity"] == 9
+
+    def test_scan_bound(self, tmp_path):
+        lines = ["entity,score"] + [f"E{i % 9},{i:06d}" for i in range(200_000)] + ["E1,n/a-late"]
+        path = _write(tmp_path / "bounded.csv", lines)
+        bounded = analyze_schema(path, max_rows=1000)
+        assert "score" in bounded.numeric_columns
+        assert abs(bounded.row_count - 200_001) / 200_001 < 0.05
+        assert "score" in analyze_schema(path, max_rows=0).categorical_columns
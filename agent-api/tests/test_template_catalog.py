@@ -0,0 +1,82 @@
+"""
+Unit tests for the cached template catalog.
+
+Tests cover:
+- Gallery routes send strong ETags and Cache-Control, and answer If-None-Match with 304
+- The snapshot is reused until the previews directory changes or it is invalidated
+- Preview URLs and ETags follow the files in the previews directory
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import templates
+from api.routes.templates import get_preview_urls, invalidate_template_catalog, template_catalog
+
+
+@pytest.fixture
+def previews_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(template_catalog, "previews_dir", tmp_path)
+    monkeypatch.setattr(template_catalog, "poll_seconds", 0.0)
+    invalidate_template_catalog()
+    yield tmp_path
+    invalidate_template_catalog()
+
+
+@pytest.fixture
+def client(previews_dir):
+    app = FastAPI()
+    app.include_router(templates.router)
+    return TestClient(app)
+
+
+class TestConditionalRequests:
+    def test_list_etag_and_304(self, client):
+        first = client.get("/templates")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert etag.startswith('"') and "max-age" in first.headers["cache-control"]
+        assert first.json()["total"] == len(first.json()["templates"])
+
+        again = client.get("/templates", headers={"If-None-Match": f'"other", {etag}'})
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["etag"] == etag
+
+    def test_detail_etag_and_404(self, client):
+        resp = client.get("/templates/bar_race")
+        assert resp.status_code == 200
+        assert resp.json()["template_id"] == "bar_race"
+        cached = client.get("/templates/bar_race", headers={"If-None-Match": "W/" + resp.headers["etag"]})
+        assert cached.status_code == 304
+        assert client.get("/templates/nope").status_code == 404
+
+
+class TestInvalidation:
+    def test_snapshot_reused(self, previews_dir):
+        assert template_catalog.snapshot() is template_catalog.snapshot()
+
+    def test_new_preview_file_changes_urls_and_etag(self, client, previews_dir):
+        before = client.get("/templates")
+        assert get_preview_urls("bubble") == (None, None)
+
+        # preview_url always carries the expected GIF path; the fallback does not
+        (previews_dir / "bubble_placeholder.svg").write_text("<svg/>")
+        (previews_dir / "bubble.gif").write_bytes(b"GIF89a")
+        invalidate_template_catalog()
+
+        after = client.get("/templates", headers={"If-None-Match": before.headers["etag"]})
+        assert after.status_code == 200
+        assert after.headers["etag"] != before.headers["etag"]
+        assert get_preview_urls("bubble") == (
+            "/static/previews/bubble.gif",
+            "/static/previews/bubble_placeholder.svg",
+        )
+
+    def test_directory_change_detected_without_invalidate(self, previews_dir):
+        snap = template_catalog.snapshot()
+        (previews_dir / "bar_race_placeholder.svg").write_text("<svg/>")
+        rebuilt = template_catalog.snapshot()
+        assert rebuilt is not snap
+        assert "bar_race_placeholder.svg" in rebuilt.preview_files